@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Apply OSM change files (.osc / .osc.gz) to the custom router database
+Updates only the affected nodes, ways and edges, then bumps the
+graph version so running servers can pick up the new graph.
+"""
+
+import argparse
+import os
+import sys
+
+from custom_router.osm_updater import OSMChange, OSMUpdater
+
+
+def main():
+    """Main update function."""
+    parser = argparse.ArgumentParser(description='Apply OSM change files to the routing database')
+    parser.add_argument('changes', nargs='+', help='OSM change files, applied in order')
+    parser.add_argument('--db', default='data/uk_router.db', help='Routing database')
+    parser.add_argument('--sequence', type=int, help='Replication sequence number of the last file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("CUSTOM ROUTING ENGINE - INCREMENTAL UPDATE")
+    print("=" * 60)
+
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found: {args.db}")
+        return False
+
+    change = OSMChange()
+    for path in args.changes:
+        if not os.path.exists(path):
+            print(f"ERROR: Change file not found: {path}")
+            return False
+        print(f"Reading {path}...")
+        OSMChange.from_file(path, change)
+    change.sequence = args.sequence
+
+    if change.is_empty():
+        print("Nothing to apply")
+        return True
+
+    summary = OSMUpdater(args.db).apply(change, source=', '.join(args.changes))
+
+    print("\nUpdate summary:")
+    for key, value in summary.items():
+        print(f"  - {key}: {value:.1f}" if isinstance(value, float) else f"  - {key}: {value}")
+    print(f"\nGraph version is now {summary['version']}")
+    if summary['ch_invalidated']:
+        print("CH index cleared; run build_ch_index.py to rebuild it")
+    print("Run build_component_cache.py to rebuild the component cache for it")
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -78,9 +78,16 @@ class BackupManager:
             # Backup database
             print(f"[INFO] Creating backup: {backup_name}")
             
-            # Copy database
+            # Copy database with the online backup API; a file copy would miss
+            # transactions still in the WAL file
             temp_db = self.backup_dir / f"temp_{timestamp}.db"
-            shutil.copy2(self.db_path, temp_db)
+            source = sqlite3.connect(self.db_path)
+            target = sqlite3.connect(temp_db)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
             
             # Verify backup integrity
             if not self._verify_backup(temp_db):
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Before/after benchmark of the voyagr_web.db index migrations.
+Builds a database with the app schema and realistic row counts (the full
+SCDB camera set, community reports, route cache and trip history), times
+the app's hot queries on fixed-seed parameters, applies
+VOYAGR_WEB_MIGRATIONS (indexes, R*Trees, ANALYZE) and times them again,
+as the app issues them after migrating. Reports
+p50/p95 per query, the speedup and the query plan on each side.
+
+Usage:
+    python benchmark_db_indexes.py
+    python benchmark_db_indexes.py --cameras 20000 --queries 50 --output db_indexes.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from benchmark_suite import percentiles
+from db_migrations import ACTIVE_REPORTS_BBOX_SQL, CAMERAS_BBOX_SQL, VOYAGR_WEB_MIGRATIONS, migrate
+
+# Rough bounding box of Great Britain
+UK_BOUNDS = (50.0, 58.6, -5.7, 1.7)  # south, north, west, east
+
+# Cameras cluster around towns; the rest are spread along the road network
+CLUSTERS = 60
+CLUSTERED_SHARE = 0.7
+
+ROUTING_MODES = ('auto', 'pedestrian', 'bicycle')
+VEHICLE_TYPES = ('petrol_diesel', 'electric', 'hybrid')
+
+CAMERAS_BETWEEN_SQL = 'SELECT lat, lon, type, description FROM cameras WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?'
+REPORTS_BETWEEN_SQL = ("SELECT lat, lon, hazard_type, description, severity FROM community_hazard_reports "
+                    "WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ? AND status = 'active' AND expiry_timestamp > ?")
+HAZARDS_CACHE_SQL = ('SELECT hazards_data, timestamp FROM route_hazards_cache '
+                     'WHERE north >= ? AND south <= ? AND east >= ? AND west <= ?')
+ROUTE_CACHE_SQL = ('SELECT route_data, access_count FROM persistent_route_cache '
+                   'WHERE start_lat=? AND start_lon=? AND end_lat=? AND end_lon=? AND routing_mode=? AND vehicle_type=?')
+SIMILAR_ROUTE_SQL = ('SELECT AVG(total_cost / distance_km) FROM persistent_route_cache '
+                     'WHERE vehicle_type = ? AND distance_km > ? AND distance_km < ?')
+RECENT_TRIPS_SQL = 'SELECT * FROM trips ORDER BY timestamp DESC LIMIT 50'
+EXPIRED_REPORTS_SQL = 'SELECT COUNT(*) FROM community_hazard_reports WHERE expiry_timestamp < ?'
+
+# Queries the app issues differently once the migrations have run (R*Tree lookups)
+MIGRATED_SQL = {
+    CAMERAS_BETWEEN_SQL: CAMERAS_BBOX_SQL,
+    REPORTS_BETWEEN_SQL: ACTIVE_REPORTS_BBOX_SQL,
+}
+
+
+def random_point(rng: random.Random, centers: List[Tuple[float, float]]) -> Tuple[float, float]:
+    south, north, west, east = UK_BOUNDS
+    if rng.random() < CLUSTERED_SHARE:
+        lat, lon = rng.choice(centers)
+        return (min(north, max(south, rng.gauss(lat, 0.08))), min(east, max(west, rng.gauss(lon, 0.12))))
+    return rng.uniform(south, north), rng.uniform(west, east)
+
+
+def build_database(path: str, counts: Dict[str, int], seed: int) -> Dict:
+    """Create the app tables and fill them; returns rows reused as query parameters."""
+    import voyagr_web  # imported for its schema only
+
+    rng = random.Random(seed)
+    south, north, west, east = UK_BOUNDS
+    centers = [(rng.uniform(south, north), rng.uniform(west, east)) for _ in range(CLUSTERS)]
+    now = int(time.time())
+
+    conn = sqlite3.connect(path)
+    voyagr_web.create_tables(conn.cursor())
+    conn.executemany('INSERT INTO cameras (lat, lon, type, description, severity) VALUES (?, ?, ?, ?, ?)', (
+        (*random_point(rng, centers), rng.choice(('speed_camera', 'speed_camera', 'traffic_light_camera')),
+         f'SCDB camera {i}', 'high') for i in range(counts['cameras'])))
+    conn.executemany('INSERT INTO community_hazard_reports (user_id, hazard_type, lat, lon, description, severity, '
+                     'status, expiry_timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+        (f'user{i % 500}', rng.choice(('police', 'roadworks', 'accident', 'pothole')), *random_point(rng, centers),
+         'reported', 'medium', 'active' if rng.random() < 0.6 else 'resolved', now + rng.randint(-86400, 86400))
+        for i in range(counts['reports'])))
+    conn.executemany('INSERT INTO route_hazards_cache (north, south, east, west, hazards_data) VALUES (?, ?, ?, ?, ?)', (
+        (lat + 0.2, lat - 0.2, lon + 0.2, lon - 0.2, '{}')
+        for lat, lon in (random_point(rng, centers) for _ in range(counts['hazard_cache']))))
+
+    cached_routes = []
+    for _ in range(counts['route_cache']):
+        (start_lat, start_lon), (end_lat, end_lon) = random_point(rng, centers), random_point(rng, centers)
+        row = (round(start_lat, 4), round(start_lon, 4), round(end_lat, 4), round(end_lon, 4),
+               rng.choice(ROUTING_MODES), rng.choice(VEHICLE_TYPES))
+        cached_routes.append(row)
+    conn.executemany('INSERT OR IGNORE INTO persistent_route_cache (start_lat, start_lon, end_lat, end_lon, routing_mode, '
+                     'vehicle_type, route_data, distance_km, fuel_cost, toll_cost, caz_cost, total_cost, access_count, '
+                     "last_accessed) VALUES (?, ?, ?, ?, ?, ?, '{}', ?, ?, ?, ?, ?, ?, datetime('now', ?))", (
+        (*row, rng.uniform(1, 400), rng.uniform(1, 60), rng.uniform(0, 10), rng.uniform(0, 12), rng.uniform(1, 80),
+         rng.randint(1, 50), f'-{rng.randint(0, 48)} hours') for row in cached_routes))
+    conn.executemany('INSERT INTO trips (start_lat, start_lon, end_lat, end_lon, start_address, end_address, '
+                     "distance_km, duration_minutes, routing_mode, timestamp) VALUES (?, ?, ?, ?, 'A', 'B', ?, ?, ?, "
+                     "datetime('now', ?))", (
+        (*random_point(rng, centers), *random_point(rng, centers), rng.uniform(1, 300), rng.uniform(5, 300),
+         rng.choice(ROUTING_MODES), f'-{rng.randint(0, 365 * 24 * 60)} minutes') for _ in range(counts['trips'])))
+    conn.commit()
+    conn.close()
+    return {'centers': centers, 'cached_routes': cached_routes, 'now': now}
+
+
+def make_workload(fixture: Dict, queries: int, seed: int) -> Dict[str, Tuple[str, List[tuple]]]:
+    """Fixed parameters per benchmarked query, mirroring how the app builds them."""
+    rng = random.Random(seed + 1)
+    centers, now = fixture['centers'], fixture['now']
+
+    def route_bbox():
+        # fetch_hazards_for_route: start/end bounding box plus a 0.1 degree margin
+        (lat1, lon1), (lat2, lon2) = random_point(rng, centers), random_point(rng, centers)
+        lat2, lon2 = lat1 + (lat2 - lat1) * 0.1, lon1 + (lon2 - lon1) * 0.1  # 10-60 km trips
+        return (min(lat1, lat2) - 0.1, max(lat1, lat2) + 0.1, min(lon1, lon2) - 0.1, max(lon1, lon2) + 0.1)
+
+    def nearby_bbox():
+        lat, lon = random_point(rng, centers)
+        return (lat - 0.045, lat + 0.045, lon - 0.07, lon + 0.07)  # ~5 km each way
+
+    def cached_route():
+        if rng.random() < 0.5 and fixture['cached_routes']:
+            return rng.choice(fixture['cached_routes'])
+        (lat1, lon1), (lat2, lon2) = random_point(rng, centers), random_point(rng, centers)
+        return (lat1, lon1, lat2, lon2, rng.choice(ROUTING_MODES), rng.choice(VEHICLE_TYPES))
+
+    def similar_route():
+        distance = rng.uniform(5, 300)
+        return (rng.choice(VEHICLE_TYPES), distance * 0.8, distance * 1.2)
+
+    def hazards_cache():
+        south, north, west, east = route_bbox()
+        return (north, south, east, west)
+
+    return {
+        'cameras_route_bbox': (CAMERAS_BETWEEN_SQL, [route_bbox() for _ in range(queries)]),
+        'cameras_nearby': (CAMERAS_BETWEEN_SQL, [nearby_bbox() for _ in range(queries)]),
+        'hazard_reports_bbox': (REPORTS_BETWEEN_SQL, [route_bbox() + (now,) for _ in range(queries)]),
+        'route_hazards_cache': (HAZARDS_CACHE_SQL, [hazards_cache() for _ in range(queries)]),
+        'route_cache_lookup': (ROUTE_CACHE_SQL, [cached_route() for _ in range(queries)]),
+        'route_cache_similar': (SIMILAR_ROUTE_SQL, [similar_route() for _ in range(queries)]),
+        'trips_recent': (RECENT_TRIPS_SQL, [() for _ in range(queries)]),
+        'expired_reports': (EXPIRED_REPORTS_SQL, [(now - rng.randint(0, 86400),) for _ in range(queries)]),
+    }
+
+
+def query_plan(conn: sqlite3.Connection, sql: str, parameters: tuple) -> List[str]:
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, parameters)]
+
+
+def measure(conn: sqlite3.Connection, workload: Dict, warmup: int, migrated: bool = False) -> Dict[str, Dict]:
+    """Latency (ms, execute plus fetchall) and plan of every query in the workload."""
+    results = {}
+    for name, (sql, parameter_sets) in workload.items():
+        if migrated:
+            sql = MIGRATED_SQL.get(sql, sql)
+        for parameters in parameter_sets[:warmup]:
+            conn.execute(sql, parameters).fetchall()
+        samples, rows = [], 0
+        for parameters in parameter_sets:
+            start = time.perf_counter()
+            rows += len(conn.execute(sql, parameters).fetchall())
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = dict(percentiles(samples), rows=rows, plan=query_plan(conn, sql, parameter_sets[0]))
+    return results
+
+
+def run(counts: Dict[str, int], queries: int, warmup: int, seed: int, db_path: str) -> Dict:
+    fixture = build_database(db_path, counts, seed)
+    workload = make_workload(fixture, queries, seed)
+
+    conn = sqlite3.connect(db_path)
+    before = measure(conn, workload, warmup)
+    start = time.perf_counter()
+    applied = migrate(conn, VOYAGR_WEB_MIGRATIONS)
+    migrate_s = time.perf_counter() - start
+    after = measure(conn, workload, warmup, migrated=True)
+    conn.close()
+
+    results = {}
+    for name in workload:
+        if before[name]['rows'] != after[name]['rows']:
+            raise AssertionError(f"{name}: {before[name]['rows']} rows before indexing, {after[name]['rows']} after")
+        results[name] = {
+            'before': before[name],
+            'after': after[name],
+            'speedup_p50': before[name]['p50'] / after[name]['p50'] if after[name]['p50'] else None,
+        }
+    return {'rows': counts, 'queries_per_type': queries, 'seed': seed, 'sqlite_version': sqlite3.sqlite_version,
+            'migrations_applied': applied, 'migrate_s': migrate_s, 'queries': results}
+
+
+def print_report(results: Dict) -> None:
+    print(f"SQLite {results['sqlite_version']}, rows: "
+          + ', '.join(f'{table}={count:,}' for table, count in results['rows'].items()))
+    print(f"Migrations {results['migrations_applied']} applied in {results['migrate_s']:.2f}s\n")
+    print(f"{'query':<22} {'p50 before':>11} {'p50 after':>10} {'p95 before':>11} {'p95 after':>10} {'speedup':>8}")
+    for name, result in results['queries'].items():
+        before, after = result['before'], result['after']
+        speedup = f"{result['speedup_p50']:.1f}x" if result['speedup_p50'] else '-'
+        print(f"{name:<22} {before['p50']:>9.3f}ms {after['p50']:>8.3f}ms "
+              f"{before['p95']:>9.3f}ms {after['p95']:>8.3f}ms {speedup:>8}")
+    print()
+    for name, result in results['queries'].items():
+        print(f"{name}:\n  before: {'; '.join(result['before']['plan'])}\n  after:  {'; '.join(result['after']['plan'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='voyagr_web.db index migration benchmark')
+    parser.add_argument('--cameras', type=int, default=144528, help='Camera rows (SCDB has ~144.5k)')
+    parser.add_argument('--reports', type=int, default=20000, help='Community hazard report rows')
+    parser.add_argument('--route-cache', type=int, default=50000, help='Persistent route cache rows')
+    parser.add_argument('--hazard-cache', type=int, default=5000, help='Route hazards cache rows')
+    parser.add_argument('--trips', type=int, default=20000, help='Trip history rows')
+    parser.add_argument('--queries', type=int, default=200, help='Timed executions per query type')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed executions per query type')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', type=str, default=None, help='Build the database here (default: temporary file)')
+    parser.add_argument('--output', type=str, default=None, help='Write results JSON here')
+    args = parser.parse_args()
+
+    counts = {'cameras': args.cameras, 'reports': args.reports, 'route_cache': args.route_cache,
+              'hazard_cache': args.hazard_cache, 'trips': args.trips}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db or os.path.join(tmp_dir, 'voyagr_bench.db')
+        if os.path.exists(db_path):
+            print(f"Refusing to overwrite existing database: {db_path}")
+            sys.exit(2)
+        results = run(counts, args.queries, args.warmup, args.seed, db_path)
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
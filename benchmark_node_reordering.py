@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: OSM-ordered vs Hilbert-ordered node IDs
+Builds a Hilbert-reordered copy of the routing database, then compares
+graph load time and Dijkstra/CH query latency on identical routes.
+
+Usage:
+    python benchmark_node_reordering.py [--db data/uk_router.db] [--routes 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from custom_router.graph import RoadNetwork
+from custom_router.dijkstra import Router
+from custom_router.node_reordering import NodeReorderer
+
+
+def time_queries(router, pairs, use_ch):
+    """Run every pair once and return per-query times in ms."""
+    times = []
+    for start_node, end_node in pairs:
+        start = time.perf_counter()
+        if use_ch:
+            router._dijkstra_ch(start_node, end_node)
+        else:
+            router.dijkstra(start_node, end_node)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def summarize(label, times):
+    """Print summary line for a set of timings."""
+    if not times:
+        print(f"  {label}: no queries")
+        return 0.0
+    avg = sum(times) / len(times)
+    ordered = sorted(times)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"  {label}: avg {avg:.1f}ms, p95 {p95:.1f}ms")
+    return avg
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Hilbert node reordering')
+    parser.add_argument('--db', type=str, default='data/uk_router.db',
+                        help='Path to routing database')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Path for reordered database (default: <db>_hilbert.db)')
+    parser.add_argument('--routes', type=int, default=20,
+                        help='Number of random routes to time (default: 20)')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Random seed for route selection')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"[ERROR] Database not found: {args.db}")
+        sys.exit(1)
+
+    output_db = args.output or args.db.replace('.db', '_hilbert.db')
+
+    print("=" * 70)
+    print("NODE REORDERING BENCHMARK")
+    print("=" * 70)
+
+    print("\n[1/4] Reordering database...")
+    reorderer = NodeReorderer(args.db)
+    reorder_stats = reorderer.reorder_database(output_db)
+
+    print("\n[2/4] Loading original graph...")
+    start = time.time()
+    graph_osm = RoadNetwork(args.db)
+    load_osm = time.time() - start
+
+    print("\n[3/4] Loading reordered graph...")
+    start = time.time()
+    graph_hilbert = RoadNetwork(output_db)
+    load_hilbert = time.time() - start
+
+    # Same routes on both graphs, translated through node_id_map
+    id_map = NodeReorderer.load_id_map(output_db)
+    rng = random.Random(args.seed)
+    candidates = [n for n, nbrs in graph_osm.edges.items() if nbrs]
+    pairs_osm = [(rng.choice(candidates), rng.choice(candidates)) for _ in range(args.routes)]
+    pairs_hilbert = [(id_map[a], id_map[b]) for a, b in pairs_osm]
+
+    print(f"\n[4/4] Timing {len(pairs_osm)} queries on each graph...")
+    results = {}
+    for use_ch in (False, True):
+        router_osm = Router(graph_osm, use_ch=use_ch, db_file=args.db)
+        router_hilbert = Router(graph_hilbert, use_ch=use_ch, db_file=output_db)
+        if use_ch and not (router_osm.ch_available and router_hilbert.ch_available):
+            print("  CH not available - skipping CH comparison")
+            continue
+
+        name = 'CH' if use_ch else 'Dijkstra'
+        print(f"\n{name}:")
+        avg_osm = summarize('OSM order    ', time_queries(router_osm, pairs_osm, use_ch))
+        avg_hilbert = summarize('Hilbert order', time_queries(router_hilbert, pairs_hilbert, use_ch))
+        results[name] = (avg_osm, avg_hilbert)
+
+    print("\n" + "=" * 70)
+    print("RESULTS")
+    print("=" * 70)
+    print(f"Reorder preprocessing: {reorder_stats['total_time_s']:.1f}s "
+          f"(Hilbert keys: {reorder_stats['order_time_s']:.1f}s)")
+    print(f"Graph load: OSM {load_osm:.1f}s, Hilbert {load_hilbert:.1f}s "
+          f"({load_osm / load_hilbert if load_hilbert else 0:.2f}x)")
+    for name, (avg_osm, avg_hilbert) in results.items():
+        speedup = avg_osm / avg_hilbert if avg_hilbert else 0
+        print(f"{name} query speedup: {speedup:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
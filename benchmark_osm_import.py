@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark: OSM import pipelines
+Imports the same PBF with the legacy dict-based pipeline (parse_pbf,
+create_database, build_edges_from_ways, edge insert) and with the streaming
+importer using 1 and N edge workers. Each run is a separate process so peak
+memory is measured per pipeline.
+
+Usage:
+    python benchmark_osm_import.py [--pbf data/great-britain-latest.osm.pbf] [--processes 4]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from custom_router.access import ACCESS_ALL, NO_RESTRICTIONS
+from custom_router.graph import RoadNetwork
+from custom_router.osm_import import peak_memory_mb
+from custom_router.osm_parser import OSMParser
+
+
+def run_legacy(parser):
+    """Parse into dicts, then build and insert edges from the loaded graph."""
+    nodes, ways, turn_restrictions = parser.parse_pbf()
+    if not nodes or not ways or not parser.create_database(nodes, ways, turn_restrictions):
+        return {}
+    graph = RoadNetwork(parser.db_file)
+    graph.build_edges_from_ways(ways)
+
+    edge_rows = []
+    for from_node, neighbors in graph.edges.items():
+        access = graph.get_edge_access(from_node)
+        codes = graph.get_edge_restrictions(from_node)
+        for i, (to_node, distance, speed_limit, way_id) in enumerate(neighbors):
+            edge_rows.append((from_node, to_node, distance, speed_limit, way_id,
+                              access[i] if access is not None else ACCESS_ALL,
+                              codes[i] if codes is not None else NO_RESTRICTIONS))
+
+    conn = sqlite3.connect(parser.db_file)
+    conn.executemany('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id, '
+                     'access, restrictions) VALUES (?, ?, ?, ?, ?, ?, ?)', edge_rows)
+    conn.commit()
+    conn.close()
+    return {'ways_imported': len(ways), 'edges': len(edge_rows)}
+
+
+def run_once(pbf_file, db_file, pipeline, processes):
+    """Run one pipeline in this process and return its measurements."""
+    parser = OSMParser(os.path.dirname(db_file))
+    parser.pbf_file = pbf_file
+    parser.db_file = db_file
+
+    start = time.time()
+    if pipeline == 'legacy':
+        stats = run_legacy(parser)
+    else:
+        stats = parser.import_pbf(processes=processes)
+    elapsed = time.time() - start
+
+    ways = stats.get('ways_imported', 0)
+    return {
+        'elapsed_s': elapsed,
+        'ways': ways,
+        'edges': stats.get('edges', 0),
+        'ways_per_s': ways / elapsed if elapsed > 0 else 0.0,
+        'peak_memory_mb': peak_memory_mb(),
+    }
+
+
+def run_in_subprocess(pbf_file, work_dir, pipeline, processes):
+    """Run a pipeline in a fresh interpreter so memory peaks don't mix."""
+    db_file = os.path.join(work_dir, f'{pipeline}_{processes}.db')
+    output = subprocess.run(
+        [sys.executable, __file__, '--pbf', pbf_file, '--run', pipeline,
+         '--processes', str(processes), '--db', db_file],
+        capture_output=True, text=True)
+    if output.returncode != 0:
+        print(output.stderr)
+        return None
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    if os.path.exists(db_file):
+        result['db_mb'] = os.path.getsize(db_file) / (1024 * 1024)
+        os.remove(db_file)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OSM import pipelines')
+    parser.add_argument('--pbf', type=str, default='data/great-britain-latest.osm.pbf',
+                        help='PBF extract to import')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help='Edge workers for the parallel streaming run')
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help='Skip the dict-based pipeline (needs several times more memory)')
+    parser.add_argument('--run', choices=('legacy', 'stream'), default=None,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--db', type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_once(args.pbf, args.db, args.run, args.processes)))
+        return 0
+
+    if not os.path.exists(args.pbf):
+        print(f"[ERROR] PBF not found: {args.pbf}")
+        return 1
+
+    print("=" * 60)
+    print("OSM IMPORT BENCHMARK")
+    print("=" * 60)
+    print(f"PBF: {args.pbf} ({os.path.getsize(args.pbf) / (1024 * 1024):.0f} MB)")
+
+    runs = [('stream', 1)]
+    if args.processes > 1:
+        runs.append(('stream', args.processes))
+    if not args.skip_legacy:
+        runs.insert(0, ('legacy', 1))
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(args.pbf))) as work_dir:
+        for pipeline, processes in runs:
+            label = pipeline if pipeline == 'legacy' else f"{pipeline} x{processes}"
+            print(f"\n[RUN] {label}...")
+            result = run_in_subprocess(args.pbf, work_dir, pipeline, processes)
+            if result is None:
+                print(f"  {label}: failed")
+                continue
+            results.append((label, result))
+            peak = result['peak_memory_mb']
+            peak_text = f", peak {peak:.0f} MB" if peak is not None else ""
+            print(f"  {label}: {result['elapsed_s']:.1f}s, {result['ways_per_s']:,.0f} ways/s, "
+                  f"{result['edges']:,} edges{peak_text}")
+
+    if len(results) > 1:
+        baseline_label, baseline = results[0]
+        print("\n" + "=" * 60)
+        print(f"SPEEDUP vs {baseline_label}")
+        print("=" * 60)
+        for label, result in results[1:]:
+            speedup = baseline['elapsed_s'] / result['elapsed_s'] if result['elapsed_s'] > 0 else 0.0
+            print(f"  {label}: {speedup:.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Reproducible routing benchmark suite with regression gating.
+Measures graph load time, snap latency, Dijkstra and CH query latency by
+distance band, alternatives, matrix and memory on fixed-seed OD sets,
+reports p50/p95/p99, writes JSON results and fails when a run is slower
+than a stored baseline by more than a threshold.
+
+Usage:
+    python benchmark_suite.py --synthetic 100000 --output results.json
+    python benchmark_suite.py --db data/doncaster.db --save-baseline benchmarks/doncaster.json
+    python benchmark_suite.py --db data/doncaster.db --baseline benchmarks/doncaster.json --threshold 0.2
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from custom_router.graph import RoadNetwork
+from custom_router.osm_import import peak_memory_mb
+from custom_router_service import RouterService
+
+RESULTS_VERSION = 1
+
+# Straight-line distance bands (km); empty bands are left out of the results
+DISTANCE_BANDS = [
+    ('short', 0, 5),
+    ('medium', 5, 25),
+    ('long', 25, 100),
+    ('very_long', 100, float('inf')),
+]
+
+# Regressions smaller than this are timer noise, whatever the ratio
+NOISE_FLOOR = {'ms': 0.5, 's': 0.05, 'mb': 5.0}
+
+
+def percentiles(values: List[float]) -> Dict:
+    """count, mean, p50, p95, p99 and max of a list of samples."""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(math.ceil(p / 100 * len(ordered))) - 1)]
+
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered),
+        'p50': pick(50),
+        'p95': pick(95),
+        'p99': pick(99),
+        'max': ordered[-1],
+    }
+
+
+def band_of(distance_km: float) -> str:
+    for name, low, high in DISTANCE_BANDS:
+        if low <= distance_km < high:
+            return name
+    return DISTANCE_BANDS[-1][0]
+
+
+def make_od_pairs(graph: RoadNetwork, per_band: int, seed: int) -> Dict[str, List[Tuple[int, int]]]:
+    """Fixed origin/destination node pairs per distance band.
+
+    Nodes are drawn (in sorted id order, so the draw only depends on the
+    seed and the graph) from the main component when one is attached.
+    """
+    rng = random.Random(seed)
+    nodes = sorted(node for node in graph.edges if graph.edges[node] and graph.is_in_main_scc(node))
+    pairs = {name: [] for name, _, _ in DISTANCE_BANDS}
+    if len(nodes) < 2:
+        return {}
+    for _ in range(per_band * len(DISTANCE_BANDS) * 200):
+        start, end = rng.sample(nodes, 2)
+        band = pairs[band_of(RoadNetwork.haversine_distance(graph.nodes[start], graph.nodes[end]) / 1000)]
+        if len(band) < per_band:
+            band.append((start, end))
+        if all(len(band) >= per_band for band in pairs.values()):
+            break
+    return {name: band for name, band in pairs.items() if band}
+
+
+def time_calls(func, args_list, warmup: int, repeats: int) -> Tuple[List[float], int]:
+    """Call func(*args) for each args after warmup calls; returns (times_ms, failures)."""
+    for args in args_list[:warmup]:
+        func(*args)
+    times, failures = [], 0
+    for _ in range(repeats):
+        for args in args_list:
+            start = time.perf_counter()
+            result = func(*args)
+            times.append((time.perf_counter() - start) * 1000)
+            if not result:
+                failures += 1
+    return times, failures
+
+
+class BenchmarkSuite:
+    """Runs every benchmark against one routing database."""
+
+    def __init__(self, db_file: str, seed: int = 42, per_band: int = 20, warmup: int = 3,
+                 repeats: int = 1, use_ch: bool = True, matrix_size: int = 10):
+        """Initialize suite."""
+        self.db_file = db_file
+        self.seed = seed
+        self.per_band = per_band
+        self.warmup = warmup
+        self.repeats = repeats
+        self.use_ch = use_ch
+        self.matrix_size = matrix_size
+
+    def run(self) -> Dict:
+        """Run all benchmarks and return the results document."""
+        results = {
+            'version': RESULTS_VERSION,
+            'meta': {
+                'db_file': self.db_file,
+                'seed': self.seed,
+                'per_band': self.per_band,
+                'warmup': self.warmup,
+                'repeats': self.repeats,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'timestamp': time.time(),
+            },
+        }
+
+        start = time.perf_counter()
+        service = RouterService(self.db_file, use_ch=self.use_ch, workers=1)
+        load_s = time.perf_counter() - start
+        try:
+            graph, router = service.graph, service.router
+            results['meta'].update(nodes=len(graph.nodes), graph_version=graph.version,
+                                   ch_available=router.ch_available)
+            results['load'] = {'graph_load_s': load_s, 'rss_mb': peak_memory_mb()}
+
+            pairs = make_od_pairs(graph, self.per_band, self.seed)
+            results['meta']['od_pairs'] = {band: len(band_pairs) for band, band_pairs in pairs.items()}
+            print(f"[Bench] Loaded {len(graph.nodes):,} nodes in {load_s:.1f}s; "
+                  f"OD pairs: {results['meta']['od_pairs']}")
+
+            results['snap'] = self._snap(graph, pairs)
+            results['query'] = self._queries(router, pairs)
+            results['alternatives'] = self._alternatives(service, graph, pairs)
+            results['matrix'] = self._matrix(service, graph, pairs)
+            results['memory'] = {'peak_rss_mb': peak_memory_mb()}
+        finally:
+            service.executor.shutdown()
+        return results
+
+    def _snap(self, graph: RoadNetwork, pairs: Dict) -> Dict:
+        """Nearest-node latency for points jittered ~50 m off OD nodes."""
+        rng = random.Random(self.seed + 1)
+        points = []
+        for band_pairs in pairs.values():
+            for node, _ in band_pairs:
+                lat, lon = graph.nodes[node]
+                points.append((lat + rng.uniform(-0.0005, 0.0005), lon + rng.uniform(-0.0005, 0.0005)))
+        times, failures = time_calls(graph.find_nearest_node, points, self.warmup, self.repeats)
+        return dict(percentiles(times), failures=failures)
+
+    def _queries(self, router, pairs: Dict) -> Dict:
+        """Point-to-point latency per algorithm and distance band."""
+        algorithms = {'dijkstra': router.dijkstra}
+        if router.ch_available:
+            algorithms['ch'] = router._dijkstra_ch
+        results = {}
+        for name, search in algorithms.items():
+            results[name] = {}
+            for band, band_pairs in pairs.items():
+                times, failures = time_calls(search, band_pairs, self.warmup, self.repeats)
+                results[name][band] = dict(percentiles(times), failures=failures)
+                print(f"[Bench] {name} {band}: p50 {results[name][band].get('p50', 0):.1f}ms, "
+                      f"p95 {results[name][band].get('p95', 0):.1f}ms")
+        return results
+
+    def _alternatives(self, service, graph: RoadNetwork, pairs: Dict) -> Dict:
+        """Yen K-shortest paths (k=3) on the short and medium pairs."""
+        coords = [graph.nodes[start] + graph.nodes[end]
+                  for band in ('short', 'medium') for start, end in pairs.get(band, [])][:self.per_band]
+        times, failures = time_calls(lambda *c: service.k_paths.find_k_paths(*c, k=3), coords,
+                                     min(self.warmup, 1), 1)
+        return dict(percentiles(times), failures=failures)
+
+    def _matrix(self, service, graph: RoadNetwork, pairs: Dict) -> Dict:
+        """NxN duration/distance matrix over OD origins."""
+        points = [graph.nodes[start] for band_pairs in pairs.values() for start, _ in band_pairs]
+        points = points[:self.matrix_size]
+        if not points:
+            return {'count': 0}
+        times, _ = time_calls(lambda: service.matrix(points, points), [()], 1, max(3, self.repeats))
+        return dict(percentiles(times), size=len(points))
+
+
+def flatten(results: Dict, prefix: str = '') -> Dict[str, float]:
+    """Lower-is-better metrics as dotted keys, e.g. query.ch.short.p95."""
+    metrics = {}
+    for key, value in results.items():
+        name = f'{prefix}.{key}' if prefix else key
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name))
+        elif key in ('p50', 'p95', 'p99', 'graph_load_s', 'rss_mb', 'peak_rss_mb') and value is not None:
+            metrics[name] = value
+    return metrics
+
+
+def metric_unit(name: str) -> str:
+    if name.endswith('_s'):
+        return 's'
+    if name.endswith('_mb'):
+        return 'mb'
+    return 'ms'
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Metrics in both runs that got slower (or bigger) by more than threshold."""
+    base = flatten({k: v for k, v in baseline.items() if k not in ('meta', 'version')})
+    now = flatten({k: v for k, v in current.items() if k not in ('meta', 'version')})
+    regressions = []
+    for name in sorted(base.keys() & now.keys()):
+        old, new = base[name], now[name]
+        if new > old * (1 + threshold) and new - old > NOISE_FLOOR[metric_unit(name)]:
+            regressions.append({'metric': name, 'baseline': old, 'current': new,
+                                'change_pct': (new / old - 1) * 100 if old else float('inf')})
+    return regressions
+
+
+def load_results(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Could not read baseline {path}: {e}")
+        return None
+
+
+def write_results(results: Dict, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"[Bench] Wrote {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Routing benchmark suite')
+    parser.add_argument('--db', type=str, default='data/uk_router.db',
+                        help='Path to routing database')
+    parser.add_argument('--synthetic', type=int, default=None,
+                        help='Benchmark a generated synthetic network of about this many nodes instead of --db')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for OD pairs and synthetic networks')
+    parser.add_argument('--per-band', type=int, default=20, help='OD pairs per distance band')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed queries per benchmark')
+    parser.add_argument('--repeats', type=int, default=1, help='Timed passes over each OD set')
+    parser.add_argument('--no-ch', action='store_true', help='Do not load Contraction Hierarchies')
+    parser.add_argument('--output', type=str, default=None, help='Write results JSON here')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Compare with this results JSON and exit 1 on regression')
+    parser.add_argument('--save-baseline', type=str, default=None,
+                        help='Write results JSON as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown against the baseline (default: 0.2 = 20%%)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ROUTING BENCHMARK SUITE")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = args.db
+        if args.synthetic:
+            from custom_router.synthetic import SyntheticNetworkGenerator
+            db_file = os.path.join(tmp_dir, f'synthetic_{args.synthetic}.db')
+            SyntheticNetworkGenerator(args.synthetic, seed=args.seed).generate(db_file)
+        elif not os.path.exists(db_file):
+            print(f"[ERROR] Database not found: {db_file}")
+            return 1
+
+        results = BenchmarkSuite(db_file, seed=args.seed, per_band=args.per_band, warmup=args.warmup,
+                                 repeats=args.repeats, use_ch=not args.no_ch).run()
+        if args.synthetic:
+            results['meta']['db_file'] = f'synthetic:{args.synthetic}'
+
+    if args.output:
+        write_results(results, args.output)
+    if args.save_baseline:
+        write_results(results, args.save_baseline)
+
+    if not args.baseline:
+        return 0
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        return 1
+    if baseline.get('meta', {}).get('db_file') != results['meta']['db_file']:
+        print(f"[WARN] Baseline was recorded on {baseline.get('meta', {}).get('db_file')}")
+
+    regressions = compare(results, baseline, args.threshold)
+    print("\n" + "=" * 60)
+    if not regressions:
+        print(f"✅ No regressions over {args.threshold:.0%} against {args.baseline}")
+        return 0
+    print(f"❌ {len(regressions)} regressions over {args.threshold:.0%} against {args.baseline}")
+    for r in regressions:
+        print(f"  {r['metric']}: {r['baseline']:.2f} -> {r['current']:.2f} (+{r['change_pct']:.0f}%)")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Build the connected component cache for the custom routing engine.
+Computes weak and strongly connected components once and stores them next to
+the routing database (<db>.components.npz), so servers load them at start-up
+instead of computing SCCs themselves. Run it after every import or update
+that changes the graph version.
+
+Usage:
+    python build_component_cache.py [--db data/uk_router.db]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from custom_router.component_analyzer import ComponentAnalyzer
+from custom_router.graph import RoadNetwork
+
+
+def main():
+    """Build and save the component cache."""
+    parser = argparse.ArgumentParser(description='Build the connected component cache')
+    parser.add_argument('--db', default='data/uk_router.db', help='Routing database')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found: {args.db}")
+        return False
+
+    start = time.time()
+    graph = RoadNetwork(args.db)
+    cache_file = ComponentAnalyzer.cache_path(args.db)
+    stats = ComponentAnalyzer(graph).analyze_cached(cache_file)
+    print(f"\nComponents: {stats['total_components']:,} "
+          f"(main {stats['main_component_pct']:.1f}% of nodes)")
+    if 'scc' in stats:
+        print(f"SCCs: {stats['scc']['total_sccs']:,} (main {stats['scc']['main_scc_pct']:.1f}% of nodes)")
+    print(f"Cache: {cache_file} ({time.time() - start:.1f}s)")
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,247 @@
+"""
+Per-mode access flags and vehicle restrictions for road network edges
+Car, bicycle and foot routing share one graph; each edge carries a bitmask
+of the modes allowed to traverse it in that direction, plus a restriction
+code (height/weight/width/HGV) checked against compiled vehicle profiles.
+"""
+
+from typing import Dict, Optional, Tuple
+
+ACCESS_CAR = 1
+ACCESS_BIKE = 2
+ACCESS_FOOT = 4
+ACCESS_ALL = ACCESS_CAR | ACCESS_BIKE | ACCESS_FOOT
+
+# Travel mode name -> access bit (API routing_mode names included)
+MODES = {
+    'car': ACCESS_CAR,
+    'auto': ACCESS_CAR,
+    'bike': ACCESS_BIKE,
+    'bicycle': ACCESS_BIKE,
+    'foot': ACCESS_FOOT,
+    'pedestrian': ACCESS_FOOT,
+}
+
+# Canonical mode name for each access bit
+MODE_NAMES = {ACCESS_CAR: 'car', ACCESS_BIKE: 'bike', ACCESS_FOOT: 'foot'}
+
+# Default access by highway type (before access/oneway tags are applied)
+HIGHWAY_ACCESS = {
+    'motorway': ACCESS_CAR,
+    'motorway_link': ACCESS_CAR,
+    'trunk': ACCESS_ALL,
+    'trunk_link': ACCESS_ALL,
+    'primary': ACCESS_ALL,
+    'primary_link': ACCESS_ALL,
+    'secondary': ACCESS_ALL,
+    'secondary_link': ACCESS_ALL,
+    'tertiary': ACCESS_ALL,
+    'unclassified': ACCESS_ALL,
+    'residential': ACCESS_ALL,
+    'service': ACCESS_ALL,
+    'living_street': ACCESS_ALL,
+    'track': ACCESS_BIKE | ACCESS_FOOT,
+    'cycleway': ACCESS_BIKE | ACCESS_FOOT,
+    'bridleway': ACCESS_FOOT,
+    'path': ACCESS_BIKE | ACCESS_FOOT,
+    'footway': ACCESS_FOOT,
+    'pedestrian': ACCESS_FOOT,
+    'steps': ACCESS_FOOT,
+}
+
+# Tag that grants or removes access for each mode, most specific last
+MODE_TAGS = {
+    ACCESS_CAR: ('access', 'vehicle', 'motor_vehicle', 'motorcar'),
+    ACCESS_BIKE: ('access', 'vehicle', 'bicycle'),
+    ACCESS_FOOT: ('access', 'foot'),
+}
+
+ALLOWED_VALUES = {'yes', 'designated', 'permissive', 'destination', 'customers', 'delivery'}
+DENIED_VALUES = {'no', 'private', 'agricultural', 'forestry', 'use_sidepath', 'dismount'}
+
+ONEWAY_VALUES = {'yes', '1', 'true'}
+REVERSE_ONEWAY_VALUES = {'-1', 'reverse'}
+
+
+def mode_mask(mode: Optional[str]) -> int:
+    """Access bit for a travel mode name (defaults to car)."""
+    if not mode:
+        return ACCESS_CAR
+    try:
+        return MODES[mode]
+    except KeyError:
+        raise ValueError(f"Unknown travel mode: {mode}")
+
+
+def highway_access(highway: Optional[str]) -> int:
+    """Default access mask for a highway type (no tag overrides)."""
+    return HIGHWAY_ACCESS.get(highway, 0)
+
+
+def way_access(tags: Dict) -> Tuple[int, int]:
+    """Forward and backward access masks for an OSM way.
+
+    Starts from the highway default, applies access/vehicle/mode tags and
+    then oneway rules (cars and bikes obey oneway unless oneway:bicycle=no;
+    pedestrians ignore it).
+    """
+    mask = highway_access(tags.get('highway'))
+    for bit, keys in MODE_TAGS.items():
+        for key in keys:
+            value = tags.get(key)
+            if value in ALLOWED_VALUES:
+                mask |= bit
+            elif value in DENIED_VALUES:
+                mask &= ~bit
+
+    forward = backward = mask
+    oneway = tags.get('oneway', '')
+    if tags.get('junction') == 'roundabout' and oneway not in ('no', '-1'):
+        oneway = 'yes'
+
+    if oneway in ONEWAY_VALUES or oneway in REVERSE_ONEWAY_VALUES:
+        restricted = ACCESS_CAR
+        if tags.get('oneway:bicycle') != 'no' and tags.get('cycleway') not in ('opposite', 'opposite_lane'):
+            restricted |= ACCESS_BIKE
+        if oneway in ONEWAY_VALUES:
+            backward &= ~restricted
+        else:
+            forward &= ~restricted
+
+    return forward, backward
+
+
+# ---------------------------------------------------------------------------
+# Vehicle restrictions
+# ---------------------------------------------------------------------------
+# Each dimension is quantized onto a ladder of thresholds. An edge gets bit i
+# of a ladder when its limit is below threshold i, so "limit < 3.0m" implies
+# the bits for every larger threshold too. A vehicle is compiled into the
+# single bit of the smallest threshold >= its size; the search then skips an
+# edge when (edge_restrictions & vehicle_mask) != 0. Rounding the vehicle up
+# to the next threshold errs on the side of avoiding tight roads.
+
+HEIGHT_THRESHOLDS_M = (2.0, 2.5, 3.0, 3.5, 4.0, 4.5)
+WEIGHT_THRESHOLDS_T = (3.5, 7.5, 12.0, 18.0, 26.0, 44.0)
+WIDTH_THRESHOLDS_M = (2.0, 2.3, 2.6)
+
+HEIGHT_SHIFT = 0
+WEIGHT_SHIFT = HEIGHT_SHIFT + len(HEIGHT_THRESHOLDS_M)
+WIDTH_SHIFT = WEIGHT_SHIFT + len(WEIGHT_THRESHOLDS_T)
+RESTRICT_HGV = 1 << (WIDTH_SHIFT + len(WIDTH_THRESHOLDS_M))
+NO_RESTRICTIONS = 0
+
+FEET_TO_M = 0.3048
+POUNDS_TO_T = 0.000453592
+
+
+def parse_dimension(value: Optional[str], unit: str = 'm') -> Optional[float]:
+    """Parse an OSM maxheight/maxwidth (metres) or maxweight (tonnes) value.
+
+    Handles plain numbers, explicit units ("3.5 m", "7.5 t", "12000 kg",
+    "10 st") and feet/inches ("12'6\""). Returns None for missing or
+    non-numeric values such as "none" or "default".
+    """
+    if not value:
+        return None
+    value = value.strip().lower().replace(',', '.')
+    try:
+        if "'" in value:
+            feet, _, inches = value.partition("'")
+            inches = inches.replace('"', '').strip()
+            return (float(feet) + (float(inches) / 12 if inches else 0)) * FEET_TO_M
+        if value.endswith('kg'):
+            return float(value[:-2]) / 1000
+        if value.endswith('lbs'):
+            return float(value[:-3]) * POUNDS_TO_T
+        if value.endswith('st'):
+            return float(value[:-2]) * 0.907185  # US short tons
+        if value.endswith('ft'):
+            return float(value[:-2]) * FEET_TO_M
+        return float(value.rstrip('mt ').strip())
+    except ValueError:
+        return None
+
+
+def _ladder_bits(limit: Optional[float], thresholds: Tuple[float, ...], shift: int) -> int:
+    """Bits for every threshold the limit falls below."""
+    if limit is None:
+        return 0
+    bits = 0
+    for i, threshold in enumerate(thresholds):
+        if limit < threshold:
+            bits |= 1 << (shift + i)
+    return bits
+
+
+def _vehicle_bit(size: Optional[float], thresholds: Tuple[float, ...], shift: int) -> int:
+    """Bit of the smallest threshold >= size (0 if size is not given)."""
+    if not size:
+        return 0
+    for i, threshold in enumerate(thresholds):
+        if size <= threshold:
+            return 1 << (shift + i)
+    # Larger than every threshold: blocked by any limit on the ladder
+    return 1 << (shift + len(thresholds) - 1)
+
+
+def way_restrictions(tags: Dict) -> int:
+    """Restriction code for an OSM way from maxheight/maxweight/maxwidth/hgv tags."""
+    code = _ladder_bits(parse_dimension(tags.get('maxheight') or tags.get('maxheight:physical')),
+                        HEIGHT_THRESHOLDS_M, HEIGHT_SHIFT)
+    code |= _ladder_bits(parse_dimension(tags.get('maxweight') or tags.get('maxweight:hgv')),
+                         WEIGHT_THRESHOLDS_T, WEIGHT_SHIFT)
+    code |= _ladder_bits(parse_dimension(tags.get('maxwidth') or tags.get('maxwidth:physical')),
+                         WIDTH_THRESHOLDS_M, WIDTH_SHIFT)
+    if tags.get('hgv') in DENIED_VALUES:
+        code |= RESTRICT_HGV
+    return code
+
+
+class VehicleProfile:
+    """Vehicle dimensions compiled into a restriction mask."""
+
+    def __init__(self, name: str, height_m: Optional[float] = None, weight_t: Optional[float] = None,
+                 width_m: Optional[float] = None, hgv: bool = False):
+        """Initialize profile and compile its restriction mask."""
+        self.name = name
+        self.height_m = height_m
+        self.weight_t = weight_t
+        self.width_m = width_m
+        self.hgv = hgv
+        self.restriction_mask = (
+            _vehicle_bit(height_m, HEIGHT_THRESHOLDS_M, HEIGHT_SHIFT)
+            | _vehicle_bit(weight_t, WEIGHT_THRESHOLDS_T, WEIGHT_SHIFT)
+            | _vehicle_bit(width_m, WIDTH_THRESHOLDS_M, WIDTH_SHIFT)
+            | (RESTRICT_HGV if hgv else 0)
+        )
+
+    def to_dict(self) -> Dict:
+        """Convert to JSON-friendly dict."""
+        return {
+            'name': self.name,
+            'height_m': self.height_m,
+            'weight_t': self.weight_t,
+            'width_m': self.width_m,
+            'hgv': self.hgv,
+            'restriction_mask': self.restriction_mask
+        }
+
+
+# Typical UK vehicles (cars are never restricted)
+VEHICLE_PROFILES = {
+    'car': VehicleProfile('car'),
+    'van': VehicleProfile('van', height_m=2.7, weight_t=3.5, width_m=2.1),
+    'truck': VehicleProfile('truck', height_m=4.0, weight_t=18.0, width_m=2.55, hgv=True),
+    'hgv': VehicleProfile('hgv', height_m=4.5, weight_t=44.0, width_m=2.55, hgv=True),
+}
+
+
+def vehicle_restriction_mask(vehicle=None) -> int:
+    """Restriction mask for a VehicleProfile, profile name or None (no restrictions)."""
+    if vehicle is None:
+        return NO_RESTRICTIONS
+    if isinstance(vehicle, VehicleProfile):
+        return vehicle.restriction_mask
+    profile = VEHICLE_PROFILES.get(vehicle)
+    return profile.restriction_mask if profile else NO_RESTRICTIONS
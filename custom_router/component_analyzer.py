@@ -1,13 +1,48 @@
 """
 Connected component analyzer for road network graph
 Identifies and caches connected components for fast routing
-Uses optimized BFS with early termination for large graphs
+Uses vectorized union-find over edge arrays (BFS kept for sampling/fallback),
+iterative Tarjan for strongly connected components over car edges, and
+persists labels next to the graph database. Build the cache offline with
+build_component_cache.py; servers that find it missing or stale compute SCCs
+in a background thread instead of blocking start-up.
 """
 
+import os
+import threading
 import time
 import random
+from array import array
+from bisect import bisect_left
 from collections import deque
-from typing import Dict, Set, Tuple, List
+from typing import Dict, Optional, Set, Tuple, List
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from .access import ACCESS_ALL, ACCESS_CAR
+
+# Bump when the on-disk label format changes
+CACHE_VERSION = 3
+
+# Per-node SCC flags relative to the main (largest) SCC
+SCC_REACHES_MAIN = 1  # node can reach the main SCC
+SCC_FROM_MAIN = 2     # node is reachable from the main SCC
+
+
+def _index_of(node_ids, node_id) -> int:
+    """Position of node_id in a sorted ID array or list (-1 if absent)."""
+    if HAS_NUMPY and isinstance(node_ids, np.ndarray):
+        idx = int(node_ids.searchsorted(node_id))
+    else:
+        idx = bisect_left(node_ids, node_id)
+    if idx < len(node_ids) and node_ids[idx] == node_id:
+        return idx
+    return -1
+
 
 class ComponentAnalyzer:
     """Analyze and cache connected components in road network."""
@@ -19,7 +54,16 @@ class ComponentAnalyzer:
         self.component_sizes = {}  # component_id -> size
         self.main_component_id = None
         self.main_component_size = 0
-        self.analysis_mode = 'fast'  # 'fast' or 'full'
+        self.analysis_mode = 'fast'  # 'fast', 'full' or 'union_find'
+        # Array-backed labels (union-find): sorted node IDs and component per node
+        self.node_ids = None
+        self.labels = None
+        # Strongly connected components over car edges (one-way aware)
+        self.scc_node_ids = None
+        self.scc_labels = None
+        self.scc_flags = None
+        self.scc_sizes = {}
+        self.scc_thread = None  # Background SCC analysis started by analyze_cached
     
     def analyze(self, sample_size=10000, max_bfs_nodes=50000) -> Dict:
         """
@@ -133,6 +177,453 @@ class ComponentAnalyzer:
         self.analysis_mode = 'full'
         return stats
 
+    def analyze_union_find(self) -> Dict:
+        """
+        Complete component analysis using union-find over edge arrays.
+        Analyzes ALL nodes in seconds (vectorized with numpy, pure-Python
+        union-find otherwise). Components are weakly connected (edge
+        direction ignored) and numbered by size, so the main component is 0.
+        """
+        print("[ComponentAnalyzer] Starting union-find component analysis...")
+        start_time = time.time()
+
+        if HAS_NUMPY:
+            self._union_find_numpy()
+        else:
+            self._union_find_python()
+
+        elapsed = time.time() - start_time
+        stats = self._get_statistics()
+        print(f"[ComponentAnalyzer] Union-find analysis complete in {elapsed:.1f}s")
+        print(f"[ComponentAnalyzer] Found {len(self.component_sizes)} components")
+        if self.main_component_size > 0:
+            print(f"[ComponentAnalyzer] Main component: {self.main_component_size:,} nodes "
+                  f"({stats['main_component_pct']:.1f}%)")
+
+        self.analysis_mode = 'union_find'
+        return stats
+
+    def _edge_arrays(self, access_mask: Optional[int] = None) -> Tuple:
+        """Sorted node IDs plus (source, target) edges as indices into them.
+
+        With access_mask, only edges usable by one of those modes are kept.
+        """
+        nodes = self.graph.nodes
+        edges = self.graph.edges
+        node_ids = np.fromiter(nodes.keys(), dtype=np.int64, count=len(nodes))
+        node_ids.sort()
+
+        counts = np.fromiter((len(nbrs) for nbrs in edges.values()), dtype=np.int64, count=len(edges))
+        total = int(counts.sum())
+        sources = np.repeat(np.fromiter(edges.keys(), dtype=np.int64, count=len(edges)), counts)
+        targets = np.fromiter((edge[0] for nbrs in edges.values() for edge in nbrs),
+                              dtype=np.int64, count=total)
+
+        if access_mask is not None:
+            # Flatten per-node access masks (absent = all modes) in edge order
+            edge_access = self.graph.edge_access
+            all_modes = bytes((ACCESS_ALL,))
+            access = np.frombuffer(b''.join(edge_access.get(node) or all_modes * len(nbrs)
+                                            for node, nbrs in edges.items()), dtype=np.uint8)
+            allowed = (access & access_mask) != 0
+            sources, targets = sources[allowed], targets[allowed]
+
+        # Map IDs to indices, dropping edges to nodes missing from the node table
+        u = np.searchsorted(node_ids, sources)
+        v = np.searchsorted(node_ids, targets)
+        n = len(node_ids)
+        valid = (u < n) & (v < n)
+        u, v = u[valid], v[valid]
+        valid = (node_ids[u] == sources[valid]) & (node_ids[v] == targets[valid])
+        return node_ids, u[valid], v[valid]
+
+    def _union_find_numpy(self) -> None:
+        """Vectorized hook-and-compress union-find."""
+        node_ids, u, v = self._edge_arrays()
+        parent = np.arange(len(node_ids), dtype=np.int64)
+
+        while len(u):
+            pu, pv = parent[u], parent[v]
+            differ = pu != pv
+            if not differ.any():
+                break
+            # Edges whose endpoints share a root never separate again
+            u, v, pu, pv = u[differ], v[differ], pu[differ], pv[differ]
+            # Hook the larger root under the smallest root it touches
+            np.minimum.at(parent, np.maximum(pu, pv), np.minimum(pu, pv))
+            # Pointer jumping until every node points at its root
+            while True:
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent = grandparent
+
+        # Relabel roots 0..k-1 by descending component size
+        roots, inverse, sizes = np.unique(parent, return_inverse=True, return_counts=True)
+        order = np.argsort(-sizes, kind='stable')
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        self._set_labels(node_ids, rank[inverse].astype(np.int32), sizes[order])
+
+    def _union_find_python(self) -> None:
+        """Union-find with path halving over the adjacency lists."""
+        parent = {node: node for node in self.graph.nodes}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for node, nbrs in self.graph.edges.items():
+            if node not in parent:
+                continue
+            for edge in nbrs:
+                if edge[0] not in parent:
+                    continue
+                a, b = find(node), find(edge[0])
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+
+        roots = {}
+        for node in parent:
+            root = find(node)
+            roots.setdefault(root, []).append(node)
+
+        self.components = {}
+        self.component_sizes = {}
+        for component_id, members in enumerate(sorted(roots.values(), key=len, reverse=True)):
+            for node in members:
+                self.components[node] = component_id
+            self.component_sizes[component_id] = len(members)
+        self.main_component_id = 0 if self.component_sizes else None
+        self.main_component_size = self.component_sizes.get(0, 0)
+
+    def _set_labels(self, node_ids, labels, sizes) -> None:
+        """Install array-backed labels (sizes[i] = size of component i)."""
+        self.node_ids = node_ids
+        self.labels = labels
+        self.components = {}
+        self.component_sizes = {i: int(size) for i, size in enumerate(sizes)}
+        self.main_component_id = 0 if len(sizes) else None
+        self.main_component_size = int(sizes[0]) if len(sizes) else 0
+
+    def analyze_scc(self, access_mask: int = ACCESS_CAR) -> Dict:
+        """
+        Strongly connected components over directed edges usable by access_mask.
+
+        Weak components ignore one-way streets, so two nodes in the same weak
+        component may still have no route between them. SCCs are numbered by
+        size (main SCC is 0) and every node is flagged with whether it can
+        reach, and be reached from, the main SCC so can_reach() rejects
+        impossible searches in O(1).
+        """
+        print("[ComponentAnalyzer] Starting strongly connected component analysis...")
+        start_time = time.time()
+
+        node_ids, u, v = self._directed_edges(access_mask)
+        n = len(node_ids)
+        forward = self._csr(n, u, v)
+        comp, num_sccs = self._tarjan(n, *forward)
+
+        # Renumber SCCs by descending size so the main SCC is 0
+        sizes = [0] * num_sccs
+        for c in comp:
+            sizes[c] += 1
+        rank = [0] * num_sccs
+        for new_id, old_id in enumerate(sorted(range(num_sccs), key=lambda c: -sizes[c])):
+            rank[old_id] = new_id
+        labels = array('l', (rank[c] for c in comp))
+
+        # Flag nodes that reach / are reached from the main SCC
+        flags = bytearray(n)
+        if n:
+            main = [i for i in range(n) if labels[i] == 0]
+            self._mark_reachable(main, *forward, flags, SCC_FROM_MAIN)
+            self._mark_reachable(main, *self._csr(n, v, u), flags, SCC_REACHES_MAIN)
+
+        if HAS_NUMPY:
+            self._set_scc(node_ids, np.frombuffer(labels, dtype=np.dtype(f'i{labels.itemsize}')).astype(np.int32),
+                          np.frombuffer(flags, dtype=np.uint8).copy())
+        else:
+            self._set_scc(node_ids, labels, flags)
+
+        elapsed = time.time() - start_time
+        stats = self._get_scc_statistics()
+        print(f"[ComponentAnalyzer] SCC analysis complete in {elapsed:.1f}s")
+        print(f"[ComponentAnalyzer] Found {stats['total_sccs']:,} SCCs, main SCC: "
+              f"{stats['main_scc_size']:,} nodes ({stats['main_scc_pct']:.1f}%)")
+        return stats
+
+    def _directed_edges(self, access_mask: int) -> Tuple:
+        """Sorted node IDs and directed (source, target) index arrays."""
+        if HAS_NUMPY:
+            return self._edge_arrays(access_mask)
+
+        node_ids = sorted(self.graph.nodes)
+        index = {node: i for i, node in enumerate(node_ids)}
+        u, v = array('q'), array('q')
+        for node, nbrs in self.graph.edges.items():
+            if node not in index:
+                continue
+            access = self.graph.edge_access.get(node)
+            for i, edge in enumerate(nbrs):
+                if edge[0] in index and (access is None or access[i] & access_mask):
+                    u.append(index[node])
+                    v.append(index[edge[0]])
+        return node_ids, u, v
+
+    @staticmethod
+    def _to_array(values) -> array:
+        """Copy a numpy integer array into a compact array('q')."""
+        result = array('q')
+        result.frombytes(values.astype(np.int64).tobytes())
+        return result
+
+    @staticmethod
+    def _csr(n: int, u, v) -> Tuple[array, array]:
+        """Compressed adjacency (indptr, targets) for edges u[i] -> v[i]."""
+        if HAS_NUMPY and isinstance(u, np.ndarray):
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(u, minlength=n), out=indptr[1:])
+            order = np.argsort(u, kind='stable')
+            return ComponentAnalyzer._to_array(indptr), ComponentAnalyzer._to_array(v[order])
+
+        indptr = array('q', bytes(8 * (n + 1)))
+        for src in u:
+            indptr[src + 1] += 1
+        for i in range(n):
+            indptr[i + 1] += indptr[i]
+        fill = array('q', indptr)
+        targets = array('q', bytes(8 * len(v)))
+        for src, dst in zip(u, v):
+            targets[fill[src]] = dst
+            fill[src] += 1
+        return indptr, targets
+
+    @staticmethod
+    def _tarjan(n: int, indptr: array, targets: array) -> Tuple[array, int]:
+        """Iterative Tarjan SCC; returns (component per node, component count)."""
+        index = array('q', [-1]) * n
+        low = array('q', bytes(8 * n))
+        on_stack = bytearray(n)
+        comp = array('l', [-1]) * n
+        stack = []
+        counter = 0
+        num_sccs = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, indptr[root])]
+
+            while work:
+                node, i = work[-1]
+                end = indptr[node + 1]
+                descended = False
+                while i < end:
+                    nbr = targets[i]
+                    i += 1
+                    if index[nbr] == -1:
+                        work[-1] = (node, i)
+                        index[nbr] = low[nbr] = counter
+                        counter += 1
+                        stack.append(nbr)
+                        on_stack[nbr] = 1
+                        work.append((nbr, indptr[nbr]))
+                        descended = True
+                        break
+                    if on_stack[nbr] and index[nbr] < low[node]:
+                        low[node] = index[nbr]
+                if descended:
+                    continue
+
+                work.pop()
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        comp[member] = num_sccs
+                        if member == node:
+                            break
+                    num_sccs += 1
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+        return comp, num_sccs
+
+    @staticmethod
+    def _mark_reachable(sources: List[int], indptr: array, targets: array,
+                        flags: bytearray, bit: int) -> None:
+        """BFS from sources, setting bit on every node reached."""
+        queue = deque(sources)
+        for node in sources:
+            flags[node] |= bit
+        while queue:
+            node = queue.popleft()
+            for i in range(indptr[node], indptr[node + 1]):
+                nbr = targets[i]
+                if not flags[nbr] & bit:
+                    flags[nbr] |= bit
+                    queue.append(nbr)
+
+    def _set_scc(self, node_ids, labels, flags) -> None:
+        """Install SCC labels and reachability flags aligned with node_ids.
+
+        scc_labels is assigned last: readers treat it as the "SCCs analyzed"
+        switch, so a background analysis never exposes half-installed arrays.
+        """
+        if HAS_NUMPY and isinstance(labels, np.ndarray):
+            sizes = {i: int(size) for i, size in enumerate(np.bincount(labels))}
+        else:
+            sizes = {}
+            for label in labels:
+                sizes[label] = sizes.get(label, 0) + 1
+        self.scc_node_ids = node_ids
+        self.scc_flags = flags
+        self.scc_sizes = sizes
+        self.scc_labels = labels
+
+    def get_scc_id(self, node_id: int) -> int:
+        """Get SCC ID for a node (-1 if SCCs not analyzed or node unknown)."""
+        if self.scc_labels is None:
+            return -1
+        idx = _index_of(self.scc_node_ids, node_id)
+        return int(self.scc_labels[idx]) if idx != -1 else -1
+
+    def is_in_main_scc(self, node_id: int) -> bool:
+        """Check if node is in the largest SCC (True if SCCs not analyzed)."""
+        if self.scc_labels is None:
+            return True
+        return self.get_scc_id(node_id) == 0
+
+    def can_reach(self, from_node: int, to_node: int) -> bool:
+        """O(1) reachability check along directed edges.
+
+        Returns False only when a route is provably impossible: one end is in
+        the main SCC and the other cannot reach it (or be reached from it).
+        Unknown nodes and pairs outside the main SCC are assumed reachable.
+        """
+        if self.scc_labels is None:
+            return True
+        i = _index_of(self.scc_node_ids, from_node)
+        j = _index_of(self.scc_node_ids, to_node)
+        if i == -1 or j == -1:
+            return True
+        from_scc, to_scc = self.scc_labels[i], self.scc_labels[j]
+        if from_scc == to_scc:
+            return True
+        if from_scc == 0:
+            return bool(self.scc_flags[j] & SCC_FROM_MAIN)
+        if to_scc == 0:
+            return bool(self.scc_flags[i] & SCC_REACHES_MAIN)
+        return True
+
+    def _get_scc_statistics(self) -> Dict:
+        """Get SCC statistics."""
+        total_nodes = len(self.scc_labels) if self.scc_labels is not None else 0
+        main_size = self.scc_sizes.get(0, 0)
+        flags = self.scc_flags if self.scc_flags is not None else b''
+        if HAS_NUMPY and isinstance(flags, np.ndarray):
+            reaching = int(np.count_nonzero(flags & SCC_REACHES_MAIN))
+            reachable = int(np.count_nonzero(flags & SCC_FROM_MAIN))
+        else:
+            reaching = sum(1 for f in flags if f & SCC_REACHES_MAIN)
+            reachable = sum(1 for f in flags if f & SCC_FROM_MAIN)
+        return {
+            'total_sccs': len(self.scc_sizes),
+            'main_scc_size': main_size,
+            'main_scc_pct': 100 * main_size / total_nodes if total_nodes > 0 else 0,
+            'nodes_reaching_main': reaching,
+            'nodes_reachable_from_main': reachable
+        }
+
+    @staticmethod
+    def cache_path(db_file: str) -> str:
+        """Component label file stored next to the graph database."""
+        return db_file + '.components.npz'
+
+    def _graph_signature(self) -> List[int]:
+        """Graph version plus node and edge counts used to detect a stale cache."""
+        return [getattr(self.graph, 'version', 0), len(self.graph.nodes),
+                sum(len(nbrs) for nbrs in self.graph.edges.values())]
+
+    def save(self, path: str) -> bool:
+        """Save array-backed component labels to disk."""
+        if not HAS_NUMPY or self.labels is None:
+            return False
+        tmp_path = path + '.tmp'
+        arrays = {'node_ids': self.node_ids, 'labels': self.labels}
+        if self.scc_labels is not None:
+            arrays.update(scc_labels=self.scc_labels, scc_flags=self.scc_flags)
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.array([CACHE_VERSION] + self._graph_signature(), dtype=np.int64), **arrays)
+        os.replace(tmp_path, path)
+        print(f"[ComponentAnalyzer] Saved component labels to {path}")
+        return True
+
+    def load(self, path: str) -> bool:
+        """Load component labels saved by save(); False if missing or stale."""
+        if not HAS_NUMPY or not os.path.exists(path):
+            return False
+        try:
+            with np.load(path) as data:
+                meta = data['meta'].tolist()
+                if meta != [CACHE_VERSION] + self._graph_signature():
+                    print(f"[ComponentAnalyzer] Component cache {path} is stale, ignoring")
+                    return False
+                node_ids, labels = data['node_ids'], data['labels']
+                scc = (data['scc_labels'], data['scc_flags']) if 'scc_labels' in data else None
+        except Exception as e:
+            print(f"[ComponentAnalyzer] Could not load component cache: {e}")
+            return False
+
+        self._set_labels(node_ids, labels, np.bincount(labels))
+        if scc is not None:
+            self._set_scc(node_ids, *scc)
+        self.analysis_mode = 'union_find'
+        print(f"[ComponentAnalyzer] Loaded {len(self.component_sizes):,} components from {path}")
+        return True
+
+    def analyze_cached(self, path: Optional[str] = None, scc: bool = True,
+                       scc_in_background: bool = False) -> Dict:
+        """Load labels from path if valid, otherwise compute and save them.
+
+        With scc, strongly connected components are computed (and cached)
+        alongside the weak components. The SCC pass is pure Python, so with
+        scc_in_background it runs in a daemon thread (scc_thread) and the
+        call returns as soon as the weak components are ready; until it
+        finishes can_reach() and is_in_main_scc() answer permissively.
+        """
+        path = path or self.cache_path(self.graph.db_file)
+        if not self.load(path):
+            self.analyze_union_find()
+            if scc and not scc_in_background:
+                self.analyze_scc()
+            self.save(path)
+        elif scc and self.scc_labels is None and not scc_in_background:
+            self.analyze_scc()
+            self.save(path)
+        if scc and self.scc_labels is None:
+            self.scc_thread = threading.Thread(target=self._analyze_scc_and_save, args=(path,),
+                                               name='scc-analysis', daemon=True)
+            self.scc_thread.start()
+        return self._get_statistics()
+
+    def _analyze_scc_and_save(self, path: str) -> None:
+        """Background SCC analysis; the labels are cached for the next start-up."""
+        try:
+            self.analyze_scc()
+            self.save(path)
+        except Exception as e:
+            print(f"[ComponentAnalyzer] Background SCC analysis failed: {e}")
+
     def _bfs_component(self, start_node: int, visited: Set[int]) -> Set[int]:
         """Find all nodes in component using BFS."""
         component = set()
@@ -176,12 +667,17 @@ class ComponentAnalyzer:
         """Check if two nodes are in same component (O(1))."""
         # If either node is not analyzed, assume they're connected
         # (fallback to other routing engines)
-        if node1 not in self.components or node2 not in self.components:
+        comp1 = self.get_component_id(node1)
+        comp2 = self.get_component_id(node2)
+        if comp1 == -1 or comp2 == -1:
             return True
-        return self.components[node1] == self.components[node2]
+        return comp1 == comp2
     
     def get_component_id(self, node_id: int) -> int:
         """Get component ID for a node."""
+        if self.labels is not None:
+            idx = _index_of(self.node_ids, node_id)
+            return int(self.labels[idx]) if idx != -1 else -1
         return self.components.get(node_id, -1)
     
     def is_in_main_component(self, node_id: int) -> bool:
@@ -190,14 +686,14 @@ class ComponentAnalyzer:
     
     def _get_statistics(self) -> Dict:
         """Get component statistics."""
-        total_nodes = len(self.components)
+        total_nodes = len(self.labels) if self.labels is not None else len(self.components)
         total_components = len(self.component_sizes)
         
         # Sort components by size
         sorted_comps = sorted(self.component_sizes.items(), 
                             key=lambda x: x[1], reverse=True)
         
-        return {
+        stats = {
             'total_nodes': total_nodes,
             'total_components': total_components,
             'main_component_id': self.main_component_id,
@@ -206,6 +702,9 @@ class ComponentAnalyzer:
             'top_5_components': sorted_comps[:5],
             'components': self.component_sizes
         }
+        if self.scc_labels is not None:
+            stats['scc'] = self._get_scc_statistics()
+        return stats
     
     def get_statistics(self) -> Dict:
         """Get component statistics."""
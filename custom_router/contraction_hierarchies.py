@@ -1,11 +1,14 @@
 """
 Contraction Hierarchies (CH) for ultra-fast routing
 Phase 2: Major optimization providing 5-10x speedup
+CH only serves car routes, so it contracts over car-accessible edges only;
+shortcuts never pass along foot- or bike-only edges.
 """
 
 import heapq
 import sqlite3
 from typing import Dict, List, Tuple, Optional, Set
+from .access import ACCESS_CAR
 from .graph import RoadNetwork
 
 class ContractionHierarchies:
@@ -72,12 +75,16 @@ class ContractionHierarchies:
             self.db_conn.close()
             self.db_conn = None
     
+    def _car_edges(self, node: int) -> List:
+        """Outgoing edges of node open to cars."""
+        return self.graph.usable_edges(node, ACCESS_CAR)
+
     def _build_reverse_edges(self):
-        """Build reverse edge index for O(1) incoming edge lookup."""
+        """Build reverse edge index (car edges) for O(1) incoming edge lookup."""
         self.reverse_edges = {}
 
-        for node, edges in self.graph.edges.items():
-            for neighbor, dist, speed, way_id in edges:
+        for node in self.graph.edges:
+            for neighbor, dist, speed, way_id in self._car_edges(node):
                 if neighbor not in self.reverse_edges:
                     self.reverse_edges[neighbor] = []
                 self.reverse_edges[neighbor].append((node, dist))
@@ -93,7 +100,7 @@ class ContractionHierarchies:
 
         # Edge difference: (shortcuts_needed - edges_removed)
         in_degree = len(self.reverse_edges.get(node, []))
-        out_degree = len(self.graph.edges.get(node, []))
+        out_degree = len(self._car_edges(node))
 
         # Estimate shortcuts needed
         shortcuts_needed = in_degree * out_degree
@@ -113,7 +120,7 @@ class ContractionHierarchies:
 
         # Get incoming and outgoing edges using reverse index (O(k) where k = degree)
         incoming = self.reverse_edges.get(node, [])
-        outgoing = self.graph.edges.get(node, [])
+        outgoing = self._car_edges(node)
 
         # Create shortcuts for all paths through this node
         # Time complexity: O(k²) where k = average degree (~2-4)
@@ -167,7 +174,7 @@ class ContractionHierarchies:
                     best_distance = min(best_distance, dist + backward_dist[node])
                 
                 # Explore neighbors (only upward in hierarchy)
-                for neighbor, edge_dist, speed, way_id in self.graph.edges.get(node, []):
+                for neighbor, edge_dist, speed, way_id in self._car_edges(node):
                     if self.levels.get(neighbor, -1) > self.levels.get(node, -1):
                         new_dist = dist + edge_dist
                         if new_dist < forward_dist.get(neighbor, float('inf')):
@@ -185,7 +192,7 @@ class ContractionHierarchies:
                     best_distance = min(best_distance, dist + forward_dist[node])
                 
                 # Explore neighbors (only upward in hierarchy)
-                for neighbor, edge_dist, speed, way_id in self.graph.edges.get(node, []):
+                for neighbor, edge_dist, speed, way_id in self._car_edges(node):
                     if self.levels.get(neighbor, -1) > self.levels.get(node, -1):
                         new_dist = dist + edge_dist
                         if new_dist < backward_dist.get(neighbor, float('inf')):
@@ -99,3 +99,34 @@ class CostCalculator:
             'total_cost': round(fuel_cost + toll_cost + caz_cost, 2)
         }
 
+
+    @staticmethod
+    def calculate_route_cost(route_data: Dict, ways: Dict, vehicle_type: str = 'petrol_diesel',
+                             fuel_efficiency: float = None, fuel_price: float = None,
+                             include_tolls: bool = True, include_caz: bool = True,
+                             is_caz_exempt: bool = False) -> Dict:
+        """Calculate route cost from Router route data.
+
+        Uses the per-edge distances and way IDs recorded during extraction,
+        so tolls are charged per road type actually driven.
+        """
+        distance_km = route_data['distance_km']
+        toll_cost = 0.0
+        if include_tolls:
+            for distance_m, way_id in zip(route_data.get('edge_distances_m', []),
+                                          route_data.get('way_ids', [])):
+                highway = (ways.get(way_id) or {}).get('highway')
+                rate = CostCalculator.TOLL_RATES.get(highway, CostCalculator.TOLL_RATES['other'])
+                toll_cost += distance_m / 1000 * rate
+
+        fuel_cost = CostCalculator.calculate_fuel_cost(distance_km, vehicle_type,
+                                                       fuel_efficiency, fuel_price)
+        caz_cost = CostCalculator.calculate_caz_cost(distance_km, vehicle_type,
+                                                     include_caz, is_caz_exempt)
+
+        return {
+            'fuel_cost': round(fuel_cost, 2),
+            'toll_cost': round(toll_cost, 2),
+            'caz_cost': round(caz_cost, 2),
+            'total_cost': round(fuel_cost + toll_cost + caz_cost, 2)
+        }
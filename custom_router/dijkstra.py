@@ -13,7 +13,8 @@ import sqlite3
 from typing import List, Tuple, Optional, Dict, Set
 from collections import deque
 from .graph import RoadNetwork
-from .memory_monitor import get_monitor
+from .access import ACCESS_CAR, MODE_NAMES, NO_RESTRICTIONS, mode_mask, vehicle_restriction_mask
+from .query_stats import QueryStats, QueryStatsAggregator, get_memory_sampler
 
 class Router:
     """Route calculation using Dijkstra algorithm with A* heuristic and optional Contraction Hierarchies."""
@@ -35,6 +36,39 @@ class Router:
         'living_street': 2.0,
     }
 
+    # Travel modes other than car use a fixed speed scaled by road type
+    MODE_SPEEDS_KMH = {
+        'bike': 16,
+        'foot': 5,
+    }
+
+    # Optimistic top speed per mode for the A* heuristic
+    MODE_MAX_SPEEDS_KMH = {
+        'car': 140,
+        'bike': 30,
+        'foot': 6,
+    }
+
+    MODE_ROAD_PENALTIES = {
+        'bike': {
+            'trunk': 2.0,
+            'trunk_link': 2.0,
+            'primary': 1.5,
+            'primary_link': 1.5,
+            'secondary': 1.2,
+            'track': 1.3,
+            'path': 1.2,
+            'cycleway': 0.8,
+            'footway': 3.0,
+            'steps': 10.0,
+        },
+        'foot': {
+            'trunk': 1.5,
+            'primary': 1.2,
+            'steps': 1.5,
+        },
+    }
+
     def __init__(self, graph: RoadNetwork, use_ch: bool = True, db_file: str = 'data/uk_router.db'):
         """Initialize router with graph.
 
@@ -48,14 +82,15 @@ class Router:
         self.db_file = db_file
         self.ch_levels = {}  # node_id -> level (loaded from DB)
         self.ch_available = False
-        self.reverse_edges = {}  # node_id -> [(from_node, distance), ...] for CH backward search
+        self.reverse_edges = {}  # node_id -> [(from_node, distance, edge, access, restrictions), ...]
+        self.mode_way_costs = {}  # mode -> {way_id: seconds per metre} (bike/foot only)
+        self.snap_to_main_scc = True  # Car routes snap to the largest SCC when SCCs are analyzed
 
         # Try to load CH data from database
         if use_ch:
             self._load_ch_data()
-            # Build reverse edge index for CH backward search
-            if self.ch_available:
-                self._build_reverse_edges()
+        # Build reverse edge index for the backward searches
+        self._build_reverse_edges()
 
         self.stats = {
             'iterations': 0,
@@ -65,22 +100,22 @@ class Router:
             'ch_used': False,  # Phase 3: Track if CH was used
         }
 
+        # Per-query instrumentation (perf_counter_ns + plain counters)
+        self.query_stats = QueryStatsAggregator()
+        self.memory_sampler = get_memory_sampler()
+
     def _build_reverse_edges(self):
-        """Build reverse edge index for CH backward search.
+        """Build reverse edge index for the backward searches.
 
-        This creates a mapping of node_id -> [(from_node, distance), ...]
-        for all incoming edges to each node.
+        This maps node_id -> [(from_node, distance, edge, access, restrictions), ...]
+        for all incoming edges of each node, with the masks of the incoming edge
+        itself. The edge is the forward adjacency tuple so searches can record it
+        without copying. The index lives on the graph, which keeps it current
+        while k-paths removes and restores edges.
         """
-        print("[Router] Building reverse edge index for CH...")
+        print("[Router] Building reverse edge index...")
         start = time.time()
-
-        # Iterate through all edges and build reverse index
-        for node, edges in self.graph.edges.items():
-            for neighbor, dist, speed, way_id in edges:
-                if neighbor not in self.reverse_edges:
-                    self.reverse_edges[neighbor] = []
-                self.reverse_edges[neighbor].append((node, dist))
-
+        self.reverse_edges = self.graph.build_reverse_edges()
         elapsed = time.time() - start
         print(f"[Router] ✅ Reverse edge index built in {elapsed:.1f}s")
         print(f"[Router] Nodes with incoming edges: {len(self.reverse_edges):,}")
@@ -126,79 +161,103 @@ class Router:
             self.ch_available = False
     
     def route(self, start_lat: float, start_lon: float,
-              end_lat: float, end_lon: float) -> Optional[Dict]:
+              end_lat: float, end_lon: float, mode: str = 'car',
+              vehicle=None) -> Optional[Dict]:
         """Calculate route between two points.
 
         Uses Contraction Hierarchies if available for 5-10x speedup,
         falls back to bidirectional Dijkstra with A* heuristic.
+        mode is 'car', 'bike' or 'foot' (API names 'auto', 'bicycle' and
+        'pedestrian' are accepted); CH is only used for car routes.
+        vehicle is a VehicleProfile or profile name ('van', 'truck', ...);
+        edges whose height/weight/width/HGV restrictions exclude it are
+        skipped during the search.
         """
-        start_time = time.time()
-        monitor = get_monitor()
-        monitor.start()
-        monitor.snapshot("route_start")
-
-        # Find nearest nodes
-        start_node = self.graph.find_nearest_node(start_lat, start_lon)
-        end_node = self.graph.find_nearest_node(end_lat, end_lon)
-        monitor.snapshot("nodes_found")
-
-        print(f"[Router] Found nodes: start={start_node}, end={end_node}")
-
-        # Check if nodes exist in graph
-        if start_node:
-            start_exists = start_node in self.graph.nodes
-            print(f"[Router] Start node exists in graph: {start_exists}")
-        if end_node:
-            end_exists = end_node in self.graph.nodes
-            print(f"[Router] End node exists in graph: {end_exists}")
+        qs = QueryStats()
+        t_start = time.perf_counter_ns()
+        mode_bit = mode_mask(mode)
+        mode = MODE_NAMES[mode_bit]
+        vehicle_mask = vehicle_restriction_mask(vehicle) if mode == 'car' else NO_RESTRICTIONS
+
+        # Find nearest nodes usable by this mode and vehicle (car routes snap into the main SCC)
+        main_scc_only = self.snap_to_main_scc and mode == 'car'
+        start_node = self.graph.find_nearest_node(start_lat, start_lon, access_mask=mode_bit,
+                                                  main_scc_only=main_scc_only, vehicle_mask=vehicle_mask)
+        end_node = self.graph.find_nearest_node(end_lat, end_lon, access_mask=mode_bit,
+                                                main_scc_only=main_scc_only, vehicle_mask=vehicle_mask)
+        t_snapped = time.perf_counter_ns()
+        qs.snap_ns = t_snapped - t_start
 
         if not start_node or not end_node:
+            self._record_query(qs, t_start)
             return None
 
         # Phase 4: Check if nodes are in same component (O(1))
         if not self.graph.is_connected(start_node, end_node):
-            elapsed = (time.time() - start_time) * 1000
+            self._record_query(qs, t_start)
             return {
                 'error': 'No route found',
                 'reason': 'Start and end points are in different road network components',
                 'start_component': self.graph.get_component_id(start_node),
                 'end_component': self.graph.get_component_id(end_node),
-                'response_time_ms': elapsed
+                'response_time_ms': qs.total_ns / 1e6
+            }
+
+        # One-way streets: reject pairs the SCC flags prove unreachable (O(1))
+        if mode == 'car' and not self.graph.can_reach(start_node, end_node):
+            self._record_query(qs, t_start)
+            return {
+                'error': 'No route found',
+                'reason': 'End point cannot be reached from start point (one-way streets)',
+                'start_scc': self.graph.component_analyzer.get_scc_id(start_node),
+                'end_scc': self.graph.component_analyzer.get_scc_id(end_node),
+                'response_time_ms': qs.total_ns / 1e6
             }
 
         # Phase 3: Try Contraction Hierarchies first if available
-        if self.ch_available and self.use_ch:
-            print(f"[Router] Using CH for route calculation...")
-            path = self._dijkstra_ch(start_node, end_node)
+        if self.ch_available and self.use_ch and mode == 'car':
+            path, path_edges = self._dijkstra_ch(start_node, end_node, return_edges=True,
+                                                 query_stats=qs, vehicle_mask=vehicle_mask)
             self.stats['ch_used'] = True
         else:
             # Fall back to standard bidirectional Dijkstra with A*
-            print(f"[Router] Using Dijkstra+A* for route calculation...")
-            path = self.dijkstra(start_node, end_node)
+            path, path_edges = self.dijkstra(start_node, end_node, return_edges=True,
+                                             query_stats=qs, mode=mode, vehicle_mask=vehicle_mask)
             self.stats['ch_used'] = False
+        qs.algorithm = 'CH' if self.stats['ch_used'] else 'Dijkstra+A*'
+        t_searched = time.perf_counter_ns()
+        qs.search_ns = t_searched - t_snapped
 
         if not path:
-            elapsed = (time.time() - start_time) * 1000
-            print(f"[Router] ❌ No path found after {elapsed:.0f}ms")
+            self._record_query(qs, t_start)
             return {
                 'error': 'No route found',
                 'reason': 'Algorithm could not find a path (timeout or no connection)',
-                'response_time_ms': elapsed
+                'response_time_ms': qs.total_ns / 1e6
             }
 
         # Extract route data
-        route_data = self.extract_route_data(path)
-        route_data['response_time_ms'] = (time.time() - start_time) * 1000
-        route_data['algorithm'] = 'CH' if self.stats['ch_used'] else 'Dijkstra+A*'
+        route_data = self.extract_route_data(path, path_edges, mode=mode)
+        qs.extract_ns = time.perf_counter_ns() - t_searched
+        qs.success = True
+        self._record_query(qs, t_start)
+
+        route_data['response_time_ms'] = qs.total_ns / 1e6
+        route_data['algorithm'] = qs.algorithm
+        route_data['mode'] = mode
+        route_data['vehicle_mask'] = vehicle_mask
+        route_data['query_stats'] = qs.to_dict()
 
-        # Add memory monitoring data
-        monitor.snapshot("route_complete")
-        memory_report = monitor.get_report()
-        route_data['memory_mb'] = memory_report.get('peak_memory_mb', 0)
-        route_data['memory_delta_mb'] = memory_report.get('total_delta_mb', 0)
+        # Memory comes from the background sampler (no syscall per query)
+        route_data['memory_mb'] = self.memory_sampler.current_mb
 
         return route_data
 
+    def _record_query(self, qs: QueryStats, t_start: int) -> None:
+        """Finalize total time and fold the query into the aggregates."""
+        qs.total_ns = time.perf_counter_ns() - t_start
+        self.query_stats.record(qs)
+
     def _are_connected(self, start_node: int, end_node: int, max_search: int = 500000) -> bool:
         """Quick check if two nodes are in the same connected component.
 
@@ -257,6 +316,15 @@ class Router:
         """
         Phase 2: Calculate edge cost with road type penalties.
         """
+        highway_type = None
+        if way_id in self.graph.ways:
+            highway_type = self.graph.ways[way_id].get('highway', 'unclassified')
+        return self.edge_time_cost(distance, speed_limit, highway_type)
+
+    @classmethod
+    def edge_time_cost(cls, distance: float, speed_limit: float,
+                       highway_type: Optional[str] = None) -> float:
+        """Edge cost from raw attributes (shared with offline preprocessing)."""
         # Base cost: time in seconds
         if speed_limit > 0:
             cost = (distance / 1000) / speed_limit * 3600
@@ -264,14 +332,24 @@ class Router:
             cost = distance / 15000  # Default 15 km/h
 
         # Apply road type penalty
-        if way_id in self.graph.ways:
-            highway_type = self.graph.ways[way_id].get('highway', 'unclassified')
-            penalty = self.ROAD_TYPE_PENALTIES.get(highway_type, 1.0)
-            cost *= penalty
+        if highway_type is not None:
+            cost *= cls.ROAD_TYPE_PENALTIES.get(highway_type, 1.0)
 
         return cost
 
-    def _dijkstra_ch(self, start_node: int, end_node: int) -> Optional[List[int]]:
+    def mode_way_cost(self, mode: str) -> Dict[int, float]:
+        """Per-way cost in seconds per metre for a non-car mode (built once per mode)."""
+        costs = self.mode_way_costs.get(mode)
+        if costs is None:
+            seconds_per_m = 3.6 / self.MODE_SPEEDS_KMH[mode]
+            penalties = self.MODE_ROAD_PENALTIES.get(mode, {})
+            costs = {way_id: seconds_per_m * penalties.get(way.get('highway'), 1.0)
+                     for way_id, way in self.graph.ways.items()}
+            self.mode_way_costs[mode] = costs
+        return costs
+
+    def _dijkstra_ch(self, start_node: int, end_node: int, return_edges: bool = False,
+                     query_stats: Optional[QueryStats] = None, vehicle_mask: int = NO_RESTRICTIONS):
         """
         Phase 3: Dijkstra using Contraction Hierarchies.
         Much faster than standard Dijkstra (5-10x speedup).
@@ -280,22 +358,31 @@ class Router:
         significantly reducing search space.
 
         Falls back to standard Dijkstra if CH coverage is too low.
+
+        Returns the node path, or (path, path_edges) if return_edges is set.
+        Edges whose restriction code intersects vehicle_mask are skipped.
         """
+        if not self.graph.can_reach(start_node, end_node):
+            return (None, None) if return_edges else None
+
         # Check if both start and end nodes have CH levels
         # If CH coverage is too low, fall back to standard Dijkstra
         if start_node not in self.ch_levels or end_node not in self.ch_levels:
             # CH coverage too low, use standard Dijkstra
-            return self.dijkstra(start_node, end_node)
+            return self.dijkstra(start_node, end_node, return_edges=return_edges,
+                                 query_stats=query_stats, vehicle_mask=vehicle_mask)
 
         # Forward search (upward in hierarchy)
         forward_dist = {start_node: 0}
         forward_prev = {}
+        forward_edge = {}  # node -> edge tuple used to reach it
         forward_pq = [(0, start_node)]
         forward_visited: Set[int] = set()
 
         # Backward search (upward in hierarchy)
         backward_dist = {end_node: 0}
         backward_prev = {}
+        backward_edge = {}
         backward_pq = [(0, end_node)]
         backward_visited: Set[int] = set()
 
@@ -304,6 +391,10 @@ class Router:
         iterations = 0
         ch_timeout = 60  # 60 second timeout for CH
         ch_start_time = time.time()
+        pushes = 2
+        relaxations = 0
+        edge_access = self.graph.edge_access
+        edge_restrictions = self.graph.edge_restrictions if vehicle_mask else {}
 
         while (forward_pq or backward_pq) and iterations < self.MAX_ITERATIONS:
             iterations += 1
@@ -331,9 +422,17 @@ class Router:
                         best_distance = candidate_dist
                         meeting_node = node
 
-                # Explore neighbors (only upward in hierarchy)
+                # Explore neighbors (only upward in hierarchy, car edges only)
                 current_level = self.ch_levels.get(node, -1)
-                for neighbor, edge_dist, speed_limit, way_id in self.graph.get_neighbors(node):
+                access = edge_access.get(node)
+                codes = edge_restrictions.get(node)
+                for i, edge in enumerate(self.graph.get_neighbors(node)):
+                    relaxations += 1
+                    if access is not None and not access[i] & ACCESS_CAR:
+                        continue
+                    if codes is not None and codes[i] & vehicle_mask:
+                        continue
+                    neighbor, edge_dist = edge[0], edge[1]
                     neighbor_level = self.ch_levels.get(neighbor, -1)
 
                     # Only explore upward edges in CH
@@ -343,6 +442,8 @@ class Router:
                         if new_dist < forward_dist.get(neighbor, float('inf')):
                             forward_dist[neighbor] = new_dist
                             forward_prev[neighbor] = node
+                            forward_edge[neighbor] = edge
+                            pushes += 1
                             heapq.heappush(forward_pq, (new_dist, neighbor))
 
             # Backward step
@@ -366,7 +467,10 @@ class Router:
                 # Explore incoming edges (only upward in hierarchy)
                 # Use reverse edges for backward search
                 current_level = self.ch_levels.get(node, -1)
-                for from_node, edge_dist in self.reverse_edges.get(node, []):
+                for from_node, edge_dist, edge, access, code in self.reverse_edges.get(node, ()):
+                    relaxations += 1
+                    if not access & ACCESS_CAR or code & vehicle_mask:
+                        continue
                     from_level = self.ch_levels.get(from_node, -1)
 
                     # Only explore upward edges in CH
@@ -376,11 +480,18 @@ class Router:
                         if new_dist < backward_dist.get(from_node, float('inf')):
                             backward_dist[from_node] = new_dist
                             backward_prev[from_node] = node
+                            backward_edge[from_node] = edge
+                            pushes += 1
                             heapq.heappush(backward_pq, (new_dist, from_node))
 
+        if query_stats is not None:
+            query_stats.settled = len(forward_visited) + len(backward_visited)
+            query_stats.heap_pushes = pushes
+            query_stats.relaxations = relaxations
+
         # Reconstruct path
         if meeting_node is None:
-            return None
+            return (None, None) if return_edges else None
 
         # Build forward path
         path = []
@@ -390,22 +501,38 @@ class Router:
             node = forward_prev[node]
         path.append(start_node)
         path.reverse()
+        path_edges = [forward_edge[n] for n in path[1:]]
 
         # Build backward path
         node = meeting_node
         while node in backward_prev:
+            path_edges.append(backward_edge[node])
             node = backward_prev[node]
             path.append(node)
 
-        return path if len(path) > 1 else None
+        if len(path) <= 1:
+            return (None, None) if return_edges else None
+        return (path, path_edges) if return_edges else path
 
-    def dijkstra(self, start_node: int, end_node: int) -> Optional[List[int]]:
+    def dijkstra(self, start_node: int, end_node: int, return_edges: bool = False,
+                 query_stats: Optional[QueryStats] = None, mode: str = 'car',
+                 vehicle_mask: int = NO_RESTRICTIONS):
         """
         Ultra-fast bidirectional A* with aggressive but safe heuristics.
         Handles London → John o' Groats in <1.8 seconds on a single core.
+
+        Returns the node path, or (path, path_edges) if return_edges is set.
+        path_edges[i] is the adjacency tuple traversed between path[i] and
+        path[i + 1], recorded during the search so extraction never rescans.
+        Only edges whose access mask allows the travel mode, and whose
+        restriction code does not intersect vehicle_mask, are relaxed.
         """
         if start_node == end_node:
-            return [start_node]
+            return ([start_node], []) if return_edges else [start_node]
+
+        # Never burn the timeout on pairs the SCC analysis proves unreachable
+        if mode_mask(mode) == ACCESS_CAR and not self.graph.can_reach(start_node, end_node):
+            return (None, None) if return_edges else None
 
         # === TUNING CONSTANTS – THESE ARE THE MAGIC ===
         HEURISTIC_WEIGHT = 1.9          # 1.0 = optimal, 2.0+ = greedy (we use 1.9 → <2% error)
@@ -415,21 +542,36 @@ class Router:
 
         start_time = time.time()
 
+        # Mode-specific access bit and edge weights (car keeps speed-based costs)
+        mode_bit = mode_mask(mode)
+        mode = MODE_NAMES[mode_bit]
+        way_costs = None if mode == 'car' else self.mode_way_cost(mode)
+        default_way_cost = 3.6 / self.MODE_SPEEDS_KMH.get(mode, 50)
+        edge_access = self.graph.edge_access
+        edge_restrictions = self.graph.edge_restrictions if vehicle_mask else {}
+        reverse_edges = self.reverse_edges
+        # Heuristic is seconds at 140 km/h; rescale to the mode's top speed
+        h_scale = HEURISTIC_WEIGHT * (MAX_SPEED_KMH / 80.0) * (140 / self.MODE_MAX_SPEEDS_KMH[mode])
+
         # Forward search (toward end_node)
         forward_dist = {start_node: 0.0}
         forward_prev = {start_node: None}
+        forward_edge = {}  # node -> edge tuple used to reach it
         forward_pq = []  # (f_score, tiebreaker, node)
         heapq.heappush(forward_pq, (0.0, 0, start_node))
 
         # Backward search (toward start_node)
         backward_dist = {end_node: 0.0}
         backward_prev = {end_node: None}
+        backward_edge = {}
         backward_pq = []
         heapq.heappush(backward_pq, (0.0, 0, end_node))
 
         best_distance = float('inf')
         meeting_node = None
         tiebreaker = 0
+        settled = 0
+        relaxations = 0
 
         while forward_pq or backward_pq:
 
@@ -441,6 +583,7 @@ class Router:
             # ── Forward search ───────────────────────────────────
             if forward_pq:
                 f_score, _, node = heapq.heappop(forward_pq)
+                settled += 1
                 dist = forward_dist[node]
 
                 # Meeting found → update best
@@ -455,19 +598,31 @@ class Router:
                     if forward_pq and forward_pq[0][0] >= best_distance * EARLY_STOP_FACTOR:
                         break
 
-                for nbr, edge_m, speed_kmh, way_id in self.graph.get_neighbors(node):
-                    if speed_kmh <= 0:
-                        speed_kmh = 50
-                    cost = self._get_edge_cost(node, nbr, edge_m, speed_kmh, way_id)
+                access = edge_access.get(node)
+                codes = edge_restrictions.get(node)
+                for i, edge in enumerate(self.graph.get_neighbors(node)):
+                    relaxations += 1
+                    if access is not None and not access[i] & mode_bit:
+                        continue
+                    if codes is not None and codes[i] & vehicle_mask:
+                        continue
+                    nbr, edge_m, speed_kmh, way_id = edge
+                    if way_costs is None:
+                        if speed_kmh <= 0:
+                            speed_kmh = 50
+                        cost = self._get_edge_cost(node, nbr, edge_m, speed_kmh, way_id)
+                    else:
+                        cost = edge_m * way_costs.get(way_id, default_way_cost)
                     new_dist = dist + cost
 
                     if new_dist < forward_dist.get(nbr, float('inf')):
                         forward_dist[nbr] = new_dist
                         forward_prev[nbr] = node
+                        forward_edge[nbr] = edge
 
                         # Super-strong heuristic
                         h = self._haversine_heuristic(nbr, end_node)
-                        h_weighted = h * HEURISTIC_WEIGHT * (MAX_SPEED_KMH / 80.0)  # scale up from old 80→140
+                        h_weighted = h * h_scale  # scale up from old 80→140
                         f = new_dist + h_weighted
 
                         tiebreaker += 1
@@ -476,6 +631,7 @@ class Router:
             # ── Backward search ──────────────────────────────────
             if backward_pq:
                 f_score, _, node = heapq.heappop(backward_pq)
+                settled += 1
                 dist = backward_dist[node]
 
                 if node in forward_dist:
@@ -488,26 +644,42 @@ class Router:
                     if backward_pq and backward_pq[0][0] >= best_distance * EARLY_STOP_FACTOR:
                         break
 
-                for nbr, edge_m, speed_kmh, way_id in self.graph.get_neighbors(node):
-                    if speed_kmh <= 0:
-                        speed_kmh = 50
-                    cost = self._get_edge_cost(node, nbr, edge_m, speed_kmh, way_id)
+                # The backward search travels the edges nbr -> node, so it is
+                # their own access and restrictions that count (they differ
+                # from node -> nbr on oneways and contraflow lanes)
+                for nbr, edge_m, edge, access, code in reverse_edges.get(node, ()):
+                    relaxations += 1
+                    if not access & mode_bit or code & vehicle_mask:
+                        continue
+                    speed_kmh, way_id = edge[2], edge[3]
+                    if way_costs is None:
+                        if speed_kmh <= 0:
+                            speed_kmh = 50
+                        cost = self._get_edge_cost(nbr, node, edge_m, speed_kmh, way_id)
+                    else:
+                        cost = edge_m * way_costs.get(way_id, default_way_cost)
                     new_dist = dist + cost
 
                     if new_dist < backward_dist.get(nbr, float('inf')):
                         backward_dist[nbr] = new_dist
                         backward_prev[nbr] = node
+                        backward_edge[nbr] = edge
 
                         h = self._haversine_heuristic(nbr, start_node)
-                        h_weighted = h * HEURISTIC_WEIGHT * (MAX_SPEED_KMH / 80.0)
+                        h_weighted = h * h_scale
                         f = new_dist + h_weighted
 
                         tiebreaker += 1
                         heapq.heappush(backward_pq, (f, tiebreaker, nbr))
 
+        if query_stats is not None:
+            query_stats.settled = settled
+            query_stats.heap_pushes = tiebreaker + 2
+            query_stats.relaxations = relaxations
+
         # ── Path reconstruction (same as CH version) ─────────────
         if meeting_node is None:
-            return None
+            return (None, None) if return_edges else None
 
         path = []
         # Forward part
@@ -516,17 +688,21 @@ class Router:
             path.append(node)
             node = forward_prev.get(node)
         path.reverse()
+        path_edges = [forward_edge[n] for n in path[1:]]
 
         # Backward part (skip duplicate meeting node)
-        node = backward_prev.get(meeting_node)
-        while node is not None:
-            path.append(node)
-            node = backward_prev.get(node)
+        node = meeting_node
+        nxt = backward_prev.get(node)
+        while nxt is not None:
+            path.append(nxt)
+            path_edges.append(backward_edge[node])
+            node = nxt
+            nxt = backward_prev.get(node)
 
         self.stats['iterations'] = len(forward_dist) + len(backward_dist)
         self.stats['nodes_explored'] = len(forward_dist) + len(backward_dist)
 
-        return path
+        return (path, path_edges) if return_edges else path
     
     def reconstruct_path(self, forward_prev: Dict, backward_prev: Dict, 
                         meeting_node: int) -> List[int]:
@@ -551,32 +727,34 @@ class Router:
         path.extend(backward_path)
         return path
     
-    def extract_route_data(self, path: List[int]) -> Dict:
-        """Extract route data from path (optimized)."""
-        coordinates = []
-        total_distance = 0
-        total_time = 0
+    def extract_route_data(self, path: List[int], path_edges: Optional[List[Tuple]] = None,
+                           mode: str = 'car') -> Dict:
+        """Extract route data from path in a single pass over its edges.
+
+        Args:
+            path: Node path
+            path_edges: Edge tuples recorded by the search (path_edges[i]
+                joins path[i] and path[i + 1]). Resolved once from the
+                adjacency lists if not supplied.
+            mode: Travel mode; bike and foot durations use the mode speed
+        """
+        if path_edges is None:
+            path_edges = self.resolve_path_edges(path)
 
         # Extract coordinates in single pass
-        for node_id in path:
-            coords = self.graph.get_node_coords(node_id)
-            if coords:
-                coordinates.append(coords)
-
-        # Calculate distance and time with optimized neighbor lookup
-        for i in range(len(path) - 1):
-            from_node = path[i]
-            to_node = path[i + 1]
-
-            # Get neighbors and find edge in single pass
-            neighbors = self.graph.get_neighbors(from_node)
-            for neighbor, distance, speed, way_id in neighbors:
-                if neighbor == to_node:
-                    total_distance += distance
-                    # Time = distance / speed (convert km/h to m/s)
-                    # Optimization: avoid division in loop
-                    total_time += distance / (speed / 3.6)
-                    break
+        nodes = self.graph.nodes
+        coordinates = [nodes[node_id] for node_id in path if node_id in nodes]
+
+        # Per-edge attributes straight from the recorded edge tuples
+        if path_edges:
+            _, edge_distances, edge_speeds, way_ids = zip(*path_edges)
+        else:
+            edge_distances, edge_speeds, way_ids = (), (), ()
+        mode_speed = self.MODE_SPEEDS_KMH.get(MODE_NAMES[mode_mask(mode)])
+        if mode_speed:
+            edge_durations = [d * 3.6 / mode_speed for d in edge_distances]
+        else:
+            edge_durations = [d * 3.6 / (s if s > 0 else 50) for d, s in zip(edge_distances, edge_speeds)]
 
         # Encode polyline (with error handling)
         encoded = None
@@ -587,8 +765,8 @@ class Router:
             pass
 
         # Return optimized dict
-        distance_m = total_distance
-        duration_s = total_time
+        distance_m = sum(edge_distances)
+        duration_s = sum(edge_durations)
 
         return {
             'path_nodes': path,
@@ -597,15 +775,34 @@ class Router:
             'distance_m': distance_m,
             'duration_s': duration_s,
             'distance_km': distance_m / 1000,
-            'duration_minutes': duration_s / 60
+            'duration_minutes': duration_s / 60,
+            'edge_distances_m': list(edge_distances),
+            'edge_durations_s': edge_durations,
+            'way_ids': list(way_ids)
         }
 
+    def resolve_path_edges(self, path: List[int]) -> List[Tuple]:
+        """Look up the edge tuple for each consecutive node pair of a path.
+
+        Only needed for paths that did not come from a search (e.g. built
+        externally); pairs with no edge are skipped.
+        """
+        path_edges = []
+        for from_node, to_node in zip(path, path[1:]):
+            for edge in self.graph.get_neighbors(from_node):
+                if edge[0] == to_node:
+                    path_edges.append(edge)
+                    break
+        return path_edges
+
     def get_stats(self) -> Dict:
         """Get routing statistics for performance analysis."""
         return {
             'iterations': self.stats['iterations'],
             'nodes_explored': self.stats['nodes_explored'],
-            'early_terminations': self.stats['early_terminations']
+            'early_terminations': self.stats['early_terminations'],
+            'queries': self.query_stats.snapshot(),
+            'memory': self.memory_sampler.get_stats()
         }
 
     def reset_stats(self) -> None:
@@ -613,5 +810,7 @@ class Router:
         self.stats = {
             'iterations': 0,
             'nodes_explored': 0,
-            'early_terminations': 0
-        }
\ No newline at end of file
+            'early_terminations': 0,
+            'ch_used': False
+        }
+        self.query_stats.reset()
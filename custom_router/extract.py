@@ -0,0 +1,309 @@
+"""
+Regional extracts of the routing database
+Cuts a bounding box or polygon out of a routing database into a smaller,
+self-contained routable database (plus an optional binary graph snapshot),
+for city-sized test and benchmark fixtures.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .graph import RoadNetwork
+
+# Named city boxes (min_lat, min_lon, max_lat, max_lon) for common fixtures
+CITY_BBOXES = {
+    'london': (51.28, -0.51, 51.70, 0.33),
+    'manchester': (53.34, -2.40, 53.56, -2.05),
+    'birmingham': (52.38, -2.03, 52.61, -1.72),
+    'leeds': (53.70, -1.80, 53.95, -1.29),
+    'sheffield': (53.30, -1.60, 53.50, -1.32),
+    'doncaster': (53.45, -1.25, 53.60, -0.98),
+    'edinburgh': (55.88, -3.35, 56.00, -3.08),
+}
+
+
+class Region:
+    """Bounding box or polygon (outer rings with optional holes) in lat/lon."""
+
+    def __init__(self, rings: List[List[Tuple[float, float]]], holes: Optional[List[List[Tuple[float, float]]]] = None,
+                 name: str = 'region'):
+        """
+        Initialize region.
+
+        Args:
+            rings: Outer rings as [(lat, lon), ...]
+            holes: Rings cut out of the outer rings
+            name: Label used in logs and stats
+        """
+        self.rings = [list(ring) for ring in rings]
+        self.holes = [list(ring) for ring in holes or []]
+        self.name = name
+        lats = [lat for ring in self.rings for lat, _ in ring]
+        lons = [lon for ring in self.rings for _, lon in ring]
+        self.bounds = (min(lats), min(lons), max(lats), max(lons))
+        self.is_bbox = False
+
+    @classmethod
+    def from_bbox(cls, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                  name: str = 'bbox') -> 'Region':
+        """Axis-aligned box region."""
+        if min_lat >= max_lat or min_lon >= max_lon:
+            raise ValueError(f"Empty bounding box: {(min_lat, min_lon, max_lat, max_lon)}")
+        region = cls([[(min_lat, min_lon), (min_lat, max_lon), (max_lat, max_lon), (max_lat, min_lon)]],
+                     name=name)
+        region.is_bbox = True
+        return region
+
+    @classmethod
+    def parse(cls, text: str) -> 'Region':
+        """Region from a city name in CITY_BBOXES or 'min_lat,min_lon,max_lat,max_lon'."""
+        if text.lower() in CITY_BBOXES:
+            return cls.from_bbox(*CITY_BBOXES[text.lower()], name=text.lower())
+        try:
+            values = [float(v) for v in text.split(',')]
+        except ValueError:
+            values = []
+        if len(values) != 4:
+            raise ValueError(f"Expected a city ({', '.join(sorted(CITY_BBOXES))}) "
+                             f"or min_lat,min_lon,max_lat,max_lon, got {text!r}")
+        return cls.from_bbox(*values)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Region':
+        """Polygon region from a GeoJSON file or an Osmosis .poly file."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path) as f:
+            if path.endswith('.poly'):
+                return cls._from_poly(f.read().splitlines(), name)
+            return cls._from_geojson(json.load(f), name)
+
+    @classmethod
+    def _from_poly(cls, lines: List[str], name: str) -> 'Region':
+        """Osmosis polygon format: sections of 'lon lat' lines, '!' marks a hole."""
+        rings, holes = [], []
+        current = None
+        hole = False
+        for line in lines[1:]:
+            line = line.strip()
+            if not line:
+                continue
+            if line == 'END':
+                if current is None:
+                    break
+                (holes if hole else rings).append(current)
+                current = None
+            elif current is None:
+                hole = line.startswith('!')
+                current = []
+            else:
+                lon, lat = (float(v) for v in line.split()[:2])
+                current.append((lat, lon))
+        if not rings:
+            raise ValueError(f"No polygon rings in {name}.poly")
+        return cls(rings, holes, name=name)
+
+    @classmethod
+    def _from_geojson(cls, data: Dict, name: str) -> 'Region':
+        """Polygon or MultiPolygon geometry, bare or in a Feature/FeatureCollection."""
+        if data.get('type') == 'FeatureCollection':
+            geometries = [feature['geometry'] for feature in data['features']]
+        elif data.get('type') == 'Feature':
+            geometries = [data['geometry']]
+        else:
+            geometries = [data]
+
+        rings, holes = [], []
+        for geometry in geometries:
+            if geometry['type'] == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry['type'] == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+            for polygon in polygons:
+                rings.append([(lat, lon) for lon, lat in polygon[0]])
+                holes.extend([(lat, lon) for lon, lat in ring] for ring in polygon[1:])
+        if not rings:
+            raise ValueError(f"No Polygon or MultiPolygon geometry in {name}")
+        return cls(rings, holes, name=name)
+
+    @staticmethod
+    def _in_ring(lat: float, lon: float, ring: List[Tuple[float, float]]) -> bool:
+        """Ray casting point-in-polygon test."""
+        inside = False
+        j = len(ring) - 1
+        for i in range(len(ring)):
+            lat_i, lon_i = ring[i]
+            lat_j, lon_j = ring[j]
+            if (lat_i > lat) != (lat_j > lat):
+                if lon < (lon_j - lon_i) * (lat - lat_i) / (lat_j - lat_i) + lon_i:
+                    inside = not inside
+            j = i
+        return inside
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Check if a point lies inside the region."""
+        min_lat, min_lon, max_lat, max_lon = self.bounds
+        if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+            return False
+        if self.is_bbox:
+            return True
+        if not any(self._in_ring(lat, lon, ring) for ring in self.rings):
+            return False
+        return not any(self._in_ring(lat, lon, ring) for ring in self.holes)
+
+
+class RegionExtractor:
+    """Copy the part of a routing database inside a region into its own database."""
+
+    def __init__(self, db_file: str):
+        """Initialize extractor."""
+        self.db_file = db_file
+        self.stats = {}
+
+    def extract(self, region: Region, output_db: str, main_component: bool = True,
+                snapshot: bool = True) -> Dict:
+        """
+        Write nodes inside the region, the edges between them, their ways and
+        the turn restrictions between those ways to output_db.
+
+        Edges leaving the region are cut, so small fragments along the border
+        are dropped unless main_component is False. CH tables are not copied
+        (shortcuts may pass outside the region); rebuild them on the extract.
+
+        Args:
+            region: Region to keep
+            output_db: Database to create (replaced if it exists)
+            main_component: Keep only the largest weakly connected component
+            snapshot: Also write RoadNetwork.snapshot_path(output_db)
+
+        Returns:
+            Extract statistics
+        """
+        print(f"[Extract] Extracting {region.name} from {self.db_file} -> {output_db}")
+        start_time = time.time()
+
+        for path in (output_db, RoadNetwork.snapshot_path(output_db)):
+            if os.path.exists(path):
+                os.remove(path)
+
+        conn = sqlite3.connect(output_db)
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=OFF')
+        cursor.execute('PRAGMA synchronous=OFF')
+        cursor.execute('ATTACH DATABASE ? AS src', (self.db_file,))
+
+        tables = ('nodes', 'edges', 'ways', 'turn_restrictions')
+        for (sql,) in cursor.execute(
+                "SELECT sql FROM src.sqlite_master WHERE type='table' "
+                "AND name IN (?, ?, ?, ?)", tables).fetchall():
+            cursor.execute(sql)
+
+        # Bounding box pre-filter on the lat/lon index, exact polygon test in Python
+        min_lat, min_lon, max_lat, max_lon = region.bounds
+        candidates = cursor.execute(
+            'SELECT id, lat, lon FROM src.nodes WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?',
+            (min_lat, max_lat, min_lon, max_lon)).fetchall()
+        cursor.execute('CREATE TEMP TABLE region_nodes (node_id INTEGER PRIMARY KEY)')
+        cursor.executemany('INSERT INTO region_nodes VALUES (?)',
+                           [(node_id,) for node_id, lat, lon in candidates if region.contains(lat, lon)])
+        del candidates
+        region_nodes = cursor.execute('SELECT COUNT(*) FROM region_nodes').fetchone()[0]
+
+        cursor.execute('''
+            INSERT INTO main.edges SELECT e.* FROM region_nodes r
+            JOIN src.edges e ON e.from_node_id = r.node_id
+            WHERE e.to_node_id IN (SELECT node_id FROM region_nodes)
+            ORDER BY e.from_node_id
+        ''')
+
+        dropped_nodes = 0
+        if main_component:
+            dropped_nodes = self._keep_main_component(cursor)
+
+        cursor.execute('''
+            INSERT INTO main.nodes SELECT n.* FROM src.nodes n
+            WHERE n.id IN (SELECT from_node_id FROM main.edges UNION SELECT to_node_id FROM main.edges)
+            ORDER BY n.id
+        ''')
+        cursor.execute('''
+            INSERT INTO main.ways SELECT * FROM src.ways
+            WHERE id IN (SELECT DISTINCT way_id FROM main.edges)
+        ''')
+        cursor.execute('''
+            INSERT INTO main.turn_restrictions SELECT * FROM src.turn_restrictions
+            WHERE from_way_id IN (SELECT id FROM main.ways) AND to_way_id IN (SELECT id FROM main.ways)
+        ''')
+        conn.commit()
+
+        # Recreate indexes after the bulk load
+        for (sql,) in cursor.execute(
+                "SELECT sql FROM src.sqlite_master WHERE type='index' AND sql IS NOT NULL "
+                "AND tbl_name IN (?, ?, ?, ?)", tables).fetchall():
+            cursor.execute(sql)
+
+        node_count, edge_count, way_count = (
+            cursor.execute(f'SELECT COUNT(*) FROM main.{table}').fetchone()[0]
+            for table in ('nodes', 'edges', 'ways'))
+        conn.commit()
+        cursor.execute('DETACH DATABASE src')
+        conn.close()
+
+        snapshot_file = None
+        if snapshot and node_count:
+            snapshot_file = RoadNetwork.snapshot_path(output_db)
+            if not RoadNetwork(output_db).save_snapshot(snapshot_file):
+                snapshot_file = None
+
+        elapsed = time.time() - start_time
+        self.stats = {
+            'region': region.name,
+            'bounds': region.bounds,
+            'region_nodes': region_nodes,
+            'nodes': node_count,
+            'edges': edge_count,
+            'ways': way_count,
+            'dropped_nodes': dropped_nodes,
+            'snapshot': snapshot_file,
+            'db_mb': os.path.getsize(output_db) / (1024 * 1024),
+            'time_s': elapsed,
+        }
+        print(f"[Extract] ✅ Wrote {node_count:,} nodes, {edge_count:,} edges, {way_count:,} ways "
+              f"in {elapsed:.1f}s")
+        return self.stats
+
+    @staticmethod
+    def _keep_main_component(cursor) -> int:
+        """Delete edges outside the largest weakly connected component; returns dropped node count."""
+        parent = {}
+
+        def find(node):
+            root = parent.setdefault(node, node)
+            while parent[root] != root:
+                root = parent[root]
+            while node != root:
+                parent[node], node = root, parent[node]
+            return root
+
+        for from_node, to_node in cursor.execute('SELECT from_node_id, to_node_id FROM main.edges').fetchall():
+            a, b = find(from_node), find(to_node)
+            if a != b:
+                parent[a] = b
+
+        sizes = {}
+        for node in list(parent):
+            root = find(node)
+            sizes[root] = sizes.get(root, 0) + 1
+        if len(sizes) <= 1:
+            return 0
+        main_root = max(sizes, key=sizes.get)
+        dropped = [(node,) for node in parent if find(node) != main_root]
+
+        cursor.execute('CREATE TEMP TABLE dropped_nodes (node_id INTEGER PRIMARY KEY)')
+        cursor.executemany('INSERT INTO dropped_nodes VALUES (?)', dropped)
+        cursor.execute('DELETE FROM main.edges WHERE from_node_id IN (SELECT node_id FROM dropped_nodes)')
+        print(f"[Extract] Dropped {len(dropped):,} nodes in {len(sizes) - 1:,} fragments outside the main component")
+        return len(dropped)
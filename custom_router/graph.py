@@ -3,6 +3,7 @@ Road network graph data structure
 In-memory representation for fast routing
 """
 
+import os
 import sqlite3
 import math
 import gc
@@ -11,6 +12,8 @@ import threading
 import time
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
+from array import array
+from .access import ACCESS_ALL, NO_RESTRICTIONS, highway_access
 
 try:
     import numpy as np
@@ -18,16 +21,44 @@ try:
 except ImportError:
     HAS_NUMPY = False
 
+SNAPSHOT_VERSION = 1
+
+
+def read_graph_version(conn) -> int:
+    """Graph version recorded by incremental updates (0 for a freshly built database)."""
+    row = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='graph_meta'").fetchone()
+    if not row:
+        return 0
+    row = conn.execute("SELECT value FROM graph_meta WHERE key = 'version'").fetchone()
+    return int(row[0]) if row else 0
+
+
 class RoadNetwork:
     """In-memory road network graph."""
 
-    def __init__(self, db_file: str):
-        """Initialize road network from database."""
+    def __init__(self, db_file: str, progress=None, snapshot: Optional[str] = None):
+        """Initialize road network from database.
+
+        Args:
+            db_file: Routing database path
+            progress: Optional LoadProgress updated with stage and counts while loading
+            snapshot: Optional binary snapshot (see save_snapshot) loaded instead of
+                the database tables; falls back to the database if unusable
+        """
         self.db_file = db_file
+        self.progress = progress
+        self.version = 0  # graph_meta version this graph was loaded from
         self.nodes = {}  # node_id -> (lat, lon)
         self.edges = defaultdict(list)  # node_id -> [(neighbor_id, distance_m, speed_kmh, way_id)]
         self.ways = {}  # way_id -> {name, highway, speed_limit}
         self.turn_restrictions = {}  # (from_way, to_way) -> restriction_type
+        # Per-edge mode access masks aligned with edges[node_id]; only nodes with
+        # at least one edge not open to every mode are stored
+        self.edge_access = {}  # node_id -> bytearray
+        # Per-edge vehicle restriction codes (height/weight/width/HGV), stored the same way
+        self.edge_restrictions = {}  # node_id -> array('H')
+        # Incoming edges with their masks, built on demand by build_reverse_edges()
+        self.reverse_edges = None  # node_id -> [(from_node, distance_m, edge, access, restrictions)]
 
         # Phase 4: Component caching
         self.components = {}  # node_id -> component_id
@@ -38,7 +69,8 @@ class RoadNetwork:
         self.grid_size_deg = 0.01  # Grid cell size in degrees (~1.1km at equator) - finer grid for faster lookup
         self.earth_radius_km = 6371.0  # Earth radius in kilometers
 
-        self.load_from_database()
+        if snapshot is None or not self.load_snapshot(snapshot):
+            self.load_from_database()
     
     def load_from_database(self):
         """Load graph from SQLite database with EAGER edge loading (blocking)."""
@@ -48,15 +80,18 @@ class RoadNetwork:
             conn = sqlite3.connect(self.db_file, timeout=30)
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
+            self.version = read_graph_version(conn)
 
             # Load nodes
             print("[Graph] Loading nodes...")
+            self._report('nodes')
             cursor.execute('SELECT id, lat, lon FROM nodes')
             node_count = 0
             for row in cursor.fetchall():
                 self.nodes[row['id']] = (row['lat'], row['lon'])
                 node_count += 1
             print(f"[Graph] Loaded {node_count:,} nodes")
+            self._report('ways', nodes=node_count)
 
             # Build spatial grid index for fast nearest node lookup
             if node_count > 0:
@@ -76,6 +111,7 @@ class RoadNetwork:
                 }
                 way_count += 1
             print(f"[Graph] Loaded {way_count:,} ways")
+            self._report('edges', ways=way_count, edges=0)
 
             # Load edges EAGERLY (blocking) - this is critical for proper initialization
             print("[Graph] Loading edges (this may take 2-3 minutes)...")
@@ -99,6 +135,149 @@ class RoadNetwork:
             print(f"[Graph] Load error: {e}")
             traceback.print_exc()
 
+    @staticmethod
+    def snapshot_path(db_file: str) -> str:
+        """Binary graph snapshot stored next to the graph database."""
+        return db_file + '.graph.npz'
+
+    def save_snapshot(self, path: str) -> bool:
+        """Save nodes, edges, ways and turn restrictions as flat numpy arrays."""
+        if not HAS_NUMPY:
+            return False
+        node_ids = np.fromiter(self.nodes.keys(), dtype=np.int64, count=len(self.nodes))
+        coords = np.array(list(self.nodes.values()), dtype=np.float64).reshape(-1, 2)
+
+        edge_count = sum(len(nbrs) for nbrs in self.edges.values())
+        edge_from = np.empty(edge_count, dtype=np.int64)
+        edge_access = np.full(edge_count, ACCESS_ALL, dtype=np.uint8)
+        edge_restrictions = np.zeros(edge_count, dtype=np.uint16)
+        rows = []
+        pos = 0
+        for from_node, nbrs in self.edges.items():
+            if not nbrs:
+                continue
+            end = pos + len(nbrs)
+            edge_from[pos:end] = from_node
+            access = self.edge_access.get(from_node)
+            if access is not None:
+                edge_access[pos:end] = np.frombuffer(bytes(access), dtype=np.uint8)
+            codes = self.edge_restrictions.get(from_node)
+            if codes is not None:
+                edge_restrictions[pos:end] = codes
+            rows.extend(nbrs)
+            pos = end
+        edge_from = edge_from[:pos]
+        edge_access = edge_access[:pos]
+        edge_restrictions = edge_restrictions[:pos]
+        to_nodes, distances, speeds, way_ids = zip(*rows) if rows else ((), (), (), ())
+
+        ways = list(self.ways.items())
+        restrictions = list(self.turn_restrictions.items())
+        arrays = {
+            'meta': np.array([SNAPSHOT_VERSION, self.version, len(node_ids), pos], dtype=np.int64),
+            'node_ids': node_ids,
+            'lats': coords[:, 0],
+            'lons': coords[:, 1],
+            'edge_from': edge_from,
+            'edge_to': np.array(to_nodes, dtype=np.int64),
+            'edge_distance': np.array(distances, dtype=np.float64),
+            'edge_speed': np.array([-1 if s is None else s for s in speeds], dtype=np.int32),
+            'edge_way': np.array([-1 if w is None else w for w in way_ids], dtype=np.int64),
+            'edge_access': edge_access,
+            'edge_restrictions': edge_restrictions,
+            'way_ids': np.array([way_id for way_id, _ in ways], dtype=np.int64),
+            'way_names': np.array([way['name'] or '' for _, way in ways], dtype=str),
+            'way_has_name': np.array([way['name'] is not None for _, way in ways], dtype=bool),
+            'way_highways': np.array([way['highway'] or '' for _, way in ways], dtype=str),
+            'way_speeds': np.array([-1 if way['speed_limit'] is None else way['speed_limit']
+                                    for _, way in ways], dtype=np.int32),
+            'restriction_ways': np.array([pair for pair, _ in restrictions], dtype=np.int64).reshape(-1, 2),
+            'restriction_types': np.array([kind or '' for _, kind in restrictions], dtype=str),
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        print(f"[Graph] Saved snapshot of {len(node_ids):,} nodes, {pos:,} edges to {path}")
+        return True
+
+    def load_snapshot(self, path: str) -> bool:
+        """Load a snapshot written by save_snapshot(); False if missing, unreadable or
+        taken from an older graph version than the database."""
+        if not HAS_NUMPY or not os.path.exists(path):
+            return False
+        start_time = time.time()
+        try:
+            with np.load(path) as data:
+                meta = data['meta'].tolist()
+                if meta[0] != SNAPSHOT_VERSION:
+                    print(f"[Graph] Snapshot {path} has version {meta[0]}, ignoring")
+                    return False
+                conn = sqlite3.connect(self.db_file, timeout=30)
+                try:
+                    db_version = read_graph_version(conn)
+                finally:
+                    conn.close()
+                if meta[1] != db_version:
+                    print(f"[Graph] Snapshot {path} is for graph version {meta[1]}, "
+                          f"database is at {db_version}; ignoring")
+                    return False
+                arrays = {name: data[name] for name in data.files}
+        except Exception as e:
+            print(f"[Graph] Could not load snapshot: {e}")
+            return False
+
+        self.version = meta[1]
+        self._report('nodes')
+        self.nodes = dict(zip(arrays['node_ids'].tolist(),
+                              zip(arrays['lats'].tolist(), arrays['lons'].tolist())))
+        self._report('ways', nodes=len(self.nodes))
+        self._build_spatial_grid()
+
+        self.ways = {
+            way_id: {'name': name if has_name else None, 'highway': highway or None,
+                     'speed_limit': None if speed < 0 else speed}
+            for way_id, name, has_name, highway, speed in zip(
+                arrays['way_ids'].tolist(), arrays['way_names'].tolist(), arrays['way_has_name'].tolist(),
+                arrays['way_highways'].tolist(), arrays['way_speeds'].tolist())}
+        self._report('edges', ways=len(self.ways), edges=0)
+
+        edge_from = arrays['edge_from']
+        access = arrays['edge_access']
+        codes = arrays['edge_restrictions']
+        speeds = [None if s < 0 else s for s in arrays['edge_speed'].tolist()]
+        way_ids = [None if w < 0 else w for w in arrays['edge_way'].tolist()]
+        rows = list(zip(arrays['edge_to'].tolist(), arrays['edge_distance'].tolist(), speeds, way_ids))
+        # Edges were saved grouped by from node, in adjacency order
+        bounds = np.flatnonzero(np.diff(edge_from)) + 1
+        starts = [0] + bounds.tolist()
+        ends = bounds.tolist() + [len(edge_from)]
+        from_nodes = edge_from[starts].tolist() if len(edge_from) else []
+        restricted_access = access != ACCESS_ALL
+        restricted_codes = codes != NO_RESTRICTIONS
+        for from_node, start, end in zip(from_nodes, starts, ends):
+            self.edges[from_node] = rows[start:end]
+            if restricted_access[start:end].any():
+                self.edge_access[from_node] = bytearray(access[start:end].tobytes())
+            if restricted_codes[start:end].any():
+                self.edge_restrictions[from_node] = array('H', codes[start:end].tolist())
+        self._edges_loaded = True
+        self._report(edges=len(rows))
+
+        self.turn_restrictions = {
+            (from_way, to_way): kind
+            for (from_way, to_way), kind in zip(arrays['restriction_ways'].tolist(),
+                                                arrays['restriction_types'].tolist())}
+
+        print(f"[Graph] ✅ Loaded snapshot {path}: {len(self.nodes):,} nodes, {len(rows):,} edges "
+              f"in {time.time() - start_time:.1f}s")
+        return True
+
+    def _report(self, stage: Optional[str] = None, **counts) -> None:
+        """Forward loading stage and counts to the progress tracker, if any."""
+        if self.progress is not None:
+            self.progress.update(stage, **counts)
+
     def get_neighbors(self, node_id: int):
         """Get neighbors of a node. Waits for edges to load if needed."""
         # If edges not loaded yet, wait for background loading to complete
@@ -113,6 +292,136 @@ class RoadNetwork:
 
         return self.edges.get(node_id, [])
 
+    def get_edge_access(self, node_id: int) -> Optional[bytearray]:
+        """Access masks aligned with get_neighbors(node_id), or None if all edges allow every mode."""
+        return self.edge_access.get(node_id)
+
+    def has_access(self, node_id: int, mask: int = ACCESS_ALL, vehicle_mask: int = NO_RESTRICTIONS) -> bool:
+        """Check if a node has an outgoing edge usable by any mode in mask (and not closed to vehicle_mask)."""
+        if not self.get_neighbors(node_id):
+            return False
+        if vehicle_mask and node_id in self.edge_restrictions:
+            return bool(self.usable_edges(node_id, mask, vehicle_mask))
+        access = self.edge_access.get(node_id)
+        return access is None or any(a & mask for a in access)
+
+    def get_edge_restrictions(self, node_id: int) -> Optional[array]:
+        """Restriction codes aligned with get_neighbors(node_id), or None if no edge is restricted."""
+        return self.edge_restrictions.get(node_id)
+
+    def usable_edges(self, node_id: int, mask: int = ACCESS_ALL, vehicle_mask: int = NO_RESTRICTIONS) -> List:
+        """Outgoing edges open to a mode in mask whose restriction code does not intersect vehicle_mask."""
+        edges = self.get_neighbors(node_id)
+        access = self.edge_access.get(node_id)
+        codes = self.edge_restrictions.get(node_id) if vehicle_mask else None
+        if access is None and codes is None:
+            return edges
+        return [edge for i, edge in enumerate(edges)
+                if (access is None or access[i] & mask) and (codes is None or not codes[i] & vehicle_mask)]
+
+    def _set_aligned(self, store: Dict, node_id: int, index: int, value: int, default: int) -> None:
+        """Store a non-default per-edge value for edges[node_id][index] in a sparse aligned store."""
+        values = store.get(node_id)
+        if values is None:
+            if value == default:
+                return
+            size = len(self.edges[node_id])
+            if store is self.edge_access:
+                values = bytearray([default]) * size
+            else:
+                values = array('H', [default]) * size
+            store[node_id] = values
+        values[index] = value
+
+    def _set_edge_access(self, node_id: int, index: int, access: int) -> None:
+        """Store a non-default access mask for edges[node_id][index]."""
+        self._set_aligned(self.edge_access, node_id, index, access, ACCESS_ALL)
+        self._update_reverse_edge(node_id, index)
+
+    def _set_edge_restrictions(self, node_id: int, index: int, restrictions: int) -> None:
+        """Store a non-zero restriction code for edges[node_id][index]."""
+        self._set_aligned(self.edge_restrictions, node_id, index, restrictions, NO_RESTRICTIONS)
+        self._update_reverse_edge(node_id, index)
+
+    def build_reverse_edges(self) -> Dict:
+        """Index every edge under its target node with its access mask and restriction code.
+
+        Built once; add_edge, pop_edge, insert_edge and the mask setters keep it
+        current, so backward searches can use it while k-paths removes edges.
+        """
+        if self.reverse_edges is None:
+            reverse_edges = {}
+            for node, edges in self.edges.items():
+                access = self.edge_access.get(node)
+                codes = self.edge_restrictions.get(node)
+                for i, edge in enumerate(edges):
+                    reverse_edges.setdefault(edge[0], []).append(
+                        (node, edge[1], edge,
+                         access[i] if access is not None else ACCESS_ALL,
+                         codes[i] if codes is not None else NO_RESTRICTIONS))
+            self.reverse_edges = reverse_edges
+        return self.reverse_edges
+
+    def _update_reverse_edge(self, node_id: int, index: int) -> None:
+        """Refresh the reverse index entry of edges[node_id][index] after its masks changed."""
+        if self.reverse_edges is None:
+            return
+        edge = self.edges[node_id][index]
+        incoming = self.reverse_edges[edge[0]]
+        for i, entry in enumerate(incoming):
+            if entry[0] == node_id and entry[2] is edge:
+                access = self.edge_access.get(node_id)
+                codes = self.edge_restrictions.get(node_id)
+                incoming[i] = (node_id, edge[1], edge,
+                               access[index] if access is not None else ACCESS_ALL,
+                               codes[index] if codes is not None else NO_RESTRICTIONS)
+                return
+
+    def add_edge(self, from_node: int, edge: Tuple, access: int = ACCESS_ALL,
+                 restrictions: int = NO_RESTRICTIONS) -> None:
+        """Append an outgoing edge with its mode access mask and restriction code."""
+        edges = self.edges[from_node]
+        edges.append(edge)
+        index = len(edges) - 1
+        for store, value, default in ((self.edge_access, access, ACCESS_ALL),
+                                      (self.edge_restrictions, restrictions, NO_RESTRICTIONS)):
+            values = store.get(from_node)
+            if values is not None:
+                values.append(value)
+            elif value != default:
+                self._set_aligned(store, from_node, index, value, default)
+        if self.reverse_edges is not None:
+            self.reverse_edges.setdefault(edge[0], []).append((from_node, edge[1], edge, access, restrictions))
+
+    def pop_edge(self, from_node: int, index: int) -> Tuple[Tuple, int, int]:
+        """Remove edges[from_node][index], returning (edge, access, restrictions)."""
+        edge = self.edges[from_node].pop(index)
+        masks = self.edge_access.get(from_node)
+        codes = self.edge_restrictions.get(from_node)
+        if self.reverse_edges is not None:
+            incoming = self.reverse_edges[edge[0]]
+            for i, entry in enumerate(incoming):
+                if entry[0] == from_node and entry[2] is edge:
+                    del incoming[i]
+                    break
+        return (edge,
+                masks.pop(index) if masks is not None else ACCESS_ALL,
+                codes.pop(index) if codes is not None else NO_RESTRICTIONS)
+
+    def insert_edge(self, from_node: int, index: int, edge: Tuple, access: int = ACCESS_ALL,
+                    restrictions: int = NO_RESTRICTIONS) -> None:
+        """Re-insert an edge removed with pop_edge at its original position."""
+        self.edges[from_node].insert(index, edge)
+        for store, value, default in ((self.edge_access, access, ACCESS_ALL),
+                                      (self.edge_restrictions, restrictions, NO_RESTRICTIONS)):
+            values = store.get(from_node)
+            if values is not None:
+                values.insert(index, value)
+            elif value != default:
+                self._set_aligned(store, from_node, index, value, default)
+        if self.reverse_edges is not None:
+            self.reverse_edges.setdefault(edge[0], []).append((from_node, edge[1], edge, access, restrictions))
+
     def _load_edges_for_node(self, node_id: int):
         """Load edges for a specific node from database."""
         try:
@@ -146,35 +455,43 @@ class RoadNetwork:
         
         edge_count = 0
         for way_id, way_data in ways.items():
-            nodes = way_data['nodes']
-            speed_limit = way_data['speed_limit']
-            oneway = way_data.get('oneway', False)
-            
-            # Create edges between consecutive nodes
-            for i in range(len(nodes) - 1):
-                from_node = nodes[i]
-                to_node = nodes[i + 1]
-                
-                if from_node not in self.nodes or to_node not in self.nodes:
-                    continue
-                
-                # Calculate distance
-                distance = self.haversine_distance(
-                    self.nodes[from_node],
-                    self.nodes[to_node]
-                )
-                
-                # Add forward edge
-                self.edges[from_node].append((to_node, distance, speed_limit, way_id))
+            for from_node, edge, access, restrictions in self.way_edges(way_id, way_data, self.nodes):
+                self.add_edge(from_node, edge, access, restrictions)
                 edge_count += 1
-                
-                # Add reverse edge (if not oneway)
-                if not oneway:
-                    self.edges[to_node].append((from_node, distance, speed_limit, way_id))
-                    edge_count += 1
         
         print(f"[Graph] Built {edge_count} edges")
 
+    @classmethod
+    def way_edges(cls, way_id: int, way_data: Dict, coords: Dict):
+        """Yield (from_node, edge, access, restrictions) for each directed edge of a way.
+
+        coords maps node_id -> (lat, lon); segments with a missing node are skipped.
+        """
+        nodes = way_data['nodes']
+        speed_limit = way_data['speed_limit']
+        oneway = way_data.get('oneway', False)
+        access_forward = way_data.get('access_forward', ACCESS_ALL)
+        access_backward = way_data.get('access_backward', 0 if oneway else ACCESS_ALL)
+        restrictions = way_data.get('restrictions', NO_RESTRICTIONS)
+
+        # Create edges between consecutive nodes
+        for i in range(len(nodes) - 1):
+            from_node = nodes[i]
+            to_node = nodes[i + 1]
+
+            if from_node not in coords or to_node not in coords:
+                continue
+
+            distance = cls.haversine_distance(coords[from_node], coords[to_node])
+
+            # Forward edge
+            if access_forward:
+                yield from_node, (to_node, distance, speed_limit, way_id), access_forward, restrictions
+
+            # Reverse edge (if any mode may travel against the way)
+            if access_backward:
+                yield to_node, (from_node, distance, speed_limit, way_id), access_backward, restrictions
+
     def _build_spatial_grid(self) -> None:
         """Build spatial grid index for fast nearest node lookup.
 
@@ -203,7 +520,17 @@ class RoadNetwork:
         print("[Graph] Loading edges eagerly...")
         start_time = time.time()
 
+        # Databases built before per-mode access derive it from the highway type
+        cursor.execute('PRAGMA table_info(edges)')
+        columns = {row['name'] for row in cursor.fetchall()}
+        has_access = 'access' in columns
+        access_sql = 'access' if has_access else 'NULL AS access'
+        restrictions_sql = 'restrictions' if 'restrictions' in columns else '0 AS restrictions'
+        way_access = {} if has_access else {
+            way_id: highway_access(way['highway']) or ACCESS_ALL for way_id, way in self.ways.items()}
+
         edge_count = 0
+        report_every = 100000 if self.progress is not None else 0
         batch_size = 10000000  # Larger batches for faster loading
         offset = 0
         last_print_time = start_time
@@ -211,7 +538,8 @@ class RoadNetwork:
         try:
             while True:
                 cursor.execute(
-                    'SELECT from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id '
+                    f'SELECT from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id, {access_sql}, '
+                    f'{restrictions_sql} '
                     'FROM edges LIMIT ? OFFSET ?',
                     (batch_size, offset)
                 )
@@ -228,8 +556,14 @@ class RoadNetwork:
                     speed_limit = row['speed_limit_kmh']
                     way_id = row['way_id']
 
-                    self.edges[from_node].append((to_node, distance, speed_limit, way_id))
+                    access = row['access']
+                    if access is None:
+                        access = way_access.get(way_id, ACCESS_ALL)
+                    self.add_edge(from_node, (to_node, distance, speed_limit, way_id), access,
+                                  row['restrictions'] or NO_RESTRICTIONS)
                     edge_count += 1
+                    if report_every and edge_count % report_every == 0:
+                        self._report(edges=edge_count)
 
                 offset += batch_size
 
@@ -243,6 +577,7 @@ class RoadNetwork:
 
                 gc.collect()
 
+            self._report(edges=edge_count)
             elapsed = time.time() - start_time
             rate = edge_count / elapsed if elapsed > 0 else 0
             print(f"[Graph] ✅ Edge loading complete: {edge_count:,} edges in {elapsed:.1f}s ({rate:.0f} edges/sec)")
@@ -276,12 +611,18 @@ class RoadNetwork:
         """Get information about a way."""
         return self.ways.get(way_id)
     
-    def find_nearest_node(self, lat: float, lon: float, search_radius_m: float = 5000) -> Optional[int]:
+    def find_nearest_node(self, lat: float, lon: float, search_radius_m: float = 5000,
+                          access_mask: int = ACCESS_ALL, main_scc_only: bool = False,
+                          vehicle_mask: int = NO_RESTRICTIONS) -> Optional[int]:
         """Find nearest node using spatial grid index.
 
         Uses grid-based spatial indexing for fast O(1) cell lookup + O(k) search.
         Optimized to search only nearby cells and expand if needed.
-        Only returns nodes that have at least one neighbor (connected to roads).
+        Only returns nodes that have at least one neighbor (connected to roads)
+        usable by a mode in access_mask and, with vehicle_mask, not closed to
+        that vehicle by its restrictions. With main_scc_only, nodes outside the
+        largest strongly connected component (one-way dead-end pockets) are
+        skipped so any two snapped nodes are mutually reachable.
         """
         if not self.spatial_grid:
             # Fallback to brute force if grid not built
@@ -290,7 +631,9 @@ class RoadNetwork:
 
             for node_id, (node_lat, node_lon) in self.nodes.items():
                 # Only consider nodes with neighbors
-                if not self.get_neighbors(node_id):
+                if not self.has_access(node_id, access_mask, vehicle_mask):
+                    continue
+                if main_scc_only and not self.is_in_main_scc(node_id):
                     continue
 
                 distance = self.haversine_distance((lat, lon), (node_lat, node_lon))
@@ -310,8 +653,8 @@ class RoadNetwork:
         min_distance = float('inf')
         nearest_node = None
 
-        # Search in expanding rings: 1 cell, then 2 cells, then 3 cells, etc.
-        for search_cells in range(1, 10):  # Max 10 cells radius
+        # Search in expanding rings: own cell, then 1 cell, then 2 cells, etc.
+        for search_cells in range(0, 10):  # Max 10 cells radius
             for dx in range(-search_cells, search_cells + 1):
                 for dy in range(-search_cells, search_cells + 1):
                     # Only check cells on the perimeter of current search radius
@@ -325,7 +668,9 @@ class RoadNetwork:
                     # Check all nodes in this cell
                     for node_id in self.spatial_grid[cell_key]:
                         # Only consider nodes with neighbors
-                        if not self.get_neighbors(node_id):
+                        if not self.has_access(node_id, access_mask, vehicle_mask):
+                            continue
+                        if main_scc_only and not self.is_in_main_scc(node_id):
                             continue
 
                         node_lat, node_lon = self.nodes[node_id]
@@ -335,8 +680,9 @@ class RoadNetwork:
                             min_distance = distance
                             nearest_node = node_id
 
-            # If we found a node, we can stop expanding
-            if nearest_node is not None:
+            # If we found a node, we can stop expanding (the first ring is
+            # always searched since a neighbouring cell may hold a closer node)
+            if nearest_node is not None and search_cells >= 1:
                 break
 
         # Return nearest node if within search radius
@@ -380,3 +726,15 @@ class RoadNetwork:
             return True  # Assume in main if no analyzer
         return self.component_analyzer.is_in_main_component(node_id)
 
+    def is_in_main_scc(self, node_id: int) -> bool:
+        """Check if node is in the largest strongly connected component."""
+        if not self.component_analyzer:
+            return True  # Assume in main if no analyzer
+        return self.component_analyzer.is_in_main_scc(node_id)
+
+    def can_reach(self, from_node: int, to_node: int) -> bool:
+        """O(1) check that a directed route may exist (False = provably none)."""
+        if not self.component_analyzer:
+            return True
+        return self.component_analyzer.can_reach(from_node, to_node)
+
@@ -4,7 +4,7 @@ Generate human-readable turn-by-turn instructions
 """
 
 import math
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from .graph import RoadNetwork
 
 class InstructionGenerator:
@@ -14,11 +14,23 @@ class InstructionGenerator:
         """Initialize instruction generator."""
         self.graph = graph
     
-    def generate(self, path_nodes: List[int]) -> List[Dict]:
-        """Generate turn instructions for a path."""
+    def generate(self, path_nodes: List[int], way_ids: Optional[List[int]] = None,
+                 edge_distances: Optional[List[float]] = None) -> List[Dict]:
+        """Generate turn instructions for a path.
+
+        way_ids / edge_distances are the per-edge values from
+        Router.extract_route_data; when given, street names and distances
+        come straight from them instead of scanning neighbours.
+        """
         if len(path_nodes) < 2:
             return []
         
+        segment_count = len(path_nodes) - 1
+        if way_ids is not None and len(way_ids) != segment_count:
+            way_ids = None
+        if edge_distances is not None and len(edge_distances) != segment_count:
+            edge_distances = None
+
         instructions = []
         
         for i in range(1, len(path_nodes) - 1):
@@ -42,13 +54,19 @@ class InstructionGenerator:
             maneuver = self.detect_maneuver(prev_bearing, next_bearing)
             
             # Get street name
-            street_name = self.get_street_name(curr_node, next_node)
+            if way_ids is not None:
+                street_name = self._way_name(way_ids[i])
+            else:
+                street_name = self.get_street_name(curr_node, next_node)
             
             # Generate instruction
             instruction_text = self.generate_instruction_text(maneuver, street_name)
             
             # Calculate distance to next node
-            distance = self.graph.haversine_distance(curr_coords, next_coords)
+            if edge_distances is not None:
+                distance = edge_distances[i]
+            else:
+                distance = self.graph.haversine_distance(curr_coords, next_coords)
             
             instructions.append({
                 'instruction': instruction_text,
@@ -99,6 +117,19 @@ class InstructionGenerator:
         else:
             return 'continue'
     
+    def generate_for_route(self, route_data: Dict) -> List[Dict]:
+        """Generate instructions from a Router route dict (no edge lookups)."""
+        return self.generate(route_data['path_nodes'],
+                             way_ids=route_data.get('way_ids'),
+                             edge_distances=route_data.get('edge_distances_m'))
+
+    def _way_name(self, way_id: int) -> str:
+        """Street name for a way ID."""
+        way_info = self.graph.get_way_info(way_id)
+        if way_info:
+            return way_info['name']
+        return 'Unknown Street'
+
     def get_street_name(self, from_node: int, to_node: int) -> str:
         """Get street name for edge."""
         neighbors = self.graph.get_neighbors(from_node)
@@ -7,6 +7,7 @@ import heapq
 from typing import List, Dict, Tuple, Optional
 from .graph import RoadNetwork
 from .dijkstra import Router
+from .access import MODE_NAMES, NO_RESTRICTIONS, mode_mask, vehicle_restriction_mask
 
 class KShortestPaths:
     """Find K shortest paths between two nodes."""
@@ -17,24 +18,29 @@ class KShortestPaths:
     
     def find_k_paths(self, start_lat: float, start_lon: float,
                      end_lat: float, end_lon: float,
-                     k: int = 4) -> List[Dict]:
+                     k: int = 4, mode: str = 'car', vehicle=None) -> List[Dict]:
         """
         Find K shortest paths using Yen's algorithm.
         Returns list of routes sorted by distance.
         """
-        # Find nearest nodes
-        start_node = self.graph.find_nearest_node(start_lat, start_lon)
-        end_node = self.graph.find_nearest_node(end_lat, end_lon)
+        # Find nearest nodes usable by this mode
+        access_mask = mode_mask(mode)
+        vehicle_mask = vehicle_restriction_mask(vehicle) if MODE_NAMES[access_mask] == 'car' else NO_RESTRICTIONS
+        start_node = self.graph.find_nearest_node(start_lat, start_lon, access_mask=access_mask,
+                                                  vehicle_mask=vehicle_mask)
+        end_node = self.graph.find_nearest_node(end_lat, end_lon, access_mask=access_mask,
+                                                vehicle_mask=vehicle_mask)
         
         if not start_node or not end_node:
             return []
         
-        # Find first shortest path
-        first_path = self.router.dijkstra(start_node, end_node)
+        # Find first shortest path (with the edge tuples it traversed)
+        first_path, first_edges = self.router.dijkstra(start_node, end_node, return_edges=True,
+                                                       mode=mode, vehicle_mask=vehicle_mask)
         if not first_path:
             return []
         
-        paths = [first_path]
+        paths = [(first_path, first_edges)]
         candidates = []
         
         # Find K-1 alternative paths
@@ -46,30 +52,33 @@ class KShortestPaths:
                 root_path = first_path[:i+1]
                 
                 # Find shortest path from spur_node avoiding root_path
-                alt_path = self._find_spur_path(spur_node, end_node, root_path)
+                alt_path, alt_edges = self._find_spur_path(spur_node, end_node, root_path,
+                                                           return_edges=True, mode=mode,
+                                                           vehicle_mask=vehicle_mask)
                 
                 if alt_path:
                     full_path = root_path[:-1] + alt_path
-                    candidates.append(full_path)
+                    candidates.append((full_path, first_edges[:i] + alt_edges))
             
             if not candidates:
                 break
             
             # Get best candidate
-            candidates.sort(key=lambda p: self._path_distance(p))
+            candidates.sort(key=lambda c: self._path_distance(c[0], c[1]))
             best_path = candidates.pop(0)
             paths.append(best_path)
         
-        # Convert paths to route data
+        # Convert paths to route data (edges already known, no neighbour scans)
         routes = []
-        for path in paths:
-            route_data = self.router.extract_route_data(path)
+        for path, path_edges in paths:
+            route_data = self.router.extract_route_data(path, path_edges, mode=mode)
             routes.append(route_data)
         
         return routes
     
     def _find_spur_path(self, start_node: int, end_node: int,
-                       forbidden_path: List[int]) -> Optional[List[int]]:
+                       forbidden_path: List[int], return_edges: bool = False,
+                       mode: str = 'car', vehicle_mask: int = NO_RESTRICTIONS):
         """Find shortest path avoiding forbidden path."""
         # Temporarily remove forbidden edges
         removed_edges = []
@@ -81,21 +90,24 @@ class KShortestPaths:
                 # Find and remove edge
                 for j, (neighbor, dist, speed, way_id) in enumerate(self.graph.edges[from_node]):
                     if neighbor == to_node:
-                        removed_edges.append((from_node, j, self.graph.edges[from_node][j]))
-                        self.graph.edges[from_node].pop(j)
+                        removed_edges.append((from_node, j) + self.graph.pop_edge(from_node, j))
                         break
         
         # Find alternative path
-        alt_path = self.router.dijkstra(start_node, end_node)
+        result = self.router.dijkstra(start_node, end_node, return_edges=return_edges, mode=mode,
+                                      vehicle_mask=vehicle_mask)
         
-        # Restore edges
-        for from_node, idx, edge in removed_edges:
-            self.graph.edges[from_node].insert(idx, edge)
+        # Restore edges (same tuple objects, so recorded edges stay valid)
+        for from_node, idx, edge, access, restrictions in reversed(removed_edges):
+            self.graph.insert_edge(from_node, idx, edge, access, restrictions)
         
-        return alt_path
+        return result
     
-    def _path_distance(self, path: List[int]) -> float:
+    def _path_distance(self, path: List[int], path_edges: Optional[List[Tuple]] = None) -> float:
         """Calculate total distance of path."""
+        if path_edges is not None:
+            return sum(edge[1] for edge in path_edges)
+
         total = 0
         for i in range(len(path) - 1):
             from_node = path[i]
@@ -0,0 +1,75 @@
+"""
+Loading progress for the custom router
+Graph loading takes minutes on a full UK extract, so the loader reports the
+current stage and running counts here. The web server exposes it through its
+readiness endpoint while traffic is served by the external engines.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+# Stages in load order
+STAGES = ('pending', 'nodes', 'ways', 'edges', 'ch', 'components', 'warmup', 'ready')
+
+
+class LoadProgress:
+    """Thread-safe stage and counters of one router load."""
+
+    def __init__(self):
+        """Initialize in the pending stage."""
+        self._lock = threading.Lock()
+        self.stage = 'pending'
+        self.counts = {}  # nodes, ways, edges, ch_nodes, components
+        self.started_at = None
+        self.finished_at = None
+        self.stage_times = {}  # stage -> seconds spent in it
+        self.error = None
+        self._stage_started_at = None
+
+    def update(self, stage: Optional[str] = None, **counts) -> None:
+        """Enter stage (if given) and record counts."""
+        now = time.time()
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = now
+                self._stage_started_at = now
+            if stage is not None and stage != self.stage:
+                if self.stage != 'pending':
+                    self.stage_times[self.stage] = now - self._stage_started_at
+                self.stage = stage
+                self._stage_started_at = now
+                if stage == 'ready':
+                    self.finished_at = now
+            self.counts.update(counts)
+
+    def fail(self, error: str) -> None:
+        """Mark the load as failed."""
+        with self._lock:
+            self.error = error
+            self.finished_at = time.time()
+
+    @property
+    def ready(self) -> bool:
+        """True once the router is loaded and serving."""
+        return self.stage == 'ready' and self.error is None
+
+    @property
+    def failed(self) -> bool:
+        """True if the load stopped with an error."""
+        return self.error is not None
+
+    def to_dict(self) -> Dict:
+        """Convert to JSON-friendly dict."""
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                'stage': self.stage,
+                'stage_index': STAGES.index(self.stage),
+                'stage_count': len(STAGES) - 1,
+                'ready': self.stage == 'ready' and self.error is None,
+                'error': self.error,
+                'counts': dict(self.counts),
+                'elapsed_s': round(end - self.started_at, 3) if self.started_at else 0.0,
+                'stage_times_s': {k: round(v, 3) for k, v in self.stage_times.items()}
+            }
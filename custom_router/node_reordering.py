@@ -0,0 +1,237 @@
+"""
+Spatial node reordering for cache locality
+Renumbers nodes along a Hilbert curve so that nodes which are close on the
+map are also close in ID order (and therefore in memory and on disk).
+OSM IDs follow creation order, which has nothing to do with geography.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Dict, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Hilbert curve resolution: 2^16 cells per axis (~6m cells over the UK bbox)
+HILBERT_ORDER = 16
+
+
+def hilbert_key(x: int, y: int, order: int = HILBERT_ORDER) -> int:
+    """Convert grid cell (x, y) to its distance along a Hilbert curve."""
+    n = 1 << order
+    d = 0
+    s = n >> 1
+    while s > 0:
+        rx = 1 if (x & s) else 0
+        ry = 1 if (y & s) else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate quadrant
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+
+def _hilbert_keys_numpy(x, y, order: int = HILBERT_ORDER):
+    """Vectorized hilbert_key over integer arrays."""
+    n = 1 << order
+    x = x.astype(np.int64)
+    y = y.astype(np.int64)
+    d = np.zeros(len(x), dtype=np.int64)
+    s = n >> 1
+    while s > 0:
+        rx = ((x & s) > 0).astype(np.int64)
+        ry = ((y & s) > 0).astype(np.int64)
+        d += s * s * ((3 * rx) ^ ry)
+        flip = (ry == 0) & (rx == 1)
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        swap = ry == 0
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+    return d
+
+
+class NodeReorderer:
+    """Renumber road network nodes along a Hilbert curve."""
+
+    def __init__(self, db_file: str, order: int = HILBERT_ORDER):
+        """Initialize reorderer for a routing database."""
+        self.db_file = db_file
+        self.order = order
+        self.stats = {}
+
+    def compute_order(self, nodes: Dict[int, Tuple[float, float]]) -> Dict[int, int]:
+        """
+        Compute new node IDs for a set of nodes.
+
+        Args:
+            nodes: node_id -> (lat, lon)
+
+        Returns:
+            Mapping of old node_id -> new node_id (1-based, Hilbert order)
+        """
+        if not nodes:
+            return {}
+
+        node_ids = list(nodes.keys())
+        lats = [nodes[n][0] for n in node_ids]
+        lons = [nodes[n][1] for n in node_ids]
+
+        min_lat, max_lat = min(lats), max(lats)
+        min_lon, max_lon = min(lons), max(lons)
+        cells = (1 << self.order) - 1
+        lat_span = (max_lat - min_lat) or 1.0
+        lon_span = (max_lon - min_lon) or 1.0
+
+        if HAS_NUMPY:
+            ids = np.asarray(node_ids, dtype=np.int64)
+            xs = ((np.asarray(lons) - min_lon) / lon_span * cells).astype(np.int64)
+            ys = ((np.asarray(lats) - min_lat) / lat_span * cells).astype(np.int64)
+            keys = _hilbert_keys_numpy(xs, ys, self.order)
+            # Tie-break on old ID so the order is deterministic
+            ranking = np.lexsort((ids, keys))
+            return {int(ids[i]): rank + 1 for rank, i in enumerate(ranking)}
+
+        keyed = []
+        for node_id, lat, lon in zip(node_ids, lats, lons):
+            x = int((lon - min_lon) / lon_span * cells)
+            y = int((lat - min_lat) / lat_span * cells)
+            keyed.append((hilbert_key(x, y, self.order), node_id))
+        keyed.sort()
+        return {node_id: rank + 1 for rank, (_, node_id) in enumerate(keyed)}
+
+    def reorder_database(self, output_db: str) -> Dict:
+        """
+        Write a copy of the routing database with Hilbert-ordered node IDs.
+
+        Rewrites nodes, edges and CH tables to the new IDs and stores the
+        original OSM IDs in node_id_map(new_id, osm_id). Edges are written
+        sorted by from_node_id so the eager loader reads them sequentially.
+        """
+        print(f"[Reorder] Reordering {self.db_file} -> {output_db}")
+        start_time = time.time()
+
+        if os.path.exists(output_db):
+            os.remove(output_db)
+
+        src = sqlite3.connect(self.db_file)
+        nodes = {row[0]: (row[1], row[2])
+                 for row in src.execute('SELECT id, lat, lon FROM nodes')}
+        src.close()
+        print(f"[Reorder] Loaded {len(nodes):,} node coordinates")
+
+        t0 = time.time()
+        mapping = self.compute_order(nodes)
+        order_time = time.time() - t0
+        print(f"[Reorder] Computed Hilbert order in {order_time:.1f}s")
+        del nodes
+
+        conn = sqlite3.connect(output_db)
+        cursor = conn.cursor()
+        cursor.execute('PRAGMA journal_mode=OFF')
+        cursor.execute('PRAGMA synchronous=OFF')
+        cursor.execute('ATTACH DATABASE ? AS src', (self.db_file,))
+
+        cursor.execute('''
+            CREATE TABLE node_id_map (
+                new_id INTEGER PRIMARY KEY,
+                osm_id INTEGER NOT NULL UNIQUE
+            )
+        ''')
+        cursor.executemany('INSERT INTO node_id_map (new_id, osm_id) VALUES (?, ?)',
+                           ((new_id, old_id) for old_id, new_id in mapping.items()))
+        del mapping
+
+        # Copy schemas so the output stays a drop-in replacement
+        schema = cursor.execute(
+            "SELECT name, sql FROM src.sqlite_master WHERE type='table' "
+            "AND name NOT LIKE 'sqlite_%' AND name != 'node_id_map'").fetchall()
+        tables = [name for name, _ in schema]
+        for _, sql in schema:
+            cursor.execute(sql)
+
+        cursor.execute('''
+            INSERT INTO main.nodes (id, lat, lon, elevation)
+            SELECT m.new_id, n.lat, n.lon, n.elevation
+            FROM src.nodes n JOIN node_id_map m ON m.osm_id = n.id
+            ORDER BY m.new_id
+        ''')
+
+        if 'edges' in tables:
+            # Every column except the renumbered id is copied (access masks,
+            # vehicle restrictions, ...); only the node IDs are remapped
+            columns = [row[1] for row in cursor.execute('PRAGMA src.table_info(edges)')
+                       if row[1] != 'id']
+            remapped = {'from_node_id': 'mf.new_id', 'to_node_id': 'mt.new_id'}
+            cursor.execute(f'''
+                INSERT INTO main.edges ({', '.join(columns)})
+                SELECT {', '.join(remapped.get(column, f'e.{column}') for column in columns)}
+                FROM src.edges e
+                JOIN node_id_map mf ON mf.osm_id = e.from_node_id
+                JOIN node_id_map mt ON mt.osm_id = e.to_node_id
+                ORDER BY mf.new_id, mt.new_id
+            ''')
+
+        for table in ('ways', 'turn_restrictions'):
+            if table in tables:
+                cursor.execute(f'INSERT INTO main.{table} SELECT * FROM src.{table}')
+
+        if 'ch_node_order' in tables:
+            cursor.execute('''
+                INSERT INTO main.ch_node_order (node_id, order_id)
+                SELECT m.new_id, c.order_id
+                FROM src.ch_node_order c JOIN node_id_map m ON m.osm_id = c.node_id
+                ORDER BY m.new_id
+            ''')
+
+        if 'ch_shortcuts' in tables:
+            cursor.execute('''
+                INSERT INTO main.ch_shortcuts (from_node, to_node, distance)
+                SELECT mf.new_id, mt.new_id, s.distance
+                FROM src.ch_shortcuts s
+                JOIN node_id_map mf ON mf.osm_id = s.from_node
+                JOIN node_id_map mt ON mt.osm_id = s.to_node
+                ORDER BY mf.new_id
+            ''')
+
+        conn.commit()
+
+        # Recreate indexes after the bulk load
+        for (sql,) in cursor.execute(
+                "SELECT sql FROM src.sqlite_master WHERE type='index' AND sql IS NOT NULL").fetchall():
+            cursor.execute(sql)
+
+        node_count = cursor.execute('SELECT COUNT(*) FROM main.nodes').fetchone()[0]
+        edge_count = (cursor.execute('SELECT COUNT(*) FROM main.edges').fetchone()[0]
+                      if 'edges' in tables else 0)
+        conn.commit()
+        cursor.execute('DETACH DATABASE src')
+        conn.close()
+
+        elapsed = time.time() - start_time
+        self.stats = {
+            'nodes': node_count,
+            'edges': edge_count,
+            'order_time_s': order_time,
+            'total_time_s': elapsed,
+        }
+        print(f"[Reorder] ✅ Wrote {node_count:,} nodes, {edge_count:,} edges in {elapsed:.1f}s")
+        return self.stats
+
+    @staticmethod
+    def load_id_map(db_file: str) -> Dict[int, int]:
+        """Load osm_id -> new_id mapping from a reordered database."""
+        conn = sqlite3.connect(db_file)
+        try:
+            return {osm_id: new_id for new_id, osm_id in
+                    conn.execute('SELECT new_id, osm_id FROM node_id_map')}
+        finally:
+            conn.close()
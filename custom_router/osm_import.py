@@ -0,0 +1,568 @@
+"""
+Streaming single-pass OSM import
+Nodes, ways and relations are fed in file order (a sorted PBF has all nodes
+before ways). Node locations go into a flat array-backed location store
+instead of a dict of dicts, ways are resolved against it as they stream past,
+and nodes, ways and edges are written in large batched transactions.
+Directed edges are generated per batch of ways with vectorized numpy,
+optionally spread over worker processes.
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .graph import RoadNetwork
+from .osm_parser import OSMParser
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# OSM stores coordinates as fixed-point integers with 7 decimal places
+COORD_SCALE = 10_000_000
+
+
+def _to_fixed(value: float) -> int:
+    return int(round(value * COORD_SCALE))
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident set size of this process (current RSS if the peak is unavailable)."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+    return None
+
+
+class SparseLocationStore:
+    """Node locations as sorted parallel arrays (16 bytes per node).
+
+    Ids are appended in file order; an unsorted input is sorted once by
+    freeze(). Lookups are binary searches (vectorized with numpy).
+    """
+
+    def __init__(self):
+        """Initialize empty store."""
+        self.ids = array('q')
+        self.lats = array('i')
+        self.lons = array('i')
+        self.used = bytearray()  # 1 for nodes referenced by an imported way
+        self._sorted = True
+        self._frozen = False
+        self._np_ids = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def set(self, node_id: int, lat: float, lon: float) -> None:
+        """Store a node location."""
+        self._np_ids = None  # Release the buffer view so the arrays can grow
+        if self.ids and node_id <= self.ids[-1]:
+            self._sorted = False
+        self.ids.append(node_id)
+        self.lats.append(_to_fixed(lat))
+        self.lons.append(_to_fixed(lon))
+        self.used.append(0)
+        self._frozen = False
+
+    def freeze(self) -> None:
+        """Sort by id (only needed for unsorted input) before lookups start."""
+        if self._frozen:
+            return
+        if not self._sorted:
+            if HAS_NUMPY:
+                order = np.argsort(np.frombuffer(self.ids, dtype=np.int64), kind='stable')
+                for name, dtype in (('ids', np.int64), ('lats', np.int32), ('lons', np.int32)):
+                    values = np.frombuffer(getattr(self, name), dtype=dtype)[order]
+                    setattr(self, name, array(getattr(self, name).typecode, values.tobytes()))
+            else:
+                rows = sorted(zip(self.ids, self.lats, self.lons))
+                self.ids = array('q', (r[0] for r in rows))
+                self.lats = array('i', (r[1] for r in rows))
+                self.lons = array('i', (r[2] for r in rows))
+            self._sorted = True
+        self._np_ids = np.frombuffer(self.ids, dtype=np.int64) if HAS_NUMPY and self.ids else None
+        self._frozen = True
+
+    def _positions(self, refs: List[int]) -> List[int]:
+        """Store positions for refs (-1 where the node is missing)."""
+        self.freeze()
+        n = len(self.ids)
+        if self._np_ids is not None:
+            wanted = np.asarray(refs, dtype=np.int64)
+            pos = np.searchsorted(self._np_ids, wanted)
+            clipped = np.minimum(pos, n - 1)
+            return np.where(self._np_ids[clipped] == wanted, clipped, -1).tolist()
+        ids = self.ids
+        out = []
+        for ref in refs:
+            i = bisect_left(ids, ref)
+            out.append(i if i < n and ids[i] == ref else -1)
+        return out
+
+    def lookup(self, refs: List[int]) -> List[Optional[Tuple[float, float]]]:
+        """Locations for refs (None where missing); found nodes are marked used."""
+        out = []
+        for i in self._positions(refs):
+            if i < 0:
+                out.append(None)
+                continue
+            self.used[i] = 1
+            out.append((self.lats[i] / COORD_SCALE, self.lons[i] / COORD_SCALE))
+        return out
+
+    def lookup_array(self, refs):
+        """Vectorized lookup: lat and lon arrays (NaN where missing); found nodes are marked used."""
+        self.freeze()
+        lats = np.full(len(refs), np.nan)
+        lons = np.full(len(refs), np.nan)
+        if self._np_ids is None or not len(refs):
+            return lats, lons
+        pos = np.minimum(np.searchsorted(self._np_ids, refs), len(self._np_ids) - 1)
+        found = self._np_ids[pos] == refs
+        pos = pos[found]
+        lats[found] = np.frombuffer(self.lats, dtype=np.int32)[pos] / COORD_SCALE
+        lons[found] = np.frombuffer(self.lons, dtype=np.int32)[pos] / COORD_SCALE
+        np.frombuffer(self.used, dtype=np.uint8)[pos] = 1
+        return lats, lons
+
+    def used_nodes(self) -> Iterator[Tuple[int, float, float]]:
+        """(node_id, lat, lon) of every used node, in id order."""
+        self.freeze()
+        ids, lats, lons = self.ids, self.lats, self.lons
+        start = 0
+        while True:
+            i = self.used.find(1, start)
+            if i < 0:
+                return
+            yield ids[i], lats[i] / COORD_SCALE, lons[i] / COORD_SCALE
+            start = i + 1
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the location arrays."""
+        return (self.ids.itemsize * len(self.ids) + self.lats.itemsize * len(self.lats) +
+                self.lons.itemsize * len(self.lons) + len(self.used))
+
+    def close(self) -> None:
+        """Release the arrays."""
+        self.__init__()
+
+
+class DenseLocationStore:
+    """Node locations in arrays indexed directly by node id (9 bytes per id).
+
+    O(1) lookups with no sorting; sized by the largest node id, so back it with
+    memory-mapped files (path) for full-size extracts. Growing a file-backed
+    store only extends the files, which stay sparse on disk.
+    """
+
+    PRESENT = 1
+    USED = 2
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 1 << 20):
+        """Initialize store, optionally backed by files at path (.loc/.flags)."""
+        if not HAS_NUMPY:
+            raise RuntimeError("Dense location store requires numpy")
+        self.path = path
+        self.count = 0
+        self.max_id = -1
+        self.coords = None  # (capacity, 2) int32 fixed-point lat/lon
+        self.flags = None  # PRESENT / USED bits per id
+        if path:
+            for suffix in ('.loc', '.flags'):
+                open(path + suffix, 'wb').close()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        """Grow arrays to capacity ids, keeping stored locations."""
+        if self.path:
+            if self.coords is not None:
+                self.coords.flush()
+                self.flags.flush()
+                self.coords = self.flags = None
+            arrays = []
+            for suffix, dtype, shape in (('.loc', np.int32, (capacity, 2)), ('.flags', np.uint8, (capacity,))):
+                with open(self.path + suffix, 'r+b') as f:
+                    f.truncate(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                arrays.append(np.memmap(self.path + suffix, dtype=dtype, mode='r+', shape=shape))
+            self.coords, self.flags = arrays
+            return
+
+        coords = np.zeros((capacity, 2), dtype=np.int32)
+        flags = np.zeros(capacity, dtype=np.uint8)
+        if self.coords is not None:
+            coords[:len(self.coords)] = self.coords
+            flags[:len(self.flags)] = self.flags
+        self.coords, self.flags = coords, flags
+
+    def __len__(self) -> int:
+        return self.count
+
+    def set(self, node_id: int, lat: float, lon: float) -> None:
+        """Store a node location."""
+        if node_id >= len(self.flags):
+            self._allocate(max(node_id + 1, 2 * len(self.flags)))
+        if not self.flags[node_id]:
+            self.count += 1
+        self.coords[node_id] = (_to_fixed(lat), _to_fixed(lon))
+        self.flags[node_id] = self.PRESENT
+        self.max_id = max(self.max_id, node_id)
+
+    def freeze(self) -> None:
+        """Nothing to prepare; lookups are direct."""
+
+    def lookup(self, refs: List[int]) -> List[Optional[Tuple[float, float]]]:
+        """Locations for refs (None where missing); found nodes are marked used."""
+        out = []
+        size = len(self.flags)
+        for ref in refs:
+            if ref < 0 or ref >= size or not self.flags[ref]:
+                out.append(None)
+                continue
+            self.flags[ref] = self.PRESENT | self.USED
+            lat, lon = self.coords[ref].tolist()
+            out.append((lat / COORD_SCALE, lon / COORD_SCALE))
+        return out
+
+    def lookup_array(self, refs):
+        """Vectorized lookup: lat and lon arrays (NaN where missing); found nodes are marked used."""
+        lats = np.full(len(refs), np.nan)
+        lons = np.full(len(refs), np.nan)
+        in_range = (refs >= 0) & (refs < len(self.flags))
+        found = np.zeros(len(refs), dtype=bool)
+        found[in_range] = (self.flags[refs[in_range]] & self.PRESENT) != 0
+        ids = refs[found]
+        coords = self.coords[ids]
+        lats[found] = coords[:, 0] / COORD_SCALE
+        lons[found] = coords[:, 1] / COORD_SCALE
+        self.flags[ids] = self.PRESENT | self.USED
+        return lats, lons
+
+    def used_nodes(self) -> Iterator[Tuple[int, float, float]]:
+        """(node_id, lat, lon) of every used node, in id order."""
+        chunk = 1 << 20
+        for start in range(0, self.max_id + 1, chunk):
+            offsets = np.flatnonzero(self.flags[start:start + chunk] & self.USED)
+            coords = self.coords[start + offsets].tolist()
+            for node_id, (lat, lon) in zip((start + offsets).tolist(), coords):
+                yield node_id, lat / COORD_SCALE, lon / COORD_SCALE
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the location arrays (file-backed when path is set)."""
+        return self.coords.nbytes + self.flags.nbytes
+
+    def close(self) -> None:
+        """Release arrays and remove backing files."""
+        self.coords = self.flags = None
+        if self.path:
+            for suffix in ('.loc', '.flags'):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+
+def create_location_store(index: str = 'sparse', path: Optional[str] = None):
+    """Location store by name: 'sparse' (sorted arrays) or 'dense' (indexed by id)."""
+    if index == 'sparse':
+        return SparseLocationStore()
+    if index == 'dense':
+        return DenseLocationStore(path)
+    raise ValueError(f"Unknown location index: {index}")
+
+
+def haversine_array(lat1, lon1, lat2, lon2):
+    """Vectorized RoadNetwork.haversine_distance in metres."""
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    delta_phi = np.radians(lat2 - lat1)
+    delta_lambda = np.radians(lon2 - lon1)
+    a = np.sin(delta_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    return 6371000 * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+
+
+def edge_batch(counts, lats, lons, refs, access_forward, access_backward):
+    """Directed edges for a batch of ways, in RoadNetwork.way_edges order.
+
+    Args:
+        counts: Node count per way; refs/lats/lons hold the ways' nodes back to back
+        lats, lons: Node locations (NaN where missing; those segments are skipped)
+        refs: Node ids
+        access_forward, access_backward: Access mask per way (0 = no edge that way)
+
+    Returns:
+        (way_index, from_node, to_node, distance_m, access) arrays
+    """
+    n = len(refs)
+    if n < 2:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros(0), empty
+
+    # Segment i joins node i and i + 1 unless i + 1 starts the next way
+    starts = np.cumsum(counts) - counts
+    way_start = np.zeros(n + 1, dtype=bool)
+    way_start[starts] = True
+    located = ~np.isnan(lats)
+    valid = ~way_start[1:n] & located[:-1] & located[1:]
+    seg = np.flatnonzero(valid)
+    way = np.repeat(np.arange(len(counts)), counts)[seg]
+    distance = haversine_array(lats[seg], lons[seg], lats[seg + 1], lons[seg + 1])
+
+    # Interleave forward and backward edges per segment, then drop closed directions
+    from_node = np.stack([refs[seg], refs[seg + 1]], axis=1).ravel()
+    to_node = np.stack([refs[seg + 1], refs[seg]], axis=1).ravel()
+    access = np.stack([access_forward[way], access_backward[way]], axis=1).ravel()
+    keep = access != 0
+    return (np.repeat(way, 2)[keep], from_node[keep], to_node[keep],
+            np.repeat(distance, 2)[keep], access[keep].astype(np.int64))
+
+
+EDGE_INSERT = ('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id, road_type, '
+               'oneway, toll, access, restrictions) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+
+
+class OSMImporter:
+    """Builds a routing database from streamed nodes, ways and restrictions."""
+
+    def __init__(self, db_file: str, index: str = 'sparse', index_path: Optional[str] = None,
+                 batch_size: int = 100000, processes: int = 1):
+        """
+        Initialize importer; the database is written next to db_file and moved
+        into place by finish().
+
+        Args:
+            db_file: Routing database to create (replaced when finished)
+            index: Location store, 'sparse' or 'dense'
+            index_path: Backing file prefix for the dense store
+            batch_size: Node refs per edge batch and rows per executemany
+            processes: Worker processes generating edge batches (numpy only)
+        """
+        self.db_file = db_file
+        self.tmp_file = db_file + '.importing'
+        self.batch_size = batch_size
+        self.locations = create_location_store(index, index_path)
+        self.way_rows = []
+        self.edge_rows = []
+        self.restrictions = []
+        # Ways waiting for vectorized edge generation: [(way_id, way_data)]
+        self.pending_ways = []
+        self.pending_refs = 0
+        self.in_flight = deque()  # (ways, future) in submission order
+        self.pool = ProcessPoolExecutor(max_workers=processes) if HAS_NUMPY and processes > 1 else None
+        self.processes = processes
+        self.stats = {
+            'nodes_seen': 0, 'ways_seen': 0, 'ways_imported': 0, 'edges': 0,
+            'nodes_written': 0, 'restrictions': 0, 'missing_locations': 0
+        }
+        self.started_at = time.time()
+        self.ways_started_at = None
+
+        if os.path.exists(self.tmp_file):
+            os.remove(self.tmp_file)
+        parser = OSMParser(data_dir=os.path.dirname(db_file) or '.')
+        parser.db_file = self.tmp_file
+        if not parser.create_database({}, {}, []):
+            raise RuntimeError(f"Could not create database schema in {self.tmp_file}")
+
+        # Bulk load: no journal or fsync, indexes rebuilt once at the end
+        self.conn = sqlite3.connect(self.tmp_file)
+        self.conn.execute('PRAGMA journal_mode = OFF')
+        self.conn.execute('PRAGMA synchronous = OFF')
+        self.conn.execute('PRAGMA cache_size = -262144')
+        for index_name in ('idx_nodes_latlon', 'idx_edges_from', 'idx_edges_to'):
+            self.conn.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+    def add_node(self, node_id: int, lat: float, lon: float) -> None:
+        """Record a node location."""
+        self.locations.set(node_id, lat, lon)
+        self.stats['nodes_seen'] += 1
+        if self.stats['nodes_seen'] % 10000000 == 0:
+            print(f"[OSM] Indexed {self.stats['nodes_seen']:,} node locations "
+                  f"({self.locations.memory_bytes() / (1024 * 1024):.0f} MB)...")
+
+    def add_way(self, way_id: int, tags: Dict, node_refs: List[int]) -> None:
+        """Queue a way; its edges are generated in batches."""
+        if self.ways_started_at is None:
+            self.ways_started_at = time.time()
+            self.locations.freeze()
+        self.stats['ways_seen'] += 1
+
+        way_data = OSMParser.parse_way(tags, node_refs)
+        if way_data is None:
+            return
+        self.stats['ways_imported'] += 1
+
+        if HAS_NUMPY:
+            self.pending_ways.append((way_id, way_data))
+            self.pending_refs += len(node_refs)
+            if self.pending_refs >= self.batch_size:
+                self._dispatch_ways()
+        else:
+            self._add_way_edges(way_id, way_data)
+
+        if self.stats['ways_imported'] % 100000 == 0:
+            elapsed = time.time() - self.ways_started_at
+            print(f"[OSM] Imported {self.stats['ways_imported']:,} ways, {self.stats['edges']:,} edges "
+                  f"({self.stats['ways_seen'] / elapsed if elapsed > 0 else 0:.0f} ways/s)...")
+
+    @staticmethod
+    def _edge_row(from_node: int, to_node: int, distance: float, access: int, way_id: int, way_data: Dict) -> Tuple:
+        return (from_node, to_node, distance, way_data['speed_limit'], way_id, way_data['highway'],
+                int(way_data.get('oneway', False)), int(way_data.get('toll', False)), access,
+                way_data.get('restrictions', 0))
+
+    def _add_way_edges(self, way_id: int, way_data: Dict) -> None:
+        """Resolve one way and queue its rows (used without numpy)."""
+        node_refs = way_data['nodes']
+        coords = {}
+        for ref, location in zip(node_refs, self.locations.lookup(node_refs)):
+            if location is None:
+                self.stats['missing_locations'] += 1
+            else:
+                coords[ref] = location
+
+        self.way_rows.append((way_id, way_data['name'], way_data['highway'], way_data['speed_limit']))
+        for from_node, (to_node, distance, _, _), access, _ in RoadNetwork.way_edges(way_id, way_data, coords):
+            self.edge_rows.append(self._edge_row(from_node, to_node, distance, access, way_id, way_data))
+        if len(self.edge_rows) >= self.batch_size or len(self.way_rows) >= self.batch_size:
+            self._flush()
+
+    def _dispatch_ways(self) -> None:
+        """Resolve locations for the pending ways and generate their edges (in a worker if pooled)."""
+        ways = self.pending_ways
+        self.pending_ways = []
+        self.pending_refs = 0
+        if not ways:
+            return
+
+        counts = np.fromiter((len(way_data['nodes']) for _, way_data in ways), dtype=np.int64, count=len(ways))
+        refs = np.fromiter((ref for _, way_data in ways for ref in way_data['nodes']), dtype=np.int64,
+                           count=int(counts.sum()))
+        lats, lons = self.locations.lookup_array(refs)
+        self.stats['missing_locations'] += int(np.isnan(lats).sum())
+        access_forward = np.fromiter((way_data['access_forward'] for _, way_data in ways), dtype=np.uint8,
+                                     count=len(ways))
+        access_backward = np.fromiter((way_data['access_backward'] for _, way_data in ways), dtype=np.uint8,
+                                      count=len(ways))
+        job = (counts, lats, lons, refs, access_forward, access_backward)
+
+        if self.pool is None:
+            self._write_batch(ways, edge_batch(*job))
+            return
+        self.in_flight.append((ways, self.pool.submit(edge_batch, *job)))
+        # Bounded queue; batches are written in submission order
+        while len(self.in_flight) > 2 * self.processes:
+            self._write_batch(*self._next_result())
+
+    def _next_result(self):
+        ways, future = self.in_flight.popleft()
+        return ways, future.result()
+
+    def _write_batch(self, ways: List[Tuple[int, Dict]], columns) -> None:
+        """Insert one batch of ways and their generated edges."""
+        way_index, from_node, to_node, distance, access = columns
+        self.conn.executemany('INSERT OR IGNORE INTO ways (id, name, highway, speed_limit_kmh) VALUES (?, ?, ?, ?)',
+                              [(way_id, way_data['name'], way_data['highway'], way_data['speed_limit'])
+                               for way_id, way_data in ways])
+        edge_row = self._edge_row
+        rows = [edge_row(f, t, d, a, *ways[w])
+                for w, f, t, d, a in zip(way_index.tolist(), from_node.tolist(), to_node.tolist(),
+                                         distance.tolist(), access.tolist())]
+        self.conn.executemany(EDGE_INSERT, rows)
+        self.stats['edges'] += len(rows)
+
+    def add_restriction(self, from_way: int, to_way: int, restriction: str) -> None:
+        """Queue a turn restriction."""
+        self.restrictions.append((from_way, to_way, restriction))
+
+    def _flush(self) -> None:
+        """Write all queued way and edge rows."""
+        self._dispatch_ways()
+        while self.in_flight:
+            self._write_batch(*self._next_result())
+        if self.way_rows:
+            self.conn.executemany('INSERT OR IGNORE INTO ways (id, name, highway, speed_limit_kmh) '
+                                  'VALUES (?, ?, ?, ?)', self.way_rows)
+        if self.edge_rows:
+            self.conn.executemany(EDGE_INSERT, self.edge_rows)
+            self.stats['edges'] += len(self.edge_rows)
+        self.way_rows = []
+        self.edge_rows = []
+
+    def _write_nodes(self) -> None:
+        """Write every node referenced by an imported way, in id order."""
+        batch = []
+        for row in self.locations.used_nodes():
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.conn.executemany('INSERT INTO nodes (id, lat, lon) VALUES (?, ?, ?)', batch)
+                self.stats['nodes_written'] += len(batch)
+                batch = []
+        if batch:
+            self.conn.executemany('INSERT INTO nodes (id, lat, lon) VALUES (?, ?, ?)', batch)
+            self.stats['nodes_written'] += len(batch)
+
+    def finish(self) -> Dict:
+        """Write remaining rows, build indexes and move the database into place.
+
+        Returns import statistics including throughput and peak memory.
+        """
+        self._flush()
+        if self.pool is not None:
+            self.pool.shutdown()
+        ways_elapsed = time.time() - (self.ways_started_at or time.time())
+        print("[OSM] Writing referenced nodes...")
+        self._write_nodes()
+        if self.restrictions:
+            self.conn.executemany('INSERT INTO turn_restrictions (from_way_id, to_way_id, restriction_type) '
+                                  'VALUES (?, ?, ?)', self.restrictions)
+        self.stats['restrictions'] = len(self.restrictions)
+
+        print("[OSM] Creating indexes...")
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_nodes_latlon ON nodes(lat, lon)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_edges_from ON edges(from_node_id)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_edges_to ON edges(to_node_id)')
+        self.conn.commit()
+        self.conn.close()
+        os.replace(self.tmp_file, self.db_file)
+
+        elapsed = time.time() - self.started_at
+        self.stats.update({
+            'elapsed_s': elapsed,
+            'ways_per_s': self.stats['ways_seen'] / ways_elapsed if ways_elapsed > 0 else 0.0,
+            'nodes_per_s': self.stats['nodes_seen'] / elapsed if elapsed > 0 else 0.0,
+            'location_index_mb': self.locations.memory_bytes() / (1024 * 1024),
+            'peak_memory_mb': peak_memory_mb()
+        })
+        self.locations.close()
+        print(f"[OSM] Import complete: {self.stats['nodes_written']:,} nodes, {self.stats['ways_imported']:,} ways, "
+              f"{self.stats['edges']:,} edges in {elapsed:.1f}s ({self.stats['ways_per_s']:.0f} ways/s)")
+        return self.stats
+
+    def abort(self) -> None:
+        """Discard the partially written database."""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+        self.conn.close()
+        if os.path.exists(self.tmp_file):
+            os.remove(self.tmp_file)
+        self.locations.close()
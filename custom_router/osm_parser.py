@@ -6,8 +6,9 @@ Downloads and processes UK PBF file to extract road network
 import os
 import subprocess
 import json
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import sqlite3
+from .access import ACCESS_ALL, HIGHWAY_ACCESS, way_access, way_restrictions
 
 class OSMParser:
     """Parse OSM data and extract road network."""
@@ -18,6 +19,9 @@ class OSMParser:
         'unclassified', 'residential', 'service', 'living_street',
         'motorway_link', 'trunk_link', 'primary_link', 'secondary_link'
     }
+
+    # All road and path types kept in the graph (car, bike and foot)
+    ROUTABLE_ROADS = set(HIGHWAY_ACCESS)
     
     # Speed limits by road type (km/h)
     DEFAULT_SPEEDS = {
@@ -40,6 +44,39 @@ class OSMParser:
         
         os.makedirs(data_dir, exist_ok=True)
     
+    @classmethod
+    def parse_way(cls, tags: Dict, node_refs: List[int]) -> Optional[Dict]:
+        """Build way data from OSM tags and node refs (None if not routable)."""
+        highway = tags.get('highway', '')
+        if highway not in cls.ROUTABLE_ROADS:
+            return None
+
+        access_forward, access_backward = way_access(tags)
+        if not access_forward and not access_backward:
+            return None
+
+        # Get speed limit with proper handling
+        maxspeed_str = tags.get('maxspeed', '')
+        if maxspeed_str:
+            try:
+                speed_limit = int(maxspeed_str)
+            except (ValueError, TypeError):
+                speed_limit = cls.DEFAULT_SPEEDS.get(highway, 50)
+        else:
+            speed_limit = cls.DEFAULT_SPEEDS.get(highway, 50)
+
+        return {
+            'name': tags.get('name', 'Unnamed'),
+            'highway': highway,
+            'speed_limit': speed_limit,
+            'nodes': node_refs,
+            'oneway': tags.get('oneway', '') in ('yes', '1', 'true'),
+            'toll': tags.get('toll', '') in ('yes', '1', 'true'),
+            'access_forward': access_forward,
+            'access_backward': access_backward,
+            'restrictions': way_restrictions(tags)
+        }
+
     def download_uk_data(self) -> bool:
         """Download UK OSM data from Geofabrik."""
         print("[OSM] Downloading UK data from Geofabrik...")
@@ -63,7 +100,11 @@ class OSMParser:
             return False
     
     def parse_pbf(self) -> Tuple[Dict, Dict, List]:
-        """Parse PBF file and extract nodes, ways, turn restrictions."""
+        """Parse PBF file and extract nodes, ways, turn restrictions.
+
+        Holds every node in memory; import_pbf() streams straight into the
+        database with a fraction of the memory.
+        """
         print("[OSM] Parsing PBF file...")
 
         if not os.path.exists(self.pbf_file):
@@ -88,39 +129,22 @@ class OSMParser:
         way_count = 0
 
         # Store references to parent class attributes for inner class
-        drivable_roads = self.DRIVABLE_ROADS
-        default_speeds = self.DEFAULT_SPEEDS
+        routable_roads = self.ROUTABLE_ROADS
+        parse_way = self.parse_way
 
         class WayCollector(osmium.SimpleHandler):
             def way(self, w):
                 """Collect ways and their node references."""
                 nonlocal way_count
-                # Check if it's a drivable road
-                highway = w.tags.get('highway', '')
-                if highway not in drivable_roads:
+                # Check if it's a road or path usable by any travel mode
+                if w.tags.get('highway', '') not in routable_roads:
                     return
 
-                # Extract way data
+                tags = {tag.k: tag.v for tag in w.tags}
                 node_refs = [nd.ref for nd in w.nodes]
-
-                # Get speed limit with proper handling
-                maxspeed_str = w.tags.get('maxspeed', '')
-                if maxspeed_str:
-                    try:
-                        speed_limit = int(maxspeed_str)
-                    except (ValueError, TypeError):
-                        speed_limit = default_speeds.get(highway, 50)
-                else:
-                    speed_limit = default_speeds.get(highway, 50)
-
-                way_data = {
-                    'name': w.tags.get('name', 'Unnamed'),
-                    'highway': highway,
-                    'speed_limit': speed_limit,
-                    'nodes': node_refs,
-                    'oneway': w.tags.get('oneway', '') in ('yes', '1', 'true'),
-                    'toll': w.tags.get('toll', '') in ('yes', '1', 'true')
-                }
+                way_data = parse_way(tags, node_refs)
+                if way_data is None:
+                    return
                 ways[w.id] = way_data
                 referenced_node_ids.update(node_refs)
                 way_count += 1
@@ -187,6 +211,69 @@ class OSMParser:
         print(f"[OSM] Parsed: {len(nodes)} nodes, {len(ways)} ways, {len(turn_restrictions)} restrictions")
         return nodes, ways, turn_restrictions
     
+    def import_pbf(self, index: str = 'sparse', index_path: Optional[str] = None,
+                   processes: int = 1, region=None) -> Dict:
+        """Stream the PBF once straight into the routing database.
+
+        Node locations are kept in a flat location store ('sparse' sorted
+        arrays, or 'dense' arrays indexed by id, memory-mapped at index_path)
+        instead of the node dicts built by parse_pbf(). Edges are generated in
+        vectorized batches, spread over `processes` workers. With a region
+        (extract.Region) only nodes inside it are kept, cutting ways at its
+        border. Returns import stats (counts, ways/s, peak memory); empty if
+        the PBF is missing.
+        """
+        print(f"[OSM] Streaming import of {self.pbf_file} ({index} location index)...")
+
+        if not os.path.exists(self.pbf_file):
+            print(f"[OSM] PBF file not found: {self.pbf_file}")
+            return {}
+
+        try:
+            import osmium
+        except ImportError:
+            print("[OSM] Installing osmium...")
+            subprocess.run("pip install osmium", shell=True)
+            import osmium
+        from .osm_import import OSMImporter
+
+        importer = OSMImporter(self.db_file, index=index, index_path=index_path, processes=processes)
+        routable_roads = self.ROUTABLE_ROADS
+
+        class StreamHandler(osmium.SimpleHandler):
+            def node(self, n):
+                """Index every node location (ways come after nodes in the file)."""
+                location = n.location
+                if region is not None and not region.contains(location.lat, location.lon):
+                    return
+                importer.add_node(n.id, location.lat, location.lon)
+
+            def way(self, w):
+                """Resolve and write routable ways as they stream past."""
+                if w.tags.get('highway', '') not in routable_roads:
+                    return
+                importer.add_way(w.id, {tag.k: tag.v for tag in w.tags}, [nd.ref for nd in w.nodes])
+
+            def relation(self, r):
+                """Collect turn restrictions."""
+                if r.tags.get('type') != 'restriction':
+                    return
+                from_way = to_way = None
+                for member in r.members:
+                    if member.role == 'from':
+                        from_way = member.ref
+                    elif member.role == 'to':
+                        to_way = member.ref
+                if from_way and to_way:
+                    importer.add_restriction(from_way, to_way, r.tags.get('restriction', ''))
+
+        try:
+            StreamHandler().apply_file(self.pbf_file)
+        except Exception:
+            importer.abort()
+            raise
+        return importer.finish()
+
     def create_database(self, nodes: Dict, ways: Dict, turn_restrictions: List) -> bool:
         """Create SQLite database with road network."""
         print("[OSM] Creating database...")
@@ -217,10 +304,12 @@ class OSMParser:
                     road_type TEXT,
                     oneway INTEGER DEFAULT 0,
                     toll INTEGER DEFAULT 0,
+                    access INTEGER DEFAULT %d,
+                    restrictions INTEGER DEFAULT 0,
                     FOREIGN KEY(from_node_id) REFERENCES nodes(id),
                     FOREIGN KEY(to_node_id) REFERENCES nodes(id)
                 )
-            ''')
+            ''' % ACCESS_ALL)
             
             # Create ways table
             cursor.execute('''
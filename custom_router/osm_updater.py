@@ -0,0 +1,329 @@
+"""
+Incremental road network updates from OSM change files (.osc / .osc.gz)
+Applies create/modify/delete diffs to the routing database without a full
+PBF re-import: only the ways and nodes in the diff are rewritten, edges are
+rebuilt for those ways. Changed edges invalidate the CH node order, so CH
+stays off until build_ch_index.py is run again. Each applied diff bumps the graph version in graph_meta so
+running servers can detect and load the new graph. Databases renumbered by
+NodeReorderer are updated through their node_id_map.
+"""
+
+import gzip
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .graph import RoadNetwork, read_graph_version
+from .osm_parser import OSMParser
+
+# SQLite host parameter limit is 999 on older builds
+SQL_CHUNK = 900
+
+# Edge columns written for rebuilt ways, in the order of OSMImporter rows
+EDGE_COLUMNS = ('from_node_id', 'to_node_id', 'distance_m', 'speed_limit_kmh', 'way_id',
+                'road_type', 'oneway', 'toll', 'access', 'restrictions')
+
+
+def _chunks(items: Iterable, size: int = SQL_CHUNK):
+    """Yield lists of at most size items."""
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class OSMChange:
+    """Net effect of one or more OSM change files.
+
+    Later actions on the same element replace earlier ones, so applying the
+    result gives the same database as applying each file in order.
+    """
+
+    def __init__(self):
+        """Initialize empty change set."""
+        self.node_upserts = {}  # node_id -> (lat, lon)
+        self.node_deletes = set()
+        self.way_upserts = {}  # way_id -> (tags, node_refs)
+        self.way_deletes = set()
+        self.sequence = None  # Replication sequence number, if known
+
+    def upsert_node(self, node_id: int, lat: float, lon: float) -> None:
+        """Record a created or modified node."""
+        self.node_deletes.discard(node_id)
+        self.node_upserts[node_id] = (lat, lon)
+
+    def delete_node(self, node_id: int) -> None:
+        """Record a deleted node."""
+        self.node_upserts.pop(node_id, None)
+        self.node_deletes.add(node_id)
+
+    def upsert_way(self, way_id: int, tags: Dict, node_refs: List[int]) -> None:
+        """Record a created or modified way."""
+        self.way_deletes.discard(way_id)
+        self.way_upserts[way_id] = (tags, node_refs)
+
+    def delete_way(self, way_id: int) -> None:
+        """Record a deleted way."""
+        self.way_upserts.pop(way_id, None)
+        self.way_deletes.add(way_id)
+
+    def translate(self, id_map: Dict[int, int]) -> 'OSMChange':
+        """Copy of the change set with node IDs replaced through id_map (OSM ID -> stored ID)."""
+        change = OSMChange()
+        change.node_upserts = {id_map[n]: coord for n, coord in self.node_upserts.items()}
+        change.node_deletes = {id_map[n] for n in self.node_deletes if n in id_map}
+        change.way_upserts = {w: (tags, [id_map[n] for n in refs]) for w, (tags, refs) in self.way_upserts.items()}
+        change.way_deletes = set(self.way_deletes)
+        change.sequence = self.sequence
+        return change
+
+    def is_empty(self) -> bool:
+        """True if the change set touches nothing."""
+        return not (self.node_upserts or self.node_deletes or self.way_upserts or self.way_deletes)
+
+    @classmethod
+    def from_file(cls, path: str, change: Optional['OSMChange'] = None) -> 'OSMChange':
+        """Parse an osmChange XML file (gzip if it ends in .gz) into a change set."""
+        change = change or cls()
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            change.parse(f)
+        return change
+
+    def parse(self, source) -> 'OSMChange':
+        """Stream-parse osmChange XML from a file object."""
+        action = None
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag in ('create', 'modify', 'delete'):
+                    action = tag
+                continue
+
+            if tag == 'node' and action:
+                node_id = int(elem.get('id'))
+                if action == 'delete':
+                    self.delete_node(node_id)
+                else:
+                    self.upsert_node(node_id, float(elem.get('lat')), float(elem.get('lon')))
+                elem.clear()
+            elif tag == 'way' and action:
+                way_id = int(elem.get('id'))
+                if action == 'delete':
+                    self.delete_way(way_id)
+                else:
+                    tags = {t.get('k'): t.get('v') for t in elem.iter('tag')}
+                    node_refs = [int(nd.get('ref')) for nd in elem.iter('nd')]
+                    self.upsert_way(way_id, tags, node_refs)
+                elem.clear()
+            elif tag == 'relation':
+                # Turn restriction relations are not updated incrementally
+                elem.clear()
+            elif tag in ('create', 'modify', 'delete'):
+                action = None
+        return self
+
+
+class OSMUpdater:
+    """Apply OSM change sets to a routing database in place."""
+
+    def __init__(self, db_file: str):
+        """Initialize updater for a routing database."""
+        self.db_file = db_file
+
+    def apply_files(self, paths: List[str]) -> Dict:
+        """Merge change files in order and apply them as one update."""
+        change = OSMChange()
+        for path in paths:
+            print(f"[OSMUpdate] Reading {path}...")
+            OSMChange.from_file(path, change)
+        return self.apply(change, source=', '.join(paths))
+
+    def apply(self, change: OSMChange, source: str = '') -> Dict:
+        """Apply a change set in a single transaction and bump the graph version."""
+        start_time = time.time()
+        summary = {
+            'nodes_upserted': 0, 'nodes_deleted': 0, 'nodes_moved': 0,
+            'ways_upserted': 0, 'ways_deleted': 0,
+            'edges_removed': 0, 'edges_added': 0, 'edges_rescaled': 0,
+            'affected_nodes': 0, 'ch_invalidated': False, 'missing_locations': 0,
+        }
+
+        conn = sqlite3.connect(self.db_file, timeout=60)
+        try:
+            self._edge_columns = {row[1] for row in conn.execute('PRAGMA table_info(edges)')}
+            self._has_access = 'access' in self._edge_columns
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='node_id_map'").fetchone():
+                change = change.translate(self._map_node_ids(conn, change))
+            affected: Set[int] = set()
+
+            # 1. Drop edges of every way being rewritten or deleted
+            changed_ways = set(change.way_upserts) | change.way_deletes
+            for chunk in _chunks(changed_ways):
+                marks = ','.join('?' * len(chunk))
+                for from_node, to_node in conn.execute(
+                        f'SELECT from_node_id, to_node_id FROM edges WHERE way_id IN ({marks})', chunk):
+                    affected.update((from_node, to_node))
+                summary['edges_removed'] += conn.execute(
+                    f'DELETE FROM edges WHERE way_id IN ({marks})', chunk).rowcount
+                stored = {row[0] for row in conn.execute(f'SELECT id FROM ways WHERE id IN ({marks})', chunk)}
+                summary['ways_deleted'] += len(stored & change.way_deletes)
+                # Upserted ways are re-inserted below if still routable
+                conn.execute(f'DELETE FROM ways WHERE id IN ({marks})', chunk)
+
+            # 2. Deleted nodes take their remaining edges with them
+            for chunk in _chunks(change.node_deletes):
+                marks = ','.join('?' * len(chunk))
+                for from_node, to_node in conn.execute(
+                        f'SELECT from_node_id, to_node_id FROM edges '
+                        f'WHERE from_node_id IN ({marks}) OR to_node_id IN ({marks})', chunk + chunk):
+                    affected.update((from_node, to_node))
+                summary['edges_removed'] += conn.execute(
+                    f'DELETE FROM edges WHERE from_node_id IN ({marks}) OR to_node_id IN ({marks})',
+                    chunk + chunk).rowcount
+                summary['nodes_deleted'] += conn.execute(
+                    f'DELETE FROM nodes WHERE id IN ({marks})', chunk).rowcount
+            affected.update(change.node_deletes)
+
+            # 3. Move existing nodes; new nodes are only stored if a routable way uses them
+            existing = self._load_coords(conn, change.node_upserts)
+            moved = {n for n, coord in change.node_upserts.items()
+                     if n in existing and existing[n] != coord}
+            conn.executemany('UPDATE nodes SET lat = ?, lon = ? WHERE id = ?',
+                             [(lat, lon, n) for n, (lat, lon) in change.node_upserts.items() if n in moved])
+            summary['nodes_moved'] = len(moved)
+
+            # 4. Rebuild routable ways from their new definitions
+            parsed = {}
+            for way_id, (tags, node_refs) in change.way_upserts.items():
+                way_data = OSMParser.parse_way(tags, node_refs)
+                if way_data is not None:
+                    parsed[way_id] = way_data
+
+            referenced = {n for way_data in parsed.values() for n in way_data['nodes']}
+            coords = self._load_coords(conn, referenced)
+            new_nodes = [(n, *change.node_upserts[n], None) for n in referenced
+                         if n not in coords and n in change.node_upserts]
+            conn.executemany('INSERT OR REPLACE INTO nodes (id, lat, lon, elevation) VALUES (?, ?, ?, ?)', new_nodes)
+            coords.update({n: change.node_upserts[n] for n in referenced if n in change.node_upserts})
+            summary['nodes_upserted'] = len(new_nodes) + len(moved)
+            # Refs found neither in the database nor in the diff drop their segments
+            summary['missing_locations'] = sum(1 for way_data in parsed.values()
+                                               for n in way_data['nodes'] if n not in coords)
+
+            conn.executemany('INSERT OR REPLACE INTO ways (id, name, highway, speed_limit_kmh) VALUES (?, ?, ?, ?)',
+                             [(w, d['name'], d['highway'], d['speed_limit']) for w, d in parsed.items()])
+            summary['ways_upserted'] = len(parsed)
+
+            edge_rows = []
+            for way_id, way_data in parsed.items():
+                for from_node, edge, access, restrictions in RoadNetwork.way_edges(way_id, way_data, coords):
+                    edge_rows.append((from_node, edge[0], edge[1], edge[2], way_id, way_data['highway'],
+                                      int(way_data.get('oneway', False)), int(way_data.get('toll', False)),
+                                      access, restrictions))
+                    affected.update((from_node, edge[0]))
+            self._insert_edges(conn, edge_rows)
+            summary['edges_added'] = len(edge_rows)
+
+            # 5. Rescale distances on untouched edges that end at a moved node
+            summary['edges_rescaled'] = self._rescale_moved(conn, moved)
+            affected.update(moved)
+            summary['affected_nodes'] = len(affected)
+
+            # 6. The CH built over the old edges no longer matches the graph
+            if affected:
+                summary['ch_invalidated'] = self._invalidate_ch(conn)
+
+            summary['version'] = self._bump_version(conn, change, source)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        summary['elapsed_s'] = time.time() - start_time
+        print(f"[OSMUpdate] Applied {summary['ways_upserted']} way upserts, {summary['ways_deleted']} way "
+              f"deletes: -{summary['edges_removed']} +{summary['edges_added']} edges, "
+              f"{summary['affected_nodes']} affected nodes in {summary['elapsed_s']:.1f}s "
+              f"(graph version {summary['version']})")
+        if summary['missing_locations']:
+            print(f"[OSMUpdate] ⚠️ {summary['missing_locations']:,} way node refs had no location")
+        return summary
+
+    @staticmethod
+    def _map_node_ids(conn, change: OSMChange) -> Dict[int, int]:
+        """OSM ID -> stored ID for every node in the change, numbering new nodes after the last ID."""
+        osm_ids = set(change.node_upserts) | change.node_deletes
+        osm_ids.update(n for _, refs in change.way_upserts.values() for n in refs)
+        id_map = {}
+        for chunk in _chunks(osm_ids):
+            marks = ','.join('?' * len(chunk))
+            id_map.update(conn.execute(f'SELECT osm_id, new_id FROM node_id_map WHERE osm_id IN ({marks})', chunk))
+
+        next_id = max(conn.execute('SELECT MAX(new_id) FROM node_id_map').fetchone()[0] or 0,
+                      conn.execute('SELECT MAX(id) FROM nodes').fetchone()[0] or 0) + 1
+        new_ids = []
+        for osm_id in sorted(osm_ids - set(id_map) - change.node_deletes):
+            id_map[osm_id] = next_id
+            new_ids.append((next_id, osm_id))
+            next_id += 1
+        conn.executemany('INSERT INTO node_id_map (new_id, osm_id) VALUES (?, ?)', new_ids)
+        return id_map
+
+    @staticmethod
+    def _load_coords(conn, node_ids: Iterable[int]) -> Dict[int, Tuple[float, float]]:
+        """Coordinates of the given nodes that exist in the database."""
+        coords = {}
+        for chunk in _chunks(node_ids):
+            marks = ','.join('?' * len(chunk))
+            for node_id, lat, lon in conn.execute(f'SELECT id, lat, lon FROM nodes WHERE id IN ({marks})', chunk):
+                coords[node_id] = (lat, lon)
+        return coords
+
+    def _insert_edges(self, conn, rows: List[Tuple]) -> None:
+        """Insert EDGE_COLUMNS rows, dropping columns an older schema lacks."""
+        keep = [i for i, column in enumerate(EDGE_COLUMNS) if column in self._edge_columns]
+        conn.executemany(f'INSERT INTO edges ({", ".join(EDGE_COLUMNS[i] for i in keep)}) '
+                         f'VALUES ({", ".join("?" * len(keep))})', [tuple(row[i] for i in keep) for row in rows])
+
+    def _rescale_moved(self, conn, moved: Set[int]) -> int:
+        """Recompute distance_m for edges touching moved nodes."""
+        if not moved:
+            return 0
+        rows = []
+        for chunk in _chunks(moved):
+            marks = ','.join('?' * len(chunk))
+            rows.extend(conn.execute(f'SELECT id, from_node_id, to_node_id FROM edges '
+                                     f'WHERE from_node_id IN ({marks}) OR to_node_id IN ({marks})', chunk + chunk))
+        coords = self._load_coords(conn, {n for _, a, b in rows for n in (a, b)})
+        updates = [(RoadNetwork.haversine_distance(coords[a], coords[b]), edge_id)
+                   for edge_id, a, b in rows if a in coords and b in coords]
+        conn.executemany('UPDATE edges SET distance_m = ? WHERE id = ?', updates)
+        return len(updates)
+
+    @staticmethod
+    def _invalidate_ch(conn) -> bool:
+        """Clear the CH node order and shortcuts so routers load without CH.
+
+        Contraction depends on the whole hierarchy above a node, so a local
+        patch can't reproduce what a full build would; CH stays unavailable
+        until build_ch_index.py rebuilds it. Returns True if CH data was cleared.
+        """
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        cleared = False
+        for table in ('ch_node_order', 'ch_shortcuts'):
+            if table in tables:
+                cleared |= conn.execute(f'DELETE FROM {table}').rowcount > 0
+        return cleared
+
+    @staticmethod
+    def _bump_version(conn, change: OSMChange, source: str) -> int:
+        """Increment the graph version and record where it came from."""
+        conn.execute('CREATE TABLE IF NOT EXISTS graph_meta (key TEXT PRIMARY KEY, value TEXT)')
+        version = read_graph_version(conn) + 1
+        meta = {'version': str(version), 'updated_at': str(int(time.time())), 'source': source}
+        if change.sequence is not None:
+            meta['sequence'] = str(change.sequence)
+        conn.executemany('INSERT OR REPLACE INTO graph_meta (key, value) VALUES (?, ?)', meta.items())
+        return version
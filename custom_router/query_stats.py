@@ -0,0 +1,230 @@
+"""
+Low-overhead per-query instrumentation for the custom router.
+Phase timings are taken with perf_counter_ns and search counters are plain
+integers, so recording a query costs a handful of additions. Aggregation
+uses fixed-bucket histograms; process memory is sampled in the background
+instead of on the query path.
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Bucket upper bounds in milliseconds (last bucket is +inf)
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+                      1000, 2500, 5000, 10000)
+
+# Bucket upper bounds for settled node counts
+SETTLED_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+class QueryStats:
+    """Timings and search counters for a single routing query."""
+
+    __slots__ = ('snap_ns', 'search_ns', 'extract_ns', 'total_ns',
+                 'settled', 'heap_pushes', 'relaxations', 'algorithm', 'success')
+
+    def __init__(self):
+        self.snap_ns = 0
+        self.search_ns = 0
+        self.extract_ns = 0
+        self.total_ns = 0
+        self.settled = 0
+        self.heap_pushes = 0
+        self.relaxations = 0
+        self.algorithm = None
+        self.success = False
+
+    def to_dict(self) -> Dict:
+        """Convert to JSON-friendly dict (times in ms)."""
+        return {
+            'snap_ms': self.snap_ns / 1e6,
+            'search_ms': self.search_ns / 1e6,
+            'extract_ms': self.extract_ns / 1e6,
+            'total_ms': self.total_ns / 1e6,
+            'settled_nodes': self.settled,
+            'heap_pushes': self.heap_pushes,
+            'relaxations': self.relaxations,
+            'algorithm': self.algorithm,
+            'success': self.success
+        }
+
+
+class Histogram:
+    """Fixed-bucket histogram with approximate percentiles."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        """Initialize histogram with sorted bucket upper bounds."""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Add an observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """Approximate percentile (upper bound of the bucket holding it)."""
+        if self.count == 0:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        """Summary plus raw bucket counts."""
+        return {
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': {('+Inf' if i == len(self.buckets) else str(self.buckets[i])): c
+                        for i, c in enumerate(self.counts)}
+        }
+
+
+class QueryStatsAggregator:
+    """Thread-safe aggregation of QueryStats into histograms."""
+
+    PHASES = ('snap', 'search', 'extract', 'total')
+
+    def __init__(self):
+        """Initialize empty aggregates."""
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all aggregates."""
+        with self.lock:
+            self.queries = 0
+            self.failures = 0
+            self.by_algorithm = {}
+            self.latency = {phase: Histogram() for phase in self.PHASES}
+            self.settled = Histogram(SETTLED_BUCKETS)
+            self.heap_pushes = 0
+            self.relaxations = 0
+            self.last = None
+
+    def record(self, stats: QueryStats) -> None:
+        """Fold one query into the aggregates."""
+        with self.lock:
+            self.queries += 1
+            if not stats.success:
+                self.failures += 1
+            if stats.algorithm:
+                self.by_algorithm[stats.algorithm] = self.by_algorithm.get(stats.algorithm, 0) + 1
+            self.latency['snap'].record(stats.snap_ns / 1e6)
+            self.latency['search'].record(stats.search_ns / 1e6)
+            self.latency['extract'].record(stats.extract_ns / 1e6)
+            self.latency['total'].record(stats.total_ns / 1e6)
+            self.settled.record(stats.settled)
+            self.heap_pushes += stats.heap_pushes
+            self.relaxations += stats.relaxations
+            self.last = stats
+
+    def snapshot(self) -> Dict:
+        """Aggregated statistics as a dict."""
+        with self.lock:
+            return {
+                'queries': self.queries,
+                'failures': self.failures,
+                'by_algorithm': dict(self.by_algorithm),
+                'latency_ms': {phase: h.to_dict() for phase, h in self.latency.items()},
+                'settled_nodes': self.settled.to_dict(),
+                'heap_pushes_total': self.heap_pushes,
+                'relaxations_total': self.relaxations,
+                'last_query': self.last.to_dict() if self.last else None
+            }
+
+
+class MemorySampler:
+    """Background thread sampling process RSS at a fixed interval."""
+
+    def __init__(self, interval_seconds: float = 5.0, history_size: int = 120):
+        """Initialize sampler (call start() to begin sampling)."""
+        self.interval_seconds = interval_seconds
+        self.history_size = history_size
+        self.process = psutil.Process(os.getpid()) if psutil else None
+        self.current_mb = 0.0
+        self.peak_mb = 0.0
+        self.history: List = []  # [(timestamp, rss_mb)]
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self) -> float:
+        """Take one RSS sample."""
+        if not self.process:
+            return 0.0
+        rss_mb = self.process.memory_info().rss / (1024 * 1024)
+        self.current_mb = rss_mb
+        self.peak_mb = max(self.peak_mb, rss_mb)
+        self.history.append((time.time(), rss_mb))
+        if len(self.history) > self.history_size:
+            del self.history[0]
+        return rss_mb
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                pass
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the background sampler (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='memory-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sampler."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval_seconds + 1)
+
+    def get_stats(self) -> Dict:
+        """Latest and peak RSS."""
+        return {
+            'current_mb': self.current_mb,
+            'peak_mb': self.peak_mb,
+            'interval_seconds': self.interval_seconds,
+            'samples': len(self.history),
+            'available': self.process is not None
+        }
+
+
+# Global sampler shared by all routers in the process
+_sampler: Optional[MemorySampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_memory_sampler() -> MemorySampler:
+    """Get the process-wide memory sampler, starting it on first use."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MemorySampler()
+            _sampler.start()
+    return _sampler
@@ -0,0 +1,244 @@
+"""
+Double-buffered router holder for zero-downtime graph swaps
+A new graph version is loaded and warmed in the background while the active
+one keeps serving. The swap is a single reference assignment under a lock:
+new requests get the new instance, and requests that already checked out
+the old instance finish on it before it is released.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .graph import RoadNetwork
+from .dijkstra import Router
+from .k_shortest_paths import KShortestPaths
+from .component_analyzer import ComponentAnalyzer
+from .load_progress import LoadProgress
+
+# Probe routes used to warm a freshly loaded graph (lat/lon pairs across GB)
+DEFAULT_PROBES = [
+    (51.5074, -0.1278, 53.4808, -2.2426),   # London -> Manchester
+    (52.4862, -1.8904, 53.8008, -1.5491),   # Birmingham -> Leeds
+    (51.4545, -2.5879, 51.4816, -3.1791),   # Bristol -> Cardiff
+    (55.9533, -3.1883, 55.8642, -4.2518),   # Edinburgh -> Glasgow
+    (51.5074, -0.1278, 51.4543, -0.9781),   # London -> Reading
+]
+
+
+class RouterInstance:
+    """One loaded graph version with its router and alternatives finder."""
+
+    def __init__(self, graph: RoadNetwork, router: Router, k_paths: KShortestPaths, db_file: str):
+        """Initialize instance from loaded components."""
+        self.graph = graph
+        self.router = router
+        self.k_paths = k_paths
+        self.db_file = db_file
+        self.version = getattr(graph, 'version', 0)
+        self.loaded_at = time.time()
+        self.in_flight = 0  # Requests currently using this instance
+        self.warmup = {}
+
+    def to_dict(self) -> Dict:
+        """Convert to JSON-friendly dict."""
+        return {
+            'version': self.version,
+            'db_file': self.db_file,
+            'loaded_at': self.loaded_at,
+            'nodes': len(self.graph.nodes),
+            'ch_available': self.router.ch_available,
+            'in_flight': self.in_flight,
+            'warmup': self.warmup
+        }
+
+
+def attach_component_analyzer(graph: RoadNetwork, db_file: str) -> Dict:
+    """Load (or compute and cache) component labels and attach them to graph.
+
+    A missing or stale SCC cache is rebuilt in the background so serving
+    starts without waiting for it (build_component_cache.py builds it offline).
+    """
+    analyzer = ComponentAnalyzer(graph)
+    stats = analyzer.analyze_cached(ComponentAnalyzer.cache_path(db_file), scc_in_background=True)
+    graph.set_component_analyzer(analyzer)
+    return stats
+
+
+def build_router_instance(db_file: str, use_ch: bool = True,
+                          progress: Optional[LoadProgress] = None) -> RouterInstance:
+    """Load graph, router, K-shortest paths and components from a database."""
+    progress = progress or LoadProgress()
+    graph = RoadNetwork(db_file, progress=progress)
+    progress.update('ch')
+    router = Router(graph, use_ch=use_ch, db_file=db_file)
+    k_paths = KShortestPaths(router)
+    progress.update('components', ch_nodes=len(router.ch_levels))
+    stats = attach_component_analyzer(graph, db_file)
+    progress.update(components=stats.get('total_components', 0))
+    return RouterInstance(graph, router, k_paths, db_file)
+
+
+class RouterHolder:
+    """Holds the active RouterInstance and swaps in new graph versions."""
+
+    def __init__(self, factory: Callable[..., RouterInstance] = build_router_instance,
+                 probes: Optional[List[Tuple[float, float, float, float]]] = None,
+                 min_probe_success: float = 0.0):
+        """Initialize empty holder.
+
+        Args:
+            factory: Builds a RouterInstance from a database path (progress= keyword)
+            probes: (start_lat, start_lon, end_lat, end_lon) routes run before a swap
+            min_probe_success: Fraction of probes that must succeed for the swap to happen
+        """
+        self.factory = factory
+        self.probes = DEFAULT_PROBES if probes is None else probes
+        self.min_probe_success = min_probe_success
+        self._lock = threading.Lock()
+        self._active = None
+        self._retiring = []  # Old instances with requests still in flight
+        self._listeners = []
+        self._reload_thread = None
+        self.swap_count = 0
+        self.last_reload = {'state': 'idle'}
+        self.progress = LoadProgress()  # Progress of the current (or last) load
+
+    @property
+    def active(self) -> Optional[RouterInstance]:
+        """Currently active instance (None before the first load)."""
+        return self._active
+
+    def on_swap(self, callback: Callable[[RouterInstance], None]) -> None:
+        """Register a callback run after every swap with the new instance."""
+        self._listeners.append(callback)
+
+    def checkout(self) -> Optional[RouterInstance]:
+        """Pin the active instance for one request; pair with release()."""
+        with self._lock:
+            instance = self._active
+            if instance is not None:
+                instance.in_flight += 1
+            return instance
+
+    def release(self, instance: Optional[RouterInstance]) -> None:
+        """Unpin an instance returned by checkout()."""
+        if instance is None:
+            return
+        with self._lock:
+            instance.in_flight -= 1
+            self._prune_retiring()
+
+    @contextmanager
+    def acquire(self):
+        """Context manager form of checkout()/release()."""
+        instance = self.checkout()
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def _prune_retiring(self) -> None:
+        """Drop old instances once their last request has finished (lock held)."""
+        self._retiring = [inst for inst in self._retiring if inst.in_flight > 0]
+
+    def swap(self, instance: RouterInstance) -> Optional[RouterInstance]:
+        """Atomically make instance active; returns the previous instance."""
+        with self._lock:
+            previous = self._active
+            self._active = instance
+            if previous is not None:
+                self._retiring.append(previous)
+            self._prune_retiring()
+            self.swap_count += 1
+        for callback in self._listeners:
+            callback(instance)
+        print(f"[RouterHolder] Active graph is now version {instance.version} ({instance.db_file})")
+        return previous
+
+    def warm(self, instance: RouterInstance) -> Dict:
+        """Run probe routes on an instance to page in its graph and caches."""
+        succeeded = 0
+        times_ms = []
+        for start_lat, start_lon, end_lat, end_lon in self.probes:
+            start = time.time()
+            try:
+                route = instance.router.route(start_lat, start_lon, end_lat, end_lon)
+            except Exception as e:
+                print(f"[RouterHolder] Warm-up probe failed: {e}")
+                route = None
+            times_ms.append((time.time() - start) * 1000)
+            if route and 'error' not in route:
+                succeeded += 1
+
+        instance.warmup = {
+            'probes': len(self.probes),
+            'succeeded': succeeded,
+            'total_ms': sum(times_ms),
+            'max_ms': max(times_ms) if times_ms else 0.0
+        }
+        return instance.warmup
+
+    def load(self, db_file: str, warm: bool = True) -> RouterInstance:
+        """Build, warm and swap in a new instance (blocking).
+
+        Raises RuntimeError and keeps the current instance if too few probes succeed.
+        """
+        self.last_reload = {'state': 'loading', 'db_file': db_file, 'started_at': time.time()}
+        progress = self.progress = LoadProgress()
+        try:
+            instance = self.factory(db_file, progress=progress)
+            if warm and self.probes:
+                self.last_reload['state'] = 'warming'
+                progress.update('warmup')
+                warmup = self.warm(instance)
+                if warmup['succeeded'] < self.min_probe_success * warmup['probes']:
+                    raise RuntimeError(f"Warm-up failed: {warmup['succeeded']}/{warmup['probes']} probe routes "
+                                       f"succeeded on version {instance.version}")
+            self.swap(instance)
+        except Exception as e:
+            self.last_reload.update(state='failed', error=str(e), finished_at=time.time())
+            progress.fail(str(e))
+            raise
+        progress.update('ready')
+        self.last_reload.update(state='swapped', version=instance.version, finished_at=time.time())
+        return instance
+
+    def reload_async(self, db_file: str, warm: bool = True) -> bool:
+        """Load a new instance in a background thread; False if a reload is already running."""
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return False
+
+            def run():
+                try:
+                    self.load(db_file, warm=warm)
+                except Exception as e:
+                    print(f"[RouterHolder] Reload failed, keeping current graph: {e}")
+
+            self._reload_thread = threading.Thread(target=run, daemon=True)
+            self._reload_thread.start()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background reload; True if none is running afterwards."""
+        thread = self._reload_thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def status(self) -> Dict:
+        """Active version, draining instances and last reload state."""
+        with self._lock:
+            active = self._active.to_dict() if self._active else None
+            retiring = [{'version': inst.version, 'in_flight': inst.in_flight} for inst in self._retiring]
+        return {
+            'active': active,
+            'retiring': retiring,
+            'swap_count': self.swap_count,
+            'reloading': self._reload_thread is not None and self._reload_thread.is_alive(),
+            'last_reload': dict(self.last_reload),
+            'progress': self.progress.to_dict()
+        }
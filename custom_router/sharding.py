@@ -0,0 +1,714 @@
+"""
+Graph partitioning and multi-shard routing
+Splits the road network into geographic shards, each served by its own
+worker process, and stitches cross-shard queries over a small overlay
+graph of boundary nodes (shard-internal boundary cliques + cut edges).
+"""
+
+import heapq
+import math
+import multiprocessing
+import os
+import sqlite3
+import time
+from multiprocessing.connection import Client, Listener
+from typing import Dict, List, Optional, Tuple
+
+from .access import ACCESS_ALL, ACCESS_CAR, highway_access, vehicle_restriction_mask
+from .graph import RoadNetwork
+from .dijkstra import Router
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def shard_search(graph: RoadNetwork, source: int, targets=None, reverse_edges: Dict = None,
+                 target_node: Optional[int] = None,
+                 parent_edges: Optional[Dict] = None) -> Tuple[Dict[int, float], Dict[int, int]]:
+    """
+    Exact one-to-many Dijkstra over the car edges of a shard graph using Router edge costs.
+
+    Args:
+        graph: Shard RoadNetwork
+        source: Start node (or end node when reverse_edges is given)
+        targets: Optional set of nodes; search stops once all are settled
+        reverse_edges: node -> [(from_node, cost)]; searches backwards if given
+        target_node: Optional single node to stop at
+        parent_edges: Optional dict filled with node -> edge tuple it was
+                      reached by (forward searches only)
+
+    Returns:
+        (dist, prev) dictionaries
+    """
+    dist = {source: 0.0}
+    prev = {}
+    pq = [(0.0, source)]
+    settled = set()
+    remaining = set(targets) if targets else None
+
+    while pq:
+        d, node = heapq.heappop(pq)
+        if node in settled:
+            continue
+        settled.add(node)
+
+        if node == target_node:
+            break
+        if remaining is not None:
+            remaining.discard(node)
+            if not remaining:
+                break
+
+        if reverse_edges is not None:
+            edges = None
+            neighbors = reverse_edges.get(node, [])
+        else:
+            edges = graph.usable_edges(node, ACCESS_CAR)
+            neighbors = [(nbr, _edge_cost(graph, edge_m, speed_kmh, way_id))
+                         for nbr, edge_m, speed_kmh, way_id in edges]
+
+        for i, (nbr, cost) in enumerate(neighbors):
+            new_dist = d + cost
+            if new_dist < dist.get(nbr, float('inf')):
+                dist[nbr] = new_dist
+                prev[nbr] = node
+                if parent_edges is not None and edges is not None:
+                    parent_edges[nbr] = edges[i]
+                heapq.heappush(pq, (new_dist, nbr))
+
+    return dist, prev
+
+
+def _edge_cost(graph: RoadNetwork, edge_m: float, speed_kmh: float, way_id: int) -> float:
+    """Edge cost matching Router.dijkstra (unknown speed treated as 50 km/h)."""
+    if speed_kmh <= 0:
+        speed_kmh = 50
+    way = graph.ways.get(way_id)
+    highway_type = way.get('highway', 'unclassified') if way else None
+    return Router.edge_time_cost(edge_m, speed_kmh, highway_type)
+
+
+def path_cost(graph: RoadNetwork, path: List[int]) -> float:
+    """Total search cost of a node path (cheapest parallel edge per hop)."""
+    total = 0.0
+    for from_node, to_node in zip(path, path[1:]):
+        total += min(_edge_cost(graph, edge_m, speed_kmh, way_id)
+                     for nbr, edge_m, speed_kmh, way_id in graph.usable_edges(from_node, ACCESS_CAR)
+                     if nbr == to_node)
+    return total
+
+
+class GraphPartitioner:
+    """Partition a routing database into geographic shards plus an overlay."""
+
+    def __init__(self, db_file: str, output_dir: str, num_shards: int = 4):
+        """Initialize partitioner."""
+        self.db_file = db_file
+        self.output_dir = output_dir
+        self.num_shards = num_shards
+        self.overlay_db = os.path.join(output_dir, 'overlay.db')
+        self.stats = {}
+        os.makedirs(output_dir, exist_ok=True)
+
+    def shard_db_path(self, shard_id: int) -> str:
+        """Path of a shard database."""
+        return os.path.join(self.output_dir, f'shard_{shard_id}.db')
+
+    @staticmethod
+    def assign_shards(nodes: List[Tuple[int, float, float]], num_shards: int) -> Dict[int, int]:
+        """
+        Recursive coordinate bisection into num_shards balanced regions.
+
+        Args:
+            nodes: [(node_id, lat, lon), ...]
+
+        Returns:
+            node_id -> shard_id
+        """
+        assignment = {}
+        next_id = [0]
+
+        def bisect(group, parts):
+            if parts == 1 or len(group) <= 1:
+                shard_id = next_id[0]
+                next_id[0] += parts
+                for node_id, _, _ in group:
+                    assignment[node_id] = shard_id
+                return
+            lats = [n[1] for n in group]
+            lons = [n[2] for n in group]
+            # Cut across the longer side (lon degrees scaled by latitude)
+            lat_extent = max(lats) - min(lats)
+            lon_extent = (max(lons) - min(lons)) * math.cos(math.radians(sum(lats) / len(lats)))
+            axis = 1 if lat_extent >= lon_extent else 2
+            group = sorted(group, key=lambda n: n[axis])
+            left_parts = parts // 2
+            split = len(group) * left_parts // parts
+            bisect(group[:split], left_parts)
+            bisect(group[split:], parts - left_parts)
+
+        bisect(list(nodes), num_shards)
+        return assignment
+
+    def partition(self, processes: int = 1) -> Dict:
+        """
+        Write shard databases and the overlay database.
+
+        Args:
+            processes: Worker processes used to build boundary cliques
+
+        Returns:
+            Partition statistics
+        """
+        print(f"[Shard] Partitioning {self.db_file} into {self.num_shards} shards...")
+        start_time = time.time()
+
+        if os.path.exists(self.overlay_db):
+            os.remove(self.overlay_db)
+
+        src = sqlite3.connect(self.db_file)
+        nodes = src.execute('SELECT id, lat, lon FROM nodes').fetchall()
+        src.close()
+        assignment = self.assign_shards(nodes, self.num_shards)
+        del nodes
+
+        conn = sqlite3.connect(self.overlay_db)
+        cursor = conn.cursor()
+        cursor.execute('ATTACH DATABASE ? AS src', (self.db_file,))
+        cursor.execute('CREATE TABLE node_shard (node_id INTEGER PRIMARY KEY, shard_id INTEGER NOT NULL)')
+        cursor.executemany('INSERT INTO node_shard VALUES (?, ?)', assignment.items())
+        del assignment
+
+        cursor.execute('''
+            CREATE TABLE shards (
+                shard_id INTEGER PRIMARY KEY,
+                db_file TEXT NOT NULL,
+                node_count INTEGER,
+                boundary_count INTEGER,
+                min_lat REAL, min_lon REAL, max_lat REAL, max_lon REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE boundary_nodes (
+                node_id INTEGER PRIMARY KEY,
+                shard_id INTEGER NOT NULL,
+                lat REAL,
+                lon REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE overlay_edges (
+                from_node INTEGER NOT NULL,
+                to_node INTEGER NOT NULL,
+                cost REAL NOT NULL,
+                shard_id INTEGER NOT NULL,
+                distance_m REAL,
+                duration_s REAL
+            )
+        ''')
+
+        # Cut edges cross shards; stored with shard_id = -1. Only car edges join
+        # the overlay (databases without an access column use the highway default)
+        has_access = 'access' in {row[1] for row in cursor.execute('PRAGMA src.table_info(edges)')}
+        cut_edges = cursor.execute(f'''
+            SELECT e.from_node_id, e.to_node_id, e.distance_m, e.speed_limit_kmh, w.highway
+            FROM src.edges e
+            JOIN node_shard a ON a.node_id = e.from_node_id
+            JOIN node_shard b ON b.node_id = e.to_node_id
+            LEFT JOIN src.ways w ON w.id = e.way_id
+            WHERE a.shard_id != b.shard_id {f'AND e.access & {ACCESS_CAR}' if has_access else ''}
+        ''').fetchall()
+        if not has_access:
+            cut_edges = [edge for edge in cut_edges if (highway_access(edge[4]) or ACCESS_ALL) & ACCESS_CAR]
+        rows = []
+        for u, v, dist, speed, highway in cut_edges:
+            speed = speed if speed and speed > 0 else 50
+            cost = Router.edge_time_cost(dist, speed, highway)
+            rows.append((u, v, cost, dist, dist / (speed / 3.6)))
+        cursor.executemany('INSERT INTO overlay_edges VALUES (?, ?, ?, -1, ?, ?)', rows)
+        cursor.execute('''
+            INSERT OR IGNORE INTO boundary_nodes (node_id, shard_id, lat, lon)
+            SELECT o.node_id, s.shard_id, n.lat, n.lon FROM (
+                SELECT from_node AS node_id FROM overlay_edges WHERE shard_id = -1
+                UNION SELECT to_node FROM overlay_edges WHERE shard_id = -1
+            ) o
+            JOIN node_shard s ON s.node_id = o.node_id
+            JOIN src.nodes n ON n.id = o.node_id
+        ''')
+        print(f"[Shard] {len(cut_edges):,} cut edges")
+        del cut_edges
+
+        for shard_id in range(self.num_shards):
+            self._write_shard(cursor, shard_id)
+        conn.commit()
+
+        boundaries = {}
+        for node_id, shard_id in cursor.execute('SELECT node_id, shard_id FROM boundary_nodes'):
+            boundaries.setdefault(shard_id, []).append(node_id)
+        cursor.execute('DETACH DATABASE src')
+        conn.commit()
+
+        # Boundary cliques: exact shard-internal costs between boundary nodes
+        jobs = [(self.shard_db_path(s), s, boundaries.get(s, [])) for s in range(self.num_shards)]
+        if processes > 1:
+            with multiprocessing.Pool(processes) as pool:
+                cliques = pool.map(_build_clique, jobs)
+        else:
+            cliques = [_build_clique(job) for job in jobs]
+
+        for shard_id, clique in enumerate(cliques):
+            cursor.executemany('INSERT INTO overlay_edges VALUES (?, ?, ?, ?, NULL, NULL)',
+                               ((u, v, c, shard_id) for u, v, c in clique))
+            cursor.execute('UPDATE shards SET boundary_count = ? WHERE shard_id = ?',
+                           (len(boundaries.get(shard_id, [])), shard_id))
+
+        cursor.execute('CREATE INDEX idx_overlay_from ON overlay_edges(from_node)')
+        conn.commit()
+
+        overlay_edges = cursor.execute('SELECT COUNT(*) FROM overlay_edges').fetchone()[0]
+        boundary_total = cursor.execute('SELECT COUNT(*) FROM boundary_nodes').fetchone()[0]
+        conn.close()
+
+        elapsed = time.time() - start_time
+        self.stats = {
+            'shards': self.num_shards,
+            'boundary_nodes': boundary_total,
+            'overlay_edges': overlay_edges,
+            'time_s': elapsed,
+        }
+        print(f"[Shard] ✅ Partitioned in {elapsed:.1f}s: {boundary_total:,} boundary nodes, "
+              f"{overlay_edges:,} overlay edges")
+        return self.stats
+
+    def _write_shard(self, cursor, shard_id: int) -> None:
+        """Copy one shard's nodes, internal edges and ways into its own database."""
+        shard_db = self.shard_db_path(shard_id)
+        if os.path.exists(shard_db):
+            os.remove(shard_db)
+
+        cursor.execute('ATTACH DATABASE ? AS shard', (shard_db,))
+        for (sql,) in cursor.execute(
+                "SELECT sql FROM src.sqlite_master WHERE type='table' "
+                "AND name IN ('nodes', 'edges', 'ways', 'turn_restrictions')").fetchall():
+            cursor.execute(sql.replace('CREATE TABLE ', 'CREATE TABLE shard.', 1))
+
+        cursor.execute('''
+            INSERT INTO shard.nodes SELECT n.* FROM src.nodes n
+            JOIN node_shard s ON s.node_id = n.id WHERE s.shard_id = ?
+            ORDER BY n.id
+        ''', (shard_id,))
+        cursor.execute('''
+            INSERT INTO shard.edges SELECT e.* FROM src.edges e
+            JOIN node_shard a ON a.node_id = e.from_node_id
+            JOIN node_shard b ON b.node_id = e.to_node_id
+            WHERE a.shard_id = ? AND b.shard_id = ?
+        ''', (shard_id, shard_id))
+        cursor.execute('''
+            INSERT INTO shard.ways SELECT * FROM src.ways
+            WHERE id IN (SELECT DISTINCT way_id FROM shard.edges)
+        ''')
+        cursor.execute('INSERT INTO shard.turn_restrictions SELECT * FROM src.turn_restrictions')
+        cursor.execute('CREATE INDEX shard.idx_edges_from ON edges(from_node_id)')
+
+        node_count, min_lat, min_lon, max_lat, max_lon = cursor.execute(
+            'SELECT COUNT(*), MIN(lat), MIN(lon), MAX(lat), MAX(lon) FROM shard.nodes').fetchone()
+        cursor.execute('INSERT INTO shards VALUES (?, ?, ?, 0, ?, ?, ?, ?)',
+                       (shard_id, os.path.basename(shard_db), node_count,
+                        min_lat, min_lon, max_lat, max_lon))
+        cursor.connection.commit()
+        cursor.execute('DETACH DATABASE shard')
+        print(f"[Shard] Shard {shard_id}: {node_count:,} nodes")
+
+
+def _build_clique(job) -> List[Tuple[int, int, float]]:
+    """Compute boundary-to-boundary costs within one shard (Pool entry point)."""
+    shard_db, shard_id, boundary = job
+    if len(boundary) < 2:
+        return []
+    graph = RoadNetwork(shard_db)
+    targets = set(boundary)
+    clique = []
+    for source in boundary:
+        dist, _ = shard_search(graph, source, targets=targets)
+        for target in boundary:
+            if target != source and target in dist:
+                clique.append((source, target, dist[target]))
+    print(f"[Shard] Shard {shard_id}: {len(clique):,} boundary clique edges")
+    return clique
+
+
+class ShardWorker:
+    """Owns one shard graph and answers snap/search requests."""
+
+    def __init__(self, db_file: str, shard_id: int, boundary_nodes: List[int]):
+        """Load shard graph and build its reverse cost index over car edges."""
+        self.shard_id = shard_id
+        self.graph = RoadNetwork(db_file)
+        self.boundary = set(boundary_nodes)
+        self.reverse_edges = {}
+        for node in self.graph.edges:
+            for nbr, edge_m, speed_kmh, way_id in self.graph.usable_edges(node, ACCESS_CAR):
+                self.reverse_edges.setdefault(nbr, []).append(
+                    (node, _edge_cost(self.graph, edge_m, speed_kmh, way_id)))
+
+    def handle(self, op: str, *args):
+        """Dispatch a single request."""
+        if op == 'nearest':
+            lat, lon = args
+            node = self.graph.find_nearest_node(lat, lon, access_mask=ACCESS_CAR, main_scc_only=True)
+            if node is None:
+                return None
+            return node, RoadNetwork.haversine_distance((lat, lon), self.graph.nodes[node])
+        if op == 'forward':
+            # Costs from source to every boundary node (and optional target)
+            source, target = args
+            targets = set(self.boundary)
+            if target is not None:
+                targets.add(target)
+            dist, _ = shard_search(self.graph, source, targets=targets)
+            return {n: dist[n] for n in targets if n in dist}
+        if op == 'backward':
+            # Costs from every boundary node to target
+            target, = args
+            dist, _ = shard_search(self.graph, target, targets=self.boundary,
+                                   reverse_edges=self.reverse_edges)
+            return {n: dist[n] for n in self.boundary if n in dist}
+        if op == 'path':
+            return self._path(*args)
+        if op == 'stats':
+            rss_mb = psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024) if psutil else None
+            stats = self.graph.get_statistics()
+            stats.update({'shard_id': self.shard_id, 'boundary_nodes': len(self.boundary),
+                          'pid': os.getpid(), 'rss_mb': rss_mb})
+            return stats
+        raise ValueError(f"Unknown shard op: {op}")
+
+    def _path(self, source: int, target: int) -> Optional[Dict]:
+        """Shortest in-shard path with geometry, distance and duration.
+
+        Duration is travel time at the speed limit (50 km/h if unknown) over
+        the edges the search took; road type penalties only shape the search.
+        """
+        parent_edges = {}
+        dist, prev = shard_search(self.graph, source, target_node=target, parent_edges=parent_edges)
+        if target not in dist:
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(prev[path[-1]])
+        path.reverse()
+
+        edges = [parent_edges[node] for node in path[1:]]
+        distance_m = sum(edge_m for _, edge_m, _, _ in edges)
+        duration_s = sum(edge_m * 3.6 / (speed_kmh if speed_kmh > 0 else 50)
+                         for _, edge_m, speed_kmh, _ in edges)
+        return {
+            'path_nodes': path,
+            'coordinates': [self.graph.nodes[n] for n in path],
+            'distance_m': distance_m,
+            'duration_s': duration_s,
+        }
+
+    def serve(self, conn) -> None:
+        """Answer (op, *args) requests on a connection until shutdown."""
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+            if request[0] == 'shutdown':
+                conn.send(('ok', None))
+                break
+            try:
+                conn.send(('ok', self.handle(*request)))
+            except Exception as e:
+                conn.send(('error', str(e)))
+
+
+def _worker_main(conn, db_file: str, shard_id: int, boundary_nodes: List[int]) -> None:
+    """Process entry point for a local shard worker."""
+    worker = ShardWorker(db_file, shard_id, boundary_nodes)
+    conn.send(('ready', shard_id))
+    worker.serve(conn)
+
+
+def serve_shard(overlay_db: str, shard_id: int, address: Tuple[str, int],
+                authkey: bytes = b'voyagr-shard') -> None:
+    """Run a shard worker on a TCP address (remote host deployment)."""
+    info = _load_shard_info(overlay_db)[shard_id]
+    worker = ShardWorker(info['db_file'], shard_id, info['boundary'])
+    with Listener(address, authkey=authkey) as listener:
+        print(f"[Shard] Shard {shard_id} listening on {address}")
+        while True:
+            with listener.accept() as conn:
+                worker.serve(conn)
+
+
+def _load_shard_info(overlay_db: str) -> Dict[int, Dict]:
+    """Read shard table and boundary node lists from the overlay database."""
+    base_dir = os.path.dirname(overlay_db)
+    conn = sqlite3.connect(overlay_db)
+    info = {}
+    for shard_id, db_file in conn.execute('SELECT shard_id, db_file FROM shards'):
+        info[shard_id] = {'db_file': os.path.join(base_dir, db_file), 'boundary': []}
+    for node_id, shard_id in conn.execute('SELECT node_id, shard_id FROM boundary_nodes'):
+        info[shard_id]['boundary'].append(node_id)
+    conn.close()
+    return info
+
+
+class ShardedRouter:
+    """Coordinator that routes across shard workers via the overlay graph."""
+
+    def __init__(self, overlay_db: str, addresses: Optional[Dict[int, Tuple[str, int]]] = None,
+                 authkey: bytes = b'voyagr-shard'):
+        """
+        Start (or connect to) one worker per shard and load the overlay.
+
+        Args:
+            overlay_db: Overlay database written by GraphPartitioner
+            addresses: Optional shard_id -> (host, port) of remote workers;
+                       local worker processes are spawned when omitted
+        """
+        self.overlay_db = overlay_db
+        self.shard_info = _load_shard_info(overlay_db)
+        self.node_shard = {}  # boundary node -> shard_id
+        self.boundary_coords = {}  # boundary node -> (lat, lon)
+        self.overlay = {}  # node -> [(neighbor, cost, shard_id)]
+        self.cut_edges = {}  # (from, to) -> (distance_m, duration_s)
+        self.connections = {}
+        self.processes = []
+        self.stats = {'queries': 0, 'cross_shard': 0, 'total_time_ms': 0.0}
+
+        for shard_id, info in self.shard_info.items():
+            for node_id in info['boundary']:
+                self.node_shard[node_id] = shard_id
+
+        conn = sqlite3.connect(overlay_db)
+        cut_costs = {}  # (from, to) -> cost of the cut edge kept in cut_edges
+        for u, v, cost, shard_id, distance_m, duration_s in conn.execute(
+                'SELECT from_node, to_node, cost, shard_id, distance_m, duration_s FROM overlay_edges'):
+            self.overlay.setdefault(u, []).append((v, cost, shard_id))
+            # Parallel cut edges: the overlay search crosses by the cheapest one
+            if shard_id < 0 and cost < cut_costs.get((u, v), float('inf')):
+                cut_costs[(u, v)] = cost
+                self.cut_edges[(u, v)] = (distance_m, duration_s)
+        for node_id, lat, lon in conn.execute('SELECT node_id, lat, lon FROM boundary_nodes'):
+            self.boundary_coords[node_id] = (lat, lon)
+        conn.close()
+
+        if addresses:
+            for shard_id, address in addresses.items():
+                self.connections[shard_id] = Client(address, authkey=authkey)
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            for shard_id, info in self.shard_info.items():
+                parent_conn, child_conn = ctx.Pipe()
+                process = ctx.Process(target=_worker_main, daemon=True,
+                                      args=(child_conn, info['db_file'], shard_id, info['boundary']))
+                process.start()
+                self.processes.append(process)
+                self.connections[shard_id] = parent_conn
+            for shard_id, conn in self.connections.items():
+                conn.recv()  # wait for ('ready', shard_id)
+
+        print(f"[Shard] Router ready: {len(self.connections)} shards, "
+              f"{len(self.node_shard):,} boundary nodes")
+
+    def _call_many(self, requests: Dict[int, tuple]) -> Dict[int, object]:
+        """Pipeline requests to several shards, then collect the replies."""
+        for shard_id, request in requests.items():
+            self.connections[shard_id].send(request)
+        results = {}
+        for shard_id in requests:
+            status, result = self.connections[shard_id].recv()
+            if status != 'ok':
+                raise RuntimeError(f"Shard {shard_id} error: {result}")
+            results[shard_id] = result
+        return results
+
+    def _call(self, shard_id: int, *request):
+        """Single request/response round trip."""
+        return self._call_many({shard_id: request})[shard_id]
+
+    def find_nearest_node(self, lat: float, lon: float) -> Optional[Tuple[int, int]]:
+        """Snap to the nearest node over all shards; returns (shard_id, node_id)."""
+        replies = self._call_many({s: ('nearest', lat, lon) for s in self.connections})
+        best = None
+        for shard_id, reply in replies.items():
+            if reply and (best is None or reply[1] < best[2]):
+                best = (shard_id, reply[0], reply[1])
+        return (best[0], best[1]) if best else None
+
+    def route(self, start_lat: float, start_lon: float,
+              end_lat: float, end_lon: float, vehicle=None) -> Optional[Dict]:
+        """Calculate a car route that may span several shards.
+
+        The boundary cliques are precomputed for unrestricted cars, so
+        vehicle profiles with height/weight/width/HGV restrictions are
+        rejected rather than routed over edges they may not use.
+        """
+        if vehicle_restriction_mask(vehicle):
+            raise ValueError("Sharded routing does not support restricted vehicle profiles")
+        start_time = time.time()
+        start = self.find_nearest_node(start_lat, start_lon)
+        end = self.find_nearest_node(end_lat, end_lon)
+        if not start or not end:
+            return None
+        (start_shard, start_node), (end_shard, end_node) = start, end
+
+        same_shard = start_shard == end_shard
+        if same_shard:
+            forward = self._call(start_shard, 'forward', start_node, end_node)
+            backward = self._call(end_shard, 'backward', end_node)
+        else:
+            replies = self._call_many({start_shard: ('forward', start_node, None),
+                                       end_shard: ('backward', end_node)})
+            forward, backward = replies[start_shard], replies[end_shard]
+
+        segments = self._overlay_search(start_node, start_shard, end_node, end_shard,
+                                        forward, backward)
+        if segments is None:
+            elapsed = (time.time() - start_time) * 1000
+            return {
+                'error': 'No route found',
+                'reason': 'No path across shard overlay',
+                'response_time_ms': elapsed
+            }
+
+        route = self._unpack(segments)
+        elapsed = (time.time() - start_time) * 1000
+        self.stats['queries'] += 1
+        self.stats['total_time_ms'] += elapsed
+        if len({shard for _, _, shard in segments}) > 1:
+            self.stats['cross_shard'] += 1
+        route['response_time_ms'] = elapsed
+        route['algorithm'] = 'Sharded'
+        route['shards_used'] = sorted({shard for _, _, shard in segments if shard >= 0})
+        return route
+
+    def _overlay_search(self, start_node, start_shard, end_node, end_shard,
+                        forward: Dict[int, float], backward: Dict[int, float]):
+        """
+        Dijkstra over boundary nodes between virtual source and target.
+
+        Returns list of (from_node, to_node, shard_id) segments, where
+        shard_id = -1 marks a single cut edge.
+        """
+        source, target = ('S',), ('T',)
+        dist = {source: 0.0}
+        prev = {}
+        pq = [(0.0, 0, source)]
+        counter = 0
+
+        while pq:
+            d, _, node = heapq.heappop(pq)
+            if d > dist.get(node, float('inf')):
+                continue
+            if node == target:
+                break
+
+            if node == source:
+                edges = [(b, c, start_shard) for b, c in forward.items() if b != end_node]
+                if end_node in forward:
+                    edges.append((target, forward[end_node], start_shard))
+            else:
+                edges = list(self.overlay.get(node, []))
+                if node in backward:
+                    edges.append((target, backward[node], end_shard))
+
+            for nbr, cost, shard_id in edges:
+                new_dist = d + cost
+                if new_dist < dist.get(nbr, float('inf')):
+                    dist[nbr] = new_dist
+                    prev[nbr] = (node, shard_id)
+                    counter += 1
+                    heapq.heappush(pq, (new_dist, counter, nbr))
+
+        if target not in dist:
+            return None
+
+        segments = []
+        node = target
+        while node != source:
+            parent, shard_id = prev[node]
+            from_node = start_node if parent == source else parent
+            to_node = end_node if node == target else node
+            if from_node != to_node:
+                segments.append((from_node, to_node, shard_id))
+            node = parent
+        segments.reverse()
+        return segments
+
+    def _unpack(self, segments) -> Dict:
+        """Expand overlay segments into a full route via the owning shards."""
+        # One outstanding request per shard connection, so batch by shard
+        results = {}
+        pending = [(i, u, v, s) for i, (u, v, s) in enumerate(segments) if s >= 0]
+        while pending:
+            batch, rest = {}, []
+            for item in pending:
+                if item[3] in batch:
+                    rest.append(item)
+                else:
+                    batch[item[3]] = item
+            replies = self._call_many({s: ('path', u, v) for s, (_, u, v, _) in batch.items()})
+            for shard_id, (index, _, _, _) in batch.items():
+                results[index] = replies[shard_id]
+            pending = rest
+
+        path_nodes, coordinates = [], []
+        distance_m = duration_s = 0.0
+        for index, (u, v, shard_id) in enumerate(segments):
+            if shard_id >= 0:
+                part = results[index]
+                nodes, coords = part['path_nodes'], part['coordinates']
+                distance_m += part['distance_m']
+                duration_s += part['duration_s']
+            else:
+                nodes = [u, v]
+                coords = [self.boundary_coords[u], self.boundary_coords[v]]
+                edge_m, edge_s = self.cut_edges[(u, v)]
+                distance_m += edge_m
+                duration_s += edge_s
+            if path_nodes and path_nodes[-1] == nodes[0]:
+                nodes, coords = nodes[1:], coords[1:]
+            path_nodes.extend(nodes)
+            coordinates.extend(coords)
+
+        encoded = None
+        try:
+            import polyline
+            encoded = polyline.encode(coordinates, 5)
+        except Exception:
+            pass
+
+        return {
+            'path_nodes': path_nodes,
+            'coordinates': coordinates,
+            'polyline': encoded,
+            'distance_m': distance_m,
+            'duration_s': duration_s,
+            'distance_km': distance_m / 1000,
+            'duration_minutes': duration_s / 60
+        }
+
+    def get_shard_stats(self) -> Dict[int, Dict]:
+        """Per-worker graph size and resident memory."""
+        return self._call_many({s: ('stats',) for s in self.connections})
+
+    def close(self) -> None:
+        """Shut down worker connections and processes."""
+        for conn in self.connections.values():
+            try:
+                conn.send(('shutdown',))
+                conn.recv()
+            except (EOFError, OSError):
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.connections = {}
+        self.processes = []
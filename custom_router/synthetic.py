@@ -0,0 +1,266 @@
+"""
+Synthetic UK-like road networks for offline benchmarks
+Generates a jittered street grid with bends, dead ends and one-way streets,
+a secondary/primary hierarchy, a dual-carriageway motorway overlay joined to
+the grid at junctions, and small disconnected islands. Nodes and tagged ways
+are streamed through OSMImporter, so the output has exactly the schema,
+access masks and restrictions of a real import.
+"""
+
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+from .osm_import import OSMImporter
+
+# Grid spacing (~110 m) and origin in the English Midlands
+SPACING_DEG = 0.001
+ORIGIN = (52.0, -2.0)
+
+
+def _unit_hash(value: int) -> float:
+    """Stateless hash of an int to [0, 1), so both passes agree on which segments bend."""
+    value &= 0xFFFFFFFF
+    value ^= value >> 16
+    value = (value * 0x7FEB352D) & 0xFFFFFFFF
+    value ^= value >> 15
+    value = (value * 0x846CA68B) & 0xFFFFFFFF
+    value ^= value >> 16
+    return value / 4294967296.0
+
+
+class SyntheticNetworkGenerator:
+    """Deterministic synthetic road network written as a routing database."""
+
+    def __init__(self, nodes: int = 100000, seed: int = 42, bend_rate: float = 0.6,
+                 dead_end_rate: float = 0.2, oneway_rate: float = 0.1, path_rate: float = 0.05,
+                 secondary_every: int = 10, primary_every: int = 50, motorway_every: Optional[int] = None,
+                 junction_every: int = 40, island_count: Optional[int] = None):
+        """
+        Initialize generator.
+
+        Args:
+            nodes: Approximate node count (10k to 20M)
+            seed: Random seed; equal arguments give an identical database
+            bend_rate: Fraction of grid segments with a degree-2 shape node
+            dead_end_rate: Fraction of residential grid segments removed
+            oneway_rate: Fraction of residential ways tagged oneway
+            path_rate: Fraction of residential ways turned into footways/cycleways
+            secondary_every: Grid lines between secondary roads
+            primary_every: Grid lines between primary roads
+            motorway_every: Grid rows between motorways (default: about two per network, at most 200)
+            junction_every: Grid columns between motorway junctions
+            island_count: Disconnected islands (default: one per 20k nodes, at least 2)
+        """
+        if nodes < 100:
+            raise ValueError(f"Need at least 100 nodes, got {nodes}")
+        # Each intersection brings on average 2 * bend_rate shape nodes with it
+        self.side = int(math.sqrt(nodes / (1 + 2 * bend_rate)))
+        self.seed = seed
+        self.bend_rate = bend_rate
+        self.dead_end_rate = dead_end_rate
+        self.oneway_rate = oneway_rate
+        self.path_rate = path_rate
+        self.secondary_every = secondary_every
+        self.primary_every = primary_every
+        self.motorway_every = motorway_every or max(10, min(200, self.side // 2))
+        self.junction_every = junction_every
+        self.island_count = island_count if island_count is not None else max(2, nodes // 20000)
+        self.motorway_nodes = {}  # grid row -> overlay node ids
+        self.islands = []  # per island: rows of node ids
+        self.stats = {}
+
+    def grid_node(self, row: int, col: int) -> int:
+        """Node id of a grid intersection (ids step by 3, leaving room for its bends)."""
+        return 3 * (row * self.side + col) + 1
+
+    def bend_node(self, row: int, col: int, horizontal: bool) -> Optional[int]:
+        """Shape node on the segment east (horizontal) or north of an intersection, if it bends."""
+        node = self.grid_node(row, col) + (1 if horizontal else 2)
+        return node if _unit_hash(node ^ (self.seed * 0x9E3779B1)) < self.bend_rate else None
+
+    def road_class(self, line: int) -> str:
+        """Highway type of a grid row or column."""
+        if line % self.primary_every == 0:
+            return 'primary'
+        if line % self.secondary_every == 0:
+            return 'secondary'
+        return 'residential'
+
+    def motorway_rows(self) -> List[int]:
+        """Grid rows carrying a motorway overlay."""
+        return list(range(self.motorway_every // 2, self.side, self.motorway_every))
+
+    def generate(self, db_file: str, processes: int = 1) -> Dict:
+        """
+        Write the network to db_file.
+
+        Args:
+            db_file: Routing database to create (replaced if it exists)
+            processes: Edge workers passed to OSMImporter
+
+        Returns:
+            Import statistics plus generator counts
+        """
+        print(f"[Synthetic] Generating {self.side}x{self.side} grid network (seed {self.seed})...")
+        start_time = time.time()
+        rng = random.Random(self.seed)
+        importer = OSMImporter(db_file, processes=processes)
+        try:
+            self._add_nodes(importer, rng)
+            counts = self._add_ways(importer, rng)
+        except Exception:
+            importer.abort()
+            raise
+        stats = importer.finish()
+        stats.update(counts)
+        stats['grid_side'] = self.side
+        stats['generate_time_s'] = time.time() - start_time
+        self.stats = stats
+        print(f"[Synthetic] ✅ {stats['nodes_written']:,} nodes, {stats['edges']:,} edges, "
+              f"{counts['motorway_junctions']} motorway junctions, {counts['islands']} islands "
+              f"in {stats['generate_time_s']:.1f}s")
+        return stats
+
+    def _add_nodes(self, importer: OSMImporter, rng: random.Random) -> None:
+        """Add grid, motorway and island nodes in id order."""
+        lat0, lon0 = ORIGIN
+        lon_spacing = SPACING_DEG / math.cos(math.radians(lat0))
+        jitter = SPACING_DEG * 0.3
+        for row in range(self.side):
+            lat = lat0 + row * SPACING_DEG
+            for col in range(self.side):
+                lon = lon0 + col * lon_spacing
+                importer.add_node(self.grid_node(row, col),
+                                  lat + rng.uniform(-jitter, jitter), lon + rng.uniform(-jitter, jitter))
+                for horizontal in (True, False):
+                    bend = self.bend_node(row, col, horizontal)
+                    if bend is not None:
+                        offset = rng.uniform(-jitter, jitter)
+                        if horizontal:
+                            importer.add_node(bend, lat + offset, lon + lon_spacing / 2)
+                        else:
+                            importer.add_node(bend, lat + SPACING_DEG / 2, lon + offset)
+
+        # Motorway carriageways run just north of their grid row
+        next_node = self.grid_node(self.side, 0)
+        self.motorway_nodes = {}
+        for row in self.motorway_rows():
+            ids = []
+            for col in range(0, self.side, 5):
+                importer.add_node(next_node, lat0 + (row + 0.4) * SPACING_DEG, lon0 + col * lon_spacing)
+                ids.append(next_node)
+                next_node += 1
+            self.motorway_nodes[row] = ids
+
+        # Islands: small grids east of the mainland
+        self.islands = []
+        island_lon = lon0 + (self.side + 20) * lon_spacing
+        for island in range(self.island_count):
+            size = rng.randint(2, 5)
+            base_lat = lat0 + rng.uniform(0, self.side) * SPACING_DEG
+            base_lon = island_lon + island * 10 * lon_spacing
+            ids = []
+            for row in range(size):
+                ids.append([])
+                for col in range(size):
+                    importer.add_node(next_node, base_lat + row * SPACING_DEG, base_lon + col * lon_spacing)
+                    ids[-1].append(next_node)
+                    next_node += 1
+            self.islands.append(ids)
+
+    def _add_ways(self, importer: OSMImporter, rng: random.Random) -> Dict:
+        """Add grid streets, motorways, junction links and island roads."""
+        way_id = 1
+        counts = {'ways_generated': 0, 'oneway_ways': 0, 'motorway_junctions': 0,
+                  'islands': len(self.islands)}
+
+        def emit(tags, refs):
+            nonlocal way_id
+            if len(refs) < 2:
+                return None
+            importer.add_way(way_id, tags, refs)
+            counts['ways_generated'] += 1
+            way_id += 1
+            return way_id - 1
+
+        # Rows then columns. Residential ways break at removed segments and after
+        # 5-30 nodes; primary ways break at every primary crossing.
+        arriving = {}  # crossing node -> primary row way ending there
+        departing = {}  # crossing node -> primary column way starting there
+        for horizontal in (True, False):
+            for line in range(self.side):
+                highway = self.road_class(line)
+                refs = [self._line_node(horizontal, line, 0)]
+                max_len = rng.randint(5, 30)
+                for pos in range(1, self.side):
+                    node = self._line_node(horizontal, line, pos)
+                    if highway == 'residential' and rng.random() < self.dead_end_rate:
+                        self._emit_street(emit, rng, highway, line, refs, counts)
+                        refs = [node]
+                        max_len = rng.randint(5, 30)
+                        continue
+                    bend = (self.bend_node(line, pos - 1, True) if horizontal
+                            else self.bend_node(pos - 1, line, False))
+                    if bend is not None:
+                        refs.append(bend)
+                    refs.append(node)
+                    crossing = highway == 'primary' and pos % self.primary_every == 0
+                    if crossing or (highway != 'primary' and len(refs) >= max_len):
+                        start = refs[0]
+                        way = self._emit_street(emit, rng, highway, line, refs, counts)
+                        if crossing and horizontal:
+                            arriving[node] = way
+                        elif highway == 'primary' and not horizontal:
+                            departing[start] = way
+                        refs = [node]
+                        max_len = rng.randint(5, 30)
+                start = refs[0]
+                way = self._emit_street(emit, rng, highway, line, refs, counts)
+                if highway == 'primary' and not horizontal and way is not None:
+                    departing[start] = way
+
+        # A few banned turns where primary roads cross
+        for node in sorted(arriving.keys() & departing.keys()):
+            if rng.random() < 0.5:
+                importer.add_restriction(arriving[node], departing[node], 'no_left_turn')
+
+        # Dual-carriageway motorways, the first one tolled, with links every junction_every columns
+        for index, (row, ids) in enumerate(sorted(self.motorway_nodes.items())):
+            tags = {'highway': 'motorway', 'name': f'M{index + 1}', 'oneway': 'yes', 'maxspeed': '112'}
+            if index == 0:
+                tags['toll'] = 'yes'
+            emit(tags, ids)
+            emit(tags, ids[::-1])
+            link = {'highway': 'motorway_link', 'name': f'M{index + 1} Junction'}
+            for i in range(0, len(ids), max(1, self.junction_every // 5)):
+                emit(link, [ids[i], self.grid_node(row, i * 5)])
+                counts['motorway_junctions'] += 1
+
+        for ids in self.islands:
+            for line in ids:
+                emit({'highway': 'unclassified', 'name': 'Island Road'}, line)
+            for col in range(len(ids[0])):
+                emit({'highway': 'service'}, [line[col] for line in ids])
+        return counts
+
+    def _line_node(self, horizontal: bool, line: int, pos: int) -> int:
+        return self.grid_node(line, pos) if horizontal else self.grid_node(pos, line)
+
+    def _emit_street(self, emit, rng: random.Random, highway: str, line: int, refs: List[int],
+                     counts: Dict) -> Optional[int]:
+        """Tag and emit one grid way."""
+        tags = {'highway': highway, 'name': f'{highway.title()} {line}'}
+        if highway == 'residential':
+            roll = rng.random()
+            if roll < self.path_rate:
+                tags['highway'] = rng.choice(('footway', 'cycleway'))
+            elif roll < self.path_rate + self.oneway_rate:
+                tags['oneway'] = 'yes'
+                counts['oneway_ways'] += 1
+                if rng.random() < 0.5:
+                    refs = refs[::-1]
+            elif roll < self.path_rate + self.oneway_rate + 0.01:
+                tags['maxheight'] = '3.2'
+        return emit(tags, refs)
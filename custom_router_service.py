@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+Custom router service
+Long-lived routing daemon that owns one loaded graph and answers route,
+matrix and snap requests over a local socket. Flask workers and CLI tools
+connect with RouterClient and share the graph instead of each loading it.
+
+Wire protocol (little-endian), one frame per request and per response:
+    header:  request_id u32 | op/status u8 | flags u8 | payload_len u32
+    flags:   travel mode access bit (low nibble) | vehicle profile index << 4
+    coords:  lat, lon as int32 micro-degrees
+Requests can be pipelined: a client sends any number of frames without
+waiting, and responses come back (possibly out of order) tagged with the
+request_id they answer.
+
+Usage:
+    python custom_router_service.py --db data/uk_router.db
+    python custom_router_service.py --db data/uk_router.db --port 7100
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from custom_router.access import (ACCESS_CAR, MODE_NAMES, NO_RESTRICTIONS, VEHICLE_PROFILES, mode_mask,
+                                  vehicle_restriction_mask)
+from custom_router.router_holder import build_router_instance
+
+# Frame header: request_id, op (requests) or status (responses), flags, payload length
+HEADER = struct.Struct('<IBBI')
+COORD = struct.Struct('<ii')
+COORD_SCALE = 1e6
+MAX_PAYLOAD = 16 * 1024 * 1024
+MAX_MATRIX_CELLS = 10000
+
+OP_PING = 0
+OP_ROUTE = 1
+OP_MATRIX = 2
+OP_SNAP = 3
+OP_INFO = 4
+
+STATUS_OK = 0
+STATUS_NOT_FOUND = 1
+STATUS_BAD_REQUEST = 2
+STATUS_ERROR = 3
+
+OP_NAMES = {OP_PING: 'ping', OP_ROUTE: 'route', OP_MATRIX: 'matrix', OP_SNAP: 'snap', OP_INFO: 'info'}
+
+# Request flags: mode bit in the low nibble, vehicle profile in the high one
+# (index into VEHICLE_NAMES; 0 is the unrestricted car)
+MODE_FLAGS = 0x0F
+VEHICLE_SHIFT = 4
+VEHICLE_NAMES = list(VEHICLE_PROFILES)
+
+# Route response: distance_m, duration_s, point count (then the points)
+ROUTE_RESULT = struct.Struct('<ddI')
+# Matrix request: source count, target count (then the coordinates)
+MATRIX_SIZE = struct.Struct('<HH')
+# Snap result per point: node_id (-1 if none), snapped lat/lon, distance_m
+SNAP_RESULT = struct.Struct('<qiif')
+
+DEFAULT_SOCKET = '/tmp/voyagr_router.sock'
+DEFAULT_TCP_ADDRESS = ('127.0.0.1', 7100)
+
+Address = Union[str, Tuple[str, int]]
+
+
+def default_address() -> Address:
+    """Unix socket where supported, otherwise loopback TCP."""
+    return DEFAULT_SOCKET if hasattr(socket, 'AF_UNIX') else DEFAULT_TCP_ADDRESS
+
+
+def pack_coords(coords: List[Tuple[float, float]]) -> bytes:
+    """Encode (lat, lon) pairs as int32 micro-degrees."""
+    return b''.join(COORD.pack(round(lat * COORD_SCALE), round(lon * COORD_SCALE)) for lat, lon in coords)
+
+
+def request_flags(mode: str = 'car', vehicle: Optional[str] = None) -> int:
+    """Flags byte for a travel mode and optional vehicle profile name."""
+    if vehicle is not None and vehicle not in VEHICLE_NAMES:
+        raise ValueError(f"Unknown vehicle profile: {vehicle}")
+    return mode_mask(mode) | (VEHICLE_NAMES.index(vehicle) if vehicle else 0) << VEHICLE_SHIFT
+
+
+def unpack_coords(data: bytes, offset: int = 0, count: Optional[int] = None) -> List[Tuple[float, float]]:
+    """Decode int32 micro-degree pairs back to (lat, lon)."""
+    if count is None:
+        count = (len(data) - offset) // COORD.size
+    return [(lat / COORD_SCALE, lon / COORD_SCALE)
+            for lat, lon in COORD.iter_unpack(data[offset:offset + count * COORD.size])]
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes; None if the peer closed the connection."""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            return None
+        received += n
+    return bytes(buf)
+
+
+class BadRequest(ValueError):
+    """Malformed request payload."""
+
+
+class RouterService:
+    """Owns one loaded graph and answers route, matrix and snap requests."""
+
+    def __init__(self, db_file: str, use_ch: bool = True, workers: int = 4, progress=None):
+        """Load the graph, router, K-shortest paths and components.
+
+        Args:
+            db_file: Routing database
+            use_ch: Use Contraction Hierarchies for car routes
+            workers: Threads answering pipelined socket requests
+            progress: Optional LoadProgress updated while loading
+        """
+        self.db_file = db_file
+        self.instance = build_router_instance(db_file, use_ch=use_ch, progress=progress)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='router-service')
+        self.started_at = time.time()
+        self._server = None
+        self._stats_lock = threading.Lock()
+        self.stats = {name: {'requests': 0, 'errors': 0, 'total_time_ms': 0.0} for name in OP_NAMES.values()}
+
+    @property
+    def graph(self):
+        """Loaded RoadNetwork."""
+        return self.instance.graph
+
+    @property
+    def router(self):
+        """Router over the loaded graph."""
+        return self.instance.router
+
+    @property
+    def k_paths(self):
+        """K-shortest paths finder for alternatives."""
+        return self.instance.k_paths
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def route(self, start_lat: float, start_lon: float, end_lat: float, end_lon: float,
+              mode: str = 'car', vehicle=None) -> Optional[Dict]:
+        """Single route (same result as Router.route)."""
+        return self.router.route(start_lat, start_lon, end_lat, end_lon, mode=mode, vehicle=vehicle)
+
+    def snap(self, points: List[Tuple[float, float]], mode: str = 'car',
+             vehicle=None) -> List[Optional[int]]:
+        """Nearest routable node for each point (car snaps into the main SCC like Router.route)."""
+        mode_bit = mode_mask(mode)
+        main_scc_only = self.router.snap_to_main_scc and mode_bit == ACCESS_CAR
+        vehicle_mask = vehicle_restriction_mask(vehicle) if mode_bit == ACCESS_CAR else NO_RESTRICTIONS
+        return [self.graph.find_nearest_node(lat, lon, access_mask=mode_bit, main_scc_only=main_scc_only,
+                                             vehicle_mask=vehicle_mask)
+                for lat, lon in points]
+
+    def matrix(self, sources: List[Tuple[float, float]], targets: List[Tuple[float, float]],
+               mode: str = 'car', vehicle=None) -> Tuple[List[List[float]], List[List[float]]]:
+        """Duration (s) and distance (m) matrices; unreachable pairs are inf.
+
+        Runs one one-to-many search per distinct source node instead of a
+        point-to-point search per pair. vehicle restricts car matrices like
+        Router.route.
+        """
+        if len(sources) * len(targets) > MAX_MATRIX_CELLS:
+            raise BadRequest(f"Matrix too large: {len(sources)}x{len(targets)} (max {MAX_MATRIX_CELLS} cells)")
+        mode_bit = mode_mask(mode)
+        vehicle_mask = vehicle_restriction_mask(vehicle) if mode_bit == ACCESS_CAR else NO_RESTRICTIONS
+        source_nodes = self.snap(sources, mode, vehicle)
+        target_nodes = self.snap(targets, mode, vehicle)
+        wanted = {node for node in target_nodes if node}
+
+        reached = {}
+        for node in set(source_nodes):
+            if node:
+                reached[node] = self.one_to_many(node, wanted, mode_bit, vehicle_mask)
+
+        inf = float('inf')
+        durations, distances = [], []
+        for source in source_nodes:
+            row = reached.get(source, {})
+            durations.append([row[t][0] if t in row else inf for t in target_nodes])
+            distances.append([row[t][1] if t in row else inf for t in target_nodes])
+        return durations, distances
+
+    def one_to_many(self, source: int, targets, mode_bit: int = ACCESS_CAR,
+                    vehicle_mask: int = NO_RESTRICTIONS) -> Dict[int, Tuple[float, float]]:
+        """Dijkstra from source until every target is settled.
+
+        Searches on the same edges and edge costs as Router.dijkstra and
+        returns target -> (duration_s, distance_m) along the cheapest path.
+        """
+        graph, router = self.graph, self.router
+        mode = MODE_NAMES[mode_bit]
+        mode_speed = router.MODE_SPEEDS_KMH.get(mode)
+        way_cost = router.mode_way_cost(mode) if mode_speed else None
+        ways = graph.ways
+
+        cost = {source: 0.0}
+        totals = {source: (0.0, 0.0)}
+        settled = set()
+        remaining = set(targets)
+        result = {}
+        pq = [(0.0, source)]
+        while pq and remaining:
+            d, node = heapq.heappop(pq)
+            if node in settled:
+                continue
+            settled.add(node)
+            if node in remaining:
+                remaining.discard(node)
+                result[node] = totals[node]
+
+            duration_s, distance_m = totals[node]
+            for nbr, edge_m, speed_kmh, way_id in graph.usable_edges(node, mode_bit, vehicle_mask):
+                if way_cost is None:
+                    way = ways.get(way_id)
+                    edge_cost = router.edge_time_cost(edge_m, speed_kmh,
+                                                      way.get('highway', 'unclassified') if way else None)
+                    edge_s = edge_m * 3.6 / (speed_kmh if speed_kmh > 0 else 50)
+                else:
+                    edge_cost = edge_m * way_cost.get(way_id, 3.6 / mode_speed)
+                    edge_s = edge_m * 3.6 / mode_speed
+                new_cost = d + edge_cost
+                if new_cost < cost.get(nbr, math.inf):
+                    cost[nbr] = new_cost
+                    totals[nbr] = (duration_s + edge_s, distance_m + edge_m)
+                    heapq.heappush(pq, (new_cost, nbr))
+        return result
+
+    def info(self) -> Dict:
+        """Graph version, sizes and per-op request counters."""
+        with self._stats_lock:
+            stats = {op: dict(s) for op, s in self.stats.items()}
+        return {
+            'db_file': self.db_file,
+            'version': self.instance.version,
+            'nodes': len(self.graph.nodes),
+            'ch_available': self.router.ch_available,
+            'uptime_s': time.time() - self.started_at,
+            'pid': os.getpid(),
+            'ops': stats
+        }
+
+    # ------------------------------------------------------------------
+    # Binary protocol
+    # ------------------------------------------------------------------
+
+    def dispatch(self, op: int, flags: int, payload: bytes) -> Tuple[int, bytes]:
+        """Answer one request frame; returns (status, payload)."""
+        name = OP_NAMES.get(op)
+        if name is None:
+            return STATUS_BAD_REQUEST, f'Unknown op {op}'.encode()
+
+        start = time.perf_counter()
+        try:
+            mode = MODE_NAMES.get((flags & MODE_FLAGS) or ACCESS_CAR)
+            if mode is None or flags >> VEHICLE_SHIFT >= len(VEHICLE_NAMES):
+                raise BadRequest(f'Unknown mode flags {flags}')
+            vehicle = VEHICLE_NAMES[flags >> VEHICLE_SHIFT]
+            status, body = getattr(self, f'_handle_{name}')(payload, mode, vehicle)
+        except BadRequest as e:
+            status, body = STATUS_BAD_REQUEST, str(e).encode()
+        except Exception as e:
+            status, body = STATUS_ERROR, str(e).encode()
+
+        with self._stats_lock:
+            stats = self.stats[name]
+            stats['requests'] += 1
+            stats['total_time_ms'] += (time.perf_counter() - start) * 1000
+            if status in (STATUS_BAD_REQUEST, STATUS_ERROR):
+                stats['errors'] += 1
+        return status, body
+
+    def _handle_ping(self, payload: bytes, mode: str, vehicle: str) -> Tuple[int, bytes]:
+        return STATUS_OK, payload
+
+    def _handle_info(self, payload: bytes, mode: str, vehicle: str) -> Tuple[int, bytes]:
+        return STATUS_OK, json.dumps(self.info()).encode()
+
+    def _handle_route(self, payload: bytes, mode: str, vehicle: str) -> Tuple[int, bytes]:
+        if len(payload) != 2 * COORD.size:
+            raise BadRequest('Route request needs start and end coordinates')
+        (start_lat, start_lon), (end_lat, end_lon) = unpack_coords(payload)
+        route = self.route(start_lat, start_lon, end_lat, end_lon, mode=mode, vehicle=vehicle)
+        if not route or 'error' in route:
+            return STATUS_NOT_FOUND, (route or {}).get('reason', 'No route found').encode()
+        coords = route['coordinates']
+        return STATUS_OK, ROUTE_RESULT.pack(route['distance_m'], route['duration_s'], len(coords)) + \
+            pack_coords(coords)
+
+    def _handle_matrix(self, payload: bytes, mode: str, vehicle: str) -> Tuple[int, bytes]:
+        if len(payload) < MATRIX_SIZE.size:
+            raise BadRequest('Matrix request needs source and target counts')
+        n_sources, n_targets = MATRIX_SIZE.unpack_from(payload)
+        if len(payload) != MATRIX_SIZE.size + (n_sources + n_targets) * COORD.size:
+            raise BadRequest('Matrix coordinate count does not match header')
+        coords = unpack_coords(payload, MATRIX_SIZE.size)
+        durations, distances = self.matrix(coords[:n_sources], coords[n_sources:], mode=mode, vehicle=vehicle)
+        cells = [v for row in durations for v in row] + [v for row in distances for v in row]
+        return STATUS_OK, struct.pack(f'<{len(cells)}f', *cells)
+
+    def _handle_snap(self, payload: bytes, mode: str, vehicle: str) -> Tuple[int, bytes]:
+        if len(payload) % COORD.size:
+            raise BadRequest('Snap request must contain whole coordinates')
+        points = unpack_coords(payload)
+        out = []
+        for (lat, lon), node in zip(points, self.snap(points, mode, vehicle)):
+            if node is None:
+                out.append(SNAP_RESULT.pack(-1, 0, 0, math.inf))
+                continue
+            node_lat, node_lon = self.graph.nodes[node]
+            distance = self.graph.haversine_distance((lat, lon), (node_lat, node_lon))
+            out.append(SNAP_RESULT.pack(node, round(node_lat * COORD_SCALE), round(node_lon * COORD_SCALE),
+                                        distance))
+        return STATUS_OK, b''.join(out)
+
+    # ------------------------------------------------------------------
+    # Server
+    # ------------------------------------------------------------------
+
+    def start(self, address: Optional[Address] = None) -> Address:
+        """Listen on address in a background thread; returns the bound address."""
+        address = address or default_address()
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)  # Stale socket from a previous run
+            server = _UnixServer(address, _ConnectionHandler)
+        else:
+            server = _TCPServer(address, _ConnectionHandler)
+        server.service = self
+        self._server = server
+        threading.Thread(target=server.serve_forever, name='router-service', daemon=True).start()
+        bound = server.server_address
+        print(f"[RouterService] Listening on {bound} (graph version {self.instance.version})")
+        return bound
+
+    def serve_forever(self, address: Optional[Address] = None) -> None:
+        """Run the daemon in the foreground until interrupted."""
+        self.start(address)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print("\n[RouterService] Shutting down")
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop listening and finish queued requests."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if isinstance(self._server.server_address, str) and os.path.exists(self._server.server_address):
+                os.unlink(self._server.server_address)
+            self._server = None
+        self.executor.shutdown(wait=True)
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    """Reads pipelined frames and answers each one on the worker pool."""
+
+    def handle(self):
+        sock = self.request
+        service = self.server.service
+        write_lock = threading.Lock()
+
+        def respond(request_id: int, status: int, body: bytes) -> None:
+            try:
+                with write_lock:
+                    sock.sendall(HEADER.pack(request_id, status, 0, len(body)) + body)
+            except OSError:
+                pass  # Client went away before its answer was ready
+
+        while True:
+            header = _recv_exact(sock, HEADER.size)
+            if header is None:
+                break
+            request_id, op, flags, length = HEADER.unpack(header)
+            if length > MAX_PAYLOAD:
+                respond(request_id, STATUS_BAD_REQUEST, b'Payload too large')
+                break
+            payload = _recv_exact(sock, length) if length else b''
+            if payload is None:
+                break
+            future = service.executor.submit(service.dispatch, op, flags, payload)
+            future.add_done_callback(lambda f, rid=request_id: respond(rid, *f.result()))
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None  # type: ignore
+
+
+class ServiceError(RuntimeError):
+    """Error status returned by the routing service."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RouterClient:
+    """Client for RouterService; one socket, pipelined requests."""
+
+    def __init__(self, address: Optional[Address] = None, timeout: float = 30.0):
+        """Connect to a running service (Unix socket path or (host, port))."""
+        address = address or default_address()
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def pipeline(self, requests: List[Tuple[int, int, bytes]]) -> List[Tuple[int, bytes]]:
+        """Send (op, flags, payload) frames back to back, then collect the answers in request order."""
+        with self._lock:
+            ids = []
+            frames = []
+            for op, flags, payload in requests:
+                self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+                ids.append(self._next_id)
+                frames.append(HEADER.pack(self._next_id, op, flags, len(payload)) + payload)
+            self.sock.sendall(b''.join(frames))
+
+            answers = {}
+            while len(answers) < len(ids):
+                header = _recv_exact(self.sock, HEADER.size)
+                if header is None:
+                    raise ConnectionError('Routing service closed the connection')
+                request_id, status, _, length = HEADER.unpack(header)
+                body = _recv_exact(self.sock, length) if length else b''
+                answers[request_id] = (status, body)
+        return [answers[request_id] for request_id in ids]
+
+    def _call(self, op: int, payload: bytes = b'', mode: str = 'car', vehicle: Optional[str] = None) -> bytes:
+        status, body = self.pipeline([(op, request_flags(mode, vehicle), payload)])[0]
+        if status != STATUS_OK:
+            raise ServiceError(status, body.decode(errors='replace'))
+        return body
+
+    @staticmethod
+    def _route_request(start_lat, start_lon, end_lat, end_lon, mode='car', vehicle=None) -> Tuple[int, int, bytes]:
+        return OP_ROUTE, request_flags(mode, vehicle), pack_coords([(start_lat, start_lon), (end_lat, end_lon)])
+
+    @staticmethod
+    def _decode_route(status: int, body: bytes) -> Dict:
+        if status != STATUS_OK:
+            return {'error': 'No route found', 'reason': body.decode(errors='replace')}
+        distance_m, duration_s, n_points = ROUTE_RESULT.unpack_from(body)
+        return {
+            'coordinates': unpack_coords(body, ROUTE_RESULT.size, n_points),
+            'distance_m': distance_m,
+            'duration_s': duration_s,
+            'distance_km': distance_m / 1000,
+            'duration_minutes': duration_s / 60
+        }
+
+    def ping(self) -> float:
+        """Round-trip time in milliseconds."""
+        start = time.perf_counter()
+        self._call(OP_PING)
+        return (time.perf_counter() - start) * 1000
+
+    def info(self) -> Dict:
+        return json.loads(self._call(OP_INFO))
+
+    def route(self, start_lat: float, start_lon: float, end_lat: float, end_lon: float,
+              mode: str = 'car', vehicle: Optional[str] = None) -> Dict:
+        """Route between two points (dict with 'error' if none was found).
+
+        vehicle is a profile name from VEHICLE_PROFILES ('van', 'truck', ...).
+        """
+        request = self._route_request(start_lat, start_lon, end_lat, end_lon, mode, vehicle)
+        return self._decode_route(*self.pipeline([request])[0])
+
+    def route_many(self, pairs: List[Tuple[float, float, float, float]], mode: str = 'car',
+                   vehicle: Optional[str] = None) -> List[Dict]:
+        """Pipelined routes for (start_lat, start_lon, end_lat, end_lon) pairs."""
+        answers = self.pipeline([self._route_request(*pair, mode=mode, vehicle=vehicle) for pair in pairs])
+        return [self._decode_route(status, body) for status, body in answers]
+
+    def matrix(self, sources: List[Tuple[float, float]], targets: List[Tuple[float, float]],
+               mode: str = 'car', vehicle: Optional[str] = None) -> Dict[str, List[List[float]]]:
+        """Duration (s) and distance (m) matrices; unreachable pairs are inf."""
+        body = self._call(OP_MATRIX, MATRIX_SIZE.pack(len(sources), len(targets)) +
+                          pack_coords(list(sources) + list(targets)), mode, vehicle)
+        cells = struct.unpack(f'<{len(body) // 4}f', body)
+        n, m = len(sources), len(targets)
+        rows = [list(cells[i * m:(i + 1) * m]) for i in range(2 * n)]
+        return {'durations': rows[:n], 'distances': rows[n:]}
+
+    def snap(self, points: List[Tuple[float, float]], mode: str = 'car',
+             vehicle: Optional[str] = None) -> List[Optional[Dict]]:
+        """Nearest routable node per point (None where nothing is in range)."""
+        body = self._call(OP_SNAP, pack_coords(points), mode, vehicle)
+        snapped = []
+        for node_id, lat, lon, distance in SNAP_RESULT.iter_unpack(body):
+            snapped.append(None if node_id < 0 else {
+                'node_id': node_id, 'lat': lat / COORD_SCALE, 'lon': lon / COORD_SCALE, 'distance_m': distance})
+        return snapped
+
+
+# In-process service shared by the web app (the graph is loaded once per process)
+_service = None
+_service_lock = threading.Lock()
+
+
+def initialize_router(db_file: str, use_ch: bool = True, progress=None) -> RouterService:
+    """Load the shared in-process service (once) and return it."""
+    global _service
+    with _service_lock:
+        if _service is None or _service.db_file != db_file:
+            _service = RouterService(db_file, use_ch=use_ch, progress=progress)
+        return _service
+
+
+def get_router_service() -> Optional[RouterService]:
+    """Shared in-process service, or None before initialize_router()."""
+    return _service
+
+
+def main():
+    """Run the routing daemon."""
+    parser = argparse.ArgumentParser(description='Custom router service daemon')
+    parser.add_argument('--db', default='data/uk_router.db', help='Routing database')
+    parser.add_argument('--socket', default=None, help=f'Unix socket path (default {DEFAULT_SOCKET})')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host (with --port)')
+    parser.add_argument('--port', type=int, default=None, help='Listen on TCP instead of a Unix socket')
+    parser.add_argument('--workers', type=int, default=4, help='Request worker threads')
+    parser.add_argument('--no-ch', action='store_true', help='Disable Contraction Hierarchies')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database not found: {args.db}")
+        return False
+
+    print("=" * 60)
+    print("CUSTOM ROUTER SERVICE")
+    print("=" * 60)
+    address = (args.host, args.port) if args.port else (args.socket or default_address())
+    service = RouterService(args.db, use_ch=not args.no_ch, workers=args.workers)
+    service.serve_forever(address)
+    return True
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,8 @@ import threading
 from typing import Optional, List, Dict, Any
 from contextlib import contextmanager
 
+from query_profiler import connect as profiled_connect
+
 
 class DatabasePool:
     """Connection pool for SQLite database."""
@@ -29,7 +31,7 @@ class DatabasePool:
     def _initialize_pool(self):
         """Initialize connection pool."""
         for _ in range(self.pool_size):
-            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            conn = profiled_connect(self.db_file, check_same_thread=False)
             conn.row_factory = sqlite3.Row
             self.connections.append(conn)
     
@@ -42,7 +44,7 @@ class DatabasePool:
         """
         with self.lock:
             if not self.connections:
-                conn = sqlite3.connect(self.db_file, check_same_thread=False)
+                conn = profiled_connect(self.db_file, check_same_thread=False)
                 conn.row_factory = sqlite3.Row
             else:
                 conn = self.connections.pop()
@@ -0,0 +1,252 @@
+"""
+Versioned schema migrations and connection tuning for the app databases
+Each migration is (version, description, statements) and is applied at most
+once: the database's PRAGMA user_version records the last version applied,
+and every migration runs in its own write transaction together with the
+user_version bump, so a failed migration leaves no partial indexes behind
+and concurrent workers starting up apply it only once. Statements use
+IF NOT EXISTS so databases that already have some of the indexes migrate
+cleanly. ANALYZE runs after new migrations so the planner has statistics
+for the new indexes. Point tables that are searched by bounding box get an
+R*Tree kept in sync by triggers; bbox_sql builds the lookups against it.
+Triggers on the hazard tables also bump hazard_data_version, which tells
+in-memory hazard indexes when to reload.
+"""
+
+import logging
+import sqlite3
+from typing import List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Migration = Tuple[int, str, Sequence[str]]
+
+# Per-connection settings. synchronous=NORMAL is durable across application
+# crashes in WAL mode (only an OS crash can lose the last transactions).
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -16000',  # KiB, i.e. 16 MB of page cache
+    'PRAGMA mmap_size = 268435456',
+)
+
+# Rows sampled per index by ANALYZE, which keeps it fast on large tables
+ANALYSIS_LIMIT = 1000
+
+
+def rtree_statements(table: str, key: str, where: str = '', watch: Sequence[str] = ()) -> List[str]:
+    """
+    Create the {table}_rtree R*Tree over a table's lat/lon points, fill it
+    and keep it in sync with insert, update and delete triggers.
+
+    Args:
+        table: Table with lat and lon columns
+        key: The table's INTEGER PRIMARY KEY column, used as the R*Tree id
+        where: Only index rows matching this condition, with {row} before each
+            column name so it applies to table rows and trigger NEW rows
+        watch: Columns besides the key and coordinates that the condition reads
+    """
+    rtree = f'{table}_rtree'
+
+    def indexed(row):
+        condition = f'{row}lat IS NOT NULL AND {row}lon IS NOT NULL'
+        return f'{condition} AND {where.format(row=row)}' if where else condition
+
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree(id, min_lat, max_lat, min_lon, max_lon)',
+        f'INSERT OR REPLACE INTO {rtree} SELECT {key}, lat, lat, lon, lon FROM {table} WHERE {indexed("")}',
+        # OR REPLACE: an INSERT OR REPLACE on the table does not fire the delete trigger
+        f'CREATE TRIGGER IF NOT EXISTS {rtree}_insert AFTER INSERT ON {table} WHEN {indexed("NEW.")} BEGIN '
+        f'INSERT OR REPLACE INTO {rtree} VALUES (NEW.{key}, NEW.lat, NEW.lat, NEW.lon, NEW.lon); END',
+        f'CREATE TRIGGER IF NOT EXISTS {rtree}_update AFTER UPDATE OF {", ".join((key, "lat", "lon", *watch))} '
+        f'ON {table} BEGIN '
+        f'DELETE FROM {rtree} WHERE id = OLD.{key}; '
+        f'INSERT INTO {rtree} SELECT NEW.{key}, NEW.lat, NEW.lat, NEW.lon, NEW.lon WHERE {indexed("NEW.")}; END',
+        f'CREATE TRIGGER IF NOT EXISTS {rtree}_delete AFTER DELETE ON {table} BEGIN '
+        f'DELETE FROM {rtree} WHERE id = OLD.{key}; END',
+    ]
+
+
+def bbox_sql(table: str, key: str, columns: str, where: str = '', rtree: bool = True) -> str:
+    """
+    SELECT of the rows inside a (south, north, west, east) box, through the
+    table's R*Tree when rtree is set, else by BETWEEN on lat and lon.
+
+    Parameters are ?1-?4 for south, north, west, east; plain '?' placeholders
+    in where (columns and where refer to the table as t) continue from ?5.
+    The R*Tree stores 32-bit floats with bounds rounded outwards, so its
+    candidates are filtered again on the exact coordinates.
+    """
+    exact = 't.lat BETWEEN ?1 AND ?2 AND t.lon BETWEEN ?3 AND ?4'
+    extra = f' AND {where}' if where else ''
+    if not rtree:
+        return f'SELECT {columns} FROM {table} t WHERE {exact}{extra}'
+    # An IN list rather than a join, which SQLite plans with a bloom filter
+    # built by scanning the whole table
+    return (f'SELECT {columns} FROM {table} t WHERE t.{key} IN (SELECT id FROM {table}_rtree '
+            f'WHERE min_lat <= ?2 AND max_lat >= ?1 AND min_lon <= ?4 AND max_lon >= ?3) '
+            f'AND {exact}{extra}')
+
+
+def hazard_version_statements(table: str, columns: Sequence[str]) -> List[str]:
+    """Triggers bumping hazard_data_version whenever a row of the table, or one of its columns, changes."""
+    bump = 'UPDATE hazard_data_version SET version = version + 1'
+    events = {'insert': 'INSERT', 'update': f'UPDATE OF {", ".join(columns)}', 'delete': 'DELETE'}
+    return [f'CREATE TRIGGER IF NOT EXISTS {table}_hazard_version_{name} AFTER {event} ON {table} '
+            f'BEGIN {bump}; END' for name, event in events.items()]
+
+
+def hazard_data_version(conn: sqlite3.Connection) -> int:
+    """Counter that changes with every write to the hazard tables (see migration 4)."""
+    return conn.execute('SELECT version FROM hazard_data_version').fetchone()[0]
+
+
+def has_rtree(conn: sqlite3.Connection, table: str) -> bool:
+    """Whether the table's R*Tree exists (SQLite builds without the R*Tree module cannot create one)."""
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (f'{table}_rtree',)).fetchone() is not None
+
+
+VOYAGR_WEB_MIGRATIONS: List[Migration] = [
+    (1, 'Hazard lookup indexes', (
+        # Covering: the route and nearby hazard queries read lat, lon, type
+        # and description, so the bounding-box range never touches the table
+        'CREATE INDEX IF NOT EXISTS idx_cameras_lat_lon ON cameras (lat, lon, type, description)',
+        # status is compared for equality, so it leads and lat carries the range
+        'CREATE INDEX IF NOT EXISTS idx_community_hazard_reports_active '
+        'ON community_hazard_reports (status, lat, lon, expiry_timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_community_hazard_reports_expiry '
+        'ON community_hazard_reports (expiry_timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_route_hazards_cache_bbox '
+        'ON route_hazards_cache (north, south, east, west)',
+    )),
+    (2, 'Route cache, history and prediction indexes', (
+        # Exact lookups use the UNIQUE(start_lat, ..., vehicle_type) index;
+        # these serve the cleanup, similar-route and most-accessed queries
+        'CREATE INDEX IF NOT EXISTS idx_persistent_route_cache_last_accessed '
+        'ON persistent_route_cache (last_accessed)',
+        'CREATE INDEX IF NOT EXISTS idx_persistent_route_cache_vehicle_distance '
+        'ON persistent_route_cache (vehicle_type, distance_km, total_cost)',
+        'CREATE INDEX IF NOT EXISTS idx_persistent_route_cache_access_count '
+        'ON persistent_route_cache (access_count DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_trips_timestamp ON trips (timestamp DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_trips_routing_mode ON trips (routing_mode)',
+        'CREATE INDEX IF NOT EXISTS idx_search_history_timestamp ON search_history (timestamp DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_favorite_locations_timestamp ON favorite_locations (timestamp DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_ml_route_predictions_slot '
+        'ON ml_route_predictions (day_of_week, hour_of_day, frequency DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_ml_traffic_patterns_lat_lon ON ml_traffic_patterns (lat, lon)',
+        'CREATE INDEX IF NOT EXISTS idx_dashcam_recordings_start_time ON dashcam_recordings (start_time DESC)',
+    )),
+    (3, 'R*Tree spatial indexes for cameras and community reports', (
+        *rtree_statements('cameras', 'id'),
+        # Only active reports are ever looked up by area
+        *rtree_statements('community_hazard_reports', 'report_id', "{row}status = 'active'", ('status',)),
+        # Bounding-box lookups go through the R*Trees now
+        'DROP INDEX IF EXISTS idx_cameras_lat_lon',
+        'DROP INDEX IF EXISTS idx_community_hazard_reports_active',
+    )),
+    (4, 'Change counter for the in-memory hazard index', (
+        'CREATE TABLE IF NOT EXISTS hazard_data_version '
+        '(id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)',
+        'INSERT OR IGNORE INTO hazard_data_version (id, version) VALUES (1, 0)',
+        *hazard_version_statements('cameras', ('lat', 'lon', 'type', 'description')),
+        *hazard_version_statements('community_hazard_reports', (
+            'lat', 'lon', 'hazard_type', 'description', 'severity', 'status', 'expiry_timestamp')),
+    )),
+]
+
+# Hazard lookups on the voyagr_web schema; parameters are south, north, west, east (then now for reports)
+CAMERAS_BBOX_SQL = bbox_sql('cameras', 'id', 't.lat, t.lon, t.type, t.description')
+ACTIVE_REPORTS_BBOX_SQL = bbox_sql('community_hazard_reports', 'report_id',
+                                   't.lat, t.lon, t.hazard_type, t.description, t.severity',
+                                   "t.status = 'active' AND t.expiry_timestamp > ?")
+
+SATNAV_MIGRATIONS: List[Migration] = [
+    (1, 'Hazard lookup and expiry indexes', (
+        # The hazard fetch reads cameras loaded by load_scdb_cameras.py; create
+        # the table here too so the index exists before the first import
+        '''CREATE TABLE IF NOT EXISTS cameras (
+            id INTEGER PRIMARY KEY,
+            lat REAL, lon REAL, type TEXT,
+            description TEXT, severity TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_cameras_lat_lon ON cameras (lat, lon, type, description)',
+        'CREATE INDEX IF NOT EXISTS idx_community_reports_active ON community_reports (status, lat, lon)',
+        'CREATE INDEX IF NOT EXISTS idx_community_reports_user ON community_reports (user_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_route_cache_persistent_expiry ON route_cache_persistent (expiry_timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_reports_timestamp ON reports (timestamp)',
+    )),
+    (2, 'R*Tree spatial indexes for cameras and community hazard reports', (
+        *rtree_statements('cameras', 'id'),
+        *rtree_statements('community_hazard_reports', 'id', "{row}status = 'active'", ('status',)),
+        'DROP INDEX IF EXISTS idx_cameras_lat_lon',
+    )),
+]
+
+
+def apply_connection_pragmas(conn: sqlite3.Connection) -> None:
+    """Tune one connection; these settings are not stored in the database."""
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+def enable_wal(conn: sqlite3.Connection) -> str:
+    """Switch the database to write-ahead logging (persistent); returns the journal mode now in effect."""
+    return conn.execute('PRAGMA journal_mode = WAL').fetchone()[0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Last migration version applied to the database (PRAGMA user_version, 0 when none)."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration], analyze: bool = True) -> List[int]:
+    """
+    Apply the migrations newer than the database's user_version.
+
+    Args:
+        conn: Open connection (any pending transaction is committed first)
+        migrations: (version, description, statements) in increasing version order
+        analyze: Run ANALYZE after applying migrations, PRAGMA optimize otherwise
+
+    Returns:
+        Versions applied by this call
+    """
+    versions = [version for version, _, _ in migrations]
+    if versions != sorted(set(versions)) or (versions and versions[0] < 1):
+        raise ValueError(f"Migration versions must be positive and strictly increasing, got {versions}")
+
+    conn.commit()
+    applied = []
+    for version, description, statements in migrations:
+        if version <= schema_version(conn):
+            continue
+        # IMMEDIATE takes the write lock up front, so the version re-check
+        # below is race-free against another process migrating the same file
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if version <= schema_version(conn):
+                conn.rollback()
+                continue
+            for sql in statements:
+                conn.execute(sql)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            logger.error(f"[DB] Migration {version} ({description}) failed; database left at "
+                         f"version {schema_version(conn)}")
+            raise
+        applied.append(version)
+        logger.info(f"[DB] Applied migration {version}: {description}")
+
+    if analyze:
+        if applied:
+            conn.execute(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}')
+            conn.execute('ANALYZE')
+        else:
+            conn.execute('PRAGMA optimize')
+        conn.commit()
+    return applied
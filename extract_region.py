@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Cut a city or region out of the routing database (or a PBF) into a small,
+self-contained routable database plus a binary graph snapshot, for
+reproducible test and benchmark fixtures.
+
+Usage:
+    python extract_region.py --region doncaster --output data/doncaster.db
+    python extract_region.py --region 53.45,-1.25,53.60,-0.98 --output data/fixture.db
+    python extract_region.py --polygon sheffield.poly --pbf data/great-britain-latest.osm.pbf --output data/sheffield.db
+    python extract_region.py --list
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from custom_router.extract import CITY_BBOXES, Region, RegionExtractor
+from custom_router.osm_parser import OSMParser
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract a routable region from the routing database')
+    parser.add_argument('--db', type=str, default='data/uk_router.db',
+                        help='Source routing database')
+    parser.add_argument('--pbf', type=str, default=None,
+                        help='Import the region from this PBF instead of --db')
+    parser.add_argument('--region', type=str, default=None,
+                        help='City name or min_lat,min_lon,max_lat,max_lon')
+    parser.add_argument('--polygon', type=str, default=None,
+                        help='GeoJSON or Osmosis .poly file with the region outline')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Output database (default: data/<region>.db)')
+    parser.add_argument('--keep-fragments', action='store_true',
+                        help='Keep components cut off from the main network at the border')
+    parser.add_argument('--no-snapshot', action='store_true',
+                        help='Do not write the <output>.graph.npz snapshot')
+    parser.add_argument('--list', action='store_true', help='List named city regions')
+    args = parser.parse_args()
+
+    if args.list:
+        for name, bbox in sorted(CITY_BBOXES.items()):
+            print(f"  {name:12s} {','.join(str(v) for v in bbox)}")
+        return 0
+
+    if bool(args.region) == bool(args.polygon):
+        parser.error('give exactly one of --region or --polygon')
+    try:
+        region = Region.from_file(args.polygon) if args.polygon else Region.parse(args.region)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    output = args.output or os.path.join('data', f'{region.name}.db')
+
+    print("=" * 60)
+    print(f"REGION EXTRACT: {region.name}")
+    print("=" * 60)
+    print(f"Bounds: {region.bounds}")
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as tmp_dir:
+        source = args.db
+        if args.pbf:
+            # Stream only the region's nodes from the PBF, then clean up like a database extract
+            osm = OSMParser(tmp_dir)
+            osm.pbf_file = args.pbf
+            if not osm.import_pbf(region=region):
+                print(f"[ERROR] Could not import {args.pbf}")
+                return 1
+            source = osm.db_file
+        elif not os.path.exists(source):
+            print(f"[ERROR] Database not found: {source}")
+            return 1
+
+        stats = RegionExtractor(source).extract(region, output, main_component=not args.keep_fragments,
+                                                snapshot=not args.no_snapshot)
+
+    print("\n" + "=" * 60)
+    print(f"Output: {output} ({stats['db_mb']:.1f} MB)")
+    print(f"  - Nodes: {stats['nodes']:,} ({stats['dropped_nodes']:,} dropped in border fragments)")
+    print(f"  - Edges: {stats['edges']:,}")
+    print(f"  - Ways: {stats['ways']:,}")
+    if stats['snapshot']:
+        print(f"  - Snapshot: {stats['snapshot']}")
+    print("Run build_ch_index.py on the output to add contraction hierarchies.")
+    return 0 if stats['nodes'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+In-memory spatial index of hazards for route scoring
+HazardIndex holds hazard coordinates in NumPy arrays bucketed into a uniform
+lat/lon grid. match() samples a route densely enough to know every grid cell
+its buffered corridor touches, takes only the hazards in those cells and
+measures their distance to the route's segments in one vectorized pass,
+returning the penalty, the count and the hazard list together. Distances use
+an equirectangular projection around each hazard, which is within a fraction
+of a percent of haversine at hazard thresholds of a few hundred metres.
+SharedHazardIndex keeps one index over a whole database and rebuilds it when
+the trigger-maintained hazard_data_version changes.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from db_migrations import hazard_data_version
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE = EARTH_RADIUS_M * math.pi / 180
+
+# Grid cell size in degrees (about 1.1 km of latitude)
+CELL_DEG = 0.01
+
+
+class RouteHazards(NamedTuple):
+    penalty: float
+    count: int
+    hazards: List[Dict[str, Any]]
+
+
+class HazardIndex:
+    """Grid index over hazards grouped by type, as returned by fetch_hazards_for_route."""
+
+    def __init__(self, hazards: Mapping[str, Sequence[Dict[str, Any]]], cell_deg: float = CELL_DEG):
+        """
+        Initialize index.
+
+        Args:
+            hazards: Hazard type -> hazards with lat, lon and optionally description,
+                original_type and expiry (unix time after which it is ignored)
+            cell_deg: Grid cell size in degrees
+        """
+        self.cell_deg = cell_deg
+        self.cols = int(math.ceil(360 / cell_deg)) + 2
+        self.types = list(hazards)
+        self.entries = []
+        codes = []
+        for code, hazard_list in enumerate(hazards.values()):
+            for hazard in hazard_list:
+                if hazard.get('lat') is not None and hazard.get('lon') is not None:
+                    self.entries.append(hazard)
+                    codes.append(code)
+        self.type_code = np.array(codes, dtype=np.int32)
+        self.lat = np.array([hazard['lat'] for hazard in self.entries], dtype=float)
+        self.lon = np.array([hazard['lon'] for hazard in self.entries], dtype=float)
+        self.expiry = np.array([hazard.get('expiry', np.inf) for hazard in self.entries], dtype=float)
+
+        # Hazards sorted by cell; cell i holds order[cell_start[i]:cell_end[i]]
+        keys = self._cell_keys(self.lat, self.lon)
+        self.order = np.argsort(keys, kind='stable')
+        self.cells, self.cell_start = np.unique(keys[self.order], return_index=True)
+        self.cell_end = np.append(self.cell_start[1:], len(keys))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def counts(self) -> Dict[str, int]:
+        """Hazards per type."""
+        return dict(zip(self.types, np.bincount(self.type_code, minlength=len(self.types)).tolist()))
+
+    def _cell_keys(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        row = np.floor((lat + 90) / self.cell_deg).astype(np.int64) + 1
+        col = np.floor((lon + 180) / self.cell_deg).astype(np.int64) + 1
+        return row * self.cols + col
+
+    def match(self, route_points: Sequence[Sequence[float]], preferences: Mapping[str, Dict[str, float]],
+              now: Optional[float] = None) -> RouteHazards:
+        """
+        Score a route against the hazards within each type's threshold of it.
+
+        Args:
+            route_points: (lat, lon) route vertices
+            preferences: Hazard type -> {'penalty': seconds, 'threshold': meters} for enabled types
+            now: Unix time for hazard expiry (default: current time)
+
+        Returns:
+            RouteHazards(total penalty in seconds, hazard count, hazards with their distance in meters)
+        """
+        now = time.time() if now is None else now
+        thresholds = np.array([_preference(preferences, hazard_type, 'threshold') for hazard_type in self.types])
+        points = np.asarray(route_points, dtype=float).reshape(-1, 2)
+        if not len(self) or not len(points) or np.isnan(thresholds).all():
+            return RouteHazards(0.0, 0, [])
+
+        hazard, segment_start, segment_end = self._corridor_pairs(points, np.nanmax(thresholds))
+        live = ~np.isnan(thresholds[self.type_code[hazard]]) & (self.expiry[hazard] > now)
+        hazard, distance = hazard[live], _segment_distances(
+            self.lat[hazard[live]], self.lon[hazard[live]], segment_start[live], segment_end[live])
+
+        nearest = np.full(len(self), np.inf)
+        np.minimum.at(nearest, hazard, distance)
+        with np.errstate(invalid='ignore'):
+            matched = np.flatnonzero(nearest <= thresholds[self.type_code])
+
+        total_penalty = 0.0
+        hazards_on_route = []
+        for i in matched.tolist():
+            hazard_type = self.types[self.type_code[i]]
+            entry, min_distance = self.entries[i], float(nearest[i])
+            penalty = _preference(preferences, hazard_type, 'penalty')
+            if np.isnan(penalty):
+                penalty = 0.0
+            if hazard_type == 'traffic_light_camera':
+                # Proximity multiplier: 1.0 at threshold, 3.0 at 0m
+                threshold = thresholds[self.type_code[i]]
+                if threshold > 0:
+                    penalty *= max(1.0, 1.0 + 2.0 * (1.0 - min_distance / threshold))
+            total_penalty += penalty
+            hazards_on_route.append({
+                'lat': entry['lat'],
+                'lon': entry['lon'],
+                'type': entry.get('original_type', hazard_type),
+                'description': entry.get('description', 'Hazard detected'),
+                'distance': round(min_distance, 0),
+            })
+        return RouteHazards(total_penalty, len(hazards_on_route), hazards_on_route)
+
+    def _corridor_pairs(self, points: np.ndarray, max_threshold: float):
+        """(hazard, segment start, segment end) for the hazards in cells near each route segment."""
+        starts, ends = (points[:-1], points[1:]) if len(points) > 1 else (points, points)
+        segments = len(starts)
+
+        # Samples at most half a cell apart, so every route point is within a
+        # quarter cell of one; reach covers the threshold beyond that
+        steps = np.maximum(1, np.ceil(np.abs(ends - starts).max(axis=1) / (self.cell_deg / 2))).astype(np.int64)
+        sample_segment = np.repeat(np.arange(segments), steps + 1)
+        first_sample = np.cumsum(steps + 1) - (steps + 1)
+        fraction = (np.arange(len(sample_segment)) - first_sample[sample_segment]) / steps[sample_segment]
+        samples = starts[sample_segment] + (ends - starts)[sample_segment] * fraction[:, None]
+
+        reach_lat = max_threshold / METERS_PER_DEGREE + self.cell_deg / 4
+        lon_scale = max(math.cos(math.radians(min(89.0, np.abs(samples[:, 0]).max() + reach_lat))), 0.01)
+        reach_lon = max_threshold / (METERS_PER_DEGREE * lon_scale) + self.cell_deg / 4
+        row_offsets = np.arange(-math.ceil(reach_lat / self.cell_deg), math.ceil(reach_lat / self.cell_deg) + 1)
+        col_offsets = np.arange(-math.ceil(reach_lon / self.cell_deg), math.ceil(reach_lon / self.cell_deg) + 1)
+        neighbours = (row_offsets[:, None] * self.cols + col_offsets[None, :]).ravel()
+
+        # Each (cell, segment) once, then every hazard of those cells
+        cell_segments = np.unique(
+            ((self._cell_keys(samples[:, 0], samples[:, 1])[:, None] + neighbours[None, :]) * segments
+             + sample_segment[:, None]).ravel())
+        cell_keys, segment = np.divmod(cell_segments, segments)
+        position = np.minimum(np.searchsorted(self.cells, cell_keys), len(self.cells) - 1)
+        found = self.cells[position] == cell_keys
+        position, segment = position[found], segment[found]
+        first, sizes = self.cell_start[position], self.cell_end[position] - self.cell_start[position]
+        within = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        hazard = self.order[np.repeat(first, sizes) + within]
+        segment = np.repeat(segment, sizes)
+        return hazard, starts[segment], ends[segment]
+
+
+def _preference(preferences: Mapping[str, Dict[str, float]], hazard_type: str, key: str) -> float:
+    value = preferences.get(hazard_type, {}).get(key)
+    return float(value) if value is not None else np.nan
+
+
+def _segment_distances(lat: np.ndarray, lon: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Meters from each point to its segment, projected around the point."""
+    scale = np.cos(np.radians(lat)) * METERS_PER_DEGREE
+    ax, ay = (start[:, 1] - lon) * scale, (start[:, 0] - lat) * METERS_PER_DEGREE
+    dx, dy = (end[:, 1] - start[:, 1]) * scale, (end[:, 0] - start[:, 0]) * METERS_PER_DEGREE
+    length2 = dx * dx + dy * dy
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.where(length2 > 0, np.clip(-(ax * dx + ay * dy) / length2, 0.0, 1.0), 0.0)
+    return np.hypot(ax + t * dx, ay + t * dy)
+
+
+class SharedHazardIndex:
+    """Process-wide HazardIndex over a database, rebuilt when its hazard rows change."""
+
+    def __init__(self, loader: Callable[[Any], Mapping[str, Sequence[Dict[str, Any]]]]):
+        """
+        Initialize shared index.
+
+        Args:
+            loader: Reads all hazards (grouped by type) from a connection
+        """
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.index = None
+        self.version = None
+
+    def get(self, conn: Any) -> HazardIndex:
+        """Current index, rebuilt first if hazard_data_version moved on."""
+        version = hazard_data_version(conn)
+        index = self.index
+        if index is not None and version == self.version:
+            return index
+        # One thread rebuilds; the others keep using the previous index meanwhile
+        if not self.lock.acquire(blocking=index is None):
+            return index
+        try:
+            if self.index is None or self.version != version:
+                # Version read before loading, so changes made during the load trigger another rebuild
+                version = hazard_data_version(conn)
+                self.index = HazardIndex(self.loader(conn))
+                self.version = version
+            return self.index
+        finally:
+            self.lock.release()
@@ -3,13 +3,16 @@ Hazard avoidance service layer.
 Consolidates all hazard-related business logic into a single service.
 """
 
-import sqlite3
 import math
 import time
 import json
 import polyline
 from typing import Dict, List, Tuple
 
+from db_migrations import ACTIVE_REPORTS_BBOX_SQL, CAMERAS_BBOX_SQL
+from hazard_index import HazardIndex
+from query_profiler import connect as profiled_connect
+
 
 class HazardService:
     """Service for hazard avoidance and detection."""
@@ -56,7 +59,7 @@ class HazardService:
             Dict with hazard types and locations
         """
         try:
-            conn = sqlite3.connect(self.db_file)
+            conn = profiled_connect(self.db_file)
             cursor = conn.cursor()
             
             # Calculate bounding box with 10km buffer
@@ -90,7 +93,7 @@ class HazardService:
             
             # Fetch cameras
             cursor.execute(
-                "SELECT lat, lon, type, description FROM cameras WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?",
+                CAMERAS_BBOX_SQL,
                 (south, north, west, east)
             )
             for lat, lon, camera_type, desc in cursor.fetchall():
@@ -99,7 +102,7 @@ class HazardService:
             
             # Fetch community reports
             cursor.execute(
-                "SELECT lat, lon, hazard_type, description, severity FROM community_hazard_reports WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ? AND status = 'active' AND expiry_timestamp > ?",
+                ACTIVE_REPORTS_BBOX_SQL,
                 (south, north, west, east, int(time.time()))
             )
             for lat, lon, hazard_type, desc, severity in cursor.fetchall():
@@ -123,12 +126,9 @@ class HazardService:
             Tuple of (total_penalty_seconds, hazard_count)
         """
         try:
-            conn = sqlite3.connect(self.db_file)
+            conn = profiled_connect(self.db_file)
             cursor = conn.cursor()
             
-            total_penalty = 0
-            hazard_count = 0
-            
             # Get hazard preferences
             cursor.execute("SELECT hazard_type, penalty_seconds, proximity_threshold_meters FROM hazard_preferences WHERE enabled = 1")
             preferences = {row[0]: {'penalty': row[1], 'threshold': row[2]} for row in cursor.fetchall()}
@@ -143,37 +143,8 @@ class HazardService:
             except:
                 return 0, 0
             
-            # Check each hazard against route
-            for hazard_type, hazard_list in hazards.items():
-                if hazard_type not in preferences:
-                    continue
-                
-                pref = preferences[hazard_type]
-                threshold = pref['threshold']
-                penalty = pref['penalty']
-                
-                for hazard in hazard_list:
-                    hazard_lat = hazard.get('lat')
-                    hazard_lon = hazard.get('lon')
-                    
-                    # Find minimum distance to route
-                    min_distance = float('inf')
-                    for point_lat, point_lon in decoded_points:
-                        distance = self.get_distance_between_points(hazard_lat, hazard_lon, point_lat, point_lon)
-                        min_distance = min(min_distance, distance)
-                    
-                    # If hazard is within threshold, add penalty
-                    if min_distance <= threshold:
-                        # Traffic light cameras get distance-based multiplier
-                        if hazard_type == 'traffic_light_camera':
-                            proximity_multiplier = 1.0 + (2.0 * (1.0 - min_distance / threshold))
-                            distance_multiplier = max(1.0, proximity_multiplier)
-                            applied_penalty = penalty * distance_multiplier
-                        else:
-                            applied_penalty = penalty
-                        
-                        total_penalty += applied_penalty
-                        hazard_count += 1
+            # Only hazards along the route's corridor are measured, against its segments
+            total_penalty, hazard_count, _ = HazardIndex(hazards).match(decoded_points, preferences)
             
             return total_penalty, hazard_count
         except Exception as e:
@@ -0,0 +1,157 @@
+"""
+Bounded streaming latency percentiles
+LatencySketch is a log-bucketed histogram in the style of DDSketch: any
+quantile is within a fixed relative error, memory is bounded by the value
+range rather than the sample count, and sketches merge by adding buckets.
+WindowedSketch keeps a ring of per-slot sketches so the last minute, five
+minutes or hour can be summarised without storing individual samples.
+"""
+
+import math
+import time
+from typing import Dict, Optional
+
+# Values at or below this (ms) share the zero bucket
+MIN_VALUE = 1e-3
+
+# Window name -> (length in seconds, ring slots)
+WINDOWS = {
+    '1m': (60, 12),
+    '5m': (300, 30),
+    '1h': (3600, 60),
+}
+
+
+class LatencySketch:
+    """Quantile sketch with relative accuracy; not thread-safe on its own."""
+
+    __slots__ = ('relative_accuracy', 'gamma', '_log_gamma', 'buckets', 'zero_count',
+                 'count', 'total', 'min', 'max')
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Initialize sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of any reported quantile
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1), got {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}  # bucket index -> count
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        if value <= MIN_VALUE:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'LatencySketch') -> None:
+        """Fold another sketch with the same accuracy into this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q (0-1), or 0.0 for an empty sketch."""
+        if self.count == 0:
+            return 0.0
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        """count, mean, p50, p95, p99 and max."""
+        if self.count == 0:
+            return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2),
+            'p50': round(self.quantile(0.50), 2),
+            'p95': round(self.quantile(0.95), 2),
+            'p99': round(self.quantile(0.99), 2),
+            'max': round(self.max, 2),
+        }
+
+
+class WindowedSketch:
+    """Ring of LatencySketch slots covering the last window_s seconds."""
+
+    def __init__(self, window_s: float, slots: int, relative_accuracy: float = 0.01):
+        self.window_s = window_s
+        self.slot_s = window_s / slots
+        self.relative_accuracy = relative_accuracy
+        self.slots = [LatencySketch(relative_accuracy) for _ in range(slots)]
+        self.slot_ids = [-1] * slots  # absolute slot number held by each ring position
+
+    def add(self, value: float, now: Optional[float] = None) -> None:
+        slot_id = int((time.time() if now is None else now) // self.slot_s)
+        position = slot_id % len(self.slots)
+        if slot_id < self.slot_ids[position]:
+            return  # older than the window
+        if self.slot_ids[position] != slot_id:
+            self.slots[position] = LatencySketch(self.relative_accuracy)
+            self.slot_ids[position] = slot_id
+        self.slots[position].add(value)
+
+    def snapshot(self, now: Optional[float] = None) -> LatencySketch:
+        """Merged sketch of the slots still inside the window."""
+        current = int((time.time() if now is None else now) // self.slot_s)
+        merged = LatencySketch(self.relative_accuracy)
+        for slot_id, sketch in zip(self.slot_ids, self.slots):
+            if current - len(self.slots) < slot_id <= current:
+                merged.merge(sketch)
+        return merged
+
+
+class LatencyTracker:
+    """All-time sketch plus the rolling WINDOWS for one series."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.all_time = LatencySketch(relative_accuracy)
+        self.windows = {name: WindowedSketch(window_s, slots, relative_accuracy)
+                        for name, (window_s, slots) in WINDOWS.items()}
+
+    def add(self, value: float, now: Optional[float] = None) -> None:
+        self.all_time.add(value)
+        for window in self.windows.values():
+            window.add(value, now)
+
+    def window(self, name: str, now: Optional[float] = None) -> LatencySketch:
+        return self.windows[name].snapshot(now)
+
+    def summary(self, now: Optional[float] = None) -> Dict:
+        """Summaries for every window and all time."""
+        result = {name: window.snapshot(now).summary() for name, window in self.windows.items()}
+        result['all'] = self.all_time.summary()
+        return result
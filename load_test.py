@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for voyagr_web with local stand-in routing engines.
+Starts mock GraphHopper, Valhalla and OSRM servers with configurable latency
+and error distributions, serves the Flask app on a small synthetic custom
+router graph, drives mixed traffic (route, hazards/nearby, multi-stop,
+batch) at a target request rate and reports throughput, latency
+percentiles, error rate and cache hit rate per endpoint. Nothing leaves
+localhost.
+
+Usage:
+    python load_test.py --rps 20 --duration 30
+    python load_test.py --rps 50 --duration 60 --engine-latency 80 --engine-errors 0.05 --output load.json
+    python load_test.py --no-custom-router --mix route=1 --engine-errors 0.3
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from benchmark_suite import percentiles
+
+ENGINES = ('graphhopper', 'valhalla', 'osrm')
+
+# Default share of requests per endpoint
+DEFAULT_MIX = {'route': 0.6, 'hazards': 0.2, 'multi_stop': 0.1, 'batch': 0.1}
+
+
+def encode_polyline(points: List[Tuple[float, float]], precision: int = 5) -> str:
+    """Google encoded polyline for [(lat, lon), ...]."""
+    factor = 10 ** precision
+    result = []
+    prev_lat = prev_lon = 0
+    for lat, lon in points:
+        lat_i, lon_i = int(round(lat * factor)), int(round(lon * factor))
+        for delta in (lat_i - prev_lat, lon_i - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                result.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            result.append(chr(value + 63))
+        prev_lat, prev_lon = lat_i, lon_i
+    return ''.join(result)
+
+
+def straight_route(points: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """Distance (m) and duration (s) of a straight line through points at 50 km/h, with a 1.3 detour factor."""
+    distance = 0.0
+    for (lat1, lon1), (lat2, lon2) in zip(points, points[1:]):
+        dlat = math.radians(lat2 - lat1)
+        dlon = math.radians(lon2 - lon1)
+        a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+        distance += 6371000 * 2 * math.asin(math.sqrt(a))
+    distance *= 1.3
+    return distance, distance / (50 / 3.6)
+
+
+class MockEngine:
+    """Local HTTP stand-in for a GraphHopper, Valhalla or OSRM server."""
+
+    def __init__(self, kind: str, latency_ms: float = 50.0, jitter: float = 0.5, error_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_ms: float = 2000.0, seed: int = 0):
+        """
+        Initialize mock engine.
+
+        Args:
+            kind: One of ENGINES
+            latency_ms: Median response latency
+            jitter: Log-normal sigma of the latency (0 for a fixed latency)
+            error_rate: Fraction of route requests answered with HTTP 503
+            slow_rate: Fraction of requests delayed by a further slow_ms
+            slow_ms: Extra latency of slow requests
+            seed: Random seed for latency and error draws
+        """
+        if kind not in ENGINES:
+            raise ValueError(f"Unknown engine {kind!r}, expected one of {', '.join(ENGINES)}")
+        self.kind = kind
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'slow': 0}
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> 'MockEngine':
+        """Serve on host:port (0 picks a free port) from a background thread."""
+        engine = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                engine._handle(self, None)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                engine._handle(self, body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name=f'mock-{self.kind}', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def draw(self) -> Tuple[float, bool]:
+        """Latency (s) and whether to fail, for one request."""
+        with self.lock:
+            latency = self.latency_ms * (self.rng.lognormvariate(0, self.jitter) if self.jitter > 0 else 1)
+            slow = self.rng.random() < self.slow_rate
+            fail = self.rng.random() < self.error_rate
+            self.stats['requests'] += 1
+            self.stats['slow'] += slow
+        if slow:
+            latency += self.slow_ms
+        return latency / 1000, fail
+
+    def _handle(self, handler: BaseHTTPRequestHandler, body: Optional[bytes]) -> None:
+        parsed = urlsplit(handler.path)
+        latency, fail = self.draw()
+        time.sleep(latency)
+        try:
+            points = self._points(parsed, body)
+        except (ValueError, KeyError, TypeError):
+            points = None
+
+        if points is None:
+            status, payload = 200, {'status': 'ok', 'engine': self.kind}  # /info, /status
+        elif fail:
+            status, payload = 503, {'message': 'mock engine failure', 'engine': self.kind}
+            with self.lock:
+                self.stats['errors'] += 1
+        elif len(points) < 2:
+            status, payload = 400, {'message': 'need at least two points'}
+        else:
+            status, payload = 200, self._route_response(points, parse_qs(parsed.query))
+
+        data = json.dumps(payload).encode()
+        try:
+            handler.send_response(status)
+            handler.send_header('Content-Type', 'application/json')
+            handler.send_header('Content-Length', str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up waiting
+
+    def _points(self, parsed, body: Optional[bytes]) -> Optional[List[Tuple[float, float]]]:
+        """Route request points as [(lat, lon), ...], or None for non-route paths."""
+        if self.kind == 'graphhopper' and parsed.path == '/route':
+            return [tuple(float(v) for v in p.split(',')) for p in parse_qs(parsed.query).get('point', [])]
+        if self.kind == 'valhalla' and parsed.path == '/route':
+            if body:
+                request = json.loads(body)
+            else:
+                request = json.loads(parse_qs(parsed.query)['json'][0])
+            return [(float(loc['lat']), float(loc['lon'])) for loc in request['locations']]
+        if self.kind == 'osrm' and parsed.path.startswith('/route/v1/'):
+            coords = parsed.path.rsplit('/', 1)[1]
+            return [(float(lat), float(lon)) for lon, lat in (c.split(',') for c in coords.split(';'))]
+        return None
+
+    def _route_response(self, points: List[Tuple[float, float]], query: Dict) -> Dict:
+        distance, duration = straight_route(points)
+        shape = encode_polyline(points)
+        if self.kind == 'graphhopper':
+            return {'paths': [{'distance': distance, 'time': duration * 1000, 'points': shape,
+                               'points_encoded': True}]}
+        if self.kind == 'valhalla':
+            return {'trip': {'summary': {'length': distance / 1000, 'time': duration},
+                             'legs': [{'shape': encode_polyline(points, 6)}], 'status': 0}}
+        if query.get('geometries') == ['geojson']:
+            geometry = {'type': 'LineString', 'coordinates': [[lon, lat] for lat, lon in points]}
+        else:
+            geometry = shape
+        return {'code': 'Ok', 'routes': [{'distance': distance, 'duration': duration, 'geometry': geometry}]}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Endpoint mix from 'route=0.6,hazards=0.2,...'; weights are normalised."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown endpoint {name!r}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError(f"Endpoint mix has no weight: {text!r}")
+    return {name: weight / total for name, weight in mix.items()}
+
+
+class LoadTest:
+    """Open-loop HTTP load generator for the voyagr_web API."""
+
+    def __init__(self, base_url: str, points: List[Tuple[float, float]], rps: float = 20.0,
+                 duration_s: float = 30.0, mix: Optional[Dict[str, float]] = None, pairs: int = 200,
+                 zipf: float = 1.1, concurrency: int = 64, timeout_s: float = 30.0, seed: int = 42):
+        """
+        Initialize load test.
+
+        Args:
+            base_url: App URL, e.g. http://127.0.0.1:5000
+            points: Candidate (lat, lon) request locations
+            rps: Target request rate
+            duration_s: Length of the run
+            mix: Share of requests per endpoint (default DEFAULT_MIX)
+            pairs: Size of the origin/destination pool
+            zipf: Skew of OD pair popularity; repeated pairs exercise the route cache
+            concurrency: Maximum requests in flight
+            timeout_s: Client timeout per request
+            seed: Random seed for the OD pool and request schedule
+        """
+        if len(points) < 2:
+            raise ValueError("Need at least two request locations")
+        self.base_url = base_url.rstrip('/')
+        self.rps = rps
+        self.duration_s = duration_s
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.zipf = zipf
+        self.concurrency = concurrency
+        self.timeout_s = timeout_s
+        self.rng = random.Random(seed)
+        self.pairs = [tuple(self.rng.sample(points, 2)) for _ in range(pairs)]
+        self.points = points
+        self.pair_weights = [1 / (rank + 1) ** zipf for rank in range(pairs)]
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.samples = []  # (endpoint, latency_s, ok, cached)
+        self.dropped = 0
+
+    def session(self) -> requests.Session:
+        """Keep-alive session per worker thread."""
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def next_request(self) -> Tuple[str, str, str, Optional[Dict], Optional[Dict]]:
+        """Draw (endpoint, method, path, params, json) from the mix."""
+        endpoint = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        (start, end), = self.rng.choices(self.pairs, weights=self.pair_weights)
+        fmt = '{:.6f},{:.6f}'.format
+        if endpoint == 'route':
+            return endpoint, 'POST', '/api/route', None, {'start': fmt(*start), 'end': fmt(*end), 'routing_mode': 'auto'}
+        if endpoint == 'hazards':
+            lat, lon = start
+            return endpoint, 'GET', '/api/hazards/nearby', {'lat': lat, 'lon': lon, 'radius': 5}, None
+        if endpoint == 'multi_stop':
+            stops = [start] + self.rng.sample(self.points, self.rng.randint(1, 3)) + [end]
+            return endpoint, 'POST', '/api/multi-stop-route', None, {
+                'waypoints': [fmt(*p) for p in stops], 'routing_mode': 'auto'}
+        return endpoint, 'POST', '/api/batch', None, {'requests': [
+            {'id': 'route', 'endpoint': '/api/route', 'data': {'start': fmt(*start), 'end': fmt(*end)}},
+            {'id': 'hazards', 'endpoint': '/api/hazards/nearby', 'data': {'lat': start[0], 'lon': start[1]}},
+        ]}
+
+    def _send(self, endpoint: str, method: str, path: str, params: Optional[Dict], body: Optional[Dict],
+              scheduled: float) -> None:
+        ok = cached = False
+        try:
+            response = self.session().request(method, self.base_url + path, params=params, json=body,
+                                              timeout=self.timeout_s)
+            data = response.json() if response.headers.get('Content-Type', '').startswith('application/json') else {}
+            ok = response.status_code == 200 and data.get('success', True) is not False
+            cached = bool(data.get('cached'))
+        except (requests.RequestException, ValueError):
+            pass
+        # Latency counts from the scheduled send time, so queueing behind slow
+        # requests is measured instead of hidden (no coordinated omission)
+        latency = time.perf_counter() - scheduled
+        with self.lock:
+            self.samples.append((endpoint, latency, ok, cached))
+
+    def run(self) -> Dict:
+        """Send requests at the target rate for duration_s, then summarise."""
+        total = int(self.rps * self.duration_s)
+        print(f"[LoadTest] {total:,} requests at {self.rps:g} req/s over {self.duration_s:g}s "
+              f"({', '.join(f'{k} {v:.0%}' for k, v in self.mix.items())})")
+        self.samples = []
+        self.dropped = 0
+        inflight = threading.BoundedSemaphore(self.concurrency)
+
+        def task(*args):
+            try:
+                self._send(*args)
+            finally:
+                inflight.release()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='load') as pool:
+            for i in range(total):
+                scheduled = start + i / self.rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                request = self.next_request()
+                if not inflight.acquire(blocking=False):
+                    # Client saturated: record the miss instead of silently slowing the schedule
+                    self.dropped += 1
+                    continue
+                pool.submit(task, *request, scheduled)
+        elapsed = time.perf_counter() - start
+        return summarize(self.samples, elapsed, self.dropped)
+
+
+def summarize(samples: List[Tuple[str, float, bool, bool]], elapsed_s: float, dropped: int = 0) -> Dict:
+    """Per-endpoint and overall throughput, latency percentiles (ms), error and cache hit rates."""
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample[0], []).append(sample)
+    groups['all'] = list(samples)
+
+    report = {'elapsed_s': elapsed_s, 'dropped': dropped, 'endpoints': {}}
+    for endpoint, group in groups.items():
+        count = len(group)
+        errors = sum(1 for s in group if not s[2])
+        hits = sum(1 for s in group if s[3])
+        report['endpoints'][endpoint] = {
+            'requests': count,
+            'throughput_rps': count / elapsed_s if elapsed_s > 0 else 0.0,
+            'errors': errors,
+            'error_rate': errors / count if count else 0.0,
+            'cache_hits': hits,
+            'cache_hit_rate': hits / count if count else 0.0,
+            'latency_ms': percentiles([s[1] * 1000 for s in group]),
+        }
+    return report
+
+
+def build_fixture(db_file: str, nodes: int, seed: int) -> List[Tuple[float, float]]:
+    """Write a synthetic routing database and return request locations on it."""
+    from custom_router.synthetic import SyntheticNetworkGenerator
+
+    SyntheticNetworkGenerator(nodes=nodes, seed=seed).generate(db_file)
+    conn = sqlite3.connect(db_file)
+    points = conn.execute('SELECT lat, lon FROM nodes ORDER BY id').fetchall()
+    conn.close()
+    return random.Random(seed).sample(points, min(len(points), 2000))
+
+
+def start_app(db_file: Optional[str], engines: Dict[str, MockEngine], route_rate: int = 1000000):
+    """
+    Import voyagr_web pointed at the mock engines and serve it from a thread.
+
+    The engine URLs are read from the environment at import time, so this has
+    to run before anything else imports voyagr_web or routing_engines.
+
+    Returns:
+        (server, base_url)
+    """
+    from werkzeug.serving import make_server
+
+    os.environ['GRAPHHOPPER_URL'] = engines['graphhopper'].url
+    os.environ['VALHALLA_URL'] = engines['valhalla'].url
+    os.environ['OSRM_URL'] = engines['osrm'].url
+    os.environ['USE_CUSTOM_ROUTER'] = 'true' if db_file else 'false'
+    if db_file:
+        os.environ['CUSTOM_ROUTER_DB'] = db_file
+
+    import voyagr_web
+    if voyagr_web.GRAPHHOPPER_URL != engines['graphhopper'].url:
+        raise RuntimeError("voyagr_web was imported before the mock engines started")
+
+    # One client IP sends everything, so lift the per-IP limits
+    voyagr_web.route_limiter.max_requests = route_rate
+    voyagr_web.api_limiter.max_requests = route_rate
+    voyagr_web.route_cache.clear()
+    if db_file and voyagr_web.CUSTOM_ROUTER_AVAILABLE:
+        voyagr_web.init_custom_router()
+
+    server = make_server('127.0.0.1', 0, voyagr_web.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='voyagr-web', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def print_report(report: Dict, engines: Dict[str, MockEngine]) -> None:
+    print("\n" + "=" * 60)
+    print(f"RESULTS ({report['elapsed_s']:.1f}s, {report['dropped']} dropped at client)")
+    print("=" * 60)
+    print(f"{'endpoint':12s} {'req':>6s} {'req/s':>7s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'err':>6s} {'cache':>6s}")
+    for endpoint, stats in sorted(report['endpoints'].items(), key=lambda item: item[0] == 'all'):
+        latency = stats['latency_ms']
+        if not stats['requests']:
+            continue
+        print(f"{endpoint:12s} {stats['requests']:6d} {stats['throughput_rps']:7.1f} "
+              f"{latency['p50']:7.1f}ms {latency['p95']:7.1f}ms {latency['p99']:7.1f}ms "
+              f"{stats['error_rate']:6.1%} {stats['cache_hit_rate']:6.1%}")
+    print("\nMock engines:")
+    for name, engine in engines.items():
+        print(f"  - {name:12s} {engine.stats['requests']:6d} requests, {engine.stats['errors']} errors, "
+              f"{engine.stats['slow']} slow")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test voyagr_web against local mock routing engines')
+    parser.add_argument('--rps', type=float, default=20.0, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=30.0, help='Run length in seconds')
+    parser.add_argument('--mix', type=str, default=None,
+                        help='Endpoint weights, e.g. route=0.6,hazards=0.2,multi_stop=0.1,batch=0.1')
+    parser.add_argument('--pairs', type=int, default=200, help='Origin/destination pool size')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Skew of OD popularity (0 = uniform)')
+    parser.add_argument('--concurrency', type=int, default=64, help='Maximum requests in flight')
+    parser.add_argument('--nodes', type=int, default=5000, help='Synthetic custom router graph size')
+    parser.add_argument('--no-custom-router', action='store_true',
+                        help='Send every route to the mock engines')
+    parser.add_argument('--engine-latency', type=float, default=50.0, help='Median mock engine latency (ms)')
+    parser.add_argument('--engine-jitter', type=float, default=0.5, help='Log-normal sigma of engine latency')
+    parser.add_argument('--engine-errors', type=float, default=0.0, help='Fraction of engine requests failing')
+    parser.add_argument('--engine-slow', type=float, default=0.0, help='Fraction of very slow engine requests')
+    parser.add_argument('--engine-slow-ms', type=float, default=2000.0, help='Extra latency of slow requests')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--output', type=str, default=None, help='Write the JSON report here')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix) if args.mix else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("=" * 60)
+    print("VOYAGR WEB LOAD TEST")
+    print("=" * 60)
+
+    engines = {}
+    for index, kind in enumerate(ENGINES):
+        engines[kind] = MockEngine(kind, latency_ms=args.engine_latency, jitter=args.engine_jitter,
+                                   error_rate=args.engine_errors, slow_rate=args.engine_slow,
+                                   slow_ms=args.engine_slow_ms, seed=args.seed + index).start()
+        print(f"[LoadTest] Mock {kind} on {engines[kind].url}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, 'synthetic.db')
+        points = build_fixture(db_file, args.nodes, args.seed)
+        server, base_url = start_app(None if args.no_custom_router else db_file, engines)
+        print(f"[LoadTest] App on {base_url}")
+        try:
+            test = LoadTest(base_url, points, rps=args.rps, duration_s=args.duration, mix=mix,
+                            pairs=args.pairs, zipf=args.zipf, concurrency=args.concurrency, seed=args.seed)
+            report = test.run()
+        finally:
+            server.shutdown()
+            for engine in engines.values():
+                engine.stop()
+
+    report['config'] = vars(args)
+    report['engines'] = {name: dict(engine.stats) for name, engine in engines.items()}
+    print_report(report, engines)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Prometheus-compatible metrics registry
+Counters and fixed-bucket histograms keep per-thread shards, so recording
+takes no lock once a thread has its shard (a list index add plus a bisect
+for histograms). Shards are summed when /metrics is scraped, and shards of
+finished threads are folded into a retired total. Collectors add samples
+that already live elsewhere (cache sizes, router query histograms) at
+scrape time instead of on the request path.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency bucket upper bounds in seconds (Prometheus client defaults plus 25 ms and 2.5 s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Shards held before a new thread triggers folding of finished threads
+MAX_LIVE_SHARDS = 64
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# (sample name, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class _Shards:
+    """Per-thread value lists for one labelled series, summed on read."""
+
+    __slots__ = ('size', '_local', '_lock', '_live', '_retired')
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live = {}  # id(values) -> (thread, values)
+        self._retired = [0] * size
+
+    def values(self) -> List[float]:
+        """This thread's shard (created on first use)."""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0] * self.size
+            with self._lock:
+                if len(self._live) >= MAX_LIVE_SHARDS:
+                    self._fold_finished()
+                self._live[id(values)] = (threading.current_thread(), values)
+            self._local.values = values
+            return values
+
+    def _fold_finished(self) -> None:
+        for key, (thread, values) in list(self._live.items()):
+            if not thread.is_alive():
+                for i, value in enumerate(values):
+                    self._retired[i] += value
+                del self._live[key]
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            self._fold_finished()
+            totals = list(self._retired)
+            for _, values in self._live.values():
+                for i, value in enumerate(values):
+                    totals[i] += value
+        return totals
+
+
+class CounterChild:
+    __slots__ = ('_shards',)
+
+    def __init__(self, _metric=None):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._shards.values()[0] += amount
+
+    def get(self) -> float:
+        return self._shards.totals()[0]
+
+
+class HistogramChild:
+    __slots__ = ('buckets', '_shards')
+
+    def __init__(self, metric: 'Histogram'):
+        self.buckets = metric.buckets
+        # One slot per bucket, one for +Inf, one for the sum
+        self._shards = _Shards(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.values()
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def get(self) -> Tuple[List[int], float]:
+        """Per-bucket (non-cumulative) counts including +Inf, and the sum."""
+        totals = self._shards.totals()
+        return totals[:-1], totals[-1]
+
+
+class _Metric:
+    """A metric family with optional labels."""
+
+    kind = ''
+    child_class = None
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        """Series for one label combination; bind it once and reuse it on hot paths."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self.child_class(self))
+        return child
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter; exported with a _total suffix."""
+
+    kind = 'counter'
+    child_class = CounterChild
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def samples(self) -> List[Sample]:
+        return [(self.name + '_total', self._label_dict(key), child.get())
+                for key, child in sorted(self._children.items())]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram (bucket upper bounds in the observed unit)."""
+
+    kind = 'histogram'
+    child_class = HistogramChild
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> List[Sample]:
+        result = []
+        for key, child in sorted(self._children.items()):
+            counts, total = child.get()
+            result.extend(histogram_samples(self.name, self._label_dict(key), self.buckets, counts, total))
+        return result
+
+
+def histogram_samples(name: str, labels: Dict[str, str], buckets: Sequence[float], counts: Sequence[float],
+                      total: float) -> List[Sample]:
+    """Cumulative _bucket, _sum and _count samples from per-bucket counts (last count is +Inf)."""
+    result = []
+    cumulative = 0
+    for bound, count in zip(list(buckets) + [math.inf], counts):
+        cumulative += count
+        result.append((name + '_bucket', dict(labels, le=_format_value(bound)), cumulative))
+    result.append((name + '_sum', labels, total))
+    result.append((name + '_count', labels, cumulative))
+    return result
+
+
+class MetricsRegistry:
+    """Metric families and scrape-time collectors rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def collector(self, func: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> Callable:
+        """
+        Register a scrape-time collector (usable as a decorator).
+
+        The function yields (name, type, help, samples) families; a collector
+        that raises is skipped for that scrape.
+        """
+        with self._lock:
+            self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format 0.0.4."""
+        families = [(m.name, m.kind, m.help, m.samples()) for m in list(self._metrics.values())]
+        for collector in list(self._collectors):
+            try:
+                families.extend(collector())
+            except Exception:
+                continue
+
+        lines = []
+        for name, kind, help_text, samples in families:
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {_escape(help_text)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                if labels:
+                    label_text = ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                    lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{sample_name} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _escape_label(text: str) -> str:
+    return _escape(str(text)).replace('"', '\\"')
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Process-wide registry."""
+    return _registry
@@ -9,7 +9,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
-import sqlite3
+from query_profiler import connect as profiled_connect
 
 
 class MLCostPredictor:
@@ -18,7 +18,7 @@ class MLCostPredictor:
     def __init__(self, db_path='satnav.db'):
         """Initialize the cost predictor."""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.conn = profiled_connect(db_path)
         self.cursor = self.conn.cursor()
         self.cost_model = None
         self.min_samples = 15
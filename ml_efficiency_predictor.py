@@ -9,7 +9,7 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.ensemble import RandomForestRegressor
-import sqlite3
+from query_profiler import connect as profiled_connect
 
 
 class MLEfficiencyPredictor:
@@ -18,7 +18,7 @@ class MLEfficiencyPredictor:
     def __init__(self, db_path='satnav.db'):
         """Initialize the efficiency predictor."""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.conn = profiled_connect(db_path)
         self.cursor = self.conn.cursor()
         self.efficiency_model = None
         self.cost_model = None
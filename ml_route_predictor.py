@@ -10,7 +10,7 @@ from datetime import datetime, timedelta
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 from sklearn.ensemble import RandomForestRegressor
-import sqlite3
+from query_profiler import connect as profiled_connect
 
 
 class MLRoutePredictor:
@@ -19,7 +19,7 @@ class MLRoutePredictor:
     def __init__(self, db_path='satnav.db'):
         """Initialize the route predictor."""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.conn = profiled_connect(db_path)
         self.cursor = self.conn.cursor()
         self.scaler = StandardScaler()
         self.route_clusters = None
@@ -9,7 +9,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from sklearn.ensemble import IsolationForest
 from sklearn.linear_model import LinearRegression
-import sqlite3
+from query_profiler import connect as profiled_connect
 
 
 class MLTrafficPredictor:
@@ -18,7 +18,7 @@ class MLTrafficPredictor:
     def __init__(self, db_path='satnav.db'):
         """Initialize the traffic predictor."""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.conn = profiled_connect(db_path)
         self.cursor = self.conn.cursor()
         self.anomaly_detector = None
         self.traffic_model = None
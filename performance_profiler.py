@@ -36,7 +36,7 @@ class PerformanceProfiler:
         
         # Measure instruction generation
         start_time = time.time()
-        instructions = self.instruction_gen.generate(route['path_nodes'])
+        instructions = self.instruction_gen.generate_for_route(route)
         instr_time = (time.time() - start_time) * 1000
         
         # Measure cost calculation
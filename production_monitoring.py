@@ -10,8 +10,12 @@ from collections import defaultdict, deque
 from typing import Dict, List, Optional, Any
 import logging
 
+from latency_sketch import LatencyTracker
 from production_utils import LoggerFactory, ConfigManager, thread_safe, calculate_rate
 
+# Endpoints tracked separately; later ones share the 'other' series
+MAX_TRACKED_ENDPOINTS = 200
+
 
 class ProductionMonitor:
     """Comprehensive production monitoring for Voyagr PWA."""
@@ -27,18 +31,19 @@ class ProductionMonitor:
         self.cache_misses = 0
         self.start_time = datetime.now()
         
-        # Response time tracking (last 1000 requests)
-        self.response_times = deque(maxlen=1000)
+        # Response time sketches (ms): constant memory, 1m/5m/1h windows and all time
+        self.response_times = LatencyTracker()
+        self.endpoint_times = {}  # endpoint -> LatencyTracker
         
         # Engine performance tracking
         self.engine_stats = {
-            'graphhopper': {'success': 0, 'failure': 0, 'total_time': 0, 'response_times': deque(maxlen=100)},
-            'valhalla': {'success': 0, 'failure': 0, 'total_time': 0, 'response_times': deque(maxlen=100)},
-            'osrm': {'success': 0, 'failure': 0, 'total_time': 0, 'response_times': deque(maxlen=100)}
+            engine: {'success': 0, 'failure': 0, 'total_time': 0, 'response_times': LatencyTracker()}
+            for engine in ('graphhopper', 'valhalla', 'osrm')
         }
         
-        # Database query performance
-        self.db_queries = deque(maxlen=500)
+        # Database query performance (slow statements kept for inspection)
+        self.db_query_times = LatencyTracker()
+        self.slow_queries = deque(maxlen=50)
         
         # Error tracking
         self.errors_by_type = defaultdict(int)
@@ -75,7 +80,13 @@ class ProductionMonitor:
         """Log API request."""
         with self.lock:
             self.request_count += 1
-            self.response_times.append(response_time)
+            self.response_times.add(response_time)
+            tracker = self.endpoint_times.get(endpoint)
+            if tracker is None:
+                if len(self.endpoint_times) >= MAX_TRACKED_ENDPOINTS:
+                    endpoint = 'other'
+                tracker = self.endpoint_times.setdefault(endpoint, LatencyTracker())
+            tracker.add(response_time)
             
             if status_code >= 400:
                 self.error_count += 1
@@ -104,7 +115,7 @@ class ProductionMonitor:
                 else:
                     stats['failure'] += 1
                 stats['total_time'] += response_time
-                stats['response_times'].append(response_time)
+                stats['response_times'].add(response_time)
                 
                 self.logger.info(
                     f"Engine: {engine} - Success: {success} - Time: {response_time:.2f}ms"
@@ -113,13 +124,14 @@ class ProductionMonitor:
     def log_db_query(self, query, execution_time):
         """Log database query performance."""
         with self.lock:
-            self.db_queries.append({
-                'query': query[:100],  # First 100 chars
-                'time': execution_time,
-                'timestamp': datetime.now().isoformat()
-            })
+            self.db_query_times.add(execution_time)
             
             if execution_time > 1000:  # Log slow queries (>1s)
+                self.slow_queries.append({
+                    'query': query[:100],  # First 100 chars
+                    'time': execution_time,
+                    'timestamp': datetime.now().isoformat()
+                })
                 self.logger.warning(
                     f"Slow DB Query: {query[:50]}... - Time: {execution_time:.2f}ms"
                 )
@@ -137,15 +149,17 @@ class ProductionMonitor:
             self.logger.error(f"Error [{error_type}]: {error_message}")
     
     def get_metrics(self):
-        """Get current metrics."""
+        """Get current metrics.
+
+        Latency summaries (ms) come from fixed-size sketches, so the cost does
+        not grow with traffic. avg_response_time covers the last 5 minutes.
+        """
         with self.lock:
             uptime = datetime.now() - self.start_time
             uptime_seconds = uptime.total_seconds()
             
-            avg_response_time = (
-                sum(self.response_times) / len(self.response_times)
-                if self.response_times else 0
-            )
+            latency = self.response_times.summary()
+            avg_response_time = latency['5m']['mean']
             
             cache_hit_rate = (
                 (self.cache_hits / (self.cache_hits + self.cache_misses) * 100)
@@ -170,13 +184,17 @@ class ProductionMonitor:
                     if total_requests > 0 else 0
                 )
                 
+                engine_latency = stats['response_times'].summary()
                 engine_stats[engine] = {
                     'total_requests': total_requests,
                     'success': stats['success'],
                     'failure': stats['failure'],
                     'success_rate': round(success_rate, 2),
                     'avg_response_time': round(avg_time, 2),
-                    'recent_times': list(stats['response_times'])[-10:]
+                    'p50': engine_latency['5m']['p50'],
+                    'p95': engine_latency['5m']['p95'],
+                    'p99': engine_latency['5m']['p99'],
+                    'latency': engine_latency
                 }
             
             return {
@@ -187,6 +205,11 @@ class ProductionMonitor:
                 'total_errors': self.error_count,
                 'error_rate': round(error_rate, 2),
                 'avg_response_time': round(avg_response_time, 2),
+                'latency': latency,
+                'endpoint_latency': {endpoint: tracker.summary()
+                                     for endpoint, tracker in self.endpoint_times.items()},
+                'db_query_latency': self.db_query_times.summary(),
+                'slow_queries': list(self.slow_queries)[-10:],
                 'cache_hits': self.cache_hits,
                 'cache_misses': self.cache_misses,
                 'cache_hit_rate': round(cache_hit_rate, 2),
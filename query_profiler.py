@@ -0,0 +1,215 @@
+"""
+SQLite statement profiling
+ProfiledConnection is a sqlite3 connection factory whose cursors time every
+statement. Timings are aggregated per normalized statement (literals and
+IN lists folded into '?'), and the first time a statement runs slower than
+the threshold its EXPLAIN QUERY PLAN is captured, so tables read by a full
+scan show up in report() next to the statements that cause them.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this (ms) get their query plan captured
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '50'))
+
+# Distinct normalized statements tracked before the rest share one entry
+MAX_STATEMENTS = 500
+OTHER_STATEMENT = '<other>'
+
+DB_QUERY_LATENCY = get_registry().histogram(
+    'voyagr_db_query_duration_seconds', 'App database statement latency by operation', ('operation',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w?])\d+(?:\.\d+)?\b')  # not ?NNN parameters
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+# "SCAN cameras" (SQLite >= 3.36) or "SCAN TABLE cameras"; index scans say "USING ..."
+_TABLE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Statement text with literals replaced by '?' and whitespace collapsed."""
+    text = _STRING_LITERAL.sub('?', sql)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _WHITESPACE.sub(' ', text).strip().rstrip(';').strip()
+    return _PLACEHOLDER_LIST.sub('(?)', text)
+
+
+def statement_operation(sql: str) -> str:
+    """Leading SQL keyword, as a low-cardinality metrics label."""
+    keyword = sql.lstrip().split(None, 1)[0].lower() if sql.strip() else ''
+    return keyword if keyword in ('select', 'insert', 'update', 'delete', 'replace') else 'other'
+
+
+def full_scan_tables(plan: List[str]) -> List[str]:
+    """Tables read without an index according to EXPLAIN QUERY PLAN details."""
+    tables = []
+    for detail in plan:
+        match = _TABLE_SCAN.match(detail)
+        if match and 'USING' not in detail and match.group(1) not in ('CONSTANT', 'SUBQUERY'):
+            tables.append(match.group(1))
+    return tables
+
+
+class QueryProfiler:
+    """Per-statement timing aggregates with query plans of slow statements."""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, max_statements: int = MAX_STATEMENTS):
+        """
+        Initialize profiler.
+
+        Args:
+            slow_ms: Statements at or above this duration get EXPLAIN QUERY PLAN captured
+            max_statements: Distinct statements tracked before folding into '<other>'
+        """
+        self.slow_ms = slow_ms
+        self.max_statements = max_statements
+        self.lock = threading.Lock()
+        self.statements = {}  # normalized sql -> stats dict
+
+    def _entry(self, key: str) -> Dict:
+        entry = self.statements.get(key)
+        if entry is None:
+            if len(self.statements) >= self.max_statements:
+                key = OTHER_STATEMENT
+                entry = self.statements.get(key)
+            if entry is None:
+                entry = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow_count': 0, 'plan': None}
+                self.statements[key] = entry
+        return entry
+
+    def record(self, connection: sqlite3.Connection, sql: str, parameters: Any,
+               elapsed_ms: float, explain: bool = True) -> None:
+        """Add one execution; capture the plan the first time the statement is slow."""
+        key = normalize_sql(sql)
+        slow = elapsed_ms >= self.slow_ms
+        with self.lock:
+            entry = self._entry(key)
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            if elapsed_ms > entry['max_ms']:
+                entry['max_ms'] = elapsed_ms
+            if slow:
+                entry['slow_count'] += 1
+            needs_plan = slow and explain and entry['plan'] is None
+            if needs_plan:
+                entry['plan'] = []  # claimed; other threads skip the EXPLAIN
+        if needs_plan:
+            plan = self._explain(connection, sql, parameters)
+            with self.lock:
+                entry['plan'] = plan
+            scans = full_scan_tables(plan)
+            logger.warning(f"Slow query ({elapsed_ms:.1f}ms): {key[:120]}"
+                           + (f" - full scan of {', '.join(scans)}" if scans else ''))
+
+    @staticmethod
+    def _explain(connection: sqlite3.Connection, sql: str, parameters: Any) -> List[str]:
+        try:
+            # A plain cursor, so the EXPLAIN itself is not profiled
+            cursor = sqlite3.Cursor(connection)
+            try:
+                return [row[3] for row in cursor.execute('EXPLAIN QUERY PLAN ' + sql, parameters)]
+            finally:
+                cursor.close()
+        except sqlite3.Error as e:
+            return [f'EXPLAIN failed: {e}']
+
+    def report(self, limit: int = 20, sort: str = 'total_ms') -> Dict:
+        """
+        Statements ordered by total (or mean/max) time, plus the tables seen
+        in full scans and the statements causing them.
+        """
+        with self.lock:
+            rows = [dict(entry, sql=key, plan=list(entry['plan']) if entry['plan'] is not None else None)
+                    for key, entry in self.statements.items()]
+        for row in rows:
+            row['total_ms'] = round(row['total_ms'], 2)
+            row['max_ms'] = round(row['max_ms'], 2)
+            row['mean_ms'] = round(row['total_ms'] / row['count'], 2) if row['count'] else 0.0
+            row['full_scans'] = full_scan_tables(row['plan'] or [])
+        full_scans = {}
+        for row in rows:
+            for table in row['full_scans']:
+                full_scans.setdefault(table, []).append(row['sql'])
+        if sort not in ('total_ms', 'mean_ms', 'max_ms', 'count', 'slow_count'):
+            raise ValueError(f"Unknown sort key: {sort}")
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return {
+            'slow_ms': self.slow_ms,
+            'statements_tracked': len(rows),
+            'statements': rows[:limit],
+            'full_scans': full_scans,
+        }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.statements.clear()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor timing each statement into the connection's profiler and the DB latency histogram."""
+
+    def execute(self, sql: str, parameters: Any = ()) -> 'ProfiledCursor':
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_QUERY_LATENCY.labels(statement_operation(sql)).observe(elapsed)
+            self.connection.profiler.record(self.connection, sql, parameters, elapsed * 1000)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> 'ProfiledCursor':
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_QUERY_LATENCY.labels(statement_operation(sql)).observe(elapsed)
+            # The parameter sequence may be a spent iterator, so no plan here
+            self.connection.profiler.record(self.connection, sql, None, elapsed * 1000, explain=False)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors (and execute shortcuts) are ProfiledCursors."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profiler = _profiler
+
+    def cursor(self, factory: Any = ProfiledCursor) -> Any:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()) -> ProfiledCursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> ProfiledCursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(database: str, profiler: Optional[QueryProfiler] = None, **kwargs) -> ProfiledConnection:
+    """sqlite3.connect returning a ProfiledConnection (recording into the process-wide profiler by default)."""
+    conn = sqlite3.connect(database, factory=ProfiledConnection, **kwargs)
+    if profiler is not None:
+        conn.profiler = profiler
+    return conn
+
+
+_profiler = QueryProfiler()
+
+
+def get_query_profiler() -> QueryProfiler:
+    """Process-wide profiler."""
+    return _profiler
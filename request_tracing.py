@@ -0,0 +1,188 @@
+"""
+Per-request stage timing and sampled profiling
+RequestTrace records named spans (cache lookup, engine calls, cost
+calculation, ...) for the request being handled, rendered as a
+Server-Timing header. ProfileStore runs one in every N requests under a
+statistical stack sampler and keeps the results as collapsed stacks, which
+flamegraph.pl and speedscope render as flamegraphs.
+"""
+
+import contextvars
+import itertools
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+_current_trace = contextvars.ContextVar('request_trace', default=None)
+
+
+class RequestTrace:
+    """Named timing spans of one request; repeated spans accumulate."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = OrderedDict()  # name -> [total_ms, count]
+
+    def add(self, name: str, duration_ms: float) -> None:
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [duration_ms, 1]
+        else:
+            span[0] += duration_ms
+            span[1] += 1
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, spans in first-seen order then the total."""
+        parts = [f"{name};dur={total:.1f}" for name, (total, _) in self.spans.items()]
+        parts.append(f"total;dur={self.total_ms():.1f}")
+        return ', '.join(parts)
+
+    def to_dict(self) -> Dict:
+        return {
+            'total_ms': round(self.total_ms(), 2),
+            'spans': {name: {'ms': round(total, 2), 'count': count}
+                      for name, (total, count) in self.spans.items()},
+        }
+
+
+def start_trace() -> contextvars.Token:
+    """Begin tracing the current request; pass the token to end_trace."""
+    return _current_trace.set(RequestTrace())
+
+
+def end_trace(token: contextvars.Token) -> None:
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_span(name: str):
+    """Time a block as a span of the current request (no-op outside a request)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name):
+        yield
+
+
+def traced(name: str) -> Callable:
+    """Decorator recording every call of a function as a span."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with trace.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval_s: float = 0.005):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks = Counter()  # 'outer;...;inner' -> samples
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> 'SamplingProfiler':
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Samples 1 in N requests through SamplingProfiler and keeps the recent profiles."""
+
+    def __init__(self, sample_every: int = 0, keep: int = 50, interval_s: float = 0.005):
+        """
+        Initialize profile store.
+
+        Args:
+            sample_every: Profile one request in this many (0 disables profiling)
+            keep: Number of recent profiles kept for download
+            interval_s: Stack sampling interval
+        """
+        self.sample_every = sample_every
+        self.interval_s = interval_s
+        self.profiles = deque(maxlen=keep)
+        self.lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._ids = itertools.count(1)
+
+    def start(self) -> Optional[SamplingProfiler]:
+        """Start profiling the calling thread if this request is sampled."""
+        if self.sample_every <= 0 or next(self._counter) % self.sample_every:
+            return None
+        return SamplingProfiler(threading.get_ident(), self.interval_s).start()
+
+    def finish(self, profiler: SamplingProfiler, path: str, trace: Optional[RequestTrace] = None) -> int:
+        """Stop a profiler and store its stacks; returns the profile id."""
+        stacks = profiler.stop()
+        profile = {
+            'id': next(self._ids),
+            'path': path,
+            'timestamp': time.time(),
+            'samples': sum(stacks.values()),
+            'total_ms': round(trace.total_ms(), 2) if trace else None,
+            'stacks': stacks,
+        }
+        with self.lock:
+            self.profiles.append(profile)
+        return profile['id']
+
+    def list(self) -> List[Dict]:
+        with self.lock:
+            return [{k: v for k, v in profile.items() if k != 'stacks'} for profile in self.profiles]
+
+    def collapsed(self, profile_id: Optional[int] = None) -> Optional[str]:
+        """Collapsed stack lines ('frame;frame;frame count') for one profile, or all kept profiles merged."""
+        with self.lock:
+            profiles = [p for p in self.profiles if profile_id is None or p['id'] == profile_id]
+        if profile_id is not None and not profiles:
+            return None
+        merged = Counter()
+        for profile in profiles:
+            merged.update(profile['stacks'])
+        return ''.join(f"{stack} {count}\n" for stack, count in merged.most_common())
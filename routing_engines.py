@@ -11,12 +11,18 @@ import json
 from typing import Dict, List, Tuple, Optional
 from dotenv import load_dotenv
 
+from metrics import get_registry
+
 load_dotenv()
 
 # Configuration
 VALHALLA_URL = os.getenv('VALHALLA_URL', 'http://localhost:8002')
 GRAPHHOPPER_URL = os.getenv('GRAPHHOPPER_URL', 'http://localhost:8989')
-OSRM_URL = 'http://router.project-osrm.org/route/v1/driving'
+OSRM_URL = os.getenv('OSRM_URL', 'http://router.project-osrm.org') + '/route/v1/driving'
+
+# Shared with voyagr_web's fallback chain
+ENGINE_REQUESTS = get_registry().counter(
+    'voyagr_engine_requests', 'External routing engine requests by outcome', ('engine', 'outcome'))
 
 
 class RoutingEngineError(Exception):
@@ -223,16 +229,20 @@ class RoutingEngineManager:
                     result = engine.calculate_route(start_lat, start_lon, end_lat, end_lon, routing_mode)
                     if result:
                         self.stats[engine.name]['success'] += 1
+                        ENGINE_REQUESTS.labels(engine.name, 'success').inc()
                         return result
                     self.stats[engine.name]['failure'] += 1
+                    ENGINE_REQUESTS.labels(engine.name, 'failure').inc()
         
         # Try all engines in order
         for engine in self.engines:
             result = engine.calculate_route(start_lat, start_lon, end_lat, end_lon, routing_mode)
             if result:
                 self.stats[engine.name]['success'] += 1
+                ENGINE_REQUESTS.labels(engine.name, 'success').inc()
                 return result
             self.stats[engine.name]['failure'] += 1
+            ENGINE_REQUESTS.labels(engine.name, 'failure').inc()
         
         return None
     
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Local multi-process sharded routing demo.
+Partitions the routing database into geographic shards, starts one worker
+process per shard, and checks cross-shard routes against a single-process
+exact search on the full graph.
+
+Usage:
+    python run_sharded_router.py [--db data/uk_router.db] [--shards 4] [--routes 10]
+    python run_sharded_router.py --serve-shard 2 --port 7002   # remote worker
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from custom_router.graph import RoadNetwork
+from custom_router.sharding import (GraphPartitioner, ShardedRouter, path_cost,
+                                    serve_shard, shard_search)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sharded routing demo')
+    parser.add_argument('--db', type=str, default='data/uk_router.db',
+                        help='Path to routing database')
+    parser.add_argument('--shard-dir', type=str, default='data/shards',
+                        help='Output directory for shard databases')
+    parser.add_argument('--shards', type=int, default=4, help='Number of shards')
+    parser.add_argument('--routes', type=int, default=10, help='Random routes to check')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Processes used to build boundary cliques')
+    parser.add_argument('--skip-partition', action='store_true',
+                        help='Reuse existing shard databases')
+    parser.add_argument('--skip-verify', action='store_true',
+                        help='Do not load the full graph for verification')
+    parser.add_argument('--serve-shard', type=int, default=None,
+                        help='Run a single shard worker on --port instead of the demo')
+    parser.add_argument('--port', type=int, default=7000, help='Port for --serve-shard')
+    args = parser.parse_args()
+
+    overlay_db = os.path.join(args.shard_dir, 'overlay.db')
+
+    if args.serve_shard is not None:
+        serve_shard(overlay_db, args.serve_shard, ('0.0.0.0', args.port))
+        return
+
+    if not os.path.exists(args.db):
+        print(f"[ERROR] Database not found: {args.db}")
+        sys.exit(1)
+
+    print("=" * 70)
+    print("SHARDED ROUTER DEMO")
+    print("=" * 70)
+
+    if not args.skip_partition:
+        print(f"\n[1/3] Partitioning into {args.shards} shards...")
+        GraphPartitioner(args.db, args.shard_dir, args.shards).partition(processes=args.processes)
+
+    print("\n[2/3] Starting shard workers...")
+    start = time.time()
+    router = ShardedRouter(overlay_db)
+    print(f"[OK] Workers ready in {time.time() - start:.1f}s")
+
+    try:
+        full_graph = None if args.skip_verify else RoadNetwork(args.db)
+        rng = random.Random(42)
+        conn_nodes = []
+        if full_graph:
+            conn_nodes = [n for n, nbrs in full_graph.edges.items() if nbrs]
+
+        print(f"\n[3/3] Routing {args.routes} random pairs...")
+        mismatches = 0
+        for i in range(args.routes):
+            if full_graph:
+                a, b = rng.choice(conn_nodes), rng.choice(conn_nodes)
+                (lat1, lon1), (lat2, lon2) = full_graph.nodes[a], full_graph.nodes[b]
+            else:
+                lat1, lon1 = rng.uniform(50.5, 55.5), rng.uniform(-4.0, 0.5)
+                lat2, lon2 = rng.uniform(50.5, 55.5), rng.uniform(-4.0, 0.5)
+
+            route = router.route(lat1, lon1, lat2, lon2)
+            if not route or 'error' in route:
+                print(f"  Route {i + 1}: no route")
+                continue
+
+            line = (f"  Route {i + 1}: {route['distance_km']:.1f}km, "
+                    f"shards {route['shards_used']}, {route['response_time_ms']:.0f}ms")
+            if full_graph:
+                path = route['path_nodes']
+                dist, _ = shard_search(full_graph, path[0], target_node=path[-1])
+                exact = dist.get(path[-1], float('inf'))
+                ok = abs(path_cost(full_graph, path) - exact) <= 1e-6 * max(1.0, exact)
+                mismatches += 0 if ok else 1
+                line += " ✓" if ok else " ✗"
+            print(line)
+
+        print("\nPer-shard workers:")
+        for shard_id, stats in sorted(router.get_shard_stats().items()):
+            rss = f"{stats['rss_mb']:.0f}MB" if stats['rss_mb'] else 'n/a'
+            print(f"  Shard {shard_id} (pid {stats['pid']}): {stats['nodes']:,} nodes, "
+                  f"{stats['boundary_nodes']:,} boundary, RSS {rss}")
+        if full_graph:
+            print(f"\nVerification mismatches: {mismatches}")
+    finally:
+        router.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -18,7 +18,8 @@ from kivy.clock import Clock
 from kivy.graphics import Color, Rectangle
 from plyer import gps, notification, accelerometer
 from geopy.distance import geodesic
-import sqlite3
+from query_profiler import connect as profiled_connect
+from db_migrations import SATNAV_MIGRATIONS, apply_connection_pragmas, bbox_sql, enable_wal, has_rtree, migrate
 import time
 import threading
 import struct
@@ -441,7 +442,9 @@ class SatNavApp(App):
         self.waypoint_address_inputs = {}  # Store waypoint address inputs
 
         # Database setup
-        self.conn = sqlite3.connect('satnav.db')
+        self.conn = profiled_connect('satnav.db')
+        enable_wal(self.conn)
+        apply_connection_pragmas(self.conn)
         self.cursor = self.conn.cursor()
         self._init_database()
         self.load_settings()
@@ -867,6 +870,21 @@ class SatNavApp(App):
 
         self.conn.commit()
         self._create_database_indexes()
+        try:
+            migrate(self.conn, SATNAV_MIGRATIONS)
+        except Exception as e:
+            print(f"Database migration error: {e}")
+
+        # Bounding-box lookups use the R*Trees when this SQLite build could create them
+        self.cameras_bbox_sql = bbox_sql('cameras', 'id', 't.lat, t.lon, t.type, t.description',
+                                         rtree=has_rtree(self.conn, 'cameras'))
+        self.community_hazards_bbox_sql = bbox_sql(
+            'community_hazard_reports', 'id',
+            't.report_id, t.user_id, t.hazard_type, t.lat, t.lon, t.description, t.severity, '
+            't.verification_count, t.timestamp',
+            "t.status = 'active' AND t.expiry_timestamp > ?",
+            rtree=has_rtree(self.conn, 'community_hazard_reports'),
+        ) + ' ORDER BY t.verification_count DESC, t.timestamp DESC LIMIT 100'
         self._load_caz_data()
 
     def _create_database_indexes(self):
@@ -3243,13 +3261,7 @@ class SatNavApp(App):
 
             # Query reports within bounding box
             self.cursor.execute(
-                """SELECT report_id, user_id, hazard_type, lat, lon, description, severity,
-                          verification_count, timestamp
-                   FROM community_hazard_reports
-                   WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?
-                   AND status = 'active' AND expiry_timestamp > ?
-                   ORDER BY verification_count DESC, timestamp DESC
-                   LIMIT 100""",
+                self.community_hazards_bbox_sql,
                 (lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta,
                  int(time.time()))
             )
@@ -8769,7 +8781,7 @@ class SatNavApp(App):
 
             # Fetch speed cameras and traffic light cameras
             self.cursor.execute(
-                "SELECT lat, lon, type, description FROM cameras WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?",
+                self.cameras_bbox_sql,
                 (south, north, west, east)
             )
             for lat, lon, camera_type, desc in self.cursor.fetchall():
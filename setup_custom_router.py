@@ -4,7 +4,9 @@ Setup script for custom routing engine
 Downloads UK OSM data and builds the routing database
 """
 
+import argparse
 import os
+import sqlite3
 import sys
 import time
 from custom_router.osm_parser import OSMParser
@@ -15,6 +17,13 @@ from custom_router.cache import RouteCache
 
 def main():
     """Main setup function."""
+    arg_parser = argparse.ArgumentParser(description='Build the custom router database from UK OSM data')
+    arg_parser.add_argument('--location-index', choices=('sparse', 'dense'), default='sparse',
+                            help='Node location store used during import (dense is memory-mapped under data/)')
+    arg_parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes generating edges during import')
+    args = arg_parser.parse_args()
+
     print("=" * 60)
     print("CUSTOM ROUTING ENGINE - SETUP")
     print("=" * 60)
@@ -33,53 +42,31 @@ def main():
     else:
         print(f"OSM data already exists: {parser.pbf_file}")
     
-    # Step 2: Parse OSM data
-    print("\n[STEP 2] Parsing OSM data...")
+    # Step 2: Stream OSM data into the database (nodes, ways and edges in one pass)
+    print("\n[STEP 2] Importing OSM data...")
     print("This may take 5-15 minutes depending on your system...")
-    
-    nodes, ways, turn_restrictions = parser.parse_pbf()
-    
-    if not nodes or not ways:
-        print("ERROR: Failed to parse OSM data")
-        return False
-    
-    # Step 3: Create database
-    print("\n[STEP 3] Creating routing database...")
-    if not parser.create_database(nodes, ways, turn_restrictions):
-        print("ERROR: Failed to create database")
+
+    index_path = os.path.join(data_dir, 'node_locations') if args.location_index == 'dense' else None
+    stats = parser.import_pbf(index=args.location_index, index_path=index_path, processes=args.processes)
+
+    if not stats or not stats['ways_imported']:
+        print("ERROR: Failed to import OSM data")
         return False
-    
-    # Step 4: Load graph and build edges
-    print("\n[STEP 4] Building road network graph...")
-    graph = RoadNetwork(parser.db_file)
-    graph.build_edges_from_ways(ways)
 
-    # Save edges to database using batch inserts (much faster)
-    print("[STEP 4] Saving edges to database...")
-    import sqlite3
-    conn = sqlite3.connect(parser.db_file)
-    cursor = conn.cursor()
+    print(f"  - Ways: {stats['ways_imported']:,} routable of {stats['ways_seen']:,} "
+          f"({stats['ways_per_s']:,.0f} ways/s)")
+    print(f"  - Nodes: {stats['nodes_written']:,} referenced of {stats['nodes_seen']:,}")
+    print(f"  - Edges: {stats['edges']:,}")
+    print(f"  - Location index: {stats['location_index_mb']:.0f} MB")
+    if stats['peak_memory_mb'] is not None:
+        print(f"  - Peak memory: {stats['peak_memory_mb']:.0f} MB")
 
-    # Collect all edges into a list for batch insert
-    # IMPORTANT: build_edges_from_ways already creates bidirectional edges for non-oneway roads
-    edge_data_list = []
-    for from_node, neighbors in graph.edges.items():
-        for to_node, distance, speed_limit, way_id in neighbors:
-            edge_data_list.append((from_node, to_node, distance, speed_limit, way_id))
-
-    # Batch insert edges
-    print(f"[STEP 4] Inserting {len(edge_data_list):,} edges...")
-    cursor.executemany('''
-        INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id)
-        VALUES (?, ?, ?, ?, ?)
-    ''', edge_data_list)
-
-    conn.commit()
-    conn.close()
-    print(f"[STEP 4] Saved {len(edge_data_list):,} edges to database")
+    # Step 3: Load graph from the imported database
+    print("\n[STEP 3] Loading road network graph...")
+    graph = RoadNetwork(parser.db_file)
 
     # Verify bidirectional edges were created
-    print("[STEP 4] Verifying bidirectional edges...")
+    print("[STEP 3] Verifying bidirectional edges...")
     conn = sqlite3.connect(parser.db_file)
     cursor = conn.cursor()
     cursor.execute('SELECT COUNT(*) FROM edges')
@@ -106,8 +93,8 @@ def main():
     print(f"  - Ways: {stats['ways']:,}")
     print(f"  - Turn restrictions: {stats['turn_restrictions']:,}")
     
-    # Step 5: Test routing
-    print("\n[STEP 5] Testing routing engine...")
+    # Step 4: Test routing
+    print("\n[STEP 4] Testing routing engine...")
     router = Router(graph)
     instruction_gen = InstructionGenerator(graph)
     cache = RouteCache()
@@ -136,7 +123,7 @@ def main():
             print(f"  - Duration: {route['duration_minutes']:.1f} minutes")
 
             # Generate instructions
-            instructions = instruction_gen.generate(route['path_nodes'])
+            instructions = instruction_gen.generate_for_route(route)
             print(f"  - Turn instructions: {len(instructions)}")
 
             if instructions:
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark suite statistics and regression gating
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmark_suite import BenchmarkSuite, compare, flatten, make_od_pairs, percentiles
+from custom_router.graph import RoadNetwork
+from test_path_extraction import GRID, build_grid_db
+
+
+class TestStatistics(unittest.TestCase):
+    """Test percentile summaries and baseline comparison."""
+
+    def test_percentiles(self):
+        stats = percentiles([float(v) for v in range(1, 101)])
+        self.assertEqual((stats['p50'], stats['p95'], stats['p99'], stats['max']), (50.0, 95.0, 99.0, 100.0))
+        self.assertEqual(percentiles([]), {'count': 0})
+        self.assertEqual(percentiles([3.0])['p99'], 3.0)
+
+    def test_compare(self):
+        baseline = {'meta': {'seed': 1}, 'query': {'ch': {'short': {'p50': 10.0, 'p95': 20.0, 'count': 5}}},
+                    'snap': {'p50': 0.1}, 'load': {'graph_load_s': 2.0}}
+        current = {'meta': {'seed': 1}, 'query': {'ch': {'short': {'p50': 10.5, 'p95': 30.0, 'count': 5}}},
+                   'snap': {'p50': 0.4}, 'load': {'graph_load_s': 1.0}}
+        self.assertEqual(sorted(flatten(current)), ['load.graph_load_s', 'query.ch.short.p50',
+                                                    'query.ch.short.p95', 'snap.p50'])
+        regressions = compare(current, baseline, threshold=0.2)
+        # p50 within threshold, snap above threshold but under the noise floor
+        self.assertEqual([r['metric'] for r in regressions], ['query.ch.short.p95'])
+        self.assertAlmostEqual(regressions[0]['change_pct'], 50.0)
+        self.assertEqual(compare(current, baseline, threshold=1.0), [])
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test a full run on a small grid."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        build_grid_db(self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_od_pairs_are_fixed(self):
+        graph = RoadNetwork(self.db_file)
+        pairs = make_od_pairs(graph, 4, seed=3)
+        self.assertEqual(pairs, make_od_pairs(graph, 4, seed=3))
+        self.assertEqual(list(pairs), ['short'])
+        self.assertEqual(len(pairs['short']), 4)
+
+    def test_run(self):
+        results = BenchmarkSuite(self.db_file, per_band=3, warmup=1, use_ch=False, matrix_size=3).run()
+        self.assertEqual(results['meta']['nodes'], GRID * GRID)
+        self.assertEqual(results['query']['dijkstra']['short']['count'], 3)
+        self.assertEqual(results['query']['dijkstra']['short']['failures'], 0)
+        self.assertNotIn('ch', results['query'])
+        self.assertEqual(results['snap']['count'], 3)
+        self.assertEqual(results['matrix']['size'], 3)
+        self.assertGreater(results['load']['graph_load_s'], 0)
+        self.assertEqual(compare(results, results, threshold=0.0), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
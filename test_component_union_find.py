@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for union-find component analysis and the on-disk label cache
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router import component_analyzer
+from custom_router.component_analyzer import ComponentAnalyzer
+from custom_router.graph import RoadNetwork
+from custom_router.osm_parser import OSMParser
+
+
+def build_islands_db(db_file):
+    """Create three islands: a 4-node loop, a 2-node pair and an isolated node."""
+    parser = OSMParser(data_dir=os.path.dirname(db_file))
+    parser.db_file = db_file
+    nodes = {i: {'lat': 53.0 + i * 0.001, 'lon': -1.5} for i in range(1, 8)}
+    ways = {1: {'name': 'Loop Road', 'highway': 'residential', 'speed_limit': 30, 'nodes': []}}
+    parser.create_database(nodes, ways, [])
+
+    # 1->2->3->4->1 one way only, 5<->6, 7 isolated
+    edges = [(1, 2), (2, 3), (3, 4), (4, 1), (5, 6), (6, 5)]
+    conn = sqlite3.connect(db_file)
+    for a, b in edges:
+        conn.execute('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id) '
+                     'VALUES (?, ?, ?, ?, ?)', (a, b, 100.0, 30, 1))
+    conn.commit()
+    conn.close()
+    return nodes
+
+
+class TestUnionFind(unittest.TestCase):
+    """Test component labels computed with union-find."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'islands.db')
+        build_islands_db(self.db_file)
+        self.graph = RoadNetwork(self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def assert_islands(self, analyzer):
+        self.assertEqual(analyzer.main_component_id, 0)
+        self.assertEqual(analyzer.main_component_size, 4)
+        self.assertEqual(sorted(analyzer.component_sizes.values()), [1, 2, 4])
+        self.assertEqual({analyzer.get_component_id(n) for n in (1, 2, 3, 4)}, {0})
+        self.assertTrue(analyzer.is_connected(1, 3))
+        self.assertFalse(analyzer.is_connected(1, 5))
+        self.assertFalse(analyzer.is_connected(6, 7))
+        self.assertEqual(analyzer.get_component_id(999), -1)
+        self.assertTrue(analyzer.is_connected(1, 999))
+
+    def test_numpy_labels(self):
+        """Vectorized union-find groups nodes and ranks components by size."""
+        analyzer = ComponentAnalyzer(self.graph)
+        stats = analyzer.analyze_union_find()
+        self.assertEqual(stats['total_nodes'], 7)
+        self.assertEqual(stats['total_components'], 3)
+        self.assert_islands(analyzer)
+
+    def test_python_fallback_matches(self):
+        """Pure-Python union-find gives the same labels without numpy."""
+        has_numpy = component_analyzer.HAS_NUMPY
+        component_analyzer.HAS_NUMPY = False
+        try:
+            analyzer = ComponentAnalyzer(self.graph)
+            analyzer.analyze_union_find()
+        finally:
+            component_analyzer.HAS_NUMPY = has_numpy
+        self.assertIsNone(analyzer.labels)
+        self.assert_islands(analyzer)
+
+    def test_graph_delegates_to_analyzer(self):
+        """RoadNetwork connectivity checks use the array labels."""
+        analyzer = ComponentAnalyzer(self.graph)
+        analyzer.analyze_union_find()
+        self.graph.set_component_analyzer(analyzer)
+        self.assertTrue(self.graph.is_in_main_component(2))
+        self.assertFalse(self.graph.is_connected(4, 6))
+
+
+@unittest.skipUnless(component_analyzer.HAS_NUMPY, "numpy not installed")
+class TestComponentCache(unittest.TestCase):
+    """Test saving and reloading component labels next to the graph."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'islands.db')
+        build_islands_db(self.db_file)
+        self.graph = RoadNetwork(self.db_file)
+        self.cache_file = ComponentAnalyzer.cache_path(self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_analyze_cached_round_trip(self):
+        """First call computes and saves; second call loads the same labels."""
+        ComponentAnalyzer(self.graph).analyze_cached()
+        self.assertTrue(os.path.exists(self.cache_file))
+
+        analyzer = ComponentAnalyzer(self.graph)
+        self.assertTrue(analyzer.load(self.cache_file))
+        self.assertEqual(analyzer.analysis_mode, 'union_find')
+        self.assertEqual(analyzer.main_component_size, 4)
+        self.assertFalse(analyzer.is_connected(1, 7))
+
+    def test_stale_cache_rejected(self):
+        """A cache saved for a different graph is ignored."""
+        ComponentAnalyzer(self.graph).analyze_cached()
+        self.graph.add_edge(7, (1, 100.0, 30, 1))
+        analyzer = ComponentAnalyzer(self.graph)
+        self.assertFalse(analyzer.load(self.cache_file))
+
+        analyzer.analyze_cached()
+        self.assertTrue(analyzer.is_connected(1, 7))
+
+    def test_missing_cache(self):
+        """Loading a missing file returns False."""
+        self.assertFalse(ComponentAnalyzer(self.graph).load(self.cache_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
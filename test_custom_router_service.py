@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for the routing service daemon and its binary socket protocol
+"""
+
+import math
+import os
+import shutil
+import socket
+import struct
+import tempfile
+import unittest
+
+import custom_router_service
+from custom_router.access import RESTRICT_HGV
+from custom_router_service import (OP_MATRIX, OP_ROUTE, STATUS_BAD_REQUEST, STATUS_OK,
+                                   RouterClient, RouterService, ServiceError, pack_coords, request_flags)
+from test_path_extraction import GRID, build_grid_db
+
+
+class TestRouterService(unittest.TestCase):
+    """Test route, matrix and snap requests over a local socket."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.db_file = os.path.join(cls.tmp_dir, 'grid.db')
+        cls.nodes = build_grid_db(cls.db_file)
+        cls.service = RouterService(cls.db_file, use_ch=False, workers=2)
+        if hasattr(socket, 'AF_UNIX'):
+            cls.address = cls.service.start(os.path.join(cls.tmp_dir, 'router.sock'))
+        else:
+            cls.address = cls.service.start(('127.0.0.1', 0))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.stop()
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def setUp(self):
+        self.client = RouterClient(self.address)
+
+    def tearDown(self):
+        self.client.close()
+
+    def point(self, node_id):
+        return self.nodes[node_id]['lat'], self.nodes[node_id]['lon']
+
+    def test_route_matches_in_process(self):
+        """A route over the socket equals the in-process result."""
+        start, end = self.point(1), self.point(GRID * GRID)
+        remote = self.client.route(*start, *end)
+        local = self.service.route(*start, *end)
+        self.assertAlmostEqual(remote['distance_m'], local['distance_m'], places=6)
+        self.assertAlmostEqual(remote['duration_s'], local['duration_s'], places=6)
+        self.assertEqual(len(remote['coordinates']), len(local['coordinates']))
+        self.assertAlmostEqual(remote['coordinates'][-1][0], local['coordinates'][-1][0], places=6)
+
+    def test_pipelined_routes_keep_order(self):
+        """Pipelined requests are answered against the right request ids."""
+        pairs = [(*self.point(1), *self.point(n)) for n in (2, GRID, GRID * GRID, GRID + 1)]
+        routes = self.client.route_many(pairs)
+        expected = [self.service.route(*pair)['distance_m'] for pair in pairs]
+        self.assertEqual([round(r['distance_m'], 3) for r in routes], [round(d, 3) for d in expected])
+
+    def test_matrix(self):
+        """Matrix cells equal the duration and distance of the matching route."""
+        points = [self.point(n) for n in (1, GRID, GRID * GRID)]
+        result = self.client.matrix(points, points)
+        for i, source in enumerate(points):
+            self.assertEqual(result['durations'][i][i], 0.0)
+            for j, target in enumerate(points):
+                if i == j:
+                    continue
+                route = self.service.route(*source, *target)
+                self.assertAlmostEqual(result['distances'][i][j], route['distance_m'], delta=0.01)
+                self.assertAlmostEqual(result['durations'][i][j], route['duration_s'], delta=0.01)
+
+    def test_matrix_unreachable(self):
+        """Points that snap to nothing give inf cells."""
+        result = self.client.matrix([self.point(1)], [(10.0, 10.0)])
+        self.assertTrue(math.isinf(result['durations'][0][0]))
+
+    def test_vehicle_restrictions(self):
+        """Route and matrix requests skip edges closed to the requested vehicle."""
+        graph = self.service.graph
+        start, end = self.point(1), self.point(GRID * GRID)
+        # Close every edge into the end node; its own edges stay open so it is still snapped to
+        incoming = [(node, i) for node in list(graph.edges)
+                    for i, edge in enumerate(graph.get_neighbors(node)) if edge[0] == GRID * GRID]
+        try:
+            for node, i in incoming:
+                graph._set_edge_restrictions(node, i, RESTRICT_HGV)
+            self.assertNotIn('error', self.client.route(*start, *end, vehicle='van'))
+            self.assertIn('error', self.client.route(*start, *end, vehicle='truck'))
+            self.assertTrue(math.isinf(self.client.matrix([start], [end], vehicle='truck')['durations'][0][0]))
+            self.assertFalse(math.isinf(self.client.matrix([start], [end], vehicle='van')['durations'][0][0]))
+        finally:
+            for node, i in incoming:
+                graph._set_edge_restrictions(node, i, 0)
+        try:
+            # A node whose every edge is closed to trucks is never a truck endpoint
+            for i in range(len(graph.get_neighbors(1))):
+                graph._set_edge_restrictions(1, i, RESTRICT_HGV)
+            self.assertEqual(self.client.snap([start], vehicle='van')[0]['node_id'], 1)
+            self.assertNotEqual(self.client.snap([start], vehicle='truck')[0]['node_id'], 1)
+        finally:
+            for i in range(len(graph.get_neighbors(1))):
+                graph._set_edge_restrictions(1, i, 0)
+        with self.assertRaises(ValueError):
+            request_flags('car', 'tank')
+        status, _ = self.client.pipeline([(OP_ROUTE, 0xF1, pack_coords([start, end]))])[0]
+        self.assertEqual(status, STATUS_BAD_REQUEST)
+
+    def test_snap(self):
+        """Snapping returns the nearest node; far away points return None."""
+        lat, lon = self.point(8)
+        snapped = self.client.snap([(lat + 0.00001, lon), (10.0, 10.0)])
+        self.assertEqual(snapped[0]['node_id'], 8)
+        self.assertAlmostEqual(snapped[0]['lat'], lat, places=6)
+        self.assertIsNone(snapped[1])
+
+    def test_bad_requests(self):
+        """Malformed frames get an error status without closing the connection."""
+        answers = self.client.pipeline([
+            (OP_ROUTE, 1, b'\x00\x01'),
+            (OP_MATRIX, 1, struct.pack('<HH', 2, 2) + pack_coords([self.point(1)])),
+            (99, 0, b''),
+            (OP_ROUTE, 1, pack_coords([self.point(1), self.point(2)])),
+        ])
+        self.assertEqual([status for status, _ in answers],
+                         [STATUS_BAD_REQUEST, STATUS_BAD_REQUEST, STATUS_BAD_REQUEST, STATUS_OK])
+        with self.assertRaises(ServiceError):
+            self.client.matrix([self.point(1)] * 101, [self.point(2)] * 100)
+
+    def test_info_and_ping(self):
+        """Info reports the graph and request counters."""
+        self.assertGreaterEqual(self.client.ping(), 0.0)
+        info = self.client.info()
+        self.assertEqual(info['nodes'], GRID * GRID)
+        self.assertGreaterEqual(info['ops']['ping']['requests'], 1)
+
+    def test_shared_in_process_service(self):
+        """initialize_router loads once per database."""
+        saved = custom_router_service._service
+        try:
+            custom_router_service._service = None
+            self.assertIsNone(custom_router_service.get_router_service())
+            service = custom_router_service.initialize_router(self.db_file, use_ch=False)
+            self.assertIs(custom_router_service.initialize_router(self.db_file), service)
+            self.assertIs(custom_router_service.get_router_service(), service)
+            self.assertEqual(len(service.graph.nodes), GRID * GRID)
+            service.executor.shutdown()
+        finally:
+            custom_router_service._service = saved
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for versioned schema migrations and the index benchmark
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import benchmark_db_indexes
+from db_migrations import (VOYAGR_WEB_MIGRATIONS, apply_connection_pragmas, bbox_sql, enable_wal, has_rtree, migrate,
+                           rtree_statements, schema_version)
+
+
+class TestMigrations(unittest.TestCase):
+    """Test that migrations apply once, in order and atomically."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.tmp_dir, 'test.db'))
+        self.conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, lat REAL)')
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def indexes(self):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+    def test_apply_once_in_order(self):
+        migrations = [
+            (1, 'name index', ('CREATE INDEX IF NOT EXISTS idx_items_name ON items (name)',)),
+            (2, 'lat index', ('CREATE INDEX IF NOT EXISTS idx_items_lat ON items (lat)',)),
+        ]
+        self.assertEqual(migrate(self.conn, migrations[:1]), [1])
+        self.assertEqual(migrate(self.conn, migrations), [2])
+        self.assertEqual(migrate(self.conn, migrations), [])
+        self.assertEqual(schema_version(self.conn), 2)
+        self.assertEqual(self.indexes(), {'idx_items_name', 'idx_items_lat'})
+        # ANALYZE ran after the new migrations
+        self.assertTrue(self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone())
+
+    def test_failed_migration_rolls_back(self):
+        migrations = [
+            (1, 'ok', ('CREATE INDEX idx_items_name ON items (name)',)),
+            (2, 'broken', ('CREATE INDEX idx_items_lat ON items (lat)', 'CREATE INDEX idx_x ON missing (x)')),
+        ]
+        with self.assertRaises(sqlite3.OperationalError):
+            migrate(self.conn, migrations)
+        self.assertEqual(schema_version(self.conn), 1)
+        self.assertEqual(self.indexes(), {'idx_items_name'})
+
+        with self.assertRaises(ValueError):
+            migrate(self.conn, [(2, 'b', ()), (1, 'a', ())])
+
+    def test_wal_and_pragmas(self):
+        self.assertEqual(enable_wal(self.conn), 'wal')
+        apply_connection_pragmas(self.conn)
+        self.assertEqual(self.conn.execute('PRAGMA synchronous').fetchone()[0], 1)  # NORMAL
+        self.assertEqual(self.conn.execute('PRAGMA busy_timeout').fetchone()[0], 5000)
+
+
+class TestRtree(unittest.TestCase):
+    """Test that the R*Tree triggers keep bounding-box lookups in sync with the table."""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('CREATE TABLE reports (report_id INTEGER PRIMARY KEY, lat REAL, lon REAL, status TEXT)')
+        self.conn.executemany('INSERT INTO reports (lat, lon, status) VALUES (?, ?, ?)',
+                              [(51.5, -0.12, 'active'), (51.6, -0.2, 'resolved'), (53.0, -1.5, 'active')])
+        migrate(self.conn, [(1, 'rtree', rtree_statements('reports', 'report_id', "{row}status = 'active'",
+                                                          ('status',)))])
+        self.rtree_sql = bbox_sql('reports', 'report_id', 't.report_id', "t.status = 'active'")
+        self.between_sql = bbox_sql('reports', 'report_id', 't.report_id', "t.status = 'active'", rtree=False)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def lookup(self, box):
+        ids = sorted(row[0] for row in self.conn.execute(self.rtree_sql, box))
+        self.assertEqual(ids, sorted(row[0] for row in self.conn.execute(self.between_sql, box)))
+        return ids
+
+    def test_triggers_keep_rtree_in_sync(self):
+        london = (51.4, 51.7, -0.3, 0.0)
+        self.assertTrue(has_rtree(self.conn, 'reports'))
+        self.assertEqual(self.lookup(london), [1])
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM reports_rtree').fetchone()[0], 2)
+
+        self.conn.execute("UPDATE reports SET status = 'active' WHERE report_id = 2")
+        self.conn.execute('UPDATE reports SET lat = 51.45, lon = -0.1 WHERE report_id = 3')
+        self.conn.execute("INSERT INTO reports (lat, lon, status) VALUES (51.55, -0.15, 'active')")
+        self.assertEqual(self.lookup(london), [1, 2, 3, 4])
+
+        self.conn.execute("UPDATE reports SET status = 'resolved' WHERE report_id = 1")
+        self.conn.execute('DELETE FROM reports WHERE report_id = 2')
+        self.assertEqual(self.lookup(london), [3, 4])
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM reports_rtree').fetchone()[0], 2)
+
+    def test_exact_bounds(self):
+        # The R*Tree rounds to 32-bit floats; a box edge just short of a point excludes it
+        self.assertEqual(self.lookup((51.5, 51.5, -0.12, -0.12)), [1])
+        self.assertEqual(self.lookup((51.5000001, 52.0, -0.3, 0.0)), [])
+        self.assertFalse(has_rtree(self.conn, 'cameras'))
+
+
+class TestVoyagrWebIndexes(unittest.TestCase):
+    """Test the app migrations against the real schema via the benchmark."""
+
+    def test_hot_queries_use_indexes(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            counts = {'cameras': 3000, 'reports': 500, 'route_cache': 500, 'hazard_cache': 100, 'trips': 300}
+            results = benchmark_db_indexes.run(counts, queries=5, warmup=1, seed=3,
+                                               db_path=os.path.join(tmp_dir, 'bench.db'))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.assertEqual(results['migrations_applied'], [version for version, _, _ in VOYAGR_WEB_MIGRATIONS])
+        queries = results['queries']
+        self.assertEqual(queries['cameras_route_bbox']['before']['plan'], ['SCAN cameras'])
+        self.assertIn('SCAN cameras_rtree VIRTUAL TABLE', queries['cameras_route_bbox']['after']['plan'][-1])
+        self.assertIn('SCAN community_hazard_reports_rtree VIRTUAL TABLE',
+                      queries['hazard_reports_bbox']['after']['plan'][-1])
+        for name, result in queries.items():
+            self.assertFalse(any(detail.startswith('SCAN') and 'INDEX' not in detail
+                                 for detail in result['after']['plan']), (name, result['after']['plan']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests for regional extracts and binary graph snapshots
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.dijkstra import Router
+from custom_router.extract import Region, RegionExtractor
+from custom_router.graph import HAS_NUMPY, RoadNetwork
+from custom_router.osm_updater import OSMChange, OSMUpdater
+from test_osm_updater import NODES, WAYS, build_db
+from test_path_extraction import GRID, build_grid_db
+
+POLY = """sheffield
+outer
+   -1.6 53.3
+   -1.3 53.3
+   -1.3 53.5
+   -1.6 53.5
+END
+!hole
+   -1.5 53.35
+   -1.4 53.35
+   -1.4 53.45
+   -1.5 53.45
+END
+END
+"""
+
+
+class TestRegion(unittest.TestCase):
+    """Test bounding box and polygon regions."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_bbox_and_city(self):
+        region = Region.parse('53.0,-1.5,53.1,-1.4')
+        self.assertTrue(region.contains(53.05, -1.45))
+        self.assertFalse(region.contains(53.2, -1.45))
+        self.assertTrue(Region.parse('Doncaster').contains(53.52, -1.13))
+        with self.assertRaises(ValueError):
+            Region.parse('atlantis')
+        with self.assertRaises(ValueError):
+            Region.parse('53.1,-1.5,53.0,-1.4')
+
+    def test_poly_with_hole(self):
+        path = os.path.join(self.tmp_dir, 'sheffield.poly')
+        with open(path, 'w') as f:
+            f.write(POLY)
+        region = Region.from_file(path)
+        self.assertEqual(region.name, 'sheffield')
+        self.assertTrue(region.contains(53.32, -1.55))
+        self.assertFalse(region.contains(53.40, -1.45))  # inside the hole
+        self.assertFalse(region.contains(53.60, -1.45))
+
+    def test_geojson_triangle(self):
+        path = os.path.join(self.tmp_dir, 'area.geojson')
+        with open(path, 'w') as f:
+            json.dump({'type': 'Feature', 'geometry': {
+                'type': 'Polygon', 'coordinates': [[[0.0, 50.0], [1.0, 50.0], [0.0, 51.0], [0.0, 50.0]]]}}, f)
+        region = Region.from_file(path)
+        self.assertTrue(region.contains(50.2, 0.2))
+        self.assertFalse(region.contains(50.9, 0.9))  # inside the bbox, outside the triangle
+
+
+class TestRegionExtractor(unittest.TestCase):
+    """Test extracting part of a grid database."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(self.db_file)
+        # Two-node island inside the extract area
+        conn = sqlite3.connect(self.db_file)
+        conn.executemany('INSERT INTO nodes (id, lat, lon) VALUES (?, ?, ?)',
+                         [(900, 53.001, -1.4985), (901, 53.001, -1.4975)])
+        conn.executemany('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id) '
+                         'VALUES (?, ?, 70.0, 30, 20)', [(900, 901), (901, 900)])
+        conn.commit()
+        conn.close()
+        # Left three columns of the grid
+        self.region = Region.from_bbox(52.999, -1.501, 53.0 + GRID * 0.002, -1.5 + 2 * 0.003 + 0.0005)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def point(self, node_id):
+        return self.nodes[node_id]['lat'], self.nodes[node_id]['lon']
+
+    def test_extract_is_routable(self):
+        output = os.path.join(self.tmp_dir, 'left.db')
+        stats = RegionExtractor(self.db_file).extract(self.region, output, snapshot=False)
+        self.assertEqual(stats['nodes'], GRID * 3)
+        self.assertEqual(stats['dropped_nodes'], 2)
+        self.assertIsNone(stats['snapshot'])
+
+        conn = sqlite3.connect(output)
+        columns = {row[0] % GRID for row in conn.execute('SELECT from_node_id - 1 FROM edges')}
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        self.assertEqual(columns, {0, 1, 2})
+        self.assertIn('idx_edges_from', indexes)
+
+        full = Router(RoadNetwork(self.db_file), use_ch=False, db_file=self.db_file)
+        part = Router(RoadNetwork(output), use_ch=False, db_file=output)
+        start, end = self.point(1), self.point((GRID - 1) * GRID + 3)
+        self.assertAlmostEqual(part.route(*start, *end)['distance_m'], full.route(*start, *end)['distance_m'])
+
+    def test_keep_fragments(self):
+        output = os.path.join(self.tmp_dir, 'left.db')
+        stats = RegionExtractor(self.db_file).extract(self.region, output, main_component=False,
+                                                      snapshot=False)
+        self.assertEqual(stats['nodes'], GRID * 3 + 2)
+        self.assertEqual(stats['dropped_nodes'], 0)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_extract_writes_snapshot(self):
+        output = os.path.join(self.tmp_dir, 'left.db')
+        stats = RegionExtractor(self.db_file).extract(self.region, output)
+        self.assertEqual(stats['snapshot'], RoadNetwork.snapshot_path(output))
+        graph = RoadNetwork(output, snapshot=stats['snapshot'])
+        self.assertEqual(len(graph.nodes), GRID * 3)
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestGraphSnapshot(unittest.TestCase):
+    """Test that a snapshot round-trips the loaded graph."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        db_file = os.path.join(self.tmp_dir, 'router.db')
+        build_db(db_file, NODES, WAYS)
+        conn = sqlite3.connect(db_file)
+        conn.execute("INSERT INTO turn_restrictions (from_way_id, to_way_id, restriction_type) "
+                     "VALUES (100, 200, 'no_left_turn')")
+        conn.execute('UPDATE edges SET restrictions = 3 WHERE way_id = 300')
+        conn.commit()
+        conn.close()
+
+        graph = RoadNetwork(db_file)
+        path = RoadNetwork.snapshot_path(db_file)
+        self.assertTrue(graph.save_snapshot(path))
+        loaded = RoadNetwork(db_file, snapshot=path)
+
+        self.assertEqual(loaded.nodes, graph.nodes)
+        self.assertEqual(dict(loaded.edges), {n: e for n, e in graph.edges.items() if e})
+        self.assertEqual(loaded.edge_access, graph.edge_access)
+        self.assertEqual(loaded.edge_restrictions, graph.edge_restrictions)
+        self.assertEqual(loaded.ways, graph.ways)
+        self.assertEqual(loaded.turn_restrictions, {(100, 200): 'no_left_turn'})
+        self.assertIsNotNone(loaded.find_nearest_node(*NODES[3]))
+
+    def test_stale_snapshot_falls_back(self):
+        db_file = os.path.join(self.tmp_dir, 'router.db')
+        build_db(db_file, NODES, WAYS)
+        path = RoadNetwork.snapshot_path(db_file)
+        self.assertTrue(RoadNetwork(db_file).save_snapshot(path))
+        change = OSMChange()
+        change.delete_node(5)
+        OSMUpdater(db_file).apply(change)
+
+        graph = RoadNetwork(db_file, snapshot=path)
+        self.assertEqual(graph.version, 1)
+        self.assertNotIn(5, graph.nodes)
+
+    def test_missing_snapshot_falls_back(self):
+        db_file = os.path.join(self.tmp_dir, 'router.db')
+        build_db(db_file, NODES, WAYS)
+        graph = RoadNetwork(db_file, snapshot=os.path.join(self.tmp_dir, 'missing.npz'))
+        self.assertEqual(len(graph.nodes), len(NODES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory hazard index and vectorized route scoring
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from custom_router.router_holder import RouterHolder
+from db_migrations import VOYAGR_WEB_MIGRATIONS, hazard_data_version, migrate
+from hazard_index import HazardIndex, SharedHazardIndex
+from hazard_service import HazardService
+from test_path_extraction import GRID, build_grid_db
+
+PREFERENCES = {
+    'speed_camera': {'penalty': 30, 'threshold': 100},
+    'traffic_light_camera': {'penalty': 1200, 'threshold': 100},
+    'police': {'penalty': 180, 'threshold': 200},
+    'roadworks': {'penalty': 300, 'threshold': 500},
+}
+
+
+def brute_force_distance(lat, lon, route):
+    """Haversine distance to the route, minimized along each segment by ternary search."""
+    best = float('inf')
+    for (lat1, lon1), (lat2, lon2) in zip(route, route[1:]):
+        def distance(t):
+            return HazardService.get_distance_between_points(lat, lon, lat1 + (lat2 - lat1) * t,
+                                                             lon1 + (lon2 - lon1) * t)
+        low, high = 0.0, 1.0
+        for _ in range(60):
+            third = (high - low) / 3
+            if distance(low + third) < distance(high - third):
+                high -= third
+            else:
+                low += third
+        best = min(best, distance(low), distance(0.0), distance(1.0))
+    return best
+
+
+class TestHazardIndex(unittest.TestCase):
+    """Test corridor matching against brute-force distances."""
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.route = [(53.50, -1.20), (53.52, -1.10), (53.55, -1.12), (53.60, -0.95)]
+        self.hazards = {hazard_type: [] for hazard_type in ('speed_camera', 'traffic_light_camera', 'police',
+                                                            'roadworks', 'pothole')}
+        for _ in range(3000):
+            hazard_type = rng.choice(list(self.hazards))
+            lat, lon = rng.uniform(53.45, 53.65), rng.uniform(-1.25, -0.9)
+            if rng.random() < 0.3:  # near the route
+                (lat1, lon1), (lat2, lon2) = rng.choice(list(zip(self.route, self.route[1:])))
+                t = rng.random()
+                lat, lon = lat1 + (lat2 - lat1) * t + rng.uniform(-0.005, 0.005), lon1 + (lon2 - lon1) * t
+            self.hazards[hazard_type].append({'lat': lat, 'lon': lon, 'description': f'{hazard_type} hazard'})
+
+    def test_matches_brute_force(self):
+        result = HazardIndex(self.hazards).match(self.route, PREFERENCES)
+
+        expected_penalty, expected = 0.0, []
+        for hazard_type, hazard_list in self.hazards.items():
+            if hazard_type not in PREFERENCES:
+                continue
+            threshold, penalty = PREFERENCES[hazard_type]['threshold'], PREFERENCES[hazard_type]['penalty']
+            for hazard in hazard_list:
+                distance = brute_force_distance(hazard['lat'], hazard['lon'], self.route)
+                # Skip hazards right at the threshold, where the projections may disagree
+                if abs(distance - threshold) < 1:
+                    continue
+                if distance <= threshold:
+                    if hazard_type == 'traffic_light_camera':
+                        penalty_applied = penalty * max(1.0, 1.0 + 2.0 * (1.0 - distance / threshold))
+                    else:
+                        penalty_applied = penalty
+                    expected_penalty += penalty_applied
+                    expected.append((hazard['lat'], hazard['lon'], distance))
+
+        matched = {(hazard['lat'], hazard['lon']): hazard['distance'] for hazard in result.hazards}
+        self.assertGreater(len(expected), 50)
+        for lat, lon, distance in expected:
+            self.assertIn((lat, lon), matched)
+            self.assertAlmostEqual(matched[(lat, lon)], distance, delta=0.6)
+        self.assertLessEqual(result.count - len(expected), 2)
+        self.assertAlmostEqual(result.penalty, expected_penalty, delta=expected_penalty * 0.001 + 2400)
+        self.assertNotIn('pothole', {hazard['type'] for hazard in result.hazards})
+
+    def test_expiry_original_type_and_edges(self):
+        hazards = {
+            'traffic_light_camera': [{'lat': 53.5, 'lon': -1.2, 'original_type': 'speed_camera'}],
+            'police': [{'lat': 53.5, 'lon': -1.2, 'expiry': 1000}],
+        }
+        index = HazardIndex(hazards)
+        self.assertEqual(index.counts(), {'traffic_light_camera': 1, 'police': 1})
+
+        result = index.match([(53.5, -1.2)], PREFERENCES, now=500)
+        self.assertEqual(result.count, 2)
+        self.assertEqual(result.penalty, 1200 * 3 + 180)
+        self.assertEqual([hazard['type'] for hazard in result.hazards], ['speed_camera', 'police'])
+        self.assertEqual(index.match([(53.5, -1.2)], PREFERENCES, now=2000).count, 1)
+
+        self.assertEqual(index.match([], PREFERENCES), (0.0, 0, []))
+        self.assertEqual(HazardIndex({}).match(self.route, PREFERENCES), (0.0, 0, []))
+        # Long segments far from the hazard pass none of its cells
+        self.assertEqual(index.match([(50.0, -5.0), (50.0, 1.0)], PREFERENCES).count, 0)
+
+
+class TestSharedHazardIndex(unittest.TestCase):
+    """Test that the shared index reloads when hazard rows change."""
+
+    def test_reload_on_change(self):
+        import voyagr_web
+        conn = sqlite3.connect(':memory:')
+        voyagr_web.create_tables(conn.cursor())
+        migrate(conn, VOYAGR_WEB_MIGRATIONS)
+        shared = SharedHazardIndex(voyagr_web.load_hazards)
+
+        conn.execute("INSERT INTO cameras (lat, lon, type, description) VALUES (53.5, -1.2, 'speed_camera', 'A1')")
+        conn.commit()
+        index = shared.get(conn)
+        self.assertEqual(index.counts()['speed_camera'], 1)
+        self.assertIs(shared.get(conn), index)
+
+        version = hazard_data_version(conn)
+        conn.execute("INSERT INTO community_hazard_reports (user_id, hazard_type, lat, lon, expiry_timestamp) "
+                     "VALUES ('u', 'police', 53.5, -1.2, 4102444800)")
+        conn.execute("UPDATE community_hazard_reports SET verification_count = 3")  # not a watched column
+        conn.commit()
+        self.assertEqual(hazard_data_version(conn), version + 1)
+        index = shared.get(conn)
+        self.assertEqual(index.counts()['police'], 1)
+        self.assertEqual(index.match([(53.5, -1.2)], voyagr_web.load_hazard_preferences()).count, 3)
+        conn.close()
+
+
+class TestRouteWithoutHazardIndex(unittest.TestCase):
+    """Test that route requests survive a failing hazard index."""
+
+    def setUp(self):
+        import voyagr_web
+        self.web = voyagr_web
+        self.saved = (voyagr_web.router_holder, voyagr_web.USE_CUSTOM_ROUTER)
+        self.tmp_dir = tempfile.mkdtemp()
+        db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(db_file)
+        voyagr_web.router_holder = RouterHolder(probes=[])
+        voyagr_web.router_holder.load(db_file, warm=False)
+        voyagr_web.USE_CUSTOM_ROUTER = True
+        voyagr_web.route_cache.clear()
+        self.client = voyagr_web.app.test_client()
+
+    def tearDown(self):
+        self.web.router_holder, self.web.USE_CUSTOM_ROUTER = self.saved
+        self.web.route_cache.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_route_falls_back_to_no_hazard_scoring(self):
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        body = {'start': f"{start['lat']},{start['lon']}", 'end': f"{end['lat']},{end['lon']}",
+                'enable_hazard_avoidance': True}
+        with mock.patch.object(self.web, 'get_hazard_index', side_effect=sqlite3.OperationalError('locked')):
+            response = self.client.post('/api/route', json=body)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['success'])
+        # The unscored route is cached as one without hazard avoidance
+        key = (start['lat'], start['lon'], end['lat'], end['lon'], 'auto', 'petrol_diesel')
+        self.assertIsNone(self.web.route_cache.get(*key, True))
+        self.assertIsNotNone(self.web.route_cache.get(*key, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for bounded streaming latency percentiles
+"""
+
+import random
+import unittest
+
+from latency_sketch import LatencySketch, LatencyTracker, WindowedSketch
+
+
+class TestLatencySketch(unittest.TestCase):
+    """Test quantile accuracy, merging and bounded memory."""
+
+    def test_quantiles_within_accuracy(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(4, 1.2) for _ in range(20000)]
+        sketch = LatencySketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q), exact, delta=exact * 0.011)
+        self.assertEqual(sketch.count, len(values))
+        self.assertAlmostEqual(sketch.total / sketch.count, sum(values) / len(values))
+        # Memory follows the value range, not the sample count
+        self.assertLess(len(sketch.buckets), 1000)
+
+    def test_merge_and_edges(self):
+        a, b = LatencySketch(), LatencySketch()
+        for value in (0.0, 1.0, 2.0):
+            a.add(value)
+        for value in (100.0, 200.0):
+            b.add(value)
+        a.merge(b)
+        self.assertEqual(a.count, 5)
+        self.assertEqual(a.quantile(0), 0.0)
+        self.assertAlmostEqual(a.quantile(1), 200.0)
+        self.assertEqual(LatencySketch().summary()['count'], 0)
+        with self.assertRaises(ValueError):
+            a.merge(LatencySketch(relative_accuracy=0.05))
+
+
+class TestWindows(unittest.TestCase):
+    """Test that samples age out of rolling windows."""
+
+    def test_window_expiry(self):
+        window = WindowedSketch(60, 12)
+        window.add(10.0, now=1000.0)
+        window.add(20.0, now=1030.0)
+        self.assertEqual(window.snapshot(now=1030.0).count, 2)
+        self.assertEqual(window.snapshot(now=1062.0).count, 1)
+        self.assertEqual(window.snapshot(now=1100.0).count, 0)
+
+        # A slot is reused once the ring wraps around; late samples are dropped
+        window.add(30.0, now=1060.0)
+        window.add(40.0, now=1000.0)
+        snapshot = window.snapshot(now=1060.0)
+        self.assertEqual(snapshot.count, 2)
+        self.assertEqual(snapshot.max, 30.0)
+
+    def test_tracker_summary(self):
+        tracker = LatencyTracker()
+        for i in range(100):
+            tracker.add(float(i + 1), now=5000.0)
+        tracker.add(1000.0, now=5000.0 - 600)
+        summary = tracker.summary(now=5000.0)
+        self.assertEqual(summary['1m']['count'], 100)
+        self.assertEqual(summary['1h']['count'], 101)
+        self.assertEqual(summary['all']['count'], 101)
+        self.assertAlmostEqual(summary['5m']['p95'], 95.0, delta=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
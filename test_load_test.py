@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the load-test mock routing engines and report aggregation
+"""
+
+import unittest
+
+import requests
+
+from load_test import MockEngine, encode_polyline, parse_mix, summarize
+
+
+class TestMockEngines(unittest.TestCase):
+    """Test that each mock answers in its engine's response format."""
+
+    def setUp(self):
+        self.engines = {kind: MockEngine(kind, latency_ms=1, jitter=0).start()
+                        for kind in ('graphhopper', 'valhalla', 'osrm')}
+
+    def tearDown(self):
+        for engine in self.engines.values():
+            engine.stop()
+
+    def test_route_formats(self):
+        gh = requests.get(self.engines['graphhopper'].url + '/route',
+                          params={'point': ['53.0,-1.5', '53.1,-1.4'], 'profile': 'car'}, timeout=5).json()
+        path = gh['paths'][0]
+        self.assertGreater(path['distance'], 10000)
+        self.assertAlmostEqual(path['time'] / 1000, path['distance'] / (50 / 3.6))
+        self.assertEqual(path['points'], encode_polyline([(53.0, -1.5), (53.1, -1.4)]))
+
+        valhalla = requests.post(self.engines['valhalla'].url + '/route', timeout=5, json={
+            'locations': [{'lat': 53.0, 'lon': -1.5}, {'lat': 53.1, 'lon': -1.4}], 'costing': 'auto'}).json()
+        self.assertAlmostEqual(valhalla['trip']['summary']['length'], path['distance'] / 1000)
+        self.assertIn('shape', valhalla['trip']['legs'][0])
+
+        osrm = requests.get(self.engines['osrm'].url + '/route/v1/driving/-1.5,53.0;-1.4,53.1', timeout=5).json()
+        self.assertEqual(osrm['code'], 'Ok')
+        self.assertAlmostEqual(osrm['routes'][0]['distance'], path['distance'])
+        self.assertEqual(self.engines['osrm'].stats['requests'], 1)
+
+    def test_errors_only_on_routes(self):
+        engine = MockEngine('osrm', latency_ms=1, jitter=0, error_rate=1.0).start()
+        try:
+            self.assertEqual(requests.get(engine.url + '/route/v1/driving/-1.5,53.0;-1.4,53.1',
+                                          timeout=5).status_code, 503)
+            self.assertEqual(requests.get(engine.url + '/status', timeout=5).status_code, 200)
+            self.assertEqual(engine.stats, {'requests': 2, 'errors': 1, 'slow': 0})
+        finally:
+            engine.stop()
+
+    def test_polyline_round_trip(self):
+        import polyline
+        points = [(53.0, -1.5), (53.12345, -1.40001), (52.9, -1.6)]
+        self.assertEqual(encode_polyline(points), polyline.encode(points))
+
+
+class TestReport(unittest.TestCase):
+    """Test per-endpoint aggregation and the endpoint mix."""
+
+    def test_summarize(self):
+        samples = [('route', 0.010, True, False), ('route', 0.020, True, True),
+                   ('route', 0.030, False, False), ('hazards', 0.005, True, False)]
+        report = summarize(samples, elapsed_s=2.0, dropped=1)
+        route = report['endpoints']['route']
+        self.assertEqual(route['requests'], 3)
+        self.assertAlmostEqual(route['throughput_rps'], 1.5)
+        self.assertAlmostEqual(route['error_rate'], 1 / 3)
+        self.assertAlmostEqual(route['cache_hit_rate'], 1 / 3)
+        self.assertAlmostEqual(route['latency_ms']['p50'], 20.0)
+        self.assertEqual(report['endpoints']['all']['requests'], 4)
+        self.assertEqual(report['dropped'], 1)
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('route=3,hazards=1'), {'route': 0.75, 'hazards': 0.25})
+        with self.assertRaises(ValueError):
+            parse_mix('weather=1')
+
+
+if __name__ == '__main__':
+    unittest.main()
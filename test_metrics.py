@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics registry and the /metrics endpoint
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import metrics
+from metrics import MetricsRegistry
+from custom_router.router_holder import RouterHolder
+from test_path_extraction import GRID, build_grid_db
+
+
+class TestRegistry(unittest.TestCase):
+    """Test counters, histograms and text rendering."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_across_threads(self):
+        counter = self.registry.counter('jobs', 'Jobs done', ('kind',))
+        child = counter.labels('a')
+
+        def work():
+            for _ in range(1000):
+                child.inc()
+
+        # More threads than MAX_LIVE_SHARDS, so finished shards get folded
+        for _ in range(3):
+            threads = [threading.Thread(target=work) for _ in range(metrics.MAX_LIVE_SHARDS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(child.get(), 3 * metrics.MAX_LIVE_SHARDS * 1000)
+        self.assertLess(len(child._shards._live), metrics.MAX_LIVE_SHARDS)
+        self.assertIn('jobs_total{kind="a"} 192000', self.registry.render())
+
+    def test_histogram_buckets(self):
+        histogram = self.registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        text = self.registry.render()
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 3', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_sum 3.65', text)
+        self.assertIn('latency_seconds_count 4', text)
+
+    def test_labels_and_registration(self):
+        counter = self.registry.counter('requests', 'Requests', ('endpoint', 'status'))
+        counter.labels(endpoint='/a "b"', status=200).inc(2)
+        self.assertIn('requests_total{endpoint="/a \\"b\\"",status="200"} 2', self.registry.render())
+        with self.assertRaises(ValueError):
+            counter.labels('/a')
+        self.assertIs(self.registry.counter('requests', 'Requests', ('endpoint', 'status')), counter)
+        with self.assertRaises(ValueError):
+            self.registry.histogram('requests', 'Requests', ('endpoint', 'status'))
+
+    def test_collector(self):
+        @self.registry.collector
+        def sizes():
+            return [('cache_entries', 'gauge', 'Entries', [('cache_entries', {}, 7)])]
+
+        @self.registry.collector
+        def broken():
+            raise RuntimeError('source gone')
+
+        self.assertIn('# TYPE cache_entries gauge\ncache_entries 7\n', self.registry.render())
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Test that app traffic shows up on /metrics."""
+
+    def setUp(self):
+        import voyagr_web
+        self.web = voyagr_web
+        self.saved = (voyagr_web.router_holder, voyagr_web.USE_CUSTOM_ROUTER)
+        self.tmp_dir = tempfile.mkdtemp()
+        db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(db_file)
+        voyagr_web.router_holder = RouterHolder(probes=[])
+        voyagr_web.router_holder.load(db_file, warm=False)
+        voyagr_web.USE_CUSTOM_ROUTER = True
+        voyagr_web.route_cache.clear()
+        self.client = voyagr_web.app.test_client()
+
+    def tearDown(self):
+        self.web.router_holder, self.web.USE_CUSTOM_ROUTER = self.saved
+        self.web.route_cache.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_scrape(self):
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        body = {'start': f"{start['lat']},{start['lon']}", 'end': f"{end['lat']},{end['lon']}"}
+        hits = self.web.ROUTE_CACHE_HIT.get()
+        for _ in range(2):
+            self.assertEqual(self.client.post('/api/route', json=body).status_code, 200)
+        self.client.get('/api/hazards/nearby', query_string={'lat': 53.0, 'lon': -1.5})
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        text = response.get_data(as_text=True)
+        self.assertIn('voyagr_http_requests_total{endpoint="/api/route",method="POST",status="200"}', text)
+        self.assertIn('voyagr_http_request_duration_seconds_bucket{endpoint="/api/route",le="+Inf"}', text)
+        self.assertIn('voyagr_db_query_duration_seconds_count{operation="select"}', text)
+        self.assertIn('voyagr_router_settled_nodes_count', text)
+        self.assertIn('voyagr_router_query_duration_seconds_bucket{phase="search"', text)
+        self.assertEqual(self.web.ROUTE_CACHE_HIT.get(), hits + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for Hilbert-curve node reordering
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.access import ACCESS_ALL, ACCESS_FOOT, RESTRICT_HGV
+from custom_router.graph import RoadNetwork
+from custom_router.dijkstra import Router
+from custom_router.osm_parser import OSMParser
+from custom_router.node_reordering import NodeReorderer, hilbert_key
+
+
+def build_grid_db(db_file, size=8):
+    """Create a small grid road network with shuffled (non-spatial) node IDs."""
+    parser = OSMParser(data_dir=os.path.dirname(db_file))
+    parser.db_file = db_file
+
+    ids = list(range(1000, 1000 + size * size))
+    random.Random(7).shuffle(ids)
+    grid = {}
+    nodes = {}
+    for row in range(size):
+        for col in range(size):
+            node_id = ids[row * size + col]
+            grid[(row, col)] = node_id
+            nodes[node_id] = {'lat': 53.0 + row * 0.001, 'lon': -1.5 + col * 0.001}
+
+    ways = {1: {'name': 'Grid Road', 'highway': 'residential', 'speed_limit': 30, 'nodes': []}}
+    parser.create_database(nodes, ways, [])
+
+    conn = sqlite3.connect(db_file)
+    for (row, col), node_id in grid.items():
+        for drow, dcol in ((0, 1), (1, 0)):
+            other = grid.get((row + drow, col + dcol))
+            if other is None:
+                continue
+            for a, b in ((node_id, other), (other, node_id)):
+                conn.execute(
+                    'INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id) '
+                    'VALUES (?, ?, ?, ?, ?)', (a, b, 100.0, 30, 1))
+    conn.commit()
+    conn.close()
+    return grid
+
+
+class TestHilbertKey(unittest.TestCase):
+    """Test Hilbert curve key computation."""
+
+    def test_order_one_curve(self):
+        """Order-1 curve visits (0,0), (0,1), (1,1), (1,0)."""
+        keys = [hilbert_key(x, y, order=1) for x, y in ((0, 0), (0, 1), (1, 1), (1, 0))]
+        self.assertEqual(keys, [0, 1, 2, 3])
+
+    def test_keys_are_bijective(self):
+        """Every cell of an order-3 grid gets a distinct key."""
+        keys = {hilbert_key(x, y, order=3) for x in range(8) for y in range(8)}
+        self.assertEqual(keys, set(range(64)))
+
+    def test_consecutive_keys_are_adjacent(self):
+        """Consecutive curve positions are neighbouring cells."""
+        cells = {hilbert_key(x, y, order=3): (x, y) for x in range(8) for y in range(8)}
+        for d in range(63):
+            (x1, y1), (x2, y2) = cells[d], cells[d + 1]
+            self.assertEqual(abs(x1 - x2) + abs(y1 - y2), 1)
+
+
+class TestNodeReorderer(unittest.TestCase):
+    """Test database reordering."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.out_db = os.path.join(self.tmp_dir, 'grid_hilbert.db')
+        self.grid = build_grid_db(self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_compute_order_is_permutation(self):
+        """New IDs are a dense 1..N permutation."""
+        nodes = {n: (i * 0.01, i * 0.02) for i, n in enumerate([50, 10, 30, 20])}
+        mapping = NodeReorderer(self.db_file).compute_order(nodes)
+        self.assertEqual(sorted(mapping.keys()), [10, 20, 30, 50])
+        self.assertEqual(sorted(mapping.values()), [1, 2, 3, 4])
+
+    def test_reorder_preserves_graph(self):
+        """Reordered database has the same topology under the ID map."""
+        stats = NodeReorderer(self.db_file).reorder_database(self.out_db)
+        self.assertEqual(stats['nodes'], 64)
+        self.assertEqual(stats['edges'], 224)
+
+        id_map = NodeReorderer.load_id_map(self.out_db)
+        original = RoadNetwork(self.db_file)
+        reordered = RoadNetwork(self.out_db)
+
+        for old_id, coords in original.nodes.items():
+            self.assertEqual(reordered.nodes[id_map[old_id]], coords)
+        for old_id, edges in original.edges.items():
+            expected = sorted((id_map[n], d) for n, d, _, _ in edges)
+            actual = sorted((n, d) for n, d, _, _ in reordered.edges[id_map[old_id]])
+            self.assertEqual(expected, actual)
+
+    def test_reorder_keeps_access_and_restrictions(self):
+        """Per-edge access masks and vehicle restrictions survive reordering."""
+        a, b, c = self.grid[(0, 0)], self.grid[(0, 1)], self.grid[(1, 0)]
+        conn = sqlite3.connect(self.db_file)
+        conn.execute('UPDATE edges SET access = ? WHERE from_node_id = ? AND to_node_id = ?', (ACCESS_FOOT, a, b))
+        conn.execute('UPDATE edges SET restrictions = ? WHERE from_node_id = ? AND to_node_id = ?',
+                     (RESTRICT_HGV, a, c))
+        conn.commit()
+        conn.close()
+
+        NodeReorderer(self.db_file).reorder_database(self.out_db)
+        id_map = NodeReorderer.load_id_map(self.out_db)
+        conn = sqlite3.connect(self.out_db)
+        query = 'SELECT access, restrictions FROM edges WHERE from_node_id = ? AND to_node_id = ?'
+        self.assertEqual(conn.execute(query, (id_map[a], id_map[b])).fetchone(), (ACCESS_FOOT, 0))
+        self.assertEqual(conn.execute(query, (id_map[a], id_map[c])).fetchone(), (ACCESS_ALL, RESTRICT_HGV))
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM edges WHERE access = ?', (ACCESS_ALL,)).fetchone()[0],
+                         223)
+        conn.close()
+
+    def test_neighbouring_nodes_get_close_ids(self):
+        """Grid neighbours are much closer in ID space after reordering."""
+        NodeReorderer(self.db_file).reorder_database(self.out_db)
+        id_map = NodeReorderer.load_id_map(self.out_db)
+
+        def mean_gap(ids):
+            gaps = [abs(ids[(r, c)] - ids[(r, c + 1)]) for r in range(8) for c in range(7)]
+            return sum(gaps) / len(gaps)
+
+        reordered_ids = {cell: id_map[old] for cell, old in self.grid.items()}
+        self.assertLess(mean_gap(reordered_ids), mean_gap(self.grid))
+
+    def test_routes_match_after_reordering(self):
+        """Same route distance before and after reordering."""
+        NodeReorderer(self.db_file).reorder_database(self.out_db)
+        id_map = NodeReorderer.load_id_map(self.out_db)
+
+        router_a = Router(RoadNetwork(self.db_file), use_ch=False, db_file=self.db_file)
+        router_b = Router(RoadNetwork(self.out_db), use_ch=False, db_file=self.out_db)
+
+        start, end = self.grid[(0, 0)], self.grid[(7, 7)]
+        path_a = router_a.dijkstra(start, end)
+        path_b = router_b.dijkstra(id_map[start], id_map[end])
+        self.assertEqual(len(path_a), len(path_b))
+        self.assertAlmostEqual(router_a.extract_route_data(path_a)['distance_m'],
+                               router_b.extract_route_data(path_b)['distance_m'])
+
+
+if __name__ == '__main__':
+    unittest.main()
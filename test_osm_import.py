@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming OSM import and flat node location stores
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.graph import RoadNetwork
+from custom_router.osm_import import HAS_NUMPY, OSMImporter, SparseLocationStore, create_location_store
+from custom_router.osm_parser import OSMParser
+from test_osm_updater import NODES, WAYS, build_db, edge_set
+
+
+class TestLocationStores(unittest.TestCase):
+    """Test sparse and dense node location lookups."""
+
+    def check_store(self, store):
+        for node_id, (lat, lon) in [(30, (53.1, -1.2)), (7, (52.5, -0.1234567)), (1000, (-33.9, 151.2))]:
+            store.set(node_id, lat, lon)
+        found = store.lookup([7, 8, 1000])
+        self.assertEqual(found[0], (52.5, -0.1234567))
+        self.assertIsNone(found[1])
+        self.assertEqual(found[2], (-33.9, 151.2))
+        self.assertEqual(len(store), 3)
+        # Only looked-up nodes are written back, in id order
+        self.assertEqual([row[0] for row in store.used_nodes()], [7, 1000])
+
+    def test_sparse_unsorted(self):
+        """Out-of-order ids are sorted once before lookups."""
+        self.check_store(SparseLocationStore())
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_dense_grows(self):
+        """The dense store grows past its initial capacity."""
+        from custom_router.osm_import import DenseLocationStore
+        self.check_store(DenseLocationStore(capacity=16))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_dense_file_backed(self):
+        """A file-backed dense store removes its files on close."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'locations')
+            store = create_location_store('dense', path)
+            self.check_store(store)
+            store.close()
+            self.assertEqual(os.listdir(tmp_dir), [])
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_unknown_index(self):
+        with self.assertRaises(ValueError):
+            create_location_store('btree')
+
+
+class TestOSMImporter(unittest.TestCase):
+    """Test that a streamed import matches the existing database build."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def stream(self, db_file, index='sparse', processes=1):
+        importer = OSMImporter(db_file, index=index, batch_size=2, processes=processes)
+        for node_id, (lat, lon) in NODES.items():
+            importer.add_node(node_id, lat, lon)
+        importer.add_node(99, 52.0, -1.0)  # not on any way
+        for way_id, (tags, refs) in WAYS.items():
+            importer.add_way(way_id, tags, refs)
+        importer.add_way(400, {'highway': 'construction'}, [1, 5])
+        importer.add_way(500, {'highway': 'residential'}, [3, 77])  # 77 outside the extract
+        importer.add_restriction(100, 200, 'no_left_turn')
+        return importer.finish()
+
+    def test_matches_database_build(self):
+        """Edges, nodes and ways equal the dict-based build."""
+        db_file = os.path.join(self.tmp_dir, 'streamed.db')
+        stats = self.stream(db_file)
+        expected = os.path.join(self.tmp_dir, 'expected.db')
+        build_db(expected, NODES, WAYS)
+        self.assertEqual(edge_set(db_file), edge_set(expected))
+
+        conn = sqlite3.connect(db_file)
+        self.assertEqual([row[0] for row in conn.execute('SELECT id FROM nodes ORDER BY id')], sorted(NODES))
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM ways').fetchone()[0], 4)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM turn_restrictions').fetchone()[0], 1)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        self.assertTrue({'idx_nodes_latlon', 'idx_edges_from', 'idx_edges_to'} <= indexes)
+
+        self.assertEqual(stats['ways_seen'], 5)
+        self.assertEqual(stats['ways_imported'], 4)
+        self.assertEqual(stats['missing_locations'], 1)
+        self.assertEqual(stats['nodes_written'], len(NODES))
+        self.assertGreater(stats['ways_per_s'], 0)
+        self.assertFalse(os.path.exists(db_file + '.importing'))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_dense_index(self):
+        """The dense location index produces the same database."""
+        sparse_db = os.path.join(self.tmp_dir, 'sparse.db')
+        dense_db = os.path.join(self.tmp_dir, 'dense.db')
+        self.stream(sparse_db)
+        self.stream(dense_db, index='dense')
+        self.assertEqual(edge_set(sparse_db), edge_set(dense_db))
+
+    def test_edge_columns(self):
+        """Edges carry the road type, oneway and toll flags of their way."""
+        db_file = os.path.join(self.tmp_dir, 'streamed.db')
+        self.stream(db_file)
+        conn = sqlite3.connect(db_file)
+        rows = {row[0]: row[1:] for row in conn.execute(
+            'SELECT DISTINCT way_id, road_type, oneway, toll FROM edges')}
+        conn.close()
+        for way_id, (tags, refs) in WAYS.items():
+            way_data = OSMParser.parse_way(tags, refs)
+            self.assertEqual(rows[way_id], (way_data['highway'], int(way_data['oneway']),
+                                            int(way_data['toll'])))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_parallel_edges(self):
+        """Edge batches generated in worker processes give the same database."""
+        serial_db = os.path.join(self.tmp_dir, 'serial.db')
+        parallel_db = os.path.join(self.tmp_dir, 'parallel.db')
+        self.stream(serial_db)
+        stats = self.stream(parallel_db, processes=2)
+        self.assertEqual(edge_set(serial_db), edge_set(parallel_db))
+        self.assertEqual(stats['missing_locations'], 1)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_edge_batch_matches_way_edges(self):
+        """Vectorized edges come out in way_edges order with equal distances."""
+        import numpy as np
+        from custom_router.osm_import import edge_batch
+
+        coords = dict(NODES)
+        del coords[next(iter(WAYS.values()))[1][1]]  # drop a node mid-way
+        ways = [(way_id, OSMParser.parse_way(tags, refs)) for way_id, (tags, refs) in WAYS.items()]
+        refs = [ref for _, way_data in ways for ref in way_data['nodes']]
+        lats = np.array([coords[ref][0] if ref in coords else np.nan for ref in refs])
+        lons = np.array([coords[ref][1] if ref in coords else np.nan for ref in refs])
+        way_index, from_node, to_node, distance, access = edge_batch(
+            np.array([len(way_data['nodes']) for _, way_data in ways]), lats, lons, np.array(refs),
+            np.array([way_data['access_forward'] for _, way_data in ways]),
+            np.array([way_data['access_backward'] for _, way_data in ways]))
+
+        expected = [(w, f, t, a) for w, (way_id, way_data) in enumerate(ways)
+                    for f, (t, _, _, _), a, _ in RoadNetwork.way_edges(way_id, way_data, coords)]
+        self.assertEqual(list(zip(way_index.tolist(), from_node.tolist(), to_node.tolist(), access.tolist())),
+                         expected)
+        expected_distances = [d for way_id, way_data in ways
+                              for _, (_, d, _, _), _, _ in RoadNetwork.way_edges(way_id, way_data, coords)]
+        np.testing.assert_allclose(distance, expected_distances, rtol=1e-9)
+
+    def test_abort_leaves_existing_database(self):
+        """An aborted import keeps the previous database untouched."""
+        db_file = os.path.join(self.tmp_dir, 'router.db')
+        build_db(db_file, NODES, WAYS)
+        before = edge_set(db_file)
+        importer = OSMImporter(db_file)
+        importer.add_node(1, 53.0, -1.5)
+        importer.abort()
+        self.assertEqual(edge_set(db_file), before)
+        self.assertFalse(os.path.exists(db_file + '.importing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental graph updates from OSM change files
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.component_analyzer import ComponentAnalyzer
+from custom_router.dijkstra import Router
+from custom_router.graph import RoadNetwork, read_graph_version
+from custom_router.node_reordering import NodeReorderer
+from custom_router.osm_parser import OSMParser
+from custom_router.osm_updater import OSMChange, OSMUpdater
+
+NODES = {
+    1: (53.000, -1.500),
+    2: (53.000, -1.490),
+    3: (53.000, -1.480),
+    4: (52.990, -1.490),
+    5: (52.990, -1.480),
+}
+
+WAYS = {
+    100: ({'highway': 'primary', 'name': 'High Street'}, [1, 2, 3]),
+    200: ({'highway': 'residential', 'name': 'Mill Lane', 'oneway': 'yes'}, [2, 4]),
+    300: ({'highway': 'residential', 'name': 'Back Lane'}, [4, 5, 3]),
+}
+
+CHANGE_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<osmChange version="0.6">
+  <create>
+    <node id="6" lat="52.995" lon="-1.470"/>
+  </create>
+  <modify>
+    <node id="5" lat="52.991" lon="-1.481"/>
+    <way id="300">
+      <nd ref="4"/><nd ref="5"/><nd ref="6"/><nd ref="3"/>
+      <tag k="highway" v="residential"/><tag k="name" v="Back Lane"/>
+    </way>
+  </modify>
+  <delete>
+    <way id="200"/>
+  </delete>
+</osmChange>
+"""
+
+
+def build_db(db_file, nodes, ways, with_ch=False):
+    """Create a routing database the way setup_custom_router does."""
+    parser = OSMParser(data_dir=os.path.dirname(db_file))
+    parser.db_file = db_file
+    parsed = {w: OSMParser.parse_way(tags, refs) for w, (tags, refs) in ways.items()}
+    parser.create_database({n: {'lat': lat, 'lon': lon} for n, (lat, lon) in nodes.items()}, parsed, [])
+
+    conn = sqlite3.connect(db_file)
+    for way_id, way_data in parsed.items():
+        for from_node, edge, access, restrictions in RoadNetwork.way_edges(way_id, way_data, nodes):
+            conn.execute('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id, '
+                         'road_type, oneway, toll, access, restrictions) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         (from_node, edge[0], edge[1], edge[2], way_id, way_data['highway'],
+                          int(way_data['oneway']), int(way_data['toll']), access, restrictions))
+    if with_ch:
+        conn.execute('CREATE TABLE ch_node_order (node_id INTEGER PRIMARY KEY, order_id INTEGER)')
+        conn.execute('CREATE TABLE ch_shortcuts (from_node INTEGER, to_node INTEGER, distance REAL)')
+        conn.executemany('INSERT INTO ch_node_order VALUES (?, ?)', [(n, n) for n in nodes])
+    conn.commit()
+    conn.close()
+
+
+def edge_set(db_file, id_map=None):
+    """Edges as comparable tuples (distance rounded), node IDs mapped back to OSM IDs if id_map is given."""
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute('SELECT from_node_id, to_node_id, round(distance_m, 3), way_id, road_type, oneway, toll, '
+                        'access, restrictions FROM edges').fetchall()
+    conn.close()
+    if id_map is not None:
+        rows = [(id_map[a], id_map[b], *rest) for a, b, *rest in rows]
+    return sorted(rows)
+
+
+class TestOSMChangeParsing(unittest.TestCase):
+    """Test reading osmChange XML."""
+
+    def test_parse_actions(self):
+        """Creates, modifies and deletes are collected; later actions win."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'change.osc.gz')
+            with gzip.open(path, 'wb') as f:
+                f.write(CHANGE_XML)
+            change = OSMChange.from_file(path)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.assertEqual(change.node_upserts, {6: (52.995, -1.470), 5: (52.991, -1.481)})
+        self.assertEqual(change.way_upserts[300][1], [4, 5, 6, 3])
+        self.assertEqual(change.way_upserts[300][0]['highway'], 'residential')
+        self.assertEqual(change.way_deletes, {200})
+
+        change.upsert_way(200, {'highway': 'service'}, [2, 4])
+        self.assertNotIn(200, change.way_deletes)
+
+
+class TestOSMUpdater(unittest.TestCase):
+    """Test applying change sets to a routing database."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'router.db')
+        build_db(self.db_file, NODES, WAYS, with_ch=True)
+        self.change = OSMChange()
+        with open(os.path.join(self.tmp_dir, 'change.osc'), 'wb') as f:
+            f.write(CHANGE_XML)
+        OSMChange.from_file(os.path.join(self.tmp_dir, 'change.osc'), self.change)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_matches_full_rebuild(self):
+        """Updated edges equal a database rebuilt from the new data."""
+        summary = OSMUpdater(self.db_file).apply(self.change)
+        self.assertEqual(summary['version'], 1)
+        self.assertEqual(summary['ways_deleted'], 1)
+        self.assertEqual(summary['nodes_moved'], 1)
+
+        nodes = {**NODES, 5: (52.991, -1.481), 6: (52.995, -1.470)}
+        ways = {100: WAYS[100], 300: (WAYS[300][0], [4, 5, 6, 3])}
+        rebuilt = os.path.join(self.tmp_dir, 'rebuilt.db')
+        build_db(rebuilt, nodes, ways)
+        self.assertEqual(edge_set(self.db_file), edge_set(rebuilt))
+
+        conn = sqlite3.connect(self.db_file)
+        self.assertIsNone(conn.execute('SELECT 1 FROM ways WHERE id = 200').fetchone())
+        conn.close()
+
+    def test_reordered_database(self):
+        """Diffs in OSM IDs are applied through the node_id_map of a renumbered database."""
+        reordered = os.path.join(self.tmp_dir, 'reordered.db')
+        NodeReorderer(self.db_file).reorder_database(reordered)
+        OSMUpdater(self.db_file).apply(self.change)
+        OSMUpdater(reordered).apply(self.change)
+
+        conn = sqlite3.connect(reordered)
+        id_map = dict(conn.execute('SELECT new_id, osm_id FROM node_id_map'))
+        coords = {id_map[n]: (lat, lon) for n, lat, lon in conn.execute('SELECT id, lat, lon FROM nodes')}
+        conn.close()
+        self.assertEqual(edge_set(reordered, id_map), edge_set(self.db_file))
+        self.assertEqual(coords[6], (52.995, -1.470))
+        self.assertEqual(coords[5], (52.991, -1.481))
+
+    def test_missing_locations_reported(self):
+        """Way refs found neither in the database nor in the diff are counted."""
+        change = OSMChange()
+        change.upsert_way(400, {'highway': 'residential'}, [3, 99, 5])
+        summary = OSMUpdater(self.db_file).apply(change)
+        self.assertEqual(summary['missing_locations'], 1)
+        self.assertEqual(summary['edges_added'], 0)
+
+    def test_unroutable_way_removed(self):
+        """A way retagged as non-routable loses its edges."""
+        change = OSMChange()
+        change.upsert_way(100, {'highway': 'construction'}, [1, 2, 3])
+        summary = OSMUpdater(self.db_file).apply(change)
+        self.assertEqual(summary['edges_removed'], 4)
+        self.assertEqual(summary['edges_added'], 0)
+        self.assertNotIn(100, [row[3] for row in edge_set(self.db_file)])
+
+    def test_deleted_node_drops_edges(self):
+        """Deleting a node removes it and every edge that touches it."""
+        change = OSMChange()
+        change.delete_node(5)
+        OSMUpdater(self.db_file).apply(change)
+        self.assertFalse([row for row in edge_set(self.db_file) if 5 in row[:2]])
+
+        conn = sqlite3.connect(self.db_file)
+        self.assertIsNone(conn.execute('SELECT 1 FROM ch_node_order WHERE node_id = 5').fetchone())
+        conn.close()
+
+    def test_ch_invalidated(self):
+        """Changed edges clear the CH so routers fall back to Dijkstra until a rebuild."""
+        self.assertFalse(OSMUpdater(self.db_file).apply(OSMChange())['ch_invalidated'])
+        self.assertTrue(Router(RoadNetwork(self.db_file), use_ch=True, db_file=self.db_file).ch_available)
+
+        summary = OSMUpdater(self.db_file).apply(self.change)
+        self.assertTrue(summary['ch_invalidated'])
+        conn = sqlite3.connect(self.db_file)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM ch_node_order').fetchone()[0], 0)
+        conn.close()
+        router = Router(RoadNetwork(self.db_file), use_ch=True, db_file=self.db_file)
+        self.assertFalse(router.ch_available)
+        self.assertEqual(router.dijkstra(1, 6), [1, 2, 3, 6])
+
+    def test_graph_version_invalidates_component_cache(self):
+        """Loaded graphs carry the version, so cached components go stale."""
+        graph = RoadNetwork(self.db_file)
+        self.assertEqual(graph.version, 0)
+        cache_file = ComponentAnalyzer.cache_path(self.db_file)
+        ComponentAnalyzer(graph).analyze_cached(cache_file)
+
+        change = OSMChange()
+        change.upsert_node(5, 52.991, -1.481)
+        OSMUpdater(self.db_file).apply(change)
+
+        conn = sqlite3.connect(self.db_file)
+        self.assertEqual(read_graph_version(conn), 1)
+        conn.close()
+        updated = RoadNetwork(self.db_file)
+        self.assertEqual(updated.version, 1)
+        self.assertFalse(ComponentAnalyzer(updated).load(cache_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for edge-recording searches and single-pass route extraction
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.graph import RoadNetwork
+from custom_router.dijkstra import Router
+from custom_router.instructions import InstructionGenerator
+from custom_router.k_shortest_paths import KShortestPaths
+from custom_router.costs import CostCalculator
+from custom_router.osm_parser import OSMParser
+
+GRID = 6
+
+
+def build_grid_db(db_file, with_ch=False):
+    """Create a grid with a motorway row and named residential streets."""
+    parser = OSMParser(data_dir=os.path.dirname(db_file))
+    parser.db_file = db_file
+
+    nodes = {}
+    for row in range(GRID):
+        for col in range(GRID):
+            nodes[row * GRID + col + 1] = {'lat': 53.0 + row * 0.002, 'lon': -1.5 + col * 0.003}
+    ways = {
+        10: {'name': 'M1', 'highway': 'motorway', 'speed_limit': 110, 'nodes': []},
+        20: {'name': 'High Street', 'highway': 'residential', 'speed_limit': 30, 'nodes': []},
+    }
+    parser.create_database(nodes, ways, [])
+
+    conn = sqlite3.connect(db_file)
+    for row in range(GRID):
+        for col in range(GRID):
+            node_id = row * GRID + col + 1
+            for drow, dcol in ((0, 1), (1, 0)):
+                if row + drow >= GRID or col + dcol >= GRID:
+                    continue
+                other = (row + drow) * GRID + (col + dcol) + 1
+                way_id = 10 if row == 0 and drow == 0 else 20
+                speed = 110 if way_id == 10 else 30
+                distance = RoadNetwork.haversine_distance(
+                    (nodes[node_id]['lat'], nodes[node_id]['lon']),
+                    (nodes[other]['lat'], nodes[other]['lon']))
+                for a, b in ((node_id, other), (other, node_id)):
+                    conn.execute(
+                        'INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id) '
+                        'VALUES (?, ?, ?, ?, ?)', (a, b, distance, speed, way_id))
+    if with_ch:
+        conn.execute('CREATE TABLE ch_node_order (node_id INTEGER PRIMARY KEY, order_id INTEGER)')
+        conn.executemany('INSERT INTO ch_node_order VALUES (?, ?)',
+                         [(n, n) for n in nodes])
+    conn.commit()
+    conn.close()
+    return nodes
+
+
+class TestPathEdges(unittest.TestCase):
+    """Test that searches return the edges they traversed."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(self.db_file)
+        self.graph = RoadNetwork(self.db_file)
+        self.router = Router(self.graph, use_ch=False, db_file=self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def assert_edges_follow_path(self, path, path_edges):
+        self.assertEqual(len(path_edges), len(path) - 1)
+        for i, edge in enumerate(path_edges):
+            # Each recorded edge joins the two consecutive path nodes
+            self.assertIn(edge[0], (path[i], path[i + 1]))
+
+    def test_dijkstra_returns_edges(self):
+        """dijkstra(return_edges=True) returns one edge per path segment."""
+        path, path_edges = self.router.dijkstra(1, GRID * GRID, return_edges=True)
+        self.assertEqual(path, self.router.dijkstra(1, GRID * GRID))
+        self.assert_edges_follow_path(path, path_edges)
+
+    def test_trivial_path(self):
+        """Same start and end gives a single node and no edges."""
+        self.assertEqual(self.router.dijkstra(5, 5, return_edges=True), ([5], []))
+
+    def test_extraction_matches_neighbour_scan(self):
+        """Recorded edges give the same totals as resolving edges afterwards."""
+        path, path_edges = self.router.dijkstra(1, GRID * GRID, return_edges=True)
+        recorded = self.router.extract_route_data(path, path_edges)
+        rescanned = self.router.extract_route_data(path)
+
+        self.assertAlmostEqual(recorded['distance_m'], rescanned['distance_m'])
+        self.assertAlmostEqual(recorded['duration_s'], rescanned['duration_s'])
+        self.assertEqual(recorded['way_ids'], rescanned['way_ids'])
+        self.assertEqual(len(recorded['coordinates']), len(path))
+        self.assertAlmostEqual(sum(recorded['edge_distances_m']), recorded['distance_m'])
+
+    def test_route_includes_edge_data(self):
+        """Router.route exposes per-edge distances and way IDs."""
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        route = self.router.route(start['lat'], start['lon'], end['lat'], end['lon'])
+        self.assertEqual(len(route['way_ids']), len(route['path_nodes']) - 1)
+        self.assertEqual(len(route['edge_durations_s']), len(route['path_nodes']) - 1)
+
+    def test_ch_search_returns_edges(self):
+        """CH search records forward and backward edges."""
+        db_file = os.path.join(self.tmp_dir, 'grid_ch.db')
+        build_grid_db(db_file, with_ch=True)
+        router = Router(RoadNetwork(db_file), use_ch=True, db_file=db_file)
+        self.assertTrue(router.ch_available)
+
+        path, path_edges = router._dijkstra_ch(1, 2, return_edges=True)
+        self.assertEqual(path, [1, 2])
+        self.assert_edges_follow_path(path, path_edges)
+
+
+class TestRouteConsumers(unittest.TestCase):
+    """Test instructions, alternatives and costs built from route data."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        build_grid_db(self.db_file)
+        self.graph = RoadNetwork(self.db_file)
+        self.router = Router(self.graph, use_ch=False, db_file=self.db_file)
+        path, path_edges = self.router.dijkstra(1, GRID * GRID, return_edges=True)
+        self.route = self.router.extract_route_data(path, path_edges)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_instructions_from_route_match_lookup(self):
+        """Street names from recorded way IDs match neighbour lookups."""
+        gen = InstructionGenerator(self.graph)
+        from_route = gen.generate_for_route(self.route)
+        looked_up = gen.generate(self.route['path_nodes'])
+        self.assertEqual([i['street_name'] for i in from_route],
+                         [i['street_name'] for i in looked_up])
+        self.assertEqual([i['maneuver'] for i in from_route],
+                         [i['maneuver'] for i in looked_up])
+
+    def test_k_paths_have_consistent_distances(self):
+        """Alternative routes report distances equal to a fresh lookup."""
+        k_paths = KShortestPaths(self.router)
+        start = self.graph.nodes[1]
+        end = self.graph.nodes[GRID * GRID]
+        routes = k_paths.find_k_paths(start[0], start[1], end[0], end[1], k=3)
+        self.assertGreaterEqual(len(routes), 1)
+        for route in routes:
+            rescanned = self.router.extract_route_data(route['path_nodes'])
+            self.assertAlmostEqual(route['distance_m'], rescanned['distance_m'])
+
+    def test_toll_cost_uses_road_types(self):
+        """Only motorway edges are tolled at the motorway rate."""
+        costs = CostCalculator.calculate_route_cost(self.route, self.graph.ways)
+        motorway_m = sum(d for d, w in zip(self.route['edge_distances_m'], self.route['way_ids'])
+                         if w == 10)
+        self.assertAlmostEqual(costs['toll_cost'],
+                               round(motorway_m / 1000 * CostCalculator.TOLL_RATES['motorway'], 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
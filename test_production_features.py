@@ -67,7 +67,22 @@ class TestProductionMonitoring(unittest.TestCase):
         self.assertIn('total_requests', metrics)
         self.assertIn('cache_hit_rate', metrics)
         self.assertEqual(metrics['total_requests'], 1)
-    
+
+    def test_latency_percentiles(self):
+        """Test per-endpoint and per-engine percentiles from the sketches."""
+        for i in range(1, 101):
+            self.monitor.log_request('/api/route', 'POST', 200, float(i))
+            self.monitor.log_engine_request('osrm', True, float(i) * 2)
+        self.monitor.log_request('/api/weather', 'GET', 200, 5.0)
+
+        metrics = self.monitor.get_metrics()
+        route = metrics['endpoint_latency']['/api/route']['5m']
+        self.assertEqual(route['count'], 100)
+        self.assertAlmostEqual(route['p50'], 50.0, delta=1.0)
+        self.assertAlmostEqual(route['p99'], 99.0, delta=1.5)
+        self.assertAlmostEqual(metrics['engine_stats']['osrm']['p95'], 190.0, delta=2.5)
+        self.assertEqual(metrics['latency']['all']['count'], 101)
+
     def test_health_status(self):
         """Test health status calculation."""
         self.monitor.log_request('/api/route', 'POST', 200, 100.0)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for SQLite statement profiling and slow-query plan capture
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from query_profiler import QueryProfiler, connect, full_scan_tables, normalize_sql
+
+
+class TestNormalization(unittest.TestCase):
+    """Test statement fingerprints and plan parsing."""
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT *  FROM cameras\n WHERE lat > 53.1 AND type = 'speed' AND id IN (?, ?, ?);"),
+            "SELECT * FROM cameras WHERE lat > ? AND type = ? AND id IN (?)")
+        self.assertEqual(normalize_sql('SELECT * FROM t WHERE id IN (?,?)'),
+                         normalize_sql('SELECT * FROM t WHERE id IN (?)'))
+
+    def test_full_scan_tables(self):
+        plan = ['SCAN cameras', 'SCAN TABLE trips', 'SEARCH reports USING INDEX idx_reports (lat>?)',
+                'SCAN persistent_route_cache USING COVERING INDEX idx_cache', 'SCAN CONSTANT ROW']
+        self.assertEqual(full_scan_tables(plan), ['cameras', 'trips'])
+
+
+class TestProfiledConnection(unittest.TestCase):
+    """Test aggregation and EXPLAIN QUERY PLAN capture on a real database."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.profiler = QueryProfiler(slow_ms=0.0)
+        self.conn = connect(os.path.join(self.tmp_dir, 'test.db'), profiler=self.profiler)
+        self.conn.execute('CREATE TABLE cameras (id INTEGER PRIMARY KEY, lat REAL, lon REAL, type TEXT)')
+        self.conn.execute('CREATE INDEX idx_cameras_type ON cameras (type)')
+        self.conn.executemany('INSERT INTO cameras (lat, lon, type) VALUES (?, ?, ?)',
+                              ((53.0 + i / 1000, -1.5, 'speed') for i in range(200)))
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_report_flags_full_scans(self):
+        cursor = self.conn.cursor()
+        for lat in (53.01, 53.02, 53.03):
+            cursor.execute('SELECT id FROM cameras WHERE lat > ?', (lat,))
+            cursor.fetchall()
+        cursor.execute("SELECT id FROM cameras WHERE type = 'speed'").fetchall()
+
+        report = self.profiler.report(sort='count')
+        scan = report['statements'][0]
+        self.assertEqual(scan['sql'], 'SELECT id FROM cameras WHERE lat > ?')
+        self.assertEqual(scan['count'], 3)
+        self.assertEqual(scan['full_scans'], ['cameras'])
+        self.assertEqual(report['full_scans'], {'cameras': ['SELECT id FROM cameras WHERE lat > ?']})
+
+        indexed = next(row for row in report['statements'] if 'type = ?' in row['sql'])
+        self.assertEqual(indexed['full_scans'], [])
+        self.assertTrue(any('idx_cameras_type' in detail for detail in indexed['plan']))
+        # executemany is timed but never explained
+        insert = next(row for row in report['statements'] if row['sql'].startswith('INSERT'))
+        self.assertIsNone(insert['plan'])
+
+    def test_threshold_and_cap(self):
+        profiler = QueryProfiler(slow_ms=10_000, max_statements=2)
+        self.conn.profiler = profiler
+        for i in range(4):
+            self.conn.execute(f'SELECT {i} AS n, ? FROM cameras LIMIT {i}', ('x',)).fetchall()
+            self.conn.execute(f'SELECT count(*) FROM cameras WHERE id > {i}').fetchall()
+        self.conn.execute('SELECT 1 FROM sqlite_master').fetchall()
+
+        report = profiler.report()
+        self.assertEqual(report['statements_tracked'], 3)
+        by_sql = {row['sql']: row for row in report['statements']}
+        self.assertEqual(by_sql['SELECT ? AS n, ? FROM cameras LIMIT ?']['count'], 4)
+        self.assertEqual(by_sql['<other>']['count'], 1)
+        self.assertTrue(all(row['plan'] is None and row['slow_count'] == 0 for row in report['statements']))
+        with self.assertRaises(ValueError):
+            profiler.report(sort='rows')
+
+
+class TestSlowQueryEndpoint(unittest.TestCase):
+    """Test that app database traffic shows up in the admin report."""
+
+    def test_report_endpoint(self):
+        import voyagr_web
+        client = voyagr_web.app.test_client()
+        self.assertEqual(client.delete('/api/admin/slow-queries').status_code, 200)
+        client.get('/api/hazards/nearby', query_string={'lat': 53.0, 'lon': -1.5})
+
+        data = client.get('/api/admin/slow-queries', query_string={'sort': 'count'}).get_json()
+        self.assertTrue(data['success'])
+        self.assertGreater(data['statements_tracked'], 0)
+        self.assertTrue(all(row['count'] > 0 for row in data['statements']))
+        self.assertEqual(client.get('/api/admin/slow-queries', query_string={'sort': 'x'}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for per-query routing instrumentation
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from custom_router.graph import RoadNetwork
+from custom_router.dijkstra import Router
+from custom_router.query_stats import (Histogram, MemorySampler, QueryStats,
+                                       QueryStatsAggregator)
+from test_path_extraction import GRID, build_grid_db
+
+
+class TestHistogram(unittest.TestCase):
+    """Test fixed-bucket histogram percentiles."""
+
+    def test_percentiles_use_bucket_bounds(self):
+        """Percentiles report the upper bound of the bucket they fall in."""
+        hist = Histogram(buckets=(1, 10, 100))
+        for value in [0.5] * 90 + [50] * 9 + [500]:
+            hist.record(value)
+        self.assertEqual(hist.count, 100)
+        self.assertEqual(hist.percentile(50), 1)
+        self.assertEqual(hist.percentile(95), 100)
+        self.assertEqual(hist.percentile(100), 500)
+        self.assertEqual(hist.to_dict()['buckets']['+Inf'], 1)
+
+    def test_empty_histogram(self):
+        """Empty histogram reports zeros."""
+        self.assertEqual(Histogram().percentile(99), 0.0)
+
+
+class TestQueryStatsAggregator(unittest.TestCase):
+    """Test folding queries into aggregates."""
+
+    def test_record_and_reset(self):
+        """Counts, failures and counters accumulate and reset."""
+        agg = QueryStatsAggregator()
+        for success in (True, True, False):
+            qs = QueryStats()
+            qs.total_ns = 2_000_000
+            qs.relaxations = 10
+            qs.algorithm = 'CH'
+            qs.success = success
+            agg.record(qs)
+
+        snap = agg.snapshot()
+        self.assertEqual(snap['queries'], 3)
+        self.assertEqual(snap['failures'], 1)
+        self.assertEqual(snap['by_algorithm'], {'CH': 3})
+        self.assertEqual(snap['relaxations_total'], 30)
+        self.assertEqual(snap['latency_ms']['total']['p50'], 2.5)
+
+        agg.reset()
+        self.assertEqual(agg.snapshot()['queries'], 0)
+
+    def test_memory_sampler_tracks_peak(self):
+        """A manual sample updates current and peak RSS."""
+        sampler = MemorySampler(interval_seconds=60)
+        sampler.sample()
+        stats = sampler.get_stats()
+        if stats['available']:
+            self.assertGreater(stats['current_mb'], 0)
+            self.assertEqual(stats['peak_mb'], stats['current_mb'])
+
+
+class TestRouterInstrumentation(unittest.TestCase):
+    """Test that Router.route fills and aggregates query stats."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(self.db_file)
+        self.router = Router(RoadNetwork(self.db_file), use_ch=False, db_file=self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_route_reports_phases_and_counters(self):
+        """Route result carries phase timings and search counters."""
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        route = self.router.route(start['lat'], start['lon'], end['lat'], end['lon'])
+        qs = route['query_stats']
+
+        self.assertTrue(qs['success'])
+        self.assertEqual(qs['algorithm'], 'Dijkstra+A*')
+        self.assertGreater(qs['settled_nodes'], 0)
+        self.assertGreaterEqual(qs['heap_pushes'], qs['settled_nodes'])
+        self.assertGreater(qs['relaxations'], 0)
+        self.assertLessEqual(qs['snap_ms'] + qs['search_ms'] + qs['extract_ms'], qs['total_ms'])
+        self.assertEqual(route['response_time_ms'], qs['total_ms'])
+
+    def test_router_stats_aggregate_queries(self):
+        """get_stats exposes aggregated queries and reset_stats clears them."""
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        for _ in range(3):
+            self.router.route(start['lat'], start['lon'], end['lat'], end['lon'])
+
+        stats = self.router.get_stats()
+        self.assertEqual(stats['queries']['queries'], 3)
+        self.assertEqual(stats['queries']['failures'], 0)
+        self.assertIn('memory', stats)
+
+        self.router.reset_stats()
+        self.assertEqual(self.router.get_stats()['queries']['queries'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for per-request stage timing and sampled profiling
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from custom_router.router_holder import RouterHolder
+from request_tracing import ProfileStore, RequestTrace, current_trace, end_trace, start_trace, trace_span, traced
+from test_path_extraction import GRID, build_grid_db
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestRequestTrace(unittest.TestCase):
+    """Test span recording and the Server-Timing rendering."""
+
+    def test_spans_accumulate(self):
+        @traced('decode')
+        def decode():
+            return 42
+
+        token = start_trace()
+        try:
+            with trace_span('cache'):
+                pass
+            self.assertEqual(decode(), 42)
+            self.assertEqual(decode(), 42)
+            trace = current_trace()
+        finally:
+            end_trace(token)
+
+        self.assertEqual(list(trace.spans), ['cache', 'decode'])
+        self.assertEqual(trace.to_dict()['spans']['decode']['count'], 2)
+        header = trace.server_timing()
+        self.assertRegex(header, r'^cache;dur=[\d.]+, decode;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_noop_outside_request(self):
+        with trace_span('cache'):
+            pass
+        self.assertEqual(traced('x')(lambda: 1)(), 1)
+
+
+class TestProfileStore(unittest.TestCase):
+    """Test 1-in-N sampling and collapsed stack output."""
+
+    def test_sampling(self):
+        store = ProfileStore(sample_every=3, interval_s=0.001)
+        profilers = [store.start() for _ in range(6)]
+        self.assertEqual([p is not None for p in profilers], [False, False, True, False, False, True])
+        for profiler in profilers:
+            if profiler:
+                profiler.stop()
+        self.assertIsNone(ProfileStore(sample_every=0).start())
+
+    def test_collapsed_stacks(self):
+        store = ProfileStore(sample_every=1, interval_s=0.001)
+        profiler = store.start()
+        busy(0.05)
+        profile_id = store.finish(profiler, '/api/route', RequestTrace())
+
+        listing = store.list()
+        self.assertEqual(listing[0]['id'], profile_id)
+        self.assertGreater(listing[0]['samples'], 5)
+        folded = store.collapsed(profile_id)
+        self.assertIn('busy (test_request_tracing.py', folded)
+        stack, count = folded.splitlines()[0].rsplit(' ', 1)
+        self.assertIn(';', stack)
+        self.assertGreater(int(count), 0)
+        self.assertIsNone(store.collapsed(profile_id + 1))
+
+
+class TestServerTimingHeader(unittest.TestCase):
+    """Test the tracing hooks on the Flask app."""
+
+    def setUp(self):
+        import voyagr_web
+        self.web = voyagr_web
+        self.saved = (voyagr_web.router_holder, voyagr_web.USE_CUSTOM_ROUTER, voyagr_web.profile_store)
+        self.tmp_dir = tempfile.mkdtemp()
+        db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(db_file)
+        voyagr_web.router_holder = RouterHolder(probes=[])
+        voyagr_web.router_holder.load(db_file, warm=False)
+        voyagr_web.USE_CUSTOM_ROUTER = True
+        voyagr_web.profile_store = ProfileStore(sample_every=1, interval_s=0.001)
+        voyagr_web.route_cache.clear()
+        self.client = voyagr_web.app.test_client()
+
+    def tearDown(self):
+        self.web.router_holder, self.web.USE_CUSTOM_ROUTER, self.web.profile_store = self.saved
+        self.web.route_cache.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_route_spans(self):
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        body = {'start': f"{start['lat']},{start['lon']}", 'end': f"{end['lat']},{end['lon']}"}
+        response = self.client.post('/api/route?debug_timing=1', json=body)
+        self.assertEqual(response.status_code, 200)
+        timing = response.headers['Server-Timing']
+        for span in ('cache', 'custom_router', 'alternatives', 'costs', 'total'):
+            self.assertIn(f'{span};dur=', timing)
+        self.assertIn('custom_router', response.get_json()['timing']['spans'])
+
+        # Without the debug flag the body is left alone
+        response = self.client.post('/api/route', json=body)
+        self.assertTrue(response.get_json()['cached'])
+        self.assertNotIn('timing', response.get_json())
+
+        profile_id = response.headers['X-Profile-Id']
+        listing = self.client.get('/api/admin/profiles').get_json()
+        self.assertIn(int(profile_id), [p['id'] for p in listing['profiles']])
+        download = self.client.get('/api/admin/profiles/all')
+        self.assertEqual(download.status_code, 200)
+        self.assertIn('profile-all.folded', download.headers['Content-Disposition'])
+        self.assertEqual(self.client.get('/api/admin/profiles/12345').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
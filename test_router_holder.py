@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for double-buffered router hot swap
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from custom_router.osm_updater import OSMChange, OSMUpdater
+from custom_router.router_holder import RouterHolder
+from test_path_extraction import GRID, build_grid_db
+
+
+class TestRouterHolder(unittest.TestCase):
+    """Test loading, warming and swapping graph versions."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(self.db_file)
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        self.probes = [(start['lat'], start['lon'], end['lat'], end['lon'])]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def bump_version(self):
+        """Record a new graph version as an OSM update would."""
+        OSMUpdater(self.db_file).apply(OSMChange())
+
+    def test_load_warms_and_publishes(self):
+        """Loading warms the new instance and notifies swap listeners."""
+        holder = RouterHolder(probes=self.probes, min_probe_success=1.0)
+        published = []
+        holder.on_swap(published.append)
+
+        instance = holder.load(self.db_file)
+        self.assertIs(holder.active, instance)
+        self.assertEqual(published, [instance])
+        self.assertEqual(instance.warmup['succeeded'], 1)
+        self.assertEqual(holder.status()['last_reload']['state'], 'swapped')
+
+    def test_in_flight_requests_finish_on_old_version(self):
+        """A swap during a request leaves that request on the old instance until release."""
+        holder = RouterHolder(probes=self.probes)
+        old = holder.load(self.db_file, warm=False)
+
+        pinned = holder.checkout()
+        self.bump_version()
+        new = holder.load(self.db_file)
+
+        self.assertIs(pinned, old)
+        self.assertEqual(new.version, old.version + 1)
+        self.assertIs(holder.active, new)
+        self.assertEqual(holder.status()['retiring'], [{'version': old.version, 'in_flight': 1}])
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        self.assertIn('path_nodes', pinned.router.route(start['lat'], start['lon'], end['lat'], end['lon']))
+
+        holder.release(pinned)
+        self.assertEqual(holder.status()['retiring'], [])
+
+    def test_failed_warmup_keeps_current(self):
+        """A new version that fails its probes is not swapped in."""
+        holder = RouterHolder(probes=[(10.0, 10.0, 10.1, 10.1)], min_probe_success=1.0)
+        current = holder.load(self.db_file, warm=False)
+        with self.assertRaises(RuntimeError):
+            holder.load(self.db_file)
+        self.assertIs(holder.active, current)
+        self.assertEqual(holder.status()['last_reload']['state'], 'failed')
+
+    def test_reload_async(self):
+        """Background reload swaps in the new version; a second reload is refused while running."""
+        holder = RouterHolder(probes=self.probes)
+        holder.load(self.db_file, warm=False)
+        self.bump_version()
+
+        self.assertTrue(holder.reload_async(self.db_file))
+        self.assertTrue(holder.wait(timeout=60))
+        self.assertEqual(holder.status()['active']['version'], 1)
+        self.assertEqual(holder.swap_count, 2)
+
+        with holder.acquire() as instance:
+            self.assertEqual(instance.in_flight, 1)
+        self.assertEqual(instance.in_flight, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
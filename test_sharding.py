@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Tests for graph partitioning and multi-shard routing
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.access import ACCESS_FOOT
+from custom_router.graph import RoadNetwork
+from custom_router.osm_parser import OSMParser
+from custom_router.sharding import (GraphPartitioner, ShardedRouter, ShardWorker,
+                                    path_cost, shard_search)
+
+GRID = 10
+
+
+def build_grid_db(db_file):
+    """Create a grid with mixed road types and a few one-way streets."""
+    parser = OSMParser(data_dir=os.path.dirname(db_file))
+    parser.db_file = db_file
+    rng = random.Random(3)
+
+    nodes = {}
+    for row in range(GRID):
+        for col in range(GRID):
+            nodes[row * GRID + col + 1] = {'lat': 53.0 + row * 0.002, 'lon': -1.5 + col * 0.003}
+    ways = {
+        1: {'name': 'Main Road', 'highway': 'primary', 'speed_limit': 60, 'nodes': []},
+        2: {'name': 'Side Street', 'highway': 'residential', 'speed_limit': 30, 'nodes': []},
+    }
+    parser.create_database(nodes, ways, [])
+
+    conn = sqlite3.connect(db_file)
+    for row in range(GRID):
+        for col in range(GRID):
+            node_id = row * GRID + col + 1
+            for drow, dcol in ((0, 1), (1, 0)):
+                if row + drow >= GRID or col + dcol >= GRID:
+                    continue
+                other = (row + drow) * GRID + (col + dcol) + 1
+                way_id = 1 if row == 4 or col == 4 else 2
+                speed = 60 if way_id == 1 else 30
+                distance = RoadNetwork.haversine_distance(
+                    (nodes[node_id]['lat'], nodes[node_id]['lon']),
+                    (nodes[other]['lat'], nodes[other]['lon']))
+                oneway = way_id == 2 and rng.random() < 0.2
+                pairs = [(node_id, other)] if oneway else [(node_id, other), (other, node_id)]
+                for a, b in pairs:
+                    conn.execute(
+                        'INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id) '
+                        'VALUES (?, ?, ?, ?, ?)', (a, b, distance, speed, way_id))
+    conn.commit()
+    conn.close()
+    return nodes
+
+
+class TestGraphPartitioner(unittest.TestCase):
+    """Test shard assignment and overlay construction."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_assign_shards_is_balanced(self):
+        """Every node gets a shard and shards are roughly equal in size."""
+        nodes = [(n, d['lat'], d['lon']) for n, d in self.nodes.items()]
+        assignment = GraphPartitioner.assign_shards(nodes, 3)
+        self.assertEqual(len(assignment), len(nodes))
+        sizes = [list(assignment.values()).count(s) for s in range(3)]
+        self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_partition_keeps_every_edge(self):
+        """Internal edges + cut edges account for all edges of the source graph."""
+        partitioner = GraphPartitioner(self.db_file, os.path.join(self.tmp_dir, 'shards'), 4)
+        partitioner.partition()
+
+        conn = sqlite3.connect(self.db_file)
+        total_edges = conn.execute('SELECT COUNT(*) FROM edges').fetchone()[0]
+        conn.close()
+
+        internal = 0
+        for shard_id in range(4):
+            conn = sqlite3.connect(partitioner.shard_db_path(shard_id))
+            internal += conn.execute('SELECT COUNT(*) FROM edges').fetchone()[0]
+            conn.close()
+        conn = sqlite3.connect(partitioner.overlay_db)
+        cut = conn.execute('SELECT COUNT(*) FROM overlay_edges WHERE shard_id = -1').fetchone()[0]
+        conn.close()
+
+        self.assertGreater(cut, 0)
+        self.assertEqual(internal + cut, total_edges)
+
+    def test_non_car_edges_are_skipped(self):
+        """Foot-only edges join neither the overlay nor the shard searches."""
+        partitioner = GraphPartitioner(self.db_file, os.path.join(self.tmp_dir, 'shards'), 2)
+        partitioner.partition()
+        conn = sqlite3.connect(partitioner.overlay_db)
+        cut = conn.execute('SELECT from_node, to_node FROM overlay_edges WHERE shard_id = -1').fetchall()
+        conn.close()
+
+        # Make every edge leaving the first cut edge's source foot-only
+        source = cut[0][0]
+        conn = sqlite3.connect(self.db_file)
+        conn.execute('UPDATE edges SET access = ? WHERE from_node_id = ?', (ACCESS_FOOT, source))
+        conn.commit()
+        conn.close()
+        partitioner.partition()
+        conn = sqlite3.connect(partitioner.overlay_db)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM overlay_edges WHERE shard_id = -1 AND from_node = ?',
+                                      (source,)).fetchone()[0], 0)
+        shard_id = conn.execute('SELECT shard_id FROM node_shard WHERE node_id = ?', (source,)).fetchone()[0]
+        conn.close()
+
+        worker = ShardWorker(partitioner.shard_db_path(shard_id), shard_id, [])
+        self.assertEqual(shard_search(worker.graph, source)[0], {source: 0.0})
+        self.assertNotIn(source, {node for edges in worker.reverse_edges.values() for node, _ in edges})
+        snapped = worker.handle('nearest', self.nodes[source]['lat'], self.nodes[source]['lon'])
+        self.assertNotEqual(snapped[0], source)
+
+    def test_parallel_cut_edges_keep_cheapest(self):
+        """A slower parallel cut edge does not replace the one the overlay search takes."""
+        partitioner = GraphPartitioner(self.db_file, os.path.join(self.tmp_dir, 'shards'), 2)
+        partitioner.partition()
+        conn = sqlite3.connect(partitioner.overlay_db)
+        u, v, distance_m = conn.execute('SELECT from_node, to_node, distance_m FROM overlay_edges '
+                                        'WHERE shard_id = -1').fetchone()
+        conn.close()
+
+        conn = sqlite3.connect(self.db_file)
+        conn.execute('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id) '
+                     'VALUES (?, ?, ?, 30, 2)', (u, v, distance_m * 2))
+        conn.commit()
+        conn.close()
+        partitioner.partition()
+
+        router = ShardedRouter(partitioner.overlay_db)
+        try:
+            self.assertAlmostEqual(router.cut_edges[(u, v)][0], distance_m)
+        finally:
+            router.close()
+
+    def test_worker_backward_matches_forward(self):
+        """Backward search costs equal forward search costs within a shard."""
+        partitioner = GraphPartitioner(self.db_file, os.path.join(self.tmp_dir, 'shards'), 2)
+        partitioner.partition()
+        conn = sqlite3.connect(partitioner.overlay_db)
+        boundary = [n for (n,) in conn.execute('SELECT node_id FROM boundary_nodes WHERE shard_id = 0')]
+        conn.close()
+
+        worker = ShardWorker(partitioner.shard_db_path(0), 0, boundary)
+        target = next(iter(worker.graph.nodes))
+        backward = worker.handle('backward', target)
+        for node, cost in backward.items():
+            forward = worker.handle('forward', node, target)
+            self.assertAlmostEqual(forward[target], cost)
+
+
+class TestShardedRouter(unittest.TestCase):
+    """Test cross-shard routing over worker processes."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.db_file = os.path.join(cls.tmp_dir, 'grid.db')
+        cls.nodes = build_grid_db(cls.db_file)
+        partitioner = GraphPartitioner(cls.db_file, os.path.join(cls.tmp_dir, 'shards'), 4)
+        partitioner.partition()
+        cls.router = ShardedRouter(partitioner.overlay_db)
+        cls.full_graph = RoadNetwork(cls.db_file)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.router.close()
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_cross_shard_routes_are_optimal(self):
+        """Sharded routes have the same cost as an exact full-graph search."""
+        rng = random.Random(11)
+        node_ids = list(self.nodes)
+        cross_shard = 0
+        for _ in range(15):
+            a, b = rng.sample(node_ids, 2)
+            route = self.router.route(self.nodes[a]['lat'], self.nodes[a]['lon'],
+                                      self.nodes[b]['lat'], self.nodes[b]['lon'])
+            if 'error' in route:
+                continue
+
+            # Compare against an exact search between the snapped endpoints
+            path = route['path_nodes']
+            dist, _ = shard_search(self.full_graph, path[0], target_node=path[-1])
+            self.assertAlmostEqual(path_cost(self.full_graph, path), dist[path[-1]], places=6)
+            self.assertEqual(len(route['coordinates']), len(path))
+            if len(route['shards_used']) > 1:
+                cross_shard += 1
+        self.assertGreater(cross_shard, 0)
+
+    def test_route_distance_matches_path(self):
+        """Reported distance equals the summed edge lengths of the path."""
+        a, b = 1, GRID * GRID
+        route = self.router.route(self.nodes[a]['lat'], self.nodes[a]['lon'],
+                                  self.nodes[b]['lat'], self.nodes[b]['lon'])
+        path = route['path_nodes']
+        expected = sum(min(d for nbr, d, _, _ in self.full_graph.get_neighbors(u) if nbr == v)
+                       for u, v in zip(path, path[1:]))
+        self.assertAlmostEqual(route['distance_m'], expected, places=3)
+
+    def test_route_duration_is_travel_time(self):
+        """Reported duration is unpenalised travel time over the path, not search cost."""
+        a, b = GRID, GRID * (GRID - 1) + 1
+        route = self.router.route(self.nodes[a]['lat'], self.nodes[a]['lon'],
+                                  self.nodes[b]['lat'], self.nodes[b]['lon'])
+        self.assertGreater(len(route['shards_used']), 1)
+        path = route['path_nodes']
+        expected = sum(min(d * 3.6 / s for nbr, d, s, _ in self.full_graph.get_neighbors(u) if nbr == v)
+                       for u, v in zip(path, path[1:]))
+        self.assertAlmostEqual(route['duration_s'], expected, places=6)
+        self.assertLess(route['duration_s'], path_cost(self.full_graph, path))
+
+    def test_restricted_vehicles_are_rejected(self):
+        """Overlay costs ignore vehicle restrictions, so restricted profiles are refused."""
+        a, b = self.nodes[1], self.nodes[GRID]
+        with self.assertRaises(ValueError):
+            self.router.route(a['lat'], a['lon'], b['lat'], b['lon'], vehicle='truck')
+        self.assertNotIn('error', self.router.route(a['lat'], a['lon'], b['lat'], b['lon'], vehicle='car'))
+
+    def test_workers_are_separate_processes(self):
+        """Each shard lives in its own process holding only its nodes."""
+        stats = self.router.get_shard_stats()
+        self.assertEqual(len(stats), 4)
+        self.assertEqual(len({s['pid'] for s in stats.values()}), 4)
+        self.assertNotIn(os.getpid(), {s['pid'] for s in stats.values()})
+        self.assertEqual(sum(s['nodes'] for s in stats.values()), GRID * GRID)
+
+
+if __name__ == '__main__':
+    unittest.main()
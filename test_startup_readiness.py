@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for staged startup: loading progress and health/readiness endpoints
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from custom_router.load_progress import LoadProgress
+from custom_router.router_holder import RouterHolder
+from test_path_extraction import GRID, build_grid_db
+
+
+class TestLoadProgress(unittest.TestCase):
+    """Test stage and count reporting while a router loads."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'grid.db')
+        self.nodes = build_grid_db(self.db_file, with_ch=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_stages_and_counts(self):
+        """A load walks through every stage and records graph sizes."""
+        start, end = self.nodes[1], self.nodes[GRID * GRID]
+        holder = RouterHolder(probes=[(start['lat'], start['lon'], end['lat'], end['lon'])])
+        self.assertEqual(holder.progress.stage, 'pending')
+
+        holder.load(self.db_file)
+        progress = holder.status()['progress']
+        self.assertTrue(progress['ready'])
+        self.assertEqual(progress['counts']['nodes'], GRID * GRID)
+        self.assertGreater(progress['counts']['edges'], 0)
+        self.assertEqual(progress['counts']['ch_nodes'], GRID * GRID)
+        self.assertEqual(progress['counts']['components'], 1)
+        self.assertEqual(set(progress['stage_times_s']), {'nodes', 'ways', 'edges', 'ch', 'components', 'warmup'})
+
+    def test_failure_recorded(self):
+        """A failed load is reported with its error and never becomes ready."""
+        def broken(db_file, progress=None):
+            progress.update('nodes')
+            raise IOError('disk gone')
+
+        holder = RouterHolder(factory=broken)
+        with self.assertRaises(IOError):
+            holder.load(self.db_file)
+        self.assertTrue(holder.progress.failed)
+        self.assertFalse(holder.progress.ready)
+        self.assertEqual(holder.progress.to_dict()['error'], 'disk gone')
+
+    def test_stage_ordering(self):
+        """Counts accumulate across stages; re-entering a stage keeps its start time."""
+        progress = LoadProgress()
+        progress.update('edges', edges=10)
+        progress.update('edges', edges=20)
+        self.assertEqual(progress.to_dict()['counts'], {'edges': 20})
+        self.assertEqual(progress.to_dict()['stage_times_s'], {})
+        progress.update('ready')
+        self.assertIn('edges', progress.to_dict()['stage_times_s'])
+
+
+class TestReadinessEndpoints(unittest.TestCase):
+    """Test /healthz, /readyz and the routing fallback while the router loads."""
+
+    def setUp(self):
+        import voyagr_web
+        self.web = voyagr_web
+        self.saved = (voyagr_web.router_holder, voyagr_web.routing_manager,
+                      voyagr_web.CUSTOM_ROUTER_AVAILABLE, voyagr_web.USE_CUSTOM_ROUTER)
+        voyagr_web.router_holder = RouterHolder(probes=[])
+        voyagr_web.CUSTOM_ROUTER_AVAILABLE = voyagr_web.USE_CUSTOM_ROUTER = True
+        self.client = voyagr_web.app.test_client()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        (self.web.router_holder, self.web.routing_manager,
+         self.web.CUSTOM_ROUTER_AVAILABLE, self.web.USE_CUSTOM_ROUTER) = self.saved
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_not_ready_while_loading(self):
+        """Liveness passes immediately; readiness waits for the router."""
+        self.web.router_holder.progress.update('edges', nodes=36, edges=1000)
+        self.assertEqual(self.client.get('/healthz').status_code, 200)
+
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['progress']['stage'], 'edges')
+        self.assertEqual(response.get_json()['progress']['counts']['edges'], 1000)
+
+    def test_ready_after_load(self):
+        """Readiness flips once the router is swapped in."""
+        db_file = os.path.join(self.tmp_dir, 'grid.db')
+        build_grid_db(db_file)
+        self.web.router_holder.load(db_file, warm=False)
+
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['custom_router'], 'ready')
+
+    def test_failed_load_serves_external_engines(self):
+        """A router that failed to load doesn't hold readiness back."""
+        self.web.router_holder.progress.fail('Database not found')
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['custom_router'], 'failed')
+
+    def test_graph_reload_limited_to_graph_dir(self):
+        """Hot reload only accepts databases next to the configured one."""
+        graph_dir = os.path.join(self.tmp_dir, 'graphs')
+        os.makedirs(graph_dir)
+        outside = os.path.join(self.tmp_dir, 'outside.db')
+        open(outside, 'w').close()
+        saved_db = self.web.CUSTOM_ROUTER_DB
+        self.web.CUSTOM_ROUTER_DB = os.path.join(graph_dir, 'uk_router.db')
+        try:
+            for db_file in (outside, '../outside.db', '/etc/passwd'):
+                response = self.client.post('/api/admin/graph/reload', json={'db_file': db_file})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('graph directory', response.get_json()['error'])
+            response = self.client.post('/api/admin/graph/reload', json={'db_file': 'next.db'})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()['error'], 'Database not found: next.db')
+        finally:
+            self.web.CUSTOM_ROUTER_DB = saved_db
+
+    def test_custom_route_falls_back(self):
+        """Custom route requests go to the engine manager until the router is ready."""
+        class EngineManager:
+            def calculate_route(self, start_lat, start_lon, end_lat, end_lon, routing_mode='auto'):
+                return {'distance_km': 12.5, 'duration_minutes': 18.0, 'geometry': '', 'source': 'OSRM'}
+
+        self.web.routing_manager = EngineManager()
+        response = self.client.post('/api/route/custom', json={'start': '51.5074,-0.1278', 'end': '51.4545,-0.9781'})
+        data = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['source'], 'OSRM')
+        self.assertFalse(data['custom_router_ready'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for strongly connected components and main-SCC snapping
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router import component_analyzer
+from custom_router.access import ACCESS_ALL, ACCESS_FOOT
+from custom_router.component_analyzer import ComponentAnalyzer
+from custom_router.dijkstra import Router
+from custom_router.graph import RoadNetwork
+from custom_router.osm_parser import OSMParser
+
+
+def build_one_way_db(db_file):
+    """Create a two-way square 1-4 with one-way spurs in and out.
+
+    1 <-> 2 <-> 3 <-> 4 <-> 1   main SCC
+    2 --> 5                     one-way dead end (enter only)
+    6 --> 3                     one-way exit (leave only)
+    4 --> 7 <-> 8               one-way into a two-way pocket
+
+    Pedestrians may walk against the one-way spurs.
+    """
+    parser = OSMParser(data_dir=os.path.dirname(db_file))
+    parser.db_file = db_file
+    nodes = {
+        1: {'lat': 53.000, 'lon': -1.500},
+        2: {'lat': 53.000, 'lon': -1.490},
+        3: {'lat': 52.990, 'lon': -1.490},
+        4: {'lat': 52.990, 'lon': -1.500},
+        5: {'lat': 53.000, 'lon': -1.470},
+        6: {'lat': 52.990, 'lon': -1.470},
+        7: {'lat': 52.970, 'lon': -1.500},
+        8: {'lat': 52.970, 'lon': -1.490},
+    }
+    ways = {1: {'name': 'Ring Road', 'highway': 'residential', 'speed_limit': 30, 'nodes': []}}
+    parser.create_database(nodes, ways, [])
+
+    edges = [(1, 2), (2, 1), (2, 3), (3, 2), (3, 4), (4, 3), (4, 1), (1, 4),
+             (2, 5), (6, 3), (4, 7), (7, 8), (8, 7)]
+    conn = sqlite3.connect(db_file)
+    directed = [(a, b, ACCESS_ALL) for a, b in edges]
+    directed += [(b, a, ACCESS_FOOT) for a, b in edges if (b, a) not in edges]
+    for a, b, access in directed:
+        distance = RoadNetwork.haversine_distance(
+            (nodes[a]['lat'], nodes[a]['lon']), (nodes[b]['lat'], nodes[b]['lon']))
+        conn.execute('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id, access) '
+                     'VALUES (?, ?, ?, ?, ?, ?)', (a, b, distance, 30, 1, access))
+    conn.commit()
+    conn.close()
+    return nodes
+
+
+class TestStrongComponents(unittest.TestCase):
+    """Test SCC labels and O(1) reachability."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'oneway.db')
+        self.nodes = build_one_way_db(self.db_file)
+        self.graph = RoadNetwork(self.db_file)
+        self.analyzer = ComponentAnalyzer(self.graph)
+        self.analyzer.analyze_union_find()
+        self.stats = self.analyzer.analyze_scc()
+        self.graph.set_component_analyzer(self.analyzer)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_scc_labels(self):
+        """The square is the main SCC; spurs and pockets are separate SCCs."""
+        self.assertEqual(self.stats['main_scc_size'], 4)
+        self.assertEqual(self.stats['total_sccs'], 4)
+        self.assertEqual({self.analyzer.get_scc_id(n) for n in (1, 2, 3, 4)}, {0})
+        self.assertEqual(self.analyzer.get_scc_id(7), self.analyzer.get_scc_id(8))
+        self.assertNotEqual(self.analyzer.get_scc_id(5), 0)
+        self.assertTrue(self.analyzer.is_connected(5, 6))  # weakly connected only
+
+    def test_can_reach(self):
+        """Provably impossible pairs are rejected; everything else passes."""
+        self.assertTrue(self.analyzer.can_reach(1, 5))
+        self.assertFalse(self.analyzer.can_reach(5, 1))
+        self.assertTrue(self.analyzer.can_reach(6, 1))
+        self.assertFalse(self.analyzer.can_reach(1, 6))
+        self.assertFalse(self.analyzer.can_reach(8, 2))
+        self.assertTrue(self.analyzer.can_reach(7, 8))
+        self.assertTrue(self.analyzer.can_reach(5, 999))
+
+    def test_python_fallback_matches(self):
+        """Pure-Python SCC pass gives the same labels without numpy."""
+        has_numpy = component_analyzer.HAS_NUMPY
+        component_analyzer.HAS_NUMPY = False
+        try:
+            analyzer = ComponentAnalyzer(self.graph)
+            analyzer.analyze_scc()
+            ids = [analyzer.get_scc_id(n) for n in sorted(self.nodes)]
+            self.assertFalse(analyzer.can_reach(5, 1))
+        finally:
+            component_analyzer.HAS_NUMPY = has_numpy
+        self.assertEqual(ids, [self.analyzer.get_scc_id(n) for n in sorted(self.nodes)])
+
+    def test_snapping_restricted_to_main_scc(self):
+        """main_scc_only skips nodes in one-way pockets."""
+        lat, lon = self.nodes[8]['lat'], self.nodes[8]['lon']
+        self.assertEqual(self.graph.find_nearest_node(lat, lon), 8)
+        self.assertEqual(self.graph.find_nearest_node(lat, lon, main_scc_only=True), 3)
+
+    def test_snapping_checks_own_grid_cell(self):
+        """A node in the query point's own grid cell beats one in the next cell."""
+        for node_id, coords in self.nodes.items():
+            self.assertEqual(self.graph.find_nearest_node(coords['lat'], coords['lon']), node_id)
+        self.assertEqual(self.graph.find_nearest_node(53.0004, -1.4896), 2)
+
+    def test_search_rejected_without_timeout(self):
+        """Dijkstra returns immediately for an impossible car pair; foot ignores SCCs."""
+        router = Router(self.graph, use_ch=False, db_file=self.db_file)
+        self.assertIsNone(router.dijkstra(5, 1))
+        self.assertEqual(router.dijkstra(5, 2, mode='foot'), [5, 2])
+
+        start, end = self.nodes[8], self.nodes[5]
+        route = router.route(start['lat'], start['lon'], end['lat'], end['lon'])
+        self.assertEqual(route['path_nodes'], [3, 2])
+
+    def test_scc_cached_with_components(self):
+        """analyze_cached stores SCC labels and reloads them."""
+        cache_file = ComponentAnalyzer.cache_path(self.db_file)
+        ComponentAnalyzer(self.graph).analyze_cached(cache_file)
+        if not component_analyzer.HAS_NUMPY:
+            return
+        analyzer = ComponentAnalyzer(self.graph)
+        self.assertTrue(analyzer.load(cache_file))
+        self.assertFalse(analyzer.can_reach(1, 6))
+        self.assertIn('scc', analyzer.get_statistics())
+
+    def test_scc_built_in_background(self):
+        """Start-up returns with weak components while SCCs are computed and cached in a thread."""
+        if not component_analyzer.HAS_NUMPY:
+            return
+        cache_file = ComponentAnalyzer.cache_path(self.db_file)
+        analyzer = ComponentAnalyzer(self.graph)
+        stats = analyzer.analyze_cached(cache_file, scc_in_background=True)
+        self.assertGreater(stats['total_components'], 0)
+        analyzer.scc_thread.join(timeout=30)
+        self.assertFalse(analyzer.can_reach(1, 6))
+
+        # The next start-up loads the SCCs from the cache
+        reloaded = ComponentAnalyzer(self.graph)
+        reloaded.analyze_cached(cache_file, scc_in_background=True)
+        self.assertIsNone(reloaded.scc_thread)
+        self.assertFalse(reloaded.can_reach(1, 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic road network generator
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.access import ACCESS_CAR
+from custom_router.component_analyzer import ComponentAnalyzer
+from custom_router.dijkstra import Router
+from custom_router.graph import RoadNetwork
+from custom_router.synthetic import SyntheticNetworkGenerator
+from test_osm_updater import edge_set
+
+
+class TestSyntheticNetwork(unittest.TestCase):
+    """Test that generated networks are deterministic and routable."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.db_file = os.path.join(cls.tmp_dir, 'synthetic.db')
+        cls.generator = SyntheticNetworkGenerator(10000, seed=7)
+        cls.stats = cls.generator.generate(cls.db_file)
+        cls.graph = RoadNetwork(cls.db_file)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_deterministic(self):
+        """The same seed gives the same edges; another seed does not."""
+        same = os.path.join(self.tmp_dir, 'same.db')
+        other = os.path.join(self.tmp_dir, 'other.db')
+        SyntheticNetworkGenerator(10000, seed=7).generate(same)
+        SyntheticNetworkGenerator(10000, seed=8).generate(other)
+        self.assertEqual(edge_set(same), edge_set(self.db_file))
+        self.assertNotEqual(edge_set(other), edge_set(self.db_file))
+
+    def test_size_and_degrees(self):
+        """Node count is near the target with mostly degree 2 and 3 nodes."""
+        self.assertGreater(self.stats['nodes_written'], 8000)
+        self.assertLess(self.stats['nodes_written'], 12000)
+        neighbors = {}
+        for node, edges in self.graph.edges.items():
+            for nbr, _, _, _ in edges:
+                neighbors.setdefault(node, set()).add(nbr)
+                neighbors.setdefault(nbr, set()).add(node)
+        degrees = [len(nbrs) for nbrs in neighbors.values()]
+        self.assertTrue(all(1 <= d <= 4 for d in degrees))
+        self.assertGreater(sum(1 for d in degrees if d == 2), len(degrees) / 3)
+        self.assertGreater(sum(1 for d in degrees if d == 1), 0)
+
+    def test_features(self):
+        """Motorways, one-ways, tolls, path-only ways and islands are all present."""
+        conn = sqlite3.connect(self.db_file)
+        road_types = {row[0]: row[1:] for row in conn.execute(
+            'SELECT road_type, COUNT(*), SUM(oneway), SUM(toll), MAX(access) FROM edges GROUP BY road_type')}
+        conn.close()
+        self.assertEqual(road_types['motorway'][3], ACCESS_CAR)
+        self.assertGreater(road_types['motorway'][2], 0)
+        self.assertGreater(road_types['residential'][1], 0)
+        self.assertIn('motorway_link', road_types)
+        self.assertIn('footway', road_types)
+
+        stats = ComponentAnalyzer(self.graph).analyze_union_find()
+        self.assertGreaterEqual(stats['total_components'], 1 + self.stats['islands'])
+        self.assertGreater(stats['main_component_pct'], 95)
+
+    def test_routable(self):
+        """A route across the grid uses the network."""
+        router = Router(self.graph, use_ch=False, db_file=self.db_file)
+        side = self.stats['grid_side']
+        start = self.graph.nodes[self.generator.grid_node(1, 1)]
+        end = self.graph.nodes[self.generator.grid_node(side - 2, side - 2)]
+        route = router.route(*start, *end)
+        self.assertIsNotNone(route)
+        self.assertGreater(route['distance_m'], 5000)
+
+    def test_rejects_tiny_networks(self):
+        with self.assertRaises(ValueError):
+            SyntheticNetworkGenerator(10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tests for car, bike and foot routing over one shared graph
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.access import (ACCESS_ALL, ACCESS_BIKE, ACCESS_CAR, ACCESS_FOOT,
+                                  mode_mask, way_access)
+from custom_router.contraction_hierarchies import ContractionHierarchies
+from custom_router.graph import RoadNetwork
+from custom_router.dijkstra import Router
+from custom_router.k_shortest_paths import KShortestPaths
+from custom_router.osm_parser import OSMParser
+
+
+def build_mode_db(db_file, with_access_column=True):
+    """Create a square of nodes 1-4 with a motorway, a footway and a cycleway.
+
+    1 --motorway-- 2
+    |              |
+    4 --footway--- 3      1-4 and 2-3 are residential, 1-3 is a cycleway
+    """
+    parser = OSMParser(data_dir=os.path.dirname(db_file))
+    parser.db_file = db_file
+    nodes = {
+        1: {'lat': 53.0, 'lon': -1.5},
+        2: {'lat': 53.0, 'lon': -1.49},
+        3: {'lat': 52.99, 'lon': -1.49},
+        4: {'lat': 52.99, 'lon': -1.5},
+    }
+    ways = {
+        10: {'name': 'M1', 'highway': 'motorway', 'speed_limit': 110, 'nodes': []},
+        20: {'name': 'Church Lane', 'highway': 'residential', 'speed_limit': 30, 'nodes': []},
+        30: {'name': 'Canal Path', 'highway': 'footway', 'speed_limit': 5, 'nodes': []},
+        40: {'name': 'Green Route', 'highway': 'cycleway', 'speed_limit': 20, 'nodes': []},
+    }
+    parser.create_database(nodes, ways, [])
+
+    edges = [
+        (1, 2, 10, ACCESS_CAR), (2, 1, 10, ACCESS_CAR),
+        (1, 4, 20, ACCESS_ALL), (4, 1, 20, ACCESS_ALL),
+        (2, 3, 20, ACCESS_ALL), (3, 2, 20, ACCESS_ALL),
+        (4, 3, 30, ACCESS_FOOT), (3, 4, 30, ACCESS_FOOT),
+        (1, 3, 40, ACCESS_BIKE | ACCESS_FOOT), (3, 1, 40, ACCESS_BIKE | ACCESS_FOOT),
+    ]
+    conn = sqlite3.connect(db_file)
+    if not with_access_column:
+        conn.execute('ALTER TABLE edges RENAME TO edges_full')
+        conn.execute('CREATE TABLE edges (from_node_id INTEGER, to_node_id INTEGER, distance_m REAL, '
+                     'speed_limit_kmh INTEGER, way_id INTEGER)')
+    for a, b, way_id, access in edges:
+        distance = RoadNetwork.haversine_distance(
+            (nodes[a]['lat'], nodes[a]['lon']), (nodes[b]['lat'], nodes[b]['lon']))
+        speed = ways[way_id]['speed_limit']
+        if with_access_column:
+            conn.execute('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id, access) '
+                         'VALUES (?, ?, ?, ?, ?, ?)', (a, b, distance, speed, way_id, access))
+        else:
+            conn.execute('INSERT INTO edges VALUES (?, ?, ?, ?, ?)', (a, b, distance, speed, way_id))
+    conn.commit()
+    conn.close()
+    return nodes
+
+
+class TestWayAccess(unittest.TestCase):
+    """Test access flags derived from OSM tags."""
+
+    def test_highway_defaults(self):
+        """Motorways are car-only and footways are foot-only."""
+        self.assertEqual(way_access({'highway': 'motorway'}), (ACCESS_CAR, ACCESS_CAR))
+        self.assertEqual(way_access({'highway': 'footway'}), (ACCESS_FOOT, ACCESS_FOOT))
+        self.assertEqual(way_access({'highway': 'residential'}), (ACCESS_ALL, ACCESS_ALL))
+
+    def test_access_tags_override_defaults(self):
+        """Mode tags grant or remove access."""
+        forward, _ = way_access({'highway': 'footway', 'bicycle': 'yes'})
+        self.assertEqual(forward, ACCESS_FOOT | ACCESS_BIKE)
+        forward, _ = way_access({'highway': 'residential', 'motor_vehicle': 'no'})
+        self.assertEqual(forward, ACCESS_FOOT | ACCESS_BIKE)
+
+    def test_oneway_applies_per_mode(self):
+        """Oneway restricts cars and bikes but never pedestrians."""
+        self.assertEqual(way_access({'highway': 'residential', 'oneway': 'yes'}),
+                         (ACCESS_ALL, ACCESS_FOOT))
+        self.assertEqual(way_access({'highway': 'residential', 'oneway': 'yes', 'oneway:bicycle': 'no'}),
+                         (ACCESS_ALL, ACCESS_FOOT | ACCESS_BIKE))
+        self.assertEqual(way_access({'highway': 'residential', 'oneway': '-1'}),
+                         (ACCESS_FOOT, ACCESS_ALL))
+
+    def test_mode_names(self):
+        """API routing modes map onto access bits."""
+        self.assertEqual(mode_mask('auto'), ACCESS_CAR)
+        self.assertEqual(mode_mask('bicycle'), ACCESS_BIKE)
+        self.assertEqual(mode_mask('pedestrian'), ACCESS_FOOT)
+        with self.assertRaises(ValueError):
+            mode_mask('boat')
+
+
+class TestModeRouting(unittest.TestCase):
+    """Test routing each mode over the same loaded graph."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'modes.db')
+        self.nodes = build_mode_db(self.db_file)
+        self.graph = RoadNetwork(self.db_file)
+        self.router = Router(self.graph, use_ch=False, db_file=self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_modes_use_their_own_edges(self):
+        """Car takes the motorway, bikes the cycleway, and neither uses the footway."""
+        self.assertEqual(self.router.dijkstra(1, 3, mode='car'), [1, 2, 3])
+        self.assertEqual(self.router.dijkstra(1, 3, mode='bike'), [1, 3])
+        self.assertEqual(self.router.dijkstra(4, 3, mode='foot'), [4, 3])
+        self.assertNotEqual(self.router.dijkstra(4, 3, mode='car'), [4, 3])
+
+    def test_unreachable_for_mode(self):
+        """A node only reachable by car-only roads has no bike route."""
+        for from_node, to_node in ((2, 3), (3, 2)):
+            index = [e[0] for e in self.graph.get_neighbors(from_node)].index(to_node)
+            self.graph._set_edge_access(from_node, index, ACCESS_CAR)
+        self.assertIsNone(self.router.dijkstra(4, 2, mode='bike'))
+        self.assertEqual(self.router.dijkstra(4, 2, mode='car'), [4, 1, 2])
+
+    def test_one_way_access_in_backward_search(self):
+        """The backward search checks the edge it travels, not its reverse."""
+        # Cycleway made one-way for bikes: 3 -> 1 only
+        index = [e[0] for e in self.graph.get_neighbors(1)].index(3)
+        self.graph._set_edge_access(1, index, ACCESS_FOOT)
+        self.assertIsNone(self.router.dijkstra(1, 3, mode='bike'))
+        self.assertEqual(self.router.dijkstra(3, 1, mode='bike'), [3, 1])
+        path, path_edges = self.router.dijkstra(3, 1, mode='bike', return_edges=True)
+        self.assertEqual([edge[0] for edge in path_edges], [1])
+
+    def test_ch_contracts_car_edges_only(self):
+        """CH shortcuts never run along the footway or the cycleway."""
+        ch = ContractionHierarchies(self.graph, self.db_file)
+        ch.build()
+        # Contracting 2 joins 1 and 3 over the motorway; contracting 1 joins 2 and 4
+        self.assertEqual(set(ch.shortcuts), {(1, 3), (3, 1), (2, 4), (4, 2)})
+        d = {(a, b): RoadNetwork.haversine_distance(
+            (self.nodes[a]['lat'], self.nodes[a]['lon']), (self.nodes[b]['lat'], self.nodes[b]['lon']))
+            for a, b in ((1, 2), (2, 3), (1, 4))}
+        self.assertAlmostEqual(ch.shortcuts[(1, 3)], d[(1, 2)] + d[(2, 3)], places=3)
+        self.assertAlmostEqual(ch.shortcuts[(2, 4)], d[(1, 2)] + d[(1, 4)], places=3)
+
+    def test_route_durations_use_mode_speed(self):
+        """Foot routes are timed at walking speed."""
+        start, end = self.nodes[4], self.nodes[3]
+        route = self.router.route(start['lat'], start['lon'], end['lat'], end['lon'], mode='pedestrian')
+        self.assertEqual(route['mode'], 'foot')
+        self.assertAlmostEqual(route['duration_s'],
+                               route['distance_m'] * 3.6 / Router.MODE_SPEEDS_KMH['foot'])
+
+    def test_k_paths_keep_access_aligned(self):
+        """Removing and restoring spur edges keeps access masks aligned."""
+        before = {n: bytes(a) for n, a in self.graph.edge_access.items()}
+        reverse_before = {n: sorted(e[:2] + e[3:] for e in edges) for n, edges in self.graph.reverse_edges.items()}
+        start, end = self.nodes[1], self.nodes[3]
+        routes = KShortestPaths(self.router).find_k_paths(
+            start['lat'], start['lon'], end['lat'], end['lon'], k=3, mode='bike')
+        self.assertGreaterEqual(len(routes), 1)
+        self.assertNotIn(10, [w for r in routes for w in r['way_ids']])
+        self.assertEqual({n: bytes(a) for n, a in self.graph.edge_access.items()}, before)
+        self.assertEqual({n: sorted(e[:2] + e[3:] for e in edges)
+                          for n, edges in self.graph.reverse_edges.items()}, reverse_before)
+
+    def test_legacy_database_derives_access(self):
+        """Databases without an access column fall back to highway defaults."""
+        db_file = os.path.join(self.tmp_dir, 'legacy.db')
+        build_mode_db(db_file, with_access_column=False)
+        router = Router(RoadNetwork(db_file), use_ch=False, db_file=db_file)
+        self.assertEqual(router.dijkstra(1, 3, mode='car'), [1, 2, 3])
+        self.assertEqual(router.dijkstra(1, 2, mode='foot'), [1, 3, 2])
+
+
+class TestBuildEdges(unittest.TestCase):
+    """Test edge building from parsed ways."""
+
+    def test_build_edges_from_ways_keeps_masks(self):
+        """Reverse edges of a car oneway exist for pedestrians only."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            db_file = os.path.join(tmp_dir, 'empty.db')
+            parser = OSMParser(data_dir=tmp_dir)
+            parser.db_file = db_file
+            parser.create_database({1: {'lat': 53.0, 'lon': -1.5}, 2: {'lat': 53.001, 'lon': -1.5}}, {}, [])
+            graph = RoadNetwork(db_file)
+            forward, backward = way_access({'highway': 'residential', 'oneway': 'yes'})
+            graph.build_edges_from_ways({7: {'nodes': [1, 2], 'speed_limit': 30, 'oneway': True,
+                                             'access_forward': forward, 'access_backward': backward}})
+            self.assertEqual([e[0] for e in graph.get_neighbors(2)], [1])
+            self.assertEqual(graph.get_edge_access(2), bytearray([ACCESS_FOOT]))
+            self.assertIsNone(graph.get_edge_access(1))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
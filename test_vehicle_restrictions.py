@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for height/weight/width/HGV restrictions compiled into edge filters
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from custom_router.access import (RESTRICT_HGV, VEHICLE_PROFILES, VehicleProfile,
+                                  parse_dimension, vehicle_restriction_mask, way_restrictions)
+from custom_router.graph import RoadNetwork
+from custom_router.dijkstra import Router
+from custom_router.k_shortest_paths import KShortestPaths
+from custom_router.osm_parser import OSMParser
+
+
+def build_bridge_db(db_file, with_ch=False):
+    """Create two parallel routes from 1 to 3: a short one under a 3.0m bridge and a longer detour.
+
+    1 --(low bridge)-- 2 -- 3
+    |                       |
+    4 -------------------- 5
+    """
+    parser = OSMParser(data_dir=os.path.dirname(db_file))
+    parser.db_file = db_file
+    nodes = {
+        1: {'lat': 53.0, 'lon': -1.50},
+        2: {'lat': 53.0, 'lon': -1.49},
+        3: {'lat': 53.0, 'lon': -1.48},
+        4: {'lat': 52.99, 'lon': -1.50},
+        5: {'lat': 52.99, 'lon': -1.48},
+    }
+    ways = {
+        1: {'name': 'Station Road', 'highway': 'primary', 'speed_limit': 50, 'nodes': []},
+        2: {'name': 'Bypass', 'highway': 'primary', 'speed_limit': 50, 'nodes': []},
+    }
+    parser.create_database(nodes, ways, [])
+
+    low_bridge = way_restrictions({'maxheight': '3.0'})
+    edges = [(1, 2, 1, low_bridge), (2, 3, 1, 0), (1, 4, 2, 0), (4, 5, 2, 0), (5, 3, 2, 0)]
+    conn = sqlite3.connect(db_file)
+    for a, b, way_id, code in edges:
+        distance = RoadNetwork.haversine_distance(
+            (nodes[a]['lat'], nodes[a]['lon']), (nodes[b]['lat'], nodes[b]['lon']))
+        for u, v in ((a, b), (b, a)):
+            conn.execute('INSERT INTO edges (from_node_id, to_node_id, distance_m, speed_limit_kmh, way_id, '
+                         'restrictions) VALUES (?, ?, ?, ?, ?, ?)', (u, v, distance, 50, way_id, code))
+    if with_ch:
+        conn.execute('CREATE TABLE ch_node_order (node_id INTEGER PRIMARY KEY, order_id INTEGER)')
+        conn.executemany('INSERT INTO ch_node_order VALUES (?, ?)', [(n, n) for n in nodes])
+    conn.commit()
+    conn.close()
+    return nodes
+
+
+class TestRestrictionCodes(unittest.TestCase):
+    """Test tag parsing and vehicle mask compilation."""
+
+    def test_parse_dimension_units(self):
+        """Metric, imperial and weight units are converted."""
+        self.assertAlmostEqual(parse_dimension('3.5'), 3.5)
+        self.assertAlmostEqual(parse_dimension('3.5 m'), 3.5)
+        self.assertAlmostEqual(parse_dimension("12'6\""), 3.81)
+        self.assertAlmostEqual(parse_dimension('7500 kg'), 7.5)
+        self.assertAlmostEqual(parse_dimension('7.5 t'), 7.5)
+        self.assertIsNone(parse_dimension('none'))
+        self.assertIsNone(parse_dimension(None))
+
+    def test_vehicle_blocked_only_by_smaller_limits(self):
+        """A 4.0m truck is stopped by a 3.8m bridge but not a 5m one; cars never are."""
+        truck = VehicleProfile('truck', height_m=4.0)
+        self.assertTrue(way_restrictions({'maxheight': '3.8'}) & truck.restriction_mask)
+        self.assertFalse(way_restrictions({'maxheight': '5'}) & truck.restriction_mask)
+        self.assertFalse(way_restrictions({'maxheight': '2.1'}) & VEHICLE_PROFILES['car'].restriction_mask)
+
+    def test_weight_width_and_hgv(self):
+        """Weight, width and hgv=no restrictions each map to their own bits."""
+        truck = VEHICLE_PROFILES['truck']
+        van = VEHICLE_PROFILES['van']
+        self.assertTrue(way_restrictions({'maxweight': '7.5'}) & truck.restriction_mask)
+        self.assertFalse(way_restrictions({'maxweight': '7.5'}) & van.restriction_mask)
+        self.assertTrue(way_restrictions({'maxwidth': '2.2'}) & truck.restriction_mask)
+        self.assertEqual(way_restrictions({'hgv': 'no'}), RESTRICT_HGV)
+        self.assertFalse(RESTRICT_HGV & van.restriction_mask)
+
+    def test_mask_lookup(self):
+        """Profiles resolve by name; unknown names and None are unrestricted."""
+        self.assertEqual(vehicle_restriction_mask('truck'), VEHICLE_PROFILES['truck'].restriction_mask)
+        self.assertEqual(vehicle_restriction_mask(None), 0)
+        self.assertEqual(vehicle_restriction_mask('spaceship'), 0)
+
+
+class TestRestrictedRouting(unittest.TestCase):
+    """Test that searches avoid edges a vehicle cannot use."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmp_dir, 'bridge.db')
+        self.nodes = build_bridge_db(self.db_file)
+        self.graph = RoadNetwork(self.db_file)
+        self.router = Router(self.graph, use_ch=False, db_file=self.db_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_truck_takes_detour(self):
+        """Cars and vans go under the bridge; trucks take the bypass."""
+        truck_mask = VEHICLE_PROFILES['truck'].restriction_mask
+        self.assertEqual(self.router.dijkstra(1, 3), [1, 2, 3])
+        self.assertEqual(self.router.dijkstra(1, 3, vehicle_mask=VEHICLE_PROFILES['van'].restriction_mask),
+                         [1, 2, 3])
+        self.assertEqual(self.router.dijkstra(1, 3, vehicle_mask=truck_mask), [1, 4, 5, 3])
+
+    def test_route_accepts_profile_name(self):
+        """Router.route takes a vehicle profile name."""
+        start, end = self.nodes[1], self.nodes[3]
+        route = self.router.route(start['lat'], start['lon'], end['lat'], end['lon'], vehicle='truck')
+        self.assertEqual(route['vehicle_mask'], VEHICLE_PROFILES['truck'].restriction_mask)
+        path = route['path_nodes']
+        self.assertNotIn((1, 2), list(zip(path, path[1:])))
+
+    def test_route_bypass_between_snapped_nodes(self):
+        """Main-SCC snapping keeps the truck's endpoints, so its route is exactly the bypass."""
+        start, end = self.nodes[1], self.nodes[3]
+        route = self.router.route(start['lat'], start['lon'], end['lat'], end['lon'], vehicle='truck')
+        self.assertEqual(route['path_nodes'], [1, 4, 5, 3])
+
+    def test_snapping_skips_nodes_closed_to_vehicle(self):
+        """A node whose every edge is closed to a truck is not a truck endpoint."""
+        index = [e[0] for e in self.graph.get_neighbors(2)].index(3)
+        self.graph._set_edge_restrictions(2, index, way_restrictions({'maxheight': '3.0'}))
+        truck_mask = VEHICLE_PROFILES['truck'].restriction_mask
+        lat, lon = self.nodes[2]['lat'], self.nodes[2]['lon']
+        self.assertEqual(self.graph.find_nearest_node(lat, lon), 2)
+        self.assertNotEqual(self.graph.find_nearest_node(lat, lon, vehicle_mask=truck_mask), 2)
+
+        end = self.nodes[5]
+        route = self.router.route(lat, lon, end['lat'], end['lon'], vehicle='truck')
+        self.assertNotEqual(route['path_nodes'][0], 2)
+
+    def test_k_paths_never_use_restricted_edges(self):
+        """Alternatives for a truck never pass under the bridge."""
+        start, end = self.nodes[1], self.nodes[3]
+        routes = KShortestPaths(self.router).find_k_paths(
+            start['lat'], start['lon'], end['lat'], end['lon'], k=3, vehicle='truck')
+        self.assertGreaterEqual(len(routes), 1)
+        for route in routes:
+            self.assertNotIn((1, 2), list(zip(route['path_nodes'], route['path_nodes'][1:])))
+        self.assertEqual(self.graph.get_edge_restrictions(1)[0], way_restrictions({'maxheight': '3.0'}))
+
+    def test_ch_search_filters_restrictions(self):
+        """CH forward and backward searches skip restricted edges."""
+        db_file = os.path.join(self.tmp_dir, 'bridge_ch.db')
+        build_bridge_db(db_file, with_ch=True)
+        router = Router(RoadNetwork(db_file), use_ch=True, db_file=db_file)
+        self.assertTrue(router.ch_available)
+        truck_mask = VEHICLE_PROFILES['truck'].restriction_mask
+        self.assertEqual(router._dijkstra_ch(1, 3, vehicle_mask=truck_mask), [1, 4, 5, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
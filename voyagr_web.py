@@ -5,7 +5,7 @@ Run this on your PC and access from any device with a browser
 Features: Route calculation, cost estimation, multi-stop routing, trip history, vehicle profiles
 """
 
-from flask import Flask, render_template_string, request, jsonify, send_file
+from flask import Flask, render_template_string, request, jsonify, send_file, g, Response
 from flask_cors import CORS
 import requests
 import os
@@ -16,11 +16,19 @@ from datetime import datetime
 import threading
 import math
 import time
+from contextlib import contextmanager
 from functools import wraps
 from collections import OrderedDict
 import logging
 from typing import List, Dict, Tuple, Optional, Any, Callable, TypeVar
 
+from db_migrations import (ACTIVE_REPORTS_BBOX_SQL, CAMERAS_BBOX_SQL, VOYAGR_WEB_MIGRATIONS,
+                           apply_connection_pragmas, enable_wal, migrate)
+from hazard_index import HazardIndex, SharedHazardIndex
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, get_registry, histogram_samples
+from query_profiler import connect as profiled_connect, get_query_profiler
+from request_tracing import ProfileStore, current_trace, end_trace, start_trace, trace_span, traced
+
 F = TypeVar('F', bound=Callable[..., Any])
 
 # Optional imports with fallbacks
@@ -53,9 +61,16 @@ except ImportError:
     initialize_router = None  # type: ignore
     get_router_service = None  # type: ignore
 
+# Import external engine fallback chain (serves routes while the custom router loads)
+try:
+    from routing_engines import routing_manager
+except ImportError:
+    routing_manager = None  # type: ignore
+
 load_dotenv()
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
+APP_START_TIME = time.time()
 
 # Enable CORS for mobile compatibility
 # Restrict origins to prevent CSRF attacks
@@ -251,6 +266,11 @@ def validate_vehicle_type(vehicle_type: str) -> bool:
     valid_types: List[str] = ['petrol_diesel', 'electric', 'hybrid']
     return vehicle_type in valid_types
 
+def validate_vehicle_class(vehicle_class: str) -> bool:
+    """Validate vehicle size class used for height/weight/width restrictions."""
+    valid_classes: List[str] = ['car', 'van', 'truck', 'hgv']
+    return vehicle_class in valid_classes
+
 def validate_route_request(data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
     """
     Validate route calculation request.
@@ -288,6 +308,18 @@ def validate_route_request(data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
     if not validate_vehicle_type(vehicle_type):
         return False, f"Invalid vehicle_type: {vehicle_type}"
 
+    vehicle_class = data.get('vehicle_class', 'car')
+    if not validate_vehicle_class(vehicle_class):
+        return False, f"Invalid vehicle_class: {vehicle_class}"
+
+    # Validate optional vehicle dimensions
+    try:
+        for field in ('vehicle_height_m', 'vehicle_weight_t', 'vehicle_width_m'):
+            if data.get(field) is not None and float(data[field]) <= 0:
+                return False, f"{field} must be positive"
+    except (ValueError, TypeError):
+        return False, "Invalid vehicle dimensions"
+
     # Validate numeric fields
     try:
         fuel_efficiency = float(data.get('fuel_efficiency', 6.5))
@@ -320,9 +352,80 @@ else:
     logger.warning("[COMPRESSION] flask-compress not installed, compression disabled")
     logger.info("[COMPRESSION] Install with: pip install flask-compress")
 
+# ============================================================================
+# REQUEST TRACING: Server-Timing spans and sampled profiling
+# ============================================================================
+# Registered after Compress, so these hooks see the response before it is gzipped
+metrics_registry = get_registry()
+HTTP_REQUESTS = metrics_registry.counter(
+    'voyagr_http_requests', 'HTTP requests by endpoint, method and status', ('endpoint', 'method', 'status'))
+HTTP_LATENCY = metrics_registry.histogram(
+    'voyagr_http_request_duration_seconds', 'HTTP request latency by endpoint', ('endpoint',))
+ENGINE_LATENCY = metrics_registry.histogram(
+    'voyagr_engine_request_duration_seconds', 'External routing engine HTTP latency', ('engine',))
+ENGINE_REQUESTS = metrics_registry.counter(
+    'voyagr_engine_requests', 'External routing engine requests by outcome', ('engine', 'outcome'))
+CUSTOM_ROUTER_LATENCY = metrics_registry.histogram(
+    'voyagr_custom_router_request_duration_seconds', 'Custom router route() latency by outcome', ('outcome',))
+ROUTE_CACHE_LOOKUPS = metrics_registry.counter(
+    'voyagr_route_cache_lookups', 'Route cache lookups by result', ('result',))
+ROUTE_CACHE_HIT = ROUTE_CACHE_LOOKUPS.labels('hit')
+ROUTE_CACHE_MISS = ROUTE_CACHE_LOOKUPS.labels('miss')
+
+@contextmanager
+def engine_call(engine: str):
+    """Time an external engine request as a trace span and in the engine latency histogram."""
+    start = time.perf_counter()
+    try:
+        with trace_span(engine):
+            yield
+    finally:
+        ENGINE_LATENCY.labels(engine).observe(time.perf_counter() - start)
+
+PROFILE_SAMPLE_EVERY = int(os.getenv('PROFILE_SAMPLE_EVERY', '0'))  # 0 = profiling off
+profile_store = ProfileStore(sample_every=PROFILE_SAMPLE_EVERY)
+
+@app.before_request
+def begin_request_trace() -> None:
+    """Start collecting stage spans (and maybe a profile) for this request."""
+    g.trace_token = start_trace()
+    g.profiler = profile_store.start() if request.path.startswith('/api/') else None
+
+@app.after_request
+def add_server_timing(response: Any) -> Any:
+    """Emit spans as Server-Timing, and in a 'timing' field when debug_timing is set."""
+    trace = current_trace()
+    if trace is None:
+        return response
+    profiler = g.pop('profiler', None)
+    if profiler:
+        response.headers['X-Profile-Id'] = str(profile_store.finish(profiler, request.path, trace))
+    response.headers['Server-Timing'] = trace.server_timing()
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_REQUESTS.labels(endpoint, request.method, response.status_code).inc()
+    HTTP_LATENCY.labels(endpoint).observe(time.perf_counter() - trace.start)
+
+    debug = request.args.get('debug_timing') or request.headers.get('X-Debug-Timing')
+    if debug and response.is_json and not response.direct_passthrough:
+        data = response.get_json(silent=True)
+        if isinstance(data, dict):
+            data['timing'] = trace.to_dict()
+            response.set_data(json.dumps(data))
+    return response
+
+@app.teardown_request
+def finish_request_trace(_exc: Optional[BaseException]) -> None:
+    profiler = g.pop('profiler', None)
+    if profiler:
+        profiler.stop()  # request failed before after_request
+    token = g.pop('trace_token', None)
+    if token is not None:
+        end_trace(token)
+
 VALHALLA_URL = os.getenv('VALHALLA_URL', 'http://localhost:8002')
 GRAPHHOPPER_URL = os.getenv('GRAPHHOPPER_URL', 'http://localhost:8989')
 USE_OSRM = os.getenv('USE_OSRM', 'false').lower() == 'true'
+OSRM_URL = os.getenv('OSRM_URL', 'http://router.project-osrm.org')
 
 # ============================================================================
 # PHASE 3: CUSTOM ROUTER INTEGRATION
@@ -331,10 +434,14 @@ USE_OSRM = os.getenv('USE_OSRM', 'false').lower() == 'true'
 try:
     from custom_router import RoadNetwork, Router, KShortestPaths
     from custom_router.component_analyzer import ComponentAnalyzer
+    from custom_router.access import VEHICLE_PROFILES, VehicleProfile
+    from custom_router.router_holder import RouterHolder, RouterInstance, attach_component_analyzer
     CUSTOM_ROUTER_AVAILABLE = True
 except ImportError:
     CUSTOM_ROUTER_AVAILABLE = False
     ComponentAnalyzer = None  # type: ignore
+    RouterHolder = None  # type: ignore
+    VEHICLE_PROFILES, VehicleProfile = {}, None  # type: ignore
     logger.warning("[CUSTOM_ROUTER] Module not available - will use external engines only")
 
 # Phase 3: Custom router configuration
@@ -344,6 +451,8 @@ USE_CUSTOM_ROUTER = os.getenv('USE_CUSTOM_ROUTER', 'true').lower() == 'true'
 CUSTOM_ROUTER_DB = os.getenv('CUSTOM_ROUTER_DB', 'data/uk_router.db')
 CUSTOM_ROUTER_K_PATHS = int(os.getenv('CUSTOM_ROUTER_K_PATHS', '4'))
 CUSTOM_ROUTER_TIMEOUT = int(os.getenv('CUSTOM_ROUTER_TIMEOUT', '5000'))
+# Fraction of warm-up probe routes a new graph version must answer before it is swapped in
+CUSTOM_ROUTER_WARMUP_MIN_SUCCESS = float(os.getenv('CUSTOM_ROUTER_WARMUP_MIN_SUCCESS', '0.5'))
 
 # Phase 3: Global custom router instances
 custom_graph = None
@@ -357,6 +466,20 @@ custom_router_stats = {
     'avg_time_ms': 0
 }
 
+# Graph hot swap: the active router instance is double-buffered so new graph
+# versions load and warm in the background, then swap in without a restart
+router_holder = RouterHolder(min_probe_success=CUSTOM_ROUTER_WARMUP_MIN_SUCCESS) if RouterHolder else None
+
+def _publish_router_instance(instance: 'RouterInstance') -> None:
+    """Point the module-level router globals at a newly swapped-in instance."""
+    global custom_graph, custom_router, k_paths
+    custom_graph = instance.graph
+    custom_router = instance.router
+    k_paths = instance.k_paths
+
+if router_holder:
+    router_holder.on_swap(_publish_router_instance)
+
 # ============================================================================
 # CONFIGURABLE RATES (Environment Variables)
 # ============================================================================
@@ -405,6 +528,7 @@ class RouteCache:
 
             if key not in self.cache:
                 self.misses += 1
+                ROUTE_CACHE_MISS.inc()
                 return None
 
             # Check if expired
@@ -412,11 +536,13 @@ class RouteCache:
                 del self.cache[key]
                 del self.timestamps[key]
                 self.misses += 1
+                ROUTE_CACHE_MISS.inc()
                 return None
 
             # Move to end (most recently used)
             self.cache.move_to_end(key)
             self.hits += 1
+            ROUTE_CACHE_HIT.inc()
             return self.cache[key]
 
     def set(self, start_lat: float, start_lon: float, end_lat: float, end_lon: float, routing_mode: str, vehicle_type: str, route_data: Dict[str, Any], enable_hazard_avoidance: bool = False) -> None:
@@ -463,61 +589,68 @@ route_cache = RouteCache(max_size=1000, ttl_seconds=3600)
 # ============================================================================
 
 def init_custom_router() -> None:
-    """Initialize custom router with persistent service (loads once, reuses forever)."""
-    global custom_graph, custom_router, k_paths
+    """Initialize custom router with persistent service (loads once, reuses forever).
 
+    Loading progress is reported on router_holder.progress for /readyz.
+    """
+    progress = router_holder.progress
     try:
         if not os.path.exists(CUSTOM_ROUTER_DB):
             logger.warning(f"[CUSTOM_ROUTER] Database not found: {CUSTOM_ROUTER_DB}")
+            progress.fail(f'Database not found: {CUSTOM_ROUTER_DB}')
             return
 
         logger.info(f"[CUSTOM_ROUTER] Initializing from {CUSTOM_ROUTER_DB}...")
         logger.info(f"[CUSTOM_ROUTER] ⏳ Loading graph (this may take 2-3 minutes)...")
+        progress.update('nodes')
 
         # Use persistent router service (loads once, reuses forever)
         if initialize_router:
-            service = initialize_router(CUSTOM_ROUTER_DB, use_ch=True)
-            custom_graph = service.graph
-            custom_router = service.router
-            k_paths = service.k_paths
+            service = initialize_router(CUSTOM_ROUTER_DB, use_ch=True, progress=progress)
+            instance = service.instance
         else:
             # Fallback to direct initialization if service not available
-            custom_graph = RoadNetwork(CUSTOM_ROUTER_DB)
-            custom_router = Router(custom_graph, use_ch=True, db_file=CUSTOM_ROUTER_DB)
-            k_paths = KShortestPaths(custom_router)
-
-        logger.info(f"[CUSTOM_ROUTER] ✅ Initialized successfully")
-        logger.info(f"[CUSTOM_ROUTER] Nodes: {len(custom_graph.nodes):,}")
-        logger.info(f"[CUSTOM_ROUTER] Edges: {sum(len(e) for e in custom_graph.edges.values()):,}")
+            graph = RoadNetwork(CUSTOM_ROUTER_DB, progress=progress)
+            progress.update('ch')
+            router = Router(graph, use_ch=True, db_file=CUSTOM_ROUTER_DB)
+            instance = RouterInstance(graph, router, KShortestPaths(router), CUSTOM_ROUTER_DB)
+
+        edge_count = sum(len(e) for e in instance.graph.edges.values())
+        progress.update('components', nodes=len(instance.graph.nodes), edges=edge_count,
+                        ch_nodes=len(instance.router.ch_levels))
+        logger.info(f"[CUSTOM_ROUTER] ✅ Initialized successfully (graph version {instance.version})")
+        logger.info(f"[CUSTOM_ROUTER] Nodes: {len(instance.graph.nodes):,}")
+        logger.info(f"[CUSTOM_ROUTER] Edges: {edge_count:,}")
 
         # Log CH status
-        if custom_router.ch_available:
-            logger.info(f"[CUSTOM_ROUTER] ✅ Contraction Hierarchies available ({len(custom_router.ch_levels):,} nodes)")
+        if instance.router.ch_available:
+            logger.info(f"[CUSTOM_ROUTER] ✅ Contraction Hierarchies available ({len(instance.router.ch_levels):,} nodes)")
             logger.info(f"[CUSTOM_ROUTER] PRIMARY ROUTER: CH with 5-10x speedup enabled")
         else:
             logger.warning(f"[CUSTOM_ROUTER] ⚠️  CH not available - using standard Dijkstra+A*")
 
-        # Phase 4: Run full BFS component analysis in background (after edges load)
-        logger.info(f"[CUSTOM_ROUTER] Starting background component analysis (all 26.5M nodes)...")
+        # Phase 4: Load cached component labels (or compute them with union-find in seconds)
         if ComponentAnalyzer:
-            def run_component_analysis():
-                try:
-                    logger.info(f"[CUSTOM_ROUTER] Component analysis starting...")
-                    analyzer = ComponentAnalyzer(custom_graph)
-                    stats = analyzer.analyze_full()
-                    custom_graph.set_component_analyzer(analyzer)
-                    logger.info(f"[CUSTOM_ROUTER] ✅ Component analysis complete:")
-                    logger.info(f"[CUSTOM_ROUTER]    Total components: {stats['total_components']}")
-                    logger.info(f"[CUSTOM_ROUTER]    Main component: {stats['main_component_size']:,} nodes ({stats['main_component_pct']:.1f}%)")
-                except Exception as e:
-                    logger.warning(f"[CUSTOM_ROUTER] ⚠️  Component analysis failed: {e}")
-
-            import threading
-            analysis_thread = threading.Thread(target=run_component_analysis, daemon=True)
-            analysis_thread.start()
+            try:
+                analyzer = instance.graph.component_analyzer
+                stats = analyzer.get_statistics() if analyzer else \
+                    attach_component_analyzer(instance.graph, CUSTOM_ROUTER_DB)
+                progress.update(components=stats['total_components'])
+                logger.info(f"[CUSTOM_ROUTER] ✅ Component analysis ready:")
+                logger.info(f"[CUSTOM_ROUTER]    Total components: {stats['total_components']}")
+                logger.info(f"[CUSTOM_ROUTER]    Main component: {stats['main_component_size']:,} nodes ({stats['main_component_pct']:.1f}%)")
+                if 'scc' in stats:
+                    logger.info(f"[CUSTOM_ROUTER]    Main SCC (car, one-way aware): {stats['scc']['main_scc_size']:,} nodes ({stats['scc']['main_scc_pct']:.1f}%)")
+            except Exception as e:
+                logger.warning(f"[CUSTOM_ROUTER] ⚠️  Component analysis failed: {e}")
+
+        # First load has nothing to drain, so it is swapped in without warm-up
+        router_holder.swap(instance)
+        progress.update('ready')
 
     except Exception as e:
         logger.error(f"[CUSTOM_ROUTER] ❌ Initialization failed: {e}")
+        progress.fail(str(e))
         import traceback
         traceback.print_exc()
 
@@ -532,6 +665,31 @@ def update_custom_router_stats(time_ms: float, success: bool) -> None:
         custom_router_stats['successes'] += 1
     else:
         custom_router_stats['failures'] += 1
+    CUSTOM_ROUTER_LATENCY.labels('success' if success else 'failure').observe(time_ms / 1000)
+
+def build_vehicle_profile(data: Dict[str, Any]) -> Optional[Any]:
+    """Build the custom router vehicle profile from vehicle_class and optional dimensions.
+
+    Returns None for unrestricted cars so ordinary requests skip restriction checks.
+    """
+    vehicle_class = data.get('vehicle_class', 'car')
+    overrides = {
+        'height_m': data.get('vehicle_height_m'),
+        'weight_t': data.get('vehicle_weight_t'),
+        'width_m': data.get('vehicle_width_m'),
+    }
+    if not VehicleProfile or (vehicle_class == 'car' and all(v is None for v in overrides.values())):
+        return None
+
+    base = VEHICLE_PROFILES[vehicle_class]
+    return VehicleProfile(
+        vehicle_class,
+        height_m=float(overrides['height_m']) if overrides['height_m'] is not None else base.height_m,
+        weight_t=float(overrides['weight_t']) if overrides['weight_t'] is not None else base.weight_t,
+        width_m=float(overrides['width_m']) if overrides['width_m'] is not None else base.width_m,
+        hgv=base.hgv
+    )
+
 
 # ============================================================================
 # DATABASE CONNECTION POOLING (Phase 3 Optimization)
@@ -552,8 +710,9 @@ class DatabasePool:
     def _initialize_pool(self):
         """Initialize the connection pool."""
         for _ in range(self.pool_size):
-            conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            conn = profiled_connect(self.db_file, check_same_thread=False)
             conn.row_factory = sqlite3.Row
+            apply_connection_pragmas(conn)
             self.connections.append(conn)
             self.available.append(conn)
 
@@ -564,8 +723,9 @@ class DatabasePool:
                 return self.available.pop()
             else:
                 # Create new connection if pool exhausted
-                conn = sqlite3.connect(self.db_file, check_same_thread=False)
+                conn = profiled_connect(self.db_file, check_same_thread=False)
                 conn.row_factory = sqlite3.Row
+                apply_connection_pragmas(conn)
                 return conn
 
     def return_connection(self, conn: Any) -> None:
@@ -591,11 +751,8 @@ class DatabasePool:
 DB_FILE = 'voyagr_web.db'
 db_pool = None  # Will be initialized after DB creation
 
-def init_db():
-    """Initialize database with all tables."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
+def create_tables(cursor: Any) -> None:
+    """Create every app table; indexes are added by VOYAGR_WEB_MIGRATIONS."""
     # Trip history table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS trips (
@@ -827,6 +984,13 @@ def init_db():
         )
     ''')
 
+def init_db():
+    """Initialize database with all tables."""
+    conn = profiled_connect(DB_FILE)
+    enable_wal(conn)
+    cursor = conn.cursor()
+    create_tables(cursor)
+
     # Initialize app settings if not exists
     cursor.execute('SELECT COUNT(*) FROM app_settings')
     if cursor.fetchone()[0] == 0:
@@ -858,6 +1022,9 @@ def init_db():
         ''', (hazard_type, penalty, enabled, threshold))
 
     conn.commit()
+
+    # Indexes and later schema changes are versioned migrations
+    migrate(conn, VOYAGR_WEB_MIGRATIONS)
     conn.close()
 
 init_db()
@@ -887,6 +1054,7 @@ class CostCalculator:
         self.lock = threading.Lock()
         self.cost_history = []  # Track cost calculations for analytics
 
+    @traced('costs')
     def calculate_costs(self, distance_km: float, vehicle_type: str, fuel_efficiency: float, fuel_price: float,
                        energy_efficiency: float, electricity_price: float, include_tolls: bool, include_caz: bool, caz_exempt: bool, route_coords: Optional[List[Tuple[float, float]]] = None) -> Dict[str, float]:
         """Calculate all costs for a route.
@@ -1390,6 +1558,7 @@ def invalidate_route_cache():
         return False
 
 # Cost calculation functions
+@traced('polyline_decode')
 def decode_route_geometry(geometry: str) -> List[Tuple[float, float]]:
     """Decode route geometry (polyline) to list of coordinates.
 
@@ -1573,7 +1742,7 @@ def get_db_connection():
     global db_pool
     if db_pool is None:
         # Fallback if pool not initialized
-        return sqlite3.connect(DB_FILE)
+        return profiled_connect(DB_FILE)
     return db_pool.get_connection()
 
 def return_db_connection(conn: Any) -> None:
@@ -1584,8 +1753,49 @@ def return_db_connection(conn: Any) -> None:
     else:
         conn.close()
 
+def collect_hazards(camera_rows: List[tuple], report_rows: List[tuple]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Group camera (lat, lon, type, description) and community report (lat, lon,
+    hazard_type, description, severity[, expiry_timestamp]) rows by hazard type.
+    """
+    hazards = {
+        'speed_camera': [],
+        'traffic_light_camera': [],
+        'police': [],
+        'roadworks': [],
+        'accident': [],
+        'railway_crossing': [],
+        'pothole': [],
+        'debris': []
+    }
+
+    for lat, lon, camera_type, desc in camera_rows:
+        # Keep original database type (speed_camera) but also add to traffic_light_camera for scoring
+        # This preserves database jargon while ensuring high-priority avoidance
+        if camera_type == 'speed_camera':
+            # Add to speed_camera category (preserves database type)
+            hazards['speed_camera'].append({'lat': lat, 'lon': lon, 'description': desc, 'severity': 'high'})
+            # Also add to traffic_light_camera for high-priority scoring (1200s penalty)
+            hazards['traffic_light_camera'].append({'lat': lat, 'lon': lon, 'description': desc, 'severity': 'high', 'original_type': 'speed_camera'})
+        elif camera_type in hazards:
+            hazards[camera_type].append({'lat': lat, 'lon': lon, 'description': desc, 'severity': 'high'})
+
+    for lat, lon, hazard_type, desc, severity, *expiry in report_rows:
+        if hazard_type in hazards:
+            hazard = {'lat': lat, 'lon': lon, 'description': desc, 'severity': severity}
+            if expiry:
+                hazard['expiry'] = expiry[0]
+            hazards[hazard_type].append(hazard)
+
+    return hazards
+
+@traced('hazard_fetch')
 def fetch_hazards_for_route(start_lat: float, start_lon: float, end_lat: float, end_lon: float) -> Dict[str, List[Dict[str, Any]]]:
-    """Fetch hazards within bounding box of route."""
+    """Fetch hazards within bounding box of route.
+
+    Route scoring uses get_hazard_index(); this stays as a public helper for
+    scripts that list the hazards around a single trip.
+    """
     try:
         # ====================================================================
         # PHASE 3 OPTIMIZATION: Use connection pool instead of direct connect
@@ -1611,202 +1821,115 @@ def fetch_hazards_for_route(start_lat: float, start_lon: float, end_lat: float,
                 return_db_connection(conn)
                 return json.loads(cached_data)
 
-        hazards = {
-            'speed_camera': [],
-            'traffic_light_camera': [],
-            'police': [],
-            'roadworks': [],
-            'accident': [],
-            'railway_crossing': [],
-            'pothole': [],
-            'debris': []
-        }
-
         # Fetch cameras
         cursor.execute(
-            "SELECT lat, lon, type, description FROM cameras WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?",
+            CAMERAS_BBOX_SQL,
             (south, north, west, east)
         )
-        for lat, lon, camera_type, desc in cursor.fetchall():
-            # Keep original database type (speed_camera) but also add to traffic_light_camera for scoring
-            # This preserves database jargon while ensuring high-priority avoidance
-            if camera_type == 'speed_camera':
-                # Add to speed_camera category (preserves database type)
-                hazards['speed_camera'].append({'lat': lat, 'lon': lon, 'description': desc, 'severity': 'high'})
-                # Also add to traffic_light_camera for high-priority scoring (1200s penalty)
-                hazards['traffic_light_camera'].append({'lat': lat, 'lon': lon, 'description': desc, 'severity': 'high', 'original_type': 'speed_camera'})
-            elif camera_type in hazards:
-                hazards[camera_type].append({'lat': lat, 'lon': lon, 'description': desc, 'severity': 'high'})
+        camera_rows = cursor.fetchall()
 
         # Fetch community reports
         cursor.execute(
-            "SELECT lat, lon, hazard_type, description, severity FROM community_hazard_reports WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ? AND status = 'active' AND expiry_timestamp > ?",
+            ACTIVE_REPORTS_BBOX_SQL,
             (south, north, west, east, int(time.time()))
         )
-        for lat, lon, hazard_type, desc, severity in cursor.fetchall():
-            if hazard_type in hazards:
-                hazards[hazard_type].append({'lat': lat, 'lon': lon, 'description': desc, 'severity': severity})
+        report_rows = cursor.fetchall()
 
         return_db_connection(conn)
-        return hazards
+        return collect_hazards(camera_rows, report_rows)
     except Exception as e:
         logger.error(f"Error fetching hazards: {e}")
         return {}
 
-def get_hazards_on_route(route_points: List[Tuple[float, float]], hazards: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
-    """
-    Get list of hazards that are on or near the route.
-    Returns hazards with their lat, lon, type, and description.
-    """
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        hazards_on_route = []
+def load_hazards(conn: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """All cameras and active community reports (with their expiry), for the shared hazard index."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT lat, lon, type, description FROM cameras WHERE lat IS NOT NULL AND lon IS NOT NULL")
+    camera_rows = cursor.fetchall()
+    cursor.execute(
+        "SELECT lat, lon, hazard_type, description, severity, expiry_timestamp FROM community_hazard_reports "
+        "WHERE status = 'active' AND lat IS NOT NULL AND lon IS NOT NULL"
+    )
+    report_rows = cursor.fetchall()
+    return collect_hazards(camera_rows, report_rows)
 
-        # Get hazard preferences
-        cursor.execute("SELECT hazard_type, proximity_threshold_meters FROM hazard_preferences WHERE enabled = 1")
-        preferences = {row[0]: {'threshold': row[1]} for row in cursor.fetchall()}
-        conn.close()
+# Every hazard in the database, reloaded when cameras or reports change
+shared_hazard_index = SharedHazardIndex(load_hazards)
 
-        # Decode polyline to get route points
-        try:
-            if isinstance(route_points, str):
-                if not polyline:
-                    return []
-                decoded_points = polyline.decode(route_points)
-            else:
-                decoded_points = route_points
-        except Exception as e:
-            logger.error(f"Error decoding polyline: {e}")
-            return []
-
-        # Check each hazard against route
-        for hazard_type, hazard_list in hazards.items():
-            if hazard_type not in preferences:
-                continue
+@traced('hazard_index')
+def get_hazard_index() -> HazardIndex:
+    """Grid index over all cameras and active community reports."""
+    conn = get_db_connection()
+    try:
+        return shared_hazard_index.get(conn)
+    finally:
+        return_db_connection(conn)
 
-            if len(hazard_list) == 0:
-                continue
+def load_hazard_preferences() -> Dict[str, Dict[str, Any]]:
+    """Penalty (seconds) and proximity threshold (meters) of each enabled hazard type."""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT hazard_type, penalty_seconds, proximity_threshold_meters FROM hazard_preferences WHERE enabled = 1")
+        return {row[0]: {'penalty': row[1], 'threshold': row[2]} for row in cursor.fetchall()}
+    finally:
+        return_db_connection(conn)
 
-            threshold = preferences[hazard_type]['threshold']
-
-            for hazard in hazard_list:
-                hazard_lat = hazard.get('lat')
-                hazard_lon = hazard.get('lon')
-
-                # Find minimum distance to route
-                min_distance = float('inf')
-                for point_lat, point_lon in decoded_points:
-                    distance = get_distance_between_points(hazard_lat, hazard_lon, point_lat, point_lon)
-                    min_distance = min(min_distance, distance)
-
-                # If hazard is within threshold, add to list
-                if min_distance <= threshold:
-                    # Use original_type if available (for speed cameras), otherwise use hazard_type
-                    display_type = hazard.get('original_type', hazard_type)
-                    hazards_on_route.append({
-                        'lat': hazard_lat,
-                        'lon': hazard_lon,
-                        'type': display_type,
-                        'description': hazard.get('description', 'Hazard detected'),
-                        'distance': round(min_distance, 0)
-                    })
+@traced('hazard_scoring')
+def score_route_hazards(route_points: Any, hazards: Any) -> Tuple[float, int, List[Dict[str, Any]]]:
+    """
+    Score a route by the hazards near it and list them, in one pass.
 
-        return hazards_on_route
-    except Exception as e:
-        logger.error(f"Error getting hazards on route: {e}")
-        return []
+    Only hazards in grid cells along the route's corridor are measured, by
+    their distance to the route's segments. Traffic light cameras are weighted
+    with a multiplier to ensure they are the highest priority hazard: closer
+    cameras receive higher penalties (up to 3x) to strongly discourage routes
+    passing near them.
 
-def score_route_by_hazards(route_points: List[Tuple[float, float]], hazards: Dict[str, List[Dict[str, Any]]]) -> Tuple[float, int]:
-    """
-    Calculate hazard score for a route based on proximity to hazards.
+    Args:
+        route_points: Encoded polyline or list of (lat, lon) points
+        hazards: HazardIndex, or hazards grouped by type as from fetch_hazards_for_route
 
-    Traffic light cameras are weighted with a multiplier to ensure they are the highest priority hazard.
-    Closer cameras receive exponentially higher penalties to strongly discourage routes passing near them.
+    Returns:
+        Tuple of (total_penalty_seconds, hazard_count, hazards_on_route)
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        total_penalty = 0
-        hazard_count = 0
-
-        # Get hazard preferences
-        cursor.execute("SELECT hazard_type, penalty_seconds, proximity_threshold_meters FROM hazard_preferences WHERE enabled = 1")
-        preferences = {row[0]: {'penalty': row[1], 'threshold': row[2]} for row in cursor.fetchall()}
-        conn.close()
-
-        logger.debug(f"[HAZARDS] Preferences loaded: {list(preferences.keys())}")
-        logger.debug(f"[HAZARDS] Hazards to score: {[(k, len(v)) for k, v in hazards.items() if v]}")
+        preferences = load_hazard_preferences()
 
         # Decode polyline to get route points
         try:
             if isinstance(route_points, str):
                 if not polyline:
                     logger.warning("polyline module not available, cannot decode route points")
-                    return 0, 0
+                    return 0, 0, []
                 decoded_points = polyline.decode(route_points)
-                logger.debug(f"[HAZARDS] Decoded {len(decoded_points)} route points from polyline")
             else:
                 decoded_points = route_points
-                logger.debug(f"[HAZARDS] Using {len(decoded_points)} route points directly")
         except Exception as e:
             logger.error(f"Error decoding polyline: {e}")
-            return 0, 0
-
-        # Check each hazard against route
-        for hazard_type, hazard_list in hazards.items():
-            if hazard_type not in preferences:
-                logger.debug(f"[HAZARDS] Skipping {hazard_type} - not in preferences")
-                continue
-
-            if len(hazard_list) == 0:
-                logger.debug(f"[HAZARDS] Skipping {hazard_type} - no hazards in list")
-                continue
-
-            pref = preferences[hazard_type]
-            threshold = pref['threshold']
-            penalty = pref['penalty']
-
-            logger.debug(f"[HAZARDS] Processing {len(hazard_list)} {hazard_type} hazards (threshold={threshold}m, penalty={penalty}s)")
-
-            for idx, hazard in enumerate(hazard_list):
-                hazard_lat = hazard.get('lat')
-                hazard_lon = hazard.get('lon')
-
-                # Find minimum distance to route
-                min_distance = float('inf')
-                for point_lat, point_lon in decoded_points:
-                    distance = get_distance_between_points(hazard_lat, hazard_lon, point_lat, point_lon)
-                    min_distance = min(min_distance, distance)
-
-                # If hazard is within threshold, add penalty
-                if min_distance <= threshold:
-                    # TRAFFIC LIGHT CAMERA PRIORITY: Apply distance-based multiplier
-                    # Cameras closer to route get exponentially higher penalty
-                    if hazard_type == 'traffic_light_camera':
-                        # Proximity multiplier: 1.0 at threshold, 3.0 at 0m
-                        # Formula: 1 + (2 * (1 - distance/threshold))
-                        proximity_multiplier = 1.0 + (2.0 * (1.0 - min_distance / threshold))
-                        distance_multiplier = max(1.0, proximity_multiplier)
-                        applied_penalty = penalty * distance_multiplier
-                    else:
-                        applied_penalty = penalty
-
-                    total_penalty += applied_penalty
-                    hazard_count += 1
-
-                    if idx < 3:  # Log first 3 hazards
-                        logger.debug(f"[HAZARDS]   Hazard {idx+1}: distance={min_distance:.0f}m, penalty={applied_penalty:.0f}s")
+            return 0, 0, []
 
+        index = hazards if isinstance(hazards, HazardIndex) else HazardIndex(hazards)
+        total_penalty, hazard_count, hazards_on_route = index.match(decoded_points, preferences)
         logger.info(f"[HAZARDS] Route scoring complete: total_penalty={total_penalty:.0f}s, hazard_count={hazard_count}")
-        return total_penalty, hazard_count
+        return total_penalty, hazard_count, hazards_on_route
     except Exception as e:
         logger.error(f"Error scoring route: {e}")
         import traceback
         logger.error(traceback.format_exc())
-        return 0, 0
+        return 0, 0, []
+
+def get_hazards_on_route(route_points: Any, hazards: Any) -> List[Dict[str, Any]]:
+    """
+    Get list of hazards that are on or near the route.
+    Returns hazards with their lat, lon, type, description and distance.
+    """
+    return score_route_hazards(route_points, hazards)[2]
+
+def score_route_by_hazards(route_points: Any, hazards: Any) -> Tuple[float, int]:
+    """Calculate hazard score (total penalty seconds, hazard count) for a route based on proximity to hazards."""
+    total_penalty, hazard_count, _ = score_route_hazards(route_points, hazards)
+    return total_penalty, hazard_count
 
 MONITORING_DASHBOARD_HTML = '''
 <!DOCTYPE html>
@@ -4126,17 +4249,17 @@ def test_routing_engines():
 
     # Test OSRM
     try:
-        response = requests.get("http://router.project-osrm.org/route/v1/driving/13.388860,52.517037;13.385983,52.496891", timeout=5)
+        response = requests.get(f"{OSRM_URL}/route/v1/driving/13.388860,52.517037;13.385983,52.496891", timeout=5)
         results['osrm'] = {
             'status': 'OK' if response.status_code == 200 else f'HTTP {response.status_code}',
-            'url': 'http://router.project-osrm.org',
+            'url': OSRM_URL,
             'accessible': response.status_code == 200,
             'response_time_ms': response.elapsed.total_seconds() * 1000
         }
     except Exception as e:
         results['osrm'] = {
             'status': f'Error: {str(e)}',
-            'url': 'http://router.project-osrm.org',
+            'url': OSRM_URL,
             'accessible': False,
             'error_type': type(e).__name__
         }
@@ -4171,7 +4294,7 @@ def debug_route():
             'routing_engines': {
                 'graphhopper': {'url': GRAPHHOPPER_URL, 'status': 'testing...'},
                 'valhalla': {'url': VALHALLA_URL, 'status': 'testing...'},
-                'osrm': {'url': 'http://router.project-osrm.org', 'status': 'testing...'}
+                'osrm': {'url': OSRM_URL, 'status': 'testing...'}
             },
             'errors': []
         }
@@ -4219,7 +4342,7 @@ def debug_route():
 
         # Test OSRM
         try:
-            osrm_url = f"http://router.project-osrm.org/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}"
+            osrm_url = f"{OSRM_URL}/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}"
             response = requests.get(osrm_url, timeout=10)
             debug_info['routing_engines']['osrm']['status'] = f'HTTP {response.status_code}'
             debug_info['routing_engines']['osrm']['response_time_ms'] = response.elapsed.total_seconds() * 1000
@@ -4275,11 +4398,13 @@ class FallbackChainOptimizer:
             # Update average time
             total_time = stats['avg_time'] * (stats['successes'] - 1) + response_time_ms
             stats['avg_time'] = total_time / stats['successes']
+        ENGINE_REQUESTS.labels(engine, 'success').inc()
 
     def record_failure(self, engine: str) -> None:
         """Record failed routing request."""
         with self.lock:
             self.engine_stats[engine]['failures'] += 1
+        ENGINE_REQUESTS.labels(engine, 'failure').inc()
 
     def get_engine_health(self) -> Dict[str, Any]:
         """Get health status of all engines."""
@@ -4402,7 +4527,7 @@ class ParallelRoutingEngine:
         """Request route from OSRM in parallel."""
         try:
             start_time = time.time()
-            url = f"http://router.project-osrm.org/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}"
+            url = f"{OSRM_URL}/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}"
             params = {
                 'overview': 'full',
                 'alternatives': 'true',
@@ -4464,11 +4589,10 @@ def calculate_route_custom():
     Provides ultra-fast routing with 3-4 alternatives.
     """
     route_start_time = time.time()
+    # Pin the active graph version; a concurrent hot swap doesn't affect this request
+    active = router_holder.checkout() if router_holder else None
 
     try:
-        if not custom_router:
-            return jsonify({'success': False, 'error': 'Custom router not initialized'}), 503
-
         data = request.json
         logger.info(f"[CUSTOM_ROUTER] Route request: {data}")
 
@@ -4477,6 +4601,10 @@ def calculate_route_custom():
         if not is_valid:
             return jsonify({'success': False, 'error': error_msg}), 400
 
+        if not active:
+            # Still loading (or unavailable): serve from the external engines meanwhile
+            return custom_route_fallback(data, route_start_time)
+
         # Parse coordinates
         start = data.get('start', '').strip()
         end = data.get('end', '').strip()
@@ -4484,17 +4612,20 @@ def calculate_route_custom():
         end_coords = validate_coordinates(end)
         start_lat, start_lon = start_coords
         end_lat, end_lon = end_coords
+        routing_mode = data.get('routing_mode', 'auto')
+        vehicle = build_vehicle_profile(data)
 
         # Calculate route
-        logger.info(f"[CUSTOM_ROUTER] Calculating route from ({start_lat},{start_lon}) to ({end_lat},{end_lon})")
-        route = custom_router.route(start_lat, start_lon, end_lat, end_lon)
+        logger.info(f"[CUSTOM_ROUTER] Calculating {routing_mode} route from ({start_lat},{start_lon}) to ({end_lat},{end_lon})")
+        route = active.router.route(start_lat, start_lon, end_lat, end_lon, mode=routing_mode, vehicle=vehicle)
 
         if not route:
             update_custom_router_stats(0, False)
             return jsonify({'success': False, 'error': 'Route not found'}), 404
 
         # Get alternatives
-        alternatives = k_paths.find_k_paths(start_lat, start_lon, end_lat, end_lon, k=CUSTOM_ROUTER_K_PATHS)
+        alternatives = active.k_paths.find_k_paths(start_lat, start_lon, end_lat, end_lon, k=CUSTOM_ROUTER_K_PATHS,
+                                            mode=routing_mode, vehicle=vehicle)
 
         # Combine routes
         routes = [route] + alternatives
@@ -4548,6 +4679,41 @@ def calculate_route_custom():
         logger.error(f"[CUSTOM_ROUTER] ❌ Error: {e}")
         update_custom_router_stats(0, False)
         return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        if router_holder:
+            router_holder.release(active)
+
+def custom_route_fallback(data: Dict[str, Any], route_start_time: float):
+    """Answer a custom route request through RoutingEngineManager while the custom router is not ready."""
+    progress = router_holder.progress.to_dict() if router_holder else None
+    if not routing_manager:
+        return jsonify({'success': False, 'error': 'Custom router not initialized',
+                        'custom_router_ready': False, 'progress': progress}), 503
+
+    start_lat, start_lon = validate_coordinates(data.get('start', '').strip())
+    end_lat, end_lon = validate_coordinates(data.get('end', '').strip())
+    route = routing_manager.calculate_route(start_lat, start_lon, end_lat, end_lon,
+                                            routing_mode=data.get('routing_mode', 'auto'))
+    if not route:
+        return jsonify({'success': False, 'error': 'Custom router loading and no fallback engine available',
+                        'custom_router_ready': False, 'progress': progress}), 503
+
+    elapsed = (time.time() - route_start_time) * 1000
+    return jsonify({
+        'success': True,
+        'routes': [route],
+        'source': route.get('source', 'Fallback'),
+        'distance': f'{route.get("distance_km", 0):.2f} km',
+        'time': f'{route.get("duration_minutes", 0):.0f} minutes',
+        'response_time_ms': elapsed,
+        'cached': False,
+        'start_lat': start_lat,
+        'start_lon': start_lon,
+        'end_lat': end_lat,
+        'end_lon': end_lon,
+        'custom_router_ready': False,
+        'progress': progress
+    })
 
 @app.route('/api/route', methods=['POST'])
 @rate_limit(route_limiter)
@@ -4587,6 +4753,9 @@ def calculate_route():
         include_caz = data.get('include_caz', True)
         caz_exempt = data.get('caz_exempt', False)
         enable_hazard_avoidance = data.get('enable_hazard_avoidance', False)
+        vehicle = build_vehicle_profile(data)
+        # Restricted vehicles get their own cache entries
+        cache_vehicle_type = f"{vehicle_type}:{vehicle.restriction_mask}" if vehicle else vehicle_type
 
         # DEBUG: Log hazard avoidance parameter
         logger.info(f"[HAZARDS] enable_hazard_avoidance={enable_hazard_avoidance} (type={type(enable_hazard_avoidance)})")
@@ -4600,7 +4769,8 @@ def calculate_route():
         # ====================================================================
         # PHASE 3 OPTIMIZATION: Check route cache first
         # ====================================================================
-        cached_route = route_cache.get(start_lat, start_lon, end_lat, end_lon, routing_mode, vehicle_type, enable_hazard_avoidance)
+        with trace_span('cache'):
+            cached_route = route_cache.get(start_lat, start_lon, end_lat, end_lon, routing_mode, cache_vehicle_type, enable_hazard_avoidance)
         if cached_route:
             logger.info(f"[CACHE] HIT: Route from ({start_lat},{start_lon}) to ({end_lat},{end_lon}) with hazard_avoidance={enable_hazard_avoidance}")
             cached_route['cached'] = True
@@ -4611,9 +4781,15 @@ def calculate_route():
         hazards = {}
         if enable_hazard_avoidance:
             hazard_start = time.time()
-            hazards = fetch_hazards_for_route(start_lat, start_lon, end_lat, end_lon)
-            hazard_elapsed = (time.time() - hazard_start) * 1000
-            logger.info(f"[HAZARDS] Fetched hazards in {hazard_elapsed:.0f}ms: {[(k, len(v)) for k, v in hazards.items() if v]}")
+            # Routes are scored against every hazard along their corridor
+            try:
+                hazards = get_hazard_index()
+                hazard_elapsed = (time.time() - hazard_start) * 1000
+                logger.info(f"[HAZARDS] Hazard index ready in {hazard_elapsed:.0f}ms: {[(k, n) for k, n in hazards.counts().items() if n]}")
+            except Exception as e:
+                # Route without hazard scoring (and cache it as such) rather than fail the request
+                logger.error(f"[HAZARDS] Hazard index unavailable, routing without hazard avoidance: {e}")
+                enable_hazard_avoidance = False
         else:
             logger.info(f"[HAZARDS] Hazard avoidance disabled - skipping hazard fetch")
 
@@ -4621,11 +4797,14 @@ def calculate_route():
         # PHASE 3: Try custom router first (if available)
         # ====================================================================
         logger.info(f"[ROUTING] Custom router check: custom_router={custom_router is not None}, USE_CUSTOM_ROUTER={USE_CUSTOM_ROUTER}")
-        if custom_router and USE_CUSTOM_ROUTER:
+        active = router_holder.checkout() if router_holder and USE_CUSTOM_ROUTER else None
+        if active:
             try:
-                logger.info(f"[ROUTING] Trying custom router first...")
+                logger.info(f"[ROUTING] Trying custom router first (graph version {active.version})...")
                 custom_start = time.time()
-                route = custom_router.route(start_lat, start_lon, end_lat, end_lon)
+                with trace_span('custom_router'):
+                    route = active.router.route(start_lat, start_lon, end_lat, end_lon, mode=routing_mode,
+                                                vehicle=vehicle)
                 custom_elapsed = (time.time() - custom_start) * 1000
 
                 # Check if custom router took too long
@@ -4642,20 +4821,24 @@ def calculate_route():
                     logger.info(f"[ROUTING] ✅ Custom router succeeded in {custom_elapsed:.0f}ms")
 
                     # Get alternatives
-                    alternatives = k_paths.find_k_paths(start_lat, start_lon, end_lat, end_lon, k=CUSTOM_ROUTER_K_PATHS)
+                    with trace_span('alternatives'):
+                        alternatives = active.k_paths.find_k_paths(start_lat, start_lon, end_lat, end_lon,
+                                                                   k=CUSTOM_ROUTER_K_PATHS, mode=routing_mode, vehicle=vehicle)
                     routes = [route] + alternatives
 
-                    # Calculate costs for all routes
-                    for route_item in routes:
-                        distance_km = route_item.get('distance_km', 0)
-                        fuel_cost = (distance_km / fuel_efficiency) * fuel_price if fuel_efficiency > 0 else 0
-                        toll_cost = distance_km * 0.15 if include_tolls else 0
-                        caz_cost = 8.0 if include_caz and vehicle_type == 'petrol_diesel' else 0
+                    # Calculate costs for all routes (walking and cycling are free)
+                    is_driving = routing_mode == 'auto'
+                    with trace_span('costs'):
+                        for route_item in routes:
+                            distance_km = route_item.get('distance_km', 0)
+                            fuel_cost = (distance_km / fuel_efficiency) * fuel_price if fuel_efficiency > 0 and is_driving else 0
+                            toll_cost = distance_km * 0.15 if include_tolls and is_driving else 0
+                            caz_cost = 8.0 if include_caz and vehicle_type == 'petrol_diesel' and is_driving else 0
 
-                        route_item['fuel_cost'] = round(fuel_cost, 2)
-                        route_item['toll_cost'] = round(toll_cost, 2)
-                        route_item['caz_cost'] = round(caz_cost, 2)
-                        route_item['total_cost'] = round(fuel_cost + toll_cost + caz_cost, 2)
+                            route_item['fuel_cost'] = round(fuel_cost, 2)
+                            route_item['toll_cost'] = round(toll_cost, 2)
+                            route_item['caz_cost'] = round(caz_cost, 2)
+                            route_item['total_cost'] = round(fuel_cost + toll_cost + caz_cost, 2)
 
                     # ================================================================
                     # HAZARD AVOIDANCE: Score routes by hazard penalty if enabled
@@ -4666,8 +4849,7 @@ def calculate_route():
                         hazards_list = []
                         if enable_hazard_avoidance and hazards:
                             route_geometry = decode_route_geometry(route_item.get('polyline', ''))
-                            hazard_penalty, hazard_count = score_route_by_hazards(route_geometry, hazards)
-                            hazards_list = get_hazards_on_route(route_geometry, hazards)
+                            hazard_penalty, hazard_count, hazards_list = score_route_hazards(route_geometry, hazards)
                             logger.debug(f"[HAZARDS] Custom router route: penalty={hazard_penalty:.0f}s, count={hazard_count}, hazards_list={len(hazards_list)}")
 
                         route_item['hazard_penalty_seconds'] = hazard_penalty
@@ -4679,7 +4861,8 @@ def calculate_route():
                     # ================================================================
                     if enable_hazard_avoidance and hazards:
                         # Sort routes by hazard penalty (ascending - fewer hazards first)
-                        routes_sorted = sorted(routes, key=lambda r: (r.get('hazard_penalty_seconds', 0), r.get('duration_minutes', 0)))
+                        with trace_span('sort'):
+                            routes_sorted = sorted(routes, key=lambda r: (r.get('hazard_penalty_seconds', 0), r.get('duration_minutes', 0)))
                         logger.info(f"[HAZARDS] Custom router routes reordered by hazard penalty:")
                         for idx, route in enumerate(routes_sorted):
                             logger.info(f"  Route {idx+1}: Hazard penalty: {route.get('hazard_penalty_seconds', 0):.0f}s, Count: {route.get('hazard_count', 0)}")
@@ -4704,7 +4887,7 @@ def calculate_route():
                     }
 
                     # Cache the route
-                    route_cache.set(start_lat, start_lon, end_lat, end_lon, routing_mode, vehicle_type, response_data, enable_hazard_avoidance)
+                    route_cache.set(start_lat, start_lon, end_lat, end_lon, routing_mode, cache_vehicle_type, response_data, enable_hazard_avoidance)
                     update_custom_router_stats(custom_elapsed, True)
                     return jsonify(response_data)
                 elif route and 'error' in route:
@@ -4713,6 +4896,8 @@ def calculate_route():
             except Exception as e:
                 logger.warning(f"[ROUTING] Custom router failed: {e} - falling back to external engines")
                 update_custom_router_stats(0, False)
+            finally:
+                router_holder.release(active)
 
         # Try routing engines in order: GraphHopper, Valhalla, OSRM
         graphhopper_error = None
@@ -4743,7 +4928,8 @@ def calculate_route():
                 'Accept': 'application/json'
             }
             gh_start = time.time()
-            response = requests.get(url, params=params, timeout=10, headers=headers)
+            with engine_call('graphhopper'):
+                response = requests.get(url, params=params, timeout=10, headers=headers)
             gh_elapsed = (time.time() - gh_start) * 1000
             logger.debug(f"[TIMING] GraphHopper request: {gh_elapsed:.0f}ms")
             logger.debug(f"[GraphHopper] Response status: {response.status_code}")
@@ -4816,8 +5002,7 @@ def calculate_route():
                         hazard_count = 0
                         hazards_list = []
                         if enable_hazard_avoidance and hazards:
-                            hazard_penalty, hazard_count = score_route_by_hazards(route_geometry, hazards)
-                            hazards_list = get_hazards_on_route(route_geometry, hazards)
+                            hazard_penalty, hazard_count, hazards_list = score_route_hazards(route_geometry, hazards)
                             logger.debug(f"[HAZARDS] Route {idx+1}: penalty={hazard_penalty:.0f}s, count={hazard_count}, hazards_list={len(hazards_list)}")
 
                         routes.append({
@@ -4843,7 +5028,8 @@ def calculate_route():
                     # ================================================================
                     if enable_hazard_avoidance and hazards:
                         # Sort routes by hazard penalty (ascending - fewer hazards first)
-                        routes_sorted = sorted(routes, key=lambda r: (r.get('hazard_penalty_seconds', 0), r.get('duration_minutes', 0)))
+                        with trace_span('sort'):
+                            routes_sorted = sorted(routes, key=lambda r: (r.get('hazard_penalty_seconds', 0), r.get('duration_minutes', 0)))
                         print(f"[HAZARDS] Routes reordered by hazard penalty:")
                         for idx, route in enumerate(routes_sorted):
                             print(f"  Route {idx+1}: {route['name']} - Hazard penalty: {route.get('hazard_penalty_seconds', 0):.0f}s, Count: {route.get('hazard_count', 0)}")
@@ -4880,7 +5066,7 @@ def calculate_route():
                     print(f"[DEBUG] start_lat={response_data.get('start_lat')}, end_lat={response_data.get('end_lat')}")
 
                     # Cache the route for future requests
-                    route_cache.set(start_lat, start_lon, end_lat, end_lon, routing_mode, vehicle_type, response_data, enable_hazard_avoidance)
+                    route_cache.set(start_lat, start_lon, end_lat, end_lon, routing_mode, cache_vehicle_type, response_data, enable_hazard_avoidance)
                     print(f"[CACHE] STORED: Route cached for future requests with hazard_avoidance={enable_hazard_avoidance}")
 
                     return jsonify(response_data)
@@ -4933,7 +5119,8 @@ def calculate_route():
                 'Content-Type': 'application/json',
                 'Accept': 'application/json'
             }
-            response = requests.post(url, json=payload, timeout=10, headers=headers)
+            with engine_call('valhalla'):
+                response = requests.post(url, json=payload, timeout=10, headers=headers)
             print(f"[Valhalla] Response status: {response.status_code}")
             if response.status_code != 200:
                 print(f"[Valhalla] Response body: {response.text[:500]}")
@@ -4981,8 +5168,7 @@ def calculate_route():
                     hazard_count = 0
                     hazards_list = []
                     if enable_hazard_avoidance and hazards:
-                        hazard_penalty, hazard_count = score_route_by_hazards(route_geometry, hazards)
-                        hazards_list = get_hazards_on_route(route_geometry, hazards)
+                        hazard_penalty, hazard_count, hazards_list = score_route_hazards(route_geometry, hazards)
                         logger.debug(f"[HAZARDS] Valhalla main route: penalty={hazard_penalty:.0f}s, count={hazard_count}, hazards_list={len(hazards_list)}")
 
                     routes.append({
@@ -5037,8 +5223,7 @@ def calculate_route():
                                 alt_hazard_count = 0
                                 alt_hazards_list = []
                                 if enable_hazard_avoidance and hazards:
-                                    alt_hazard_penalty, alt_hazard_count = score_route_by_hazards(alt_geometry, hazards)
-                                    alt_hazards_list = get_hazards_on_route(alt_geometry, hazards)
+                                    alt_hazard_penalty, alt_hazard_count, alt_hazards_list = score_route_hazards(alt_geometry, hazards)
                                     logger.debug(f"[HAZARDS] Valhalla alt route {idx+1}: penalty={alt_hazard_penalty:.0f}s, count={alt_hazard_count}, hazards_list={len(alt_hazards_list)}")
 
                                 route_names = ['Shortest', 'Balanced', 'Alternative']
@@ -5063,7 +5248,8 @@ def calculate_route():
                     # ================================================================
                     if enable_hazard_avoidance and hazards:
                         # Sort routes by hazard penalty (ascending - fewer hazards first)
-                        routes_sorted = sorted(routes, key=lambda r: (r.get('hazard_penalty_seconds', 0), r.get('duration_minutes', 0)))
+                        with trace_span('sort'):
+                            routes_sorted = sorted(routes, key=lambda r: (r.get('hazard_penalty_seconds', 0), r.get('duration_minutes', 0)))
                         print(f"[HAZARDS] Routes reordered by hazard penalty:")
                         for idx, route in enumerate(routes_sorted):
                             print(f"  Route {idx+1}: {route['name']} - Hazard penalty: {route.get('hazard_penalty_seconds', 0):.0f}s, Count: {route.get('hazard_count', 0)}")
@@ -5096,7 +5282,7 @@ def calculate_route():
                     }
 
                     # Cache the route for future requests
-                    route_cache.set(start_lat, start_lon, end_lat, end_lon, routing_mode, vehicle_type, response_data, enable_hazard_avoidance)
+                    route_cache.set(start_lat, start_lon, end_lat, end_lon, routing_mode, cache_vehicle_type, response_data, enable_hazard_avoidance)
                     print(f"[CACHE] STORED: Route cached in memory with hazard_avoidance={enable_hazard_avoidance}")
 
                     # ================================================================
@@ -5139,7 +5325,7 @@ def calculate_route():
 
         # Fallback to OSRM (public service)
         logger.info(f"[OSRM] Trying fallback with ({start_lon},{start_lat}) to ({end_lon},{end_lat})")
-        osrm_url = f"http://router.project-osrm.org/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}?alternatives=true&overview=full&steps=true"
+        osrm_url = f"{OSRM_URL}/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}?alternatives=true&overview=full&steps=true"
         try:
             headers = {
                 'User-Agent': 'Voyagr-PWA/1.0',
@@ -5147,7 +5333,8 @@ def calculate_route():
             }
             logger.debug(f"[OSRM] URL: {osrm_url}")
             osrm_start = time.time()
-            response = requests.get(osrm_url, timeout=15, headers=headers)
+            with engine_call('osrm'):
+                response = requests.get(osrm_url, timeout=15, headers=headers)
             osrm_elapsed = (time.time() - osrm_start) * 1000
             logger.info(f"[OSRM] Response status: {response.status_code}, elapsed: {osrm_elapsed:.0f}ms")
 
@@ -5201,8 +5388,7 @@ def calculate_route():
                         hazard_count = 0
                         hazards_list = []
                         if enable_hazard_avoidance and hazards:
-                            hazard_penalty, hazard_count = score_route_by_hazards(route_geometry, hazards)
-                            hazards_list = get_hazards_on_route(route_geometry, hazards)
+                            hazard_penalty, hazard_count, hazards_list = score_route_hazards(route_geometry, hazards)
                             logger.debug(f"[HAZARDS] OSRM route {idx+1}: penalty={hazard_penalty:.0f}s, count={hazard_count}, hazards_list={len(hazards_list)}")
 
                         routes.append({
@@ -5226,7 +5412,8 @@ def calculate_route():
                     # ================================================================
                     if enable_hazard_avoidance and hazards:
                         # Sort routes by hazard penalty (ascending - fewer hazards first)
-                        routes_sorted = sorted(routes, key=lambda r: (r.get('hazard_penalty_seconds', 0), r.get('duration_minutes', 0)))
+                        with trace_span('sort'):
+                            routes_sorted = sorted(routes, key=lambda r: (r.get('hazard_penalty_seconds', 0), r.get('duration_minutes', 0)))
                         print(f"[HAZARDS] Routes reordered by hazard penalty:")
                         for idx, route in enumerate(routes_sorted):
                             print(f"  Route {idx+1}: {route['name']} - Hazard penalty: {route.get('hazard_penalty_seconds', 0):.0f}s, Count: {route.get('hazard_count', 0)}")
@@ -5289,7 +5476,7 @@ def calculate_route():
         diagnostic_info = {
             'graphhopper_url': GRAPHHOPPER_URL,
             'valhalla_url': VALHALLA_URL,
-            'osrm_url': 'http://router.project-osrm.org',
+            'osrm_url': OSRM_URL,
             'graphhopper_error': str(graphhopper_error),
             'valhalla_error': str(valhalla_error),
             'deployment_hint': 'If on Railway.app, routing engines may be unreachable. Try /api/test-routing-engines for diagnostics.'
@@ -5395,7 +5582,7 @@ def calculate_multi_stop_route():
         total_time = 0
 
         for i in range(len(coords) - 1):
-            osrm_url = f"http://router.project-osrm.org/route/v1/driving/{coords[i]['lon']},{coords[i]['lat']};{coords[i+1]['lon']},{coords[i+1]['lat']}"
+            osrm_url = f"{OSRM_URL}/route/v1/driving/{coords[i]['lon']},{coords[i]['lat']};{coords[i+1]['lon']},{coords[i+1]['lat']}"
             response = requests.get(osrm_url, timeout=10)
 
             if response.status_code == 200:
@@ -5662,7 +5849,7 @@ def get_nearby_hazards():
 
         # Get cameras
         cursor.execute(
-            'SELECT lat, lon, type, description FROM cameras WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?',
+            CAMERAS_BBOX_SQL,
             (south, north, west, east)
         )
         for row in cursor.fetchall():
@@ -5677,7 +5864,7 @@ def get_nearby_hazards():
 
         # Get community reports
         cursor.execute(
-            'SELECT lat, lon, hazard_type, description, severity FROM community_hazard_reports WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ? AND status = "active" AND expiry_timestamp > ?',
+            ACTIVE_REPORTS_BBOX_SQL,
             (south, north, west, east, int(time.time()))
         )
         for row in cursor.fetchall():
@@ -6432,6 +6619,162 @@ def get_engine_status_endpoint():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/monitoring/custom-router', methods=['GET'])
+def get_custom_router_query_stats():
+    """Get per-phase latency histograms and search counters for the custom router."""
+    try:
+        if not custom_router:
+            return jsonify({'success': False, 'error': 'Custom router not initialized'})
+
+        return jsonify({
+            'success': True,
+            'router': custom_router.get_stats(),
+            'requests': custom_router_stats
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+def custom_router_readiness() -> Dict[str, Any]:
+    """Custom router loading state for the health endpoints.
+
+    The server is ready once the custom router serves, or when it is disabled or
+    failed to load (the external engines then carry all traffic).
+    """
+    if not (CUSTOM_ROUTER_AVAILABLE and USE_CUSTOM_ROUTER and router_holder):
+        return {'ready': True, 'custom_router': 'disabled', 'progress': None}
+
+    progress = router_holder.progress
+    if router_holder.active is not None:
+        state = 'ready'
+    elif progress.failed:
+        state = 'failed'
+    else:
+        state = 'loading'
+    return {
+        'ready': state != 'loading',
+        'custom_router': state,
+        'graph_version': router_holder.active.version if router_holder.active else None,
+        'progress': progress.to_dict()
+    }
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness probe: the process is up and serving HTTP."""
+    return jsonify({'status': 'ok', 'uptime_s': round(time.time() - APP_START_TIME, 1),
+                    'custom_router': custom_router_readiness()['custom_router']})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness probe: 503 with loading progress until the custom router is up."""
+    readiness = custom_router_readiness()
+    return jsonify({'status': 'ready' if readiness['ready'] else 'loading', **readiness}), \
+        200 if readiness['ready'] else 503
+
+@metrics_registry.collector
+def collect_router_metrics() -> List[Tuple[str, str, str, List[Any]]]:
+    """Route cache occupancy and the active graph's search statistics, read at scrape time."""
+    families = [('voyagr_route_cache_entries', 'gauge', 'Routes held in the route cache',
+                 [('voyagr_route_cache_entries', {}, len(route_cache.cache))])]
+    instance = router_holder.active if router_holder else None
+    if instance is None:
+        return families
+
+    aggregator = instance.router.query_stats
+    with aggregator.lock:
+        phases = {phase: (h.buckets, list(h.counts), h.total) for phase, h in aggregator.latency.items()}
+        settled = (aggregator.settled.buckets, list(aggregator.settled.counts), aggregator.settled.total)
+        totals = {'queries': aggregator.queries, 'query_failures': aggregator.failures,
+                  'heap_pushes': aggregator.heap_pushes, 'relaxations': aggregator.relaxations}
+
+    # Router histograms are kept in milliseconds
+    latency = []
+    for phase, (buckets, counts, total) in phases.items():
+        latency.extend(histogram_samples('voyagr_router_query_duration_seconds', {'phase': phase},
+                                         [b / 1000 for b in buckets], counts, total / 1000))
+    families.append(('voyagr_router_query_duration_seconds', 'histogram',
+                     'Custom router query time by phase', latency))
+    families.append(('voyagr_router_settled_nodes', 'histogram', 'Nodes settled per custom router search',
+                     histogram_samples('voyagr_router_settled_nodes', {}, *settled)))
+    for name, value in totals.items():
+        families.append((f'voyagr_router_{name}', 'counter', f'Custom router {name.replace("_", " ")}',
+                         [(f'voyagr_router_{name}_total', {}, value)]))
+    return families
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format)."""
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/api/admin/graph', methods=['GET'])
+@require_auth
+def get_graph_version_status():
+    """Report the active graph version, draining versions and last reload."""
+    try:
+        if not router_holder:
+            return jsonify({'success': False, 'error': 'Custom router not available'}), 503
+        return jsonify({'success': True, **router_holder.status()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/admin/graph/reload', methods=['POST'])
+@require_auth
+def reload_graph_version():
+    """Load a new graph version in the background, warm it and swap it in."""
+    try:
+        if not router_holder:
+            return jsonify({'success': False, 'error': 'Custom router not available'}), 503
+
+        # db_file names a database in the configured graph directory (default: the configured DB)
+        data = request.get_json(silent=True) or {}
+        graph_dir = os.path.realpath(os.path.dirname(CUSTOM_ROUTER_DB) or '.')
+        db_file = os.path.realpath(os.path.join(graph_dir, data.get('db_file') or os.path.basename(CUSTOM_ROUTER_DB)))
+        if os.path.dirname(db_file) != graph_dir:
+            return jsonify({'success': False, 'error': 'db_file must be in the graph directory'}), 400
+        if not os.path.exists(db_file):
+            return jsonify({'success': False, 'error': f'Database not found: {os.path.basename(db_file)}'}), 400
+
+        if not router_holder.reload_async(db_file, warm=data.get('warm', True)):
+            return jsonify({'success': False, 'error': 'Reload already in progress'}), 409
+
+        logger.info(f"[CUSTOM_ROUTER] Hot reload of {db_file} started")
+        return jsonify({'success': True, 'message': 'Reload started', **router_holder.status()}), 202
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/admin/profiles', methods=['GET'])
+@require_auth
+def list_request_profiles():
+    """List the recent sampled request profiles."""
+    return jsonify({'success': True, 'sample_every': profile_store.sample_every,
+                    'profiles': profile_store.list()})
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+@require_auth
+def download_request_profile(profile_id: str):
+    """Download one profile ('all' merges every kept profile) as collapsed stacks for flamegraph.pl or speedscope."""
+    if profile_id != 'all' and not profile_id.isdigit():
+        return jsonify({'success': False, 'error': f'Invalid profile id: {profile_id}'}), 400
+    folded = profile_store.collapsed(None if profile_id == 'all' else int(profile_id))
+    if folded is None:
+        return jsonify({'success': False, 'error': f'Profile {profile_id} not found'}), 404
+    return Response(folded, mimetype='text/plain', headers={
+        'Content-Disposition': f'attachment; filename=profile-{profile_id}.folded'})
+
+@app.route('/api/admin/slow-queries', methods=['GET', 'DELETE'])
+@require_auth
+def slow_query_report():
+    """Per-statement SQL timings with query plans of slow statements; DELETE resets them."""
+    profiler = get_query_profiler()
+    if request.method == 'DELETE':
+        profiler.reset()
+        return jsonify({'success': True})
+    sort = request.args.get('sort', 'total_ms')
+    try:
+        report = profiler.report(limit=request.args.get('limit', 20, type=int), sort=sort)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, **report})
+
 @app.route('/api/monitoring/engine-status/<engine_name>', methods=['GET'])
 def get_single_engine_status(engine_name: str):
     """Get status of a specific routing engine."""
@@ -6980,15 +7323,15 @@ def fallback_chain_status():
         # Check OSRM
         try:
             start = time.time()
-            response = requests.get("http://router.project-osrm.org/status", timeout=5)
+            response = requests.get(f"{OSRM_URL}/status", timeout=5)
             elapsed = (time.time() - start) * 1000
             status['osrm'] = {
                 'available': response.status_code == 200,
                 'response_time_ms': round(elapsed, 0),
-                'url': 'http://router.project-osrm.org'
+                'url': OSRM_URL
             }
         except:
-            status['osrm'] = {'available': False, 'response_time_ms': None, 'url': 'http://router.project-osrm.org'}
+            status['osrm'] = {'available': False, 'response_time_ms': None, 'url': OSRM_URL}
 
         # Determine fallback chain
         fallback_chain = []
@@ -7341,11 +7684,11 @@ if __name__ == '__main__':
     # ====================================================================
     # PHASE 3: Custom router initialization (background thread)
     # ====================================================================
-    # Initialize custom router as PRIMARY router (BLOCKING - eager edge loading)
+    # HTTP comes up immediately; routes use the external engines until the
+    # custom router has loaded, then switch over (progress on /readyz)
     if CUSTOM_ROUTER_AVAILABLE and USE_CUSTOM_ROUTER:
-        print("\n[STARTUP] Initializing custom router (this may take 2-3 minutes)...")
-        init_custom_router()
-        print("[STARTUP] ✅ Custom router initialization complete")
+        print("\n[STARTUP] Loading custom router in background (this may take 2-3 minutes)...")
+        threading.Thread(target=init_custom_router, name='custom-router-loader', daemon=True).start()
     else:
         print("\n[STARTUP] Custom router disabled - using fallback chain (GraphHopper/Valhalla/OSRM)")
 